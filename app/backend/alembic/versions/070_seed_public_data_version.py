@@ -0,0 +1,30 @@
+"""Seed the public data version used for ETag/Last-Modified.
+
+The row is bumped on every commit touching public travel/photo tables.
+Seeding it up front means writers only ever UPDATE it.
+"""
+
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "070"
+down_revision = "069"
+
+_app_settings = sa.table(
+    "app_settings",
+    sa.column("key", sa.String),
+    sa.column("value", sa.Text),
+)
+
+
+def upgrade() -> None:
+    op.bulk_insert(
+        _app_settings,
+        [{"key": "public_data_version", "value": datetime.now(UTC).isoformat()}],
+    )
+
+
+def downgrade() -> None:
+    op.execute(_app_settings.delete().where(_app_settings.c.key == "public_data_version"))
@@ -0,0 +1,26 @@
+"""Create cache_entries table (persistent tier of the shared cache)."""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import mysql
+
+revision = "071"
+down_revision = "070"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cache_entries",
+        sa.Column("namespace", sa.String(50), primary_key=True),
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column(
+            "value", sa.LargeBinary().with_variant(mysql.LONGBLOB(), "mysql"), nullable=False
+        ),
+        sa.Column("stored_at", sa.DateTime, nullable=False),
+        sa.Column("stale_at", sa.DateTime, nullable=False),
+        sa.Column("expires_at", sa.DateTime, nullable=False, index=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cache_entries")
@@ -0,0 +1,18 @@
+"""Add derivatives_at to instagram_media (resized WebP/JPEG copies)."""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "072"
+down_revision = "071"
+
+
+def upgrade() -> None:
+    op.add_column(
+        "instagram_media",
+        sa.Column("derivatives_at", sa.DateTime, nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("instagram_media", "derivatives_at")
@@ -0,0 +1,24 @@
+"""Create instagram_sync_state (Graph API crawl checkpoints, replaces the /tmp cursor file)."""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "074"
+down_revision = "073"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "instagram_sync_state",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("cursor", sa.Text),
+        sa.Column("last_seen_at", sa.DateTime),
+        sa.Column("pages_scanned", sa.Integer, nullable=False),
+        sa.Column("run_started_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime),
+        sa.Column("completed_at", sa.DateTime),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("instagram_sync_state")
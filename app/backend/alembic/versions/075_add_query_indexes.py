@@ -0,0 +1,53 @@
+"""Add indexes for the gallery, stats, map, labeler and flight import queries.
+
+The FK indexes MySQL creates on instagram_posts(trip_id, tcc_destination_id)
+and instagram_media(post_id) stay: these extend them with the columns the
+queries filter and sort on, so the lookups no longer read every matching row.
+"""
+
+from alembic import op
+
+revision = "075"
+down_revision = "074"
+
+INDEXES = (
+    (
+        "ix_instagram_posts_trip_id_labeled",
+        "instagram_posts",
+        ["trip_id", "skipped", "is_cover", "labeled_at"],
+    ),
+    (
+        "ix_instagram_posts_tcc_destination_id_labeled",
+        "instagram_posts",
+        ["tcc_destination_id", "skipped", "is_cover", "labeled_at"],
+    ),
+    (
+        "ix_instagram_media_post_id_order",
+        "instagram_media",
+        ["post_id", "media_order", "media_type"],
+    ),
+    (
+        "ix_visits_first_visit_date_tcc_destination_id",
+        "visits",
+        ["first_visit_date", "tcc_destination_id"],
+    ),
+    ("ix_trips_start_date_end_date", "trips", ["start_date", "end_date"]),
+    ("ix_cities_lat_lng", "cities", ["lat", "lng"]),
+    (
+        "ix_drone_flights_visibility",
+        "drone_flights",
+        ["is_deleted", "is_test", "is_hidden", "flight_date"],
+    ),
+    # Duplicate check when a flight record is imported
+    ("ix_drone_flights_source_file", "drone_flights", ["source_file"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
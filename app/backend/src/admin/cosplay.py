@@ -13,6 +13,7 @@ from ..database import get_db
 from ..log_config import get_logger
 from ..models import CosplayCostume, CosplayPhoto, User
 from ..storage import get_storage
+from ..uploads import read_upload
 
 log = get_logger(__name__)
 
@@ -148,21 +149,16 @@ async def upload_photo(
     if not file.content_type or file.content_type not in IMAGE_MIME_TYPES:
         raise HTTPException(status_code=400, detail="Only image files are accepted")
 
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="File is empty")
-    if len(content) > 10 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File too large (max 10MB)")
-
-    # Get dimensions
-    import io
+    upload = await read_upload(file, allowed_types=IMAGE_MIME_TYPES)
 
+    # Get dimensions (Pillow only reads the header)
     width, height = None, None
     try:
-        img = Image.open(io.BytesIO(content))
-        width, height = img.size
+        with Image.open(upload.file) as img:
+            width, height = img.size
     except Exception:
         pass
+    upload.file.seek(0)
 
     # Save to storage
     ext = (
@@ -172,7 +168,7 @@ async def upload_photo(
     )
     filename = f"{uuid.uuid4().hex}.{ext}"
     storage = get_storage("cosplay")
-    storage.save(filename, content, file.content_type)
+    storage.save(filename, upload.file, file.content_type)
 
     # Next sort_order
     max_order = (
@@ -1,26 +1,38 @@
 """Instagram post labeling endpoints."""
 
 import json
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Annotated, Any, cast
+from typing import Annotated, Any, NamedTuple, cast
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import FileResponse, RedirectResponse
 from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from .. import http_client
 from ..auth.session import get_admin_user
 from ..config import settings
 from ..database import get_db
+from ..jobs import JobContext, JobError, job_handler
 from ..log_config import get_logger
+from ..media_derivatives import (
+    backfill_derivatives,
+    display_size,
+    generate_derivatives,
+    media_file_response,
+)
 from ..models import (
     City,
     InstagramMedia,
     InstagramPost,
+    InstagramSyncState,
     TCCDestination,
     Trip,
     UNCountry,
@@ -34,8 +46,9 @@ router = APIRouter(prefix="/instagram", tags=["instagram"])
 # Instagram API config
 GRAPH_API_URL = "https://graph.facebook.com/v24.0"
 
-# Cursor file — stored in /tmp (always writable, even in non-root containers)
-CURSOR_FILE = Path("/tmp/.instagram_pagination_cursor")
+# Sync checkpoints (instagram_sync_state rows)
+BACKFILL_STATE = "backfill"
+FILL_GAPS_STATE = "fill_gaps"
 
 
 class InstagramMediaData(BaseModel):
@@ -556,6 +569,8 @@ def label_post(
 def get_media_file(
     media_id: int,
     _user: Annotated[User, Depends(get_admin_user)],
+    size: int | None = Query(None, ge=1, description="Display width in px (serves a resized copy)"),
+    accept: str | None = Header(None),
     db: Session = Depends(get_db),
 ) -> FileResponse | RedirectResponse:
     """Get media file path for serving."""
@@ -564,24 +579,36 @@ def get_media_file(
     if not media or not media.storage_path:
         raise HTTPException(status_code=404, detail="Media not found")
 
-    # If storage_path is a URL (GCS), redirect to it
-    if media.storage_path.startswith("http"):
-        return RedirectResponse(url=media.storage_path, status_code=302)
+    return media_file_response(media, size, accept)
 
-    # Fallback to local file serving (dev mode)
-    path = Path(media.storage_path)
 
-    # If path doesn't exist, try Docker mount path
-    if not path.exists():
-        # Extract filename and look in Docker mount location
-        filename = path.name
-        docker_path = Path("/app/data/instagram") / filename
-        if docker_path.exists():
-            path = docker_path
-        else:
-            raise HTTPException(status_code=404, detail="File not found")
+class BackfillResponse(BaseModel):
+    """Response from derivative backfill."""
 
-    return FileResponse(path, media_type="image/jpeg")
+    processed: int
+    failed: int
+    remaining: int
+
+
+@router.post("/derivatives/backfill")
+def backfill_media_derivatives(
+    _user: Annotated[User, Depends(get_admin_user)],
+    db: Session = Depends(get_db),
+    limit: int = Query(200, ge=1, le=2000),
+) -> BackfillResponse:
+    """Generate resized copies for up to ``limit`` stored photos that lack them."""
+    processed, failed = backfill_derivatives(db, get_storage(), limit=limit)
+    remaining = (
+        db.query(func.count(InstagramMedia.id))
+        .filter(
+            InstagramMedia.derivatives_at.is_(None),
+            InstagramMedia.storage_path.isnot(None),
+            InstagramMedia.media_type != "VIDEO",
+        )
+        .scalar()
+        or 0
+    )
+    return BackfillResponse(processed=processed, failed=failed, remaining=remaining)
 
 
 class FetchResponse(BaseModel):
@@ -592,20 +619,45 @@ class FetchResponse(BaseModel):
     message: str
 
 
-def _load_cursor() -> str | None:
-    """Load saved pagination cursor."""
-    if CURSOR_FILE.exists():
-        try:
-            data: dict[str, str] = json.loads(CURSOR_FILE.read_text())
-            return data.get("next_url")
-        except (json.JSONDecodeError, KeyError):
-            pass
-    return None
+def _utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def _sync_state(db: Session, name: str) -> InstagramSyncState:
+    """Checkpoint row for a crawl (created on first use)."""
+    state = db.get(InstagramSyncState, name)
+    if state is None:
+        state = InstagramSyncState(name=name, pages_scanned=0)
+        db.add(state)
+    state.run_started_at = _utcnow()
+    return state
+
+
+def _checkpoint(
+    db: Session,
+    state: InstagramSyncState,
+    *,
+    cursor: str | None,
+    last_seen_at: datetime | None = None,
+    pages: int = 1,
+) -> None:
+    """Record progress after a page and commit, so a later run resumes here."""
+    state.cursor = _strip_token(cursor) if cursor else None
+    if last_seen_at is not None:
+        state.last_seen_at = last_seen_at.astimezone(UTC).replace(tzinfo=None)
+    state.pages_scanned += pages
+    state.updated_at = _utcnow()
+    db.commit()
+
 
+def _strip_token(url: str) -> str:
+    """Page URLs embed the access token; don't persist it (it rotates anyway)."""
+    return str(httpx.URL(url).copy_remove_param("access_token"))
 
-def _save_cursor(next_url: str | None) -> None:
-    """Save pagination cursor for next fetch."""
-    CURSOR_FILE.write_text(json.dumps({"next_url": next_url}))
+
+def _as_utc(value: datetime) -> datetime:
+    """DB timestamps are naive UTC; make them comparable with API timestamps."""
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value
 
 
 def _api_request_with_retry(
@@ -617,7 +669,7 @@ def _api_request_with_retry(
     last_error: Exception | None = None
     for attempt in range(max_retries):
         try:
-            response = httpx.get(url, params=params or {}, timeout=60)
+            response = http_client.get(url, params=params or {}, timeout=60)
             response.raise_for_status()
             return cast(dict[str, Any], response.json())
         except (httpx.TimeoutException, httpx.ConnectError) as e:
@@ -638,24 +690,28 @@ def _api_request_with_retry(
 
 
 def _fetch_posts_from_api(
-    limit: int, cursor_url: str | None = None
+    limit: int, cursor_url: str | None = None, *, until: datetime | None = None
 ) -> tuple[list[dict[str, Any]], str | None]:
-    """Fetch posts from Instagram Graph API."""
+    """Fetch posts from Instagram Graph API.
+
+    Starts at ``cursor_url`` if given, else at the newest post (or the newest
+    one published before ``until``).
+    """
     posts: list[dict[str, Any]] = []
 
+    params: dict[str, Any] = {"access_token": settings.instagram_page_token or ""}
     if cursor_url:
         url = cursor_url
-        params: dict[str, Any] = {}
     else:
         url = f"{GRAPH_API_URL}/{settings.instagram_account_id}/media"
-        params = {
-            "fields": "id,caption,media_type,timestamp,permalink,location",
-            "limit": min(limit, 100),
-            "access_token": settings.instagram_page_token or "",
-        }
+        params["fields"] = "id,caption,media_type,timestamp,permalink,location"
+        params["limit"] = min(limit, 100)
+        if until is not None:
+            # One second of overlap: already stored posts are skipped anyway
+            params["until"] = int(_as_utc(until).timestamp()) + 1
 
     while len(posts) < limit:
-        data = _api_request_with_retry(url, params if params else None)
+        data = _api_request_with_retry(url, params)
 
         posts.extend(data.get("data", []))
 
@@ -695,14 +751,17 @@ def _fetch_media_url(media_id: str) -> str | None:
 
 def _download_image(
     url: str, filename: str, storage: StorageBackend
-) -> tuple[str, tuple[int, int] | None]:
-    """Download image, save to storage, return (storage_path, dimensions)."""
+) -> tuple[str, tuple[int, int] | None, bool]:
+    """Download image, save it and its resized copies to storage.
+
+    Returns (storage_path, dimensions, derivatives stored).
+    """
     from io import BytesIO
 
     from PIL import Image
 
     try:
-        response = httpx.get(url, timeout=60)
+        response = http_client.get(url, timeout=60)
         response.raise_for_status()
         content = response.content
 
@@ -710,104 +769,318 @@ def _download_image(
         dimensions: tuple[int, int] | None = None
         try:
             with Image.open(BytesIO(content)) as img:
-                dimensions = img.size
+                dimensions = display_size(img)
         except Exception:
             log.warning("Failed to read image dimensions for %s", filename)
 
         # Save to storage (local or GCS)
         storage_path = storage.save(filename, content)
-        return storage_path, dimensions
     except Exception:
         log.error("Failed to download image %s: %s", filename, url, exc_info=True)
-        return "", None
+        return "", None, False
+
+    # A failure here only costs bandwidth: the backfill retries later
+    try:
+        generate_derivatives(content, Path(filename).stem, storage)
+    except Exception:
+        log.warning("Failed to generate derivatives for %s", filename, exc_info=True)
+        return storage_path, dimensions, False
+    return storage_path, dimensions, True
+
+
+# --- Ingestion pipeline ---
+#
+# Listing pages stays with the endpoint (it decides when to stop). Each new
+# post then goes through two pools: one fetches its media metadata (carousel
+# children or the single media URL), the other downloads each image, probes
+# its size and stores it with its resized copies. At most INGEST_MAX_IN_FLIGHT
+# posts are in the pipeline per run, so a slow consumer or upstream applies
+# back-pressure instead of queueing a whole backfill. Results come back in
+# input order and all database writes stay on the request thread.
 
+INGEST_METADATA_WORKERS = 4
+INGEST_DOWNLOAD_WORKERS = 8
+INGEST_MAX_IN_FLIGHT = 16
 
-def _process_single_post(db: Session, post_data: dict, storage: StorageBackend) -> bool:
-    """Process a single Instagram post. Returns True if new post was added."""
+# Shared by all runs, so concurrent syncs can't multiply upstream load
+_metadata_pool = ThreadPoolExecutor(INGEST_METADATA_WORKERS, thread_name_prefix="ig-metadata")
+_download_pool = ThreadPoolExecutor(INGEST_DOWNLOAD_WORKERS, thread_name_prefix="ig-download")
+
+
+class PreparedMedia(NamedTuple):
+    """A media item downloaded and stored, ready to insert."""
+
+    ig_media_id: str
+    media_type: str
+    order: int
+    storage_path: str | None
+    dimensions: tuple[int, int] | None
+    derived: bool
+
+
+class IngestResult(NamedTuple):
+    """Outcome of preparing one post (``error`` set if it failed)."""
+
+    post_data: dict[str, Any]
+    media: list[PreparedMedia]
+    error: Exception | None
+
+
+def _media_items(post_data: dict[str, Any]) -> list[dict[str, Any]]:
+    """Media metadata for a post: carousel children or the post itself."""
     ig_id = post_data["id"]
+    if post_data["media_type"] == "CAROUSEL_ALBUM":
+        return [
+            {
+                "ig_media_id": child["id"],
+                "media_type": child["media_type"],
+                "media_url": child.get("media_url"),
+                "order": i,
+            }
+            for i, child in enumerate(_fetch_carousel_children(ig_id))
+        ]
+    return [
+        {
+            "ig_media_id": ig_id,
+            "media_type": post_data["media_type"],
+            "media_url": _fetch_media_url(ig_id),
+            "order": 0,
+        }
+    ]
+
+
+def _prepare_media(item: dict[str, Any], storage: StorageBackend) -> PreparedMedia:
+    storage_path = ""
+    dimensions = None
+    derived = False
+    # Videos are recorded without a file
+    if item["media_type"] != "VIDEO" and item.get("media_url"):
+        filename = f"{item['ig_media_id']}.jpg"
+        storage_path, dimensions, derived = _download_image(
+            str(item["media_url"]), filename, storage
+        )
+    return PreparedMedia(
+        ig_media_id=item["ig_media_id"],
+        media_type=item["media_type"],
+        order=item["order"],
+        storage_path=storage_path or None,
+        dimensions=dimensions,
+        derived=derived,
+    )
+
+
+def _prepare_post(post_data: dict[str, Any], storage: StorageBackend) -> list[PreparedMedia]:
+    """Fetch metadata, then download a post's images in parallel (no DB access)."""
+    futures = [
+        _download_pool.submit(_prepare_media, item, storage) for item in _media_items(post_data)
+    ]
+    return [future.result() for future in futures]
+
 
-    # Check if already exists
-    existing = db.query(InstagramPost).filter(InstagramPost.ig_id == ig_id).first()
-    if existing:
-        return False
+def _ingest_posts(
+    posts: Iterable[dict[str, Any]],
+    storage: StorageBackend,
+    *,
+    max_in_flight: int = INGEST_MAX_IN_FLIGHT,
+) -> Iterator[IngestResult]:
+    """Prepare posts concurrently, yielding results in input order.
 
+    Stopping iteration early cancels posts that haven't started yet.
+    """
+    pending: deque[tuple[dict[str, Any], Future[list[PreparedMedia]]]] = deque()
+
+    def collect(post_data: dict[str, Any], future: Future[list[PreparedMedia]]) -> IngestResult:
+        try:
+            return IngestResult(post_data, future.result(), None)
+        except Exception as e:
+            return IngestResult(post_data, [], e)
+
+    try:
+        for post_data in posts:
+            pending.append((post_data, _metadata_pool.submit(_prepare_post, post_data, storage)))
+            if len(pending) >= max_in_flight:
+                yield collect(*pending.popleft())
+        while pending:
+            yield collect(*pending.popleft())
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def _build_post(post_data: dict[str, Any], media: list[PreparedMedia]) -> InstagramPost:
+    """A new post with its media attached (not yet added to a session)."""
     # Parse location
     location = post_data.get("location", {})
     location_name = location.get("name") if location else None
     location_lat = location.get("latitude") if location else None
     location_lng = location.get("longitude") if location else None
 
-    # Create post record
-    post = InstagramPost(
-        ig_id=ig_id,
+    now = datetime.now(UTC)
+    return InstagramPost(
+        ig_id=post_data["id"],
         caption=post_data.get("caption"),
         media_type=post_data["media_type"],
-        posted_at=datetime.fromisoformat(post_data["timestamp"].replace("+0000", "+00:00")),
+        posted_at=_parse_timestamp(post_data["timestamp"]),
         permalink=post_data["permalink"],
         ig_location_name=location_name,
         ig_location_lat=location_lat,
         ig_location_lng=location_lng,
-        fetched_at=datetime.now(UTC),
+        fetched_at=now,
+        media=[
+            InstagramMedia(
+                ig_media_id=item.ig_media_id,
+                media_order=item.order,
+                media_type=item.media_type,
+                storage_path=item.storage_path,
+                width=item.dimensions[0] if item.dimensions else None,
+                height=item.dimensions[1] if item.dimensions else None,
+                downloaded_at=now if item.storage_path else None,
+                derivatives_at=now if item.derived else None,
+            )
+            for item in media
+        ],
     )
-    db.add(post)
-    db.flush()
 
-    # Get media items
-    media_items = []
-    if post_data["media_type"] == "CAROUSEL_ALBUM":
-        children = _fetch_carousel_children(ig_id)
-        for i, child in enumerate(children):
-            media_items.append(
-                {
-                    "ig_media_id": child["id"],
-                    "media_type": child["media_type"],
-                    "media_url": child.get("media_url"),
-                    "order": i,
-                }
-            )
-    else:
-        media_url = _fetch_media_url(ig_id)
-        media_items.append(
-            {
-                "ig_media_id": ig_id,
-                "media_type": post_data["media_type"],
-                "media_url": media_url,
-                "order": 0,
-            }
-        )
 
-    # Download and save media (storage backend handles directory creation)
-    for item in media_items:
-        if item["media_type"] == "VIDEO":
-            media = InstagramMedia(
-                post_id=post.id,
-                ig_media_id=item["ig_media_id"],
-                media_order=item["order"],
-                media_type=item["media_type"],
-            )
+def _insert_page(db: Session, prepared: list[IngestResult]) -> int:
+    """Insert a page of prepared posts in one transaction. Returns how many were new.
+
+    If another run inserted some of them meanwhile, the batch is retried
+    without those.
+    """
+    if not prepared:
+        return 0
+    try:
+        db.add_all(_build_post(r.post_data, r.media) for r in prepared)
+        db.commit()
+        return len(prepared)
+    except IntegrityError:
+        db.rollback()
+    existing = _existing_ig_ids(db, [r.post_data["id"] for r in prepared])
+    remaining = [r for r in prepared if r.post_data["id"] not in existing]
+    db.add_all(_build_post(r.post_data, r.media) for r in remaining)
+    db.commit()
+    return len(remaining)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("+0000", "+00:00"))
+
+
+def _existing_ig_ids(db: Session, ig_ids: list[str]) -> set[str]:
+    """Which of a page's post IDs are already stored (one query)."""
+    if not ig_ids:
+        return set()
+    rows = db.query(InstagramPost.ig_id).filter(InstagramPost.ig_id.in_(ig_ids)).all()
+    return {row[0] for row in rows}
+
+
+ProgressCallback = Callable[..., None]
+
+
+def _no_progress(**_progress: Any) -> None:
+    pass
+
+
+def _instagram_configured() -> bool:
+    return bool(settings.instagram_account_id and settings.instagram_page_token)
+
+
+def fetch_older_posts(
+    db: Session,
+    storage: StorageBackend,
+    count: int,
+    *,
+    progress: ProgressCallback = _no_progress,
+) -> FetchResponse:
+    """Fetch up to ``count`` posts older than what we have.
+
+    Resumes from the backfill checkpoint: the saved page cursor, else the
+    last post reached, else just below the oldest stored post, so known
+    history is never paged through again. Raises httpx.HTTPError if the
+    Graph API fails.
+    """
+    state = _sync_state(db, BACKFILL_STATE)
+    if state.completed_at is not None:
+        db.commit()
+        return FetchResponse(fetched=0, skipped=0, message="All older posts already fetched")
+
+    cursor = state.cursor
+    until = state.last_seen_at
+    if until is None:
+        until = db.query(func.min(InstagramPost.posted_at)).scalar()
+
+    fetched = 0
+    skipped = 0
+    max_pages = 10
+
+    for page in range(1, max_pages + 1):
+        try:
+            posts, next_cursor = _fetch_posts_from_api(100, cursor, until=until)
+        except httpx.HTTPStatusError as e:
+            if cursor is None or e.response.status_code >= 500:
+                raise
+            # Page cursors expire; the timestamp checkpoint gets us to the same place
+            log.warning("Saved Instagram cursor rejected (%s), resuming by time", e)
+            cursor = None
+            posts, next_cursor = _fetch_posts_from_api(100, until=until)
+
+        if not posts:
+            state.completed_at = _utcnow()
+            _checkpoint(db, state, cursor=None, pages=0)
+            break
+
+        known = _existing_ig_ids(db, [p["id"] for p in posts])
+        new_posts = [p for p in posts if p["id"] not in known]
+        skipped += len(posts) - len(new_posts)
+
+        # Don't download far past what was asked for
+        wanted = count - fetched
+        prepared: list[IngestResult] = []
+        last_processed = posts[-1]
+        stopped_early = False
+        for result in _ingest_posts(
+            new_posts, storage, max_in_flight=min(INGEST_MAX_IN_FLIGHT, wanted)
+        ):
+            if result.error is not None:
+                log.error(
+                    "Failed to process post %s in fetch",
+                    result.post_data.get("id", "unknown"),
+                    exc_info=result.error,
+                )
+                skipped += 1
+                continue
+            prepared.append(result)
+            if len(prepared) >= wanted:
+                stopped_early = result.post_data is not new_posts[-1]
+                if stopped_early:
+                    last_processed = result.post_data
+                break
+
+        inserted = _insert_page(db, prepared)
+        fetched += inserted
+        skipped += len(prepared) - inserted
+        last_seen_at = _parse_timestamp(last_processed["timestamp"])
+
+        if stopped_early:
+            # Resume from this post's timestamp rather than skip the rest of the page
+            _checkpoint(db, state, cursor=None, last_seen_at=last_seen_at)
+            cursor, until = None, last_seen_at
         else:
-            filename = f"{item['ig_media_id']}.jpg"
-
-            storage_path = ""
-            dimensions = None
-            media_url = item.get("media_url")
-            if media_url:
-                storage_path, dimensions = _download_image(str(media_url), filename, storage)
-
-            media = InstagramMedia(
-                post_id=post.id,
-                ig_media_id=item["ig_media_id"],
-                media_order=item["order"],
-                media_type=item["media_type"],
-                storage_path=storage_path if storage_path else None,
-                width=dimensions[0] if dimensions else None,
-                height=dimensions[1] if dimensions else None,
-                downloaded_at=datetime.now(UTC) if storage_path else None,
-            )
+            if not next_cursor:
+                state.completed_at = _utcnow()
+            _checkpoint(db, state, cursor=next_cursor, last_seen_at=last_seen_at)
+            cursor = next_cursor
+        progress(fetched=fetched, skipped=skipped, page=page)
 
-        db.add(media)
+        if fetched >= count or (not cursor and not stopped_early):
+            break
 
-    return True
+    return FetchResponse(
+        fetched=fetched,
+        skipped=skipped,
+        message=f"Fetched {fetched} new posts" + (f" (skipped {skipped})" if skipped else ""),
+    )
 
 
 @router.post("/fetch")
@@ -817,87 +1090,104 @@ def fetch_more_posts(
     count: int = 10,
 ) -> FetchResponse:
     """Fetch older posts from Instagram API (continues from cursor)."""
-    if not settings.instagram_account_id or not settings.instagram_page_token:
+    if not _instagram_configured():
         raise HTTPException(status_code=500, detail="Instagram API not configured")
+    try:
+        return fetch_older_posts(db, get_storage(), count)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Instagram API error: {e}")
 
-    storage = get_storage()
 
-    # Load cursor to continue from last position
-    cursor = _load_cursor()
+def fill_gaps(db: Session, storage: StorageBackend, max_pages: int) -> Iterator[dict[str, Any]]:
+    """Scan the whole feed and insert any posts missing from the database.
 
-    # If no cursor, we need to calibrate: find the oldest post we have
-    # and page until we pass it
-    oldest_ig_id = None
-    if not cursor:
-        oldest_post = db.query(InstagramPost).order_by(InstagramPost.posted_at.asc()).first()
-        if oldest_post:
-            oldest_ig_id = oldest_post.ig_id
+    A scan cut short by ``max_pages`` (or a failure) is continued by the
+    next run from its checkpoint. Yields a progress dict per page; the last
+    one has ``done`` set. Raises httpx.HTTPError if the Graph API fails.
+    """
+    # Get the oldest post in DB to know when to stop
+    oldest_posted_at = db.query(func.min(InstagramPost.posted_at)).scalar()
+    oldest_timestamp = _as_utc(oldest_posted_at) if oldest_posted_at else None
 
     fetched = 0
-    skipped = 0
-    calibrating = oldest_ig_id is not None and cursor is None
-    found_oldest = False
-    max_pages = 50  # Higher limit for calibration
+    checked = 0
+    pages_fetched = 0
 
-    try:
-        for _ in range(max_pages):
-            posts, next_cursor = _fetch_posts_from_api(100, cursor)
+    state = _sync_state(db, FILL_GAPS_STATE)
+    url = f"{GRAPH_API_URL}/{settings.instagram_account_id}/media"
+    params: dict = {
+        "fields": "id,caption,media_type,timestamp,permalink,location",
+        "limit": 50,
+        "access_token": settings.instagram_page_token,
+    }
+    if state.cursor:
+        url = state.cursor
+        params = {"access_token": settings.instagram_page_token}
+    else:
+        # A new scan from the top of the feed
+        state.pages_scanned = 0
+        state.last_seen_at = None
+        state.completed_at = None
+    db.commit()
 
-            if not posts:
-                _save_cursor(None)
+    while pages_fetched < max_pages:
+        response = http_client.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+        pages_fetched += 1
+
+        posts = data.get("data", [])
+        if not posts:
+            break
+
+        # If we go past our oldest post, this is the last page
+        page = []
+        reached_oldest = False
+        for post_data in posts:
+            checked += 1
+            post_timestamp = _parse_timestamp(post_data["timestamp"])
+            if oldest_timestamp and post_timestamp < oldest_timestamp:
+                reached_oldest = True
                 break
+            page.append(post_data)
+        known = _existing_ig_ids(db, [p["id"] for p in page])
+        missing = [p for p in page if p["id"] not in known]
+
+        # Fill the page's gaps through the pipeline, then insert them together
+        prepared: list[IngestResult] = []
+        for result in _ingest_posts(missing, storage):
+            if result.error is not None:
+                # Log but continue - we want to find all gaps
+                log.error(f"Failed to fetch post {result.post_data['id']}: {result.error}")
+                continue
+            prepared.append(result)
+        fetched += _insert_page(db, prepared)
 
-            for post_data in posts:
-                ig_id = post_data["id"]
-
-                # If calibrating, skip until we pass our oldest post
-                if calibrating and not found_oldest:
-                    if ig_id == oldest_ig_id:
-                        found_oldest = True
-                    continue
-
-                try:
-                    if _process_single_post(db, post_data, storage):
-                        fetched += 1
-                        if fetched >= count:
-                            db.commit()
-                            _save_cursor(next_cursor)
-                            msg = f"Fetched {fetched} new posts"
-                            if calibrating:
-                                msg += f" (calibrated, skipped {skipped} existing)"
-                            return FetchResponse(fetched=fetched, skipped=skipped, message=msg)
-                    else:
-                        skipped += 1
-                except IntegrityError:
-                    # Duplicate entry - rollback to clear session state and continue
-                    db.rollback()
-                    skipped += 1
-                    continue
-                except Exception:
-                    log.error(
-                        "Failed to process post %s in fetch",
-                        post_data.get("id", "unknown"),
-                        exc_info=True,
-                    )
-                    db.rollback()
-                    skipped += 1
-                    continue
+        # Check for next page
+        paging = data.get("paging", {})
+        next_url = paging.get("next")
+        if reached_oldest or not next_url:
+            next_url = None
+            state.completed_at = _utcnow()
+        _checkpoint(
+            db, state, cursor=next_url, last_seen_at=_parse_timestamp(posts[-1]["timestamp"])
+        )
 
-            cursor = next_cursor
-            if not cursor:
-                break
+        if reached_oldest:
+            yield {"done": True, "fetched": fetched, "checked": checked, "page": pages_fetched}
+            return
 
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=502, detail=f"Instagram API error: {e}")
+        # Page progress update
+        yield {"fetched": fetched, "checked": checked, "page": pages_fetched}
 
-    db.commit()
-    _save_cursor(cursor)
+        if not next_url:
+            break
 
-    return FetchResponse(
-        fetched=fetched,
-        skipped=skipped,
-        message=f"Fetched {fetched} new posts" + (f" (skipped {skipped})" if skipped else ""),
-    )
+        url = next_url
+        params = {}
+
+    db.commit()
+    yield {"done": True, "fetched": fetched, "checked": checked, "page": pages_fetched}
 
 
 @router.get("/fill-gaps")
@@ -912,124 +1202,32 @@ def fill_gaps_stream(
     """
     from starlette.responses import StreamingResponse
 
-    if not settings.instagram_account_id or not settings.instagram_page_token:
+    if not _instagram_configured():
         raise HTTPException(status_code=500, detail="Instagram API not configured")
 
     storage = get_storage()
 
     def generate() -> Any:
-        # Get the oldest post in DB to know when to stop
-        oldest_post = db.query(InstagramPost).order_by(InstagramPost.posted_at.asc()).first()
-        oldest_timestamp = None
-        if oldest_post and oldest_post.posted_at:
-            # Make timezone-aware for comparison with API timestamps
-            if oldest_post.posted_at.tzinfo is None:
-                oldest_timestamp = oldest_post.posted_at.replace(tzinfo=UTC)
-            else:
-                oldest_timestamp = oldest_post.posted_at
-
-        fetched = 0
-        checked = 0
-        pages_fetched = 0
-
-        url = f"{GRAPH_API_URL}/{settings.instagram_account_id}/media"
-        params: dict = {
-            "fields": "id,caption,media_type,timestamp,permalink,location",
-            "limit": 50,
-            "access_token": settings.instagram_page_token,
-        }
-
         try:
-            while pages_fetched < max_pages:
-                response = httpx.get(url, params=params, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-                pages_fetched += 1
-
-                posts = data.get("data", [])
-                if not posts:
-                    break
-
-                for post_data in posts:
-                    checked += 1
-                    post_timestamp = datetime.fromisoformat(
-                        post_data["timestamp"].replace("+0000", "+00:00")
-                    )
-
-                    # If we've gone past our oldest post, we're done
-                    if oldest_timestamp and post_timestamp < oldest_timestamp:
-                        db.commit()
-                        msg = {
-                            "done": True,
-                            "fetched": fetched,
-                            "checked": checked,
-                            "page": pages_fetched,
-                        }
-                        yield f"data: {json.dumps(msg)}\n\n"
-                        return
-
-                    # Check if this post exists
-                    existing = (
-                        db.query(InstagramPost)
-                        .filter(InstagramPost.ig_id == post_data["id"])
-                        .first()
-                    )
-                    if existing:
-                        continue
-
-                    # Post is missing - try to add it
-                    try:
-                        if _process_single_post(db, post_data, storage):
-                            fetched += 1
-                            db.commit()  # Commit each successful post
-                            # Send progress update when we find a gap
-                            msg = {"fetched": fetched, "checked": checked, "page": pages_fetched}
-                            yield f"data: {json.dumps(msg)}\n\n"
-                    except IntegrityError:
-                        # Post was added by another process - that's fine
-                        db.rollback()
-                        continue
-                    except Exception as e:
-                        db.rollback()
-                        # Log but continue - we want to find all gaps
-                        log.error(f"Failed to fetch post {post_data['id']}: {e}")
-                        continue
-
-                # Send page progress update
-                msg = {"fetched": fetched, "checked": checked, "page": pages_fetched}
+            for msg in fill_gaps(db, storage, max_pages):
                 yield f"data: {json.dumps(msg)}\n\n"
-
-                # Check for next page
-                paging = data.get("paging", {})
-                next_url = paging.get("next")
-                if not next_url:
-                    break
-
-                url = next_url
-                params = {}
-
         except httpx.HTTPError as e:
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
-            return
-
-        db.commit()
-        msg = {"done": True, "fetched": fetched, "checked": checked, "page": pages_fetched}
-        yield f"data: {json.dumps(msg)}\n\n"
 
     return StreamingResponse(generate(), media_type="text/event-stream")
 
 
-@router.post("/sync-new")
-def sync_new_posts(
-    _user: Annotated[User, Depends(get_admin_user)],
-    db: Session = Depends(get_db),
-    max_pages: int = 5,
+def sync_new(
+    db: Session,
+    storage: StorageBackend,
+    max_pages: int,
+    *,
+    progress: ProgressCallback = _no_progress,
 ) -> FetchResponse:
-    """Fetch new posts from Instagram (from the beginning until we hit existing posts)."""
-    if not settings.instagram_account_id or not settings.instagram_page_token:
-        raise HTTPException(status_code=500, detail="Instagram API not configured")
+    """Fetch posts newer than what we have (newest first, until we hit known ones).
 
-    storage = get_storage()
+    Raises httpx.HTTPError if the Graph API fails.
+    """
     fetched = 0
     skipped = 0
     consecutive_skips = 0
@@ -1042,66 +1240,62 @@ def sync_new_posts(
         "access_token": settings.instagram_page_token,
     }
 
-    try:
-        while pages_fetched < max_pages:
-            response = httpx.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            pages_fetched += 1
-
-            posts = data.get("data", [])
-            if not posts:
-                break
-
-            for post_data in posts:
-                try:
-                    if _process_single_post(db, post_data, storage):
-                        fetched += 1
-                        consecutive_skips = 0
-                    else:
-                        skipped += 1
-                        consecutive_skips += 1
-                        # If we hit 10 consecutive existing posts, we've caught up
-                        if consecutive_skips >= 10:
-                            db.commit()
-                            return FetchResponse(
-                                fetched=fetched,
-                                skipped=skipped,
-                                message=f"Synced {fetched} new posts (caught up with existing)",
-                            )
-                except IntegrityError:
-                    # Duplicate entry - rollback to clear session state and continue
-                    db.rollback()
-                    skipped += 1
-                    consecutive_skips += 1
-                    if consecutive_skips >= 10:
-                        return FetchResponse(
-                            fetched=fetched,
-                            skipped=skipped,
-                            message=f"Synced {fetched} new posts (caught up with existing)",
-                        )
-                    continue
-                except Exception:
-                    log.error(
-                        "Failed to process post %s in sync-new",
-                        post_data.get("id", "unknown"),
-                        exc_info=True,
-                    )
-                    db.rollback()
-                    skipped += 1
-                    continue
-
-            # Check for next page
-            paging = data.get("paging", {})
-            next_url = paging.get("next")
-            if not next_url:
-                break
+    while pages_fetched < max_pages:
+        response = http_client.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+        pages_fetched += 1
+
+        posts = data.get("data", [])
+        if not posts:
+            break
+
+        # If we hit 10 consecutive existing posts, we've caught up
+        known = _existing_ig_ids(db, [p["id"] for p in posts])
+        new_posts = []
+        caught_up = False
+        for post_data in posts:
+            if post_data["id"] in known:
+                skipped += 1
+                consecutive_skips += 1
+                if consecutive_skips >= 10:
+                    caught_up = True
+                    break
+            else:
+                new_posts.append(post_data)
+                consecutive_skips = 0
+
+        prepared: list[IngestResult] = []
+        for result in _ingest_posts(new_posts, storage):
+            if result.error is not None:
+                log.error(
+                    "Failed to process post %s in sync-new",
+                    result.post_data.get("id", "unknown"),
+                    exc_info=result.error,
+                )
+                skipped += 1
+                continue
+            prepared.append(result)
+        inserted = _insert_page(db, prepared)
+        fetched += inserted
+        skipped += len(prepared) - inserted
+        progress(fetched=fetched, skipped=skipped, page=pages_fetched)
+
+        if caught_up:
+            return FetchResponse(
+                fetched=fetched,
+                skipped=skipped,
+                message=f"Synced {fetched} new posts (caught up with existing)",
+            )
 
-            url = next_url
-            params = {}
+        # Check for next page
+        paging = data.get("paging", {})
+        next_url = paging.get("next")
+        if not next_url:
+            break
 
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=502, detail=f"Instagram API error: {e}")
+        url = next_url
+        params = {}
 
     db.commit()
 
@@ -1111,3 +1305,53 @@ def sync_new_posts(
         message=f"Synced {fetched} new posts"
         + (f" ({skipped} already existed)" if skipped else ""),
     )
+
+
+@router.post("/sync-new")
+def sync_new_posts(
+    _user: Annotated[User, Depends(get_admin_user)],
+    db: Session = Depends(get_db),
+    max_pages: int = 5,
+) -> FetchResponse:
+    """Fetch new posts from Instagram (from the beginning until we hit existing posts)."""
+    if not _instagram_configured():
+        raise HTTPException(status_code=500, detail="Instagram API not configured")
+    try:
+        return sync_new(db, get_storage(), max_pages)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Instagram API error: {e}")
+
+
+# --- Background jobs (see src/jobs.py), submitted via POST /admin/jobs ---
+# Graph API errors propagate and are retried with backoff.
+
+
+def _job_storage() -> StorageBackend:
+    if not _instagram_configured():
+        raise JobError("Instagram API not configured")
+    return get_storage()
+
+
+@job_handler("instagram.sync_new")
+def _sync_new_job(ctx: JobContext) -> dict[str, Any]:
+    storage = _job_storage()
+    return sync_new(
+        ctx.db, storage, int(ctx.params.get("max_pages", 5)), progress=ctx.report
+    ).model_dump()
+
+
+@job_handler("instagram.fetch")
+def _fetch_job(ctx: JobContext) -> dict[str, Any]:
+    storage = _job_storage()
+    return fetch_older_posts(
+        ctx.db, storage, int(ctx.params.get("count", 10)), progress=ctx.report
+    ).model_dump()
+
+
+@job_handler("instagram.fill_gaps")
+def _fill_gaps_job(ctx: JobContext) -> dict[str, Any]:
+    storage = _job_storage()
+    result: dict[str, Any] = {}
+    for result in fill_gaps(ctx.db, storage, int(ctx.params.get("max_pages", 50))):
+        ctx.report(**result)
+    return result
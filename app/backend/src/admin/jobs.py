@@ -0,0 +1,148 @@
+"""Submit background jobs and follow their progress (see src/jobs.py)."""
+
+import time
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy.orm import Session
+
+from ..auth.session import get_admin_user
+from ..database import get_db
+from ..jobs import FAILED, SUCCEEDED, enqueue, job_kinds
+from ..models import Job, User
+from ..uploads import read_upload
+
+router = APIRouter(prefix="/jobs", tags=["admin-jobs"])
+
+# How often the event stream checks the job row
+EVENTS_POLL_INTERVAL = 1.0
+# A stream holds a worker thread and a DB session; give up after this long
+# (a job can sit queued forever when the worker is off) and let clients reconnect
+EVENTS_MAX_DURATION = 600.0
+
+
+class JobData(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    kind: str
+    params: dict[str, Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    progress: dict[str, Any] | None
+    result: dict[str, Any] | None
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+
+class JobListResponse(BaseModel):
+    jobs: list[JobData]
+
+
+class JobCreateRequest(BaseModel):
+    kind: str
+    params: dict[str, Any] = {}
+
+
+def _get_job(db: Session, job_id: int) -> Job:
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _submit(db: Session, kind: str, params: dict[str, Any], user: User, **kwargs: Any) -> JobData:
+    if kind not in job_kinds():
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {kind}")
+    job = enqueue(db, kind, params, user_id=user.id, **kwargs)
+    return JobData.model_validate(job)
+
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+def create_job(
+    body: JobCreateRequest,
+    user: Annotated[User, Depends(get_admin_user)],
+    db: Session = Depends(get_db),
+) -> JobData:
+    """Queue a job, e.g. {"kind": "instagram.sync_new", "params": {"max_pages": 5}}."""
+    return _submit(db, body.kind, body.params, user)
+
+
+@router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
+async def create_upload_job(
+    kind: Annotated[str, Form()],
+    file: Annotated[UploadFile, File()],
+    user: Annotated[User, Depends(get_admin_user)],
+    db: Session = Depends(get_db),
+    is_test: Annotated[bool, Form()] = False,
+) -> JobData:
+    """Queue a file-based job (NM regions XLSX, DJI flight record)."""
+    upload = await read_upload(file)
+    params = {"filename": upload.filename, "is_test": is_test}
+    return _submit(db, kind, params, user, payload=upload.read())
+
+
+@router.get("")
+def list_jobs(
+    _user: Annotated[User, Depends(get_admin_user)],
+    db: Session = Depends(get_db),
+    job_status: Annotated[str | None, Query(alias="status")] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+) -> JobListResponse:
+    """Most recent jobs first."""
+    query = db.query(Job)
+    if job_status:
+        query = query.filter(Job.status == job_status)
+    jobs = query.order_by(Job.id.desc()).limit(limit).all()
+    return JobListResponse(jobs=[JobData.model_validate(j) for j in jobs])
+
+
+@router.get("/{job_id}")
+def get_job(
+    job_id: int,
+    _user: Annotated[User, Depends(get_admin_user)],
+    db: Session = Depends(get_db),
+) -> JobData:
+    return JobData.model_validate(_get_job(db, job_id))
+
+
+@router.get("/{job_id}/events")
+def job_events(
+    job_id: int,
+    _user: Annotated[User, Depends(get_admin_user)],
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """Server-Sent Events: the job's state on every change, until it finishes.
+
+    Streams longer than ``EVENTS_MAX_DURATION`` end with a ``timeout`` event
+    carrying the latest state.
+    """
+    _get_job(db, job_id)
+
+    def generate() -> Iterator[str]:
+        last = None
+        deadline = time.monotonic() + EVENTS_MAX_DURATION
+        while True:
+            db.expire_all()
+            job = JobData.model_validate(_get_job(db, job_id))
+            data = job.model_dump_json()
+            if data != last:
+                yield f"data: {data}\n\n"
+                last = data
+            if job.status in (SUCCEEDED, FAILED):
+                return
+            if time.monotonic() >= deadline:
+                yield f"event: timeout\ndata: {data}\n\n"
+                return
+            # Don't hold a transaction open between polls
+            db.rollback()
+            time.sleep(EVENTS_POLL_INTERVAL)
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
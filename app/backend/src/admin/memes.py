@@ -3,10 +3,12 @@
 from datetime import UTC, datetime
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Response, UploadFile
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, UploadFile
+from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..auth.session import get_admin_user
 from ..database import get_db
@@ -14,6 +16,7 @@ from ..log_config import get_logger
 from ..models import Meme, User
 from ..storage import get_storage
 from ..telegram.meme_processing import IMAGE_MIME_TYPES, process_meme
+from ..uploads import read_upload
 
 log = get_logger(__name__)
 
@@ -145,11 +148,7 @@ async def upload_meme(
     if not file.content_type or file.content_type not in IMAGE_MIME_TYPES:
         raise HTTPException(status_code=400, detail="Only image files are accepted")
 
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="File is empty")
-    if len(content) > 10 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File too large (max 10MB)")
+    upload = await read_upload(file, allowed_types=IMAGE_MIME_TYPES)
 
     is_test = x_test_mode == "true"
 
@@ -158,7 +157,9 @@ async def upload_meme(
     if source_url:
         message["caption"] = source_url
 
-    process_meme(content, file.content_type, message, db, is_test=is_test)
+    await run_in_threadpool(
+        process_meme, upload.read(), file.content_type, message, db, is_test=is_test
+    )
 
     # Find the just-created meme (most recent)
     meme = db.query(Meme).order_by(Meme.id.desc()).first()
@@ -259,34 +260,20 @@ def get_meme_media(
     meme_id: int,
     admin: Annotated[User, Depends(get_admin_user)],
     db: Session = Depends(get_db),
-) -> Response:
-    """Serve meme image (proxy from storage)."""
+) -> RedirectResponse:
+    """Redirect to a short-lived signed URL for the meme image."""
     meme = db.query(Meme).filter(Meme.id == meme_id).first()
     if not meme:
         raise HTTPException(status_code=404, detail="Meme not found")
 
-    storage = get_storage("memes")
-
-    # Extract filename from media_path
     # media_path can be a full URL or a local path — extract the filename
     filename = meme.media_path.rsplit("/", 1)[-1]
-
+    storage = get_storage("memes")
     if not storage.exists(filename):
         raise HTTPException(status_code=404, detail="Media file not found")
-
-    # For local storage, read from disk
-    from pathlib import Path
-
-    if "/" in meme.media_path and not meme.media_path.startswith("http"):
-        path = Path(meme.media_path)
-        if path.exists():
-            return Response(content=path.read_bytes(), media_type=meme.mime_type)
-
-    # For GCS, redirect to the public URL
-    return Response(
-        status_code=302,
-        headers={"Location": storage.get_public_url(filename)},
-    )
+    url = storage.signed_url(filename, media_type=meme.mime_type)
+    # Images are cached by the signed URL; the redirect itself mustn't be
+    return RedirectResponse(url, status_code=302, headers={"Cache-Control": "no-store"})
 
 
 @router.delete("/test-data", status_code=200)
@@ -1,7 +1,8 @@
 from datetime import date
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session, joinedload
 
 from ..auth.session import get_vault_user
@@ -18,6 +19,7 @@ from ..models import (
     VaultVaccination,
 )
 from ..models.vault import TripPassport
+from ..uploads import check_upload
 from .vault_addresses import router as addresses_router
 from .vault_documents import router as documents_router
 from .vault_models import (
@@ -63,9 +65,7 @@ def upload_file(
     if entity_type not in ("document", "vaccination", "travel_doc"):
         raise HTTPException(status_code=400, detail="Invalid entity_type")
 
-    content = file.file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File too large (max 10 MB)")
+    upload = check_upload(file, max_size=MAX_FILE_SIZE, allowed_types=ALLOWED_MIME_TYPES)
 
     mime = file.content_type or "application/octet-stream"
     if mime not in ALLOWED_MIME_TYPES:
@@ -83,7 +83,7 @@ def upload_file(
             raise HTTPException(status_code=404, detail="Travel document not found")
 
     storage = get_vault_storage()
-    key = storage.save(admin.id, file.filename or "upload", content, mime)
+    key = storage.save(admin.id, file.filename or "upload", upload.file, mime)
 
     # Count existing files for sort_order
     existing_count = (
@@ -99,7 +99,7 @@ def upload_file(
     vault_file = VaultFile(
         file_path=key,
         mime_type=mime,
-        file_size=len(content),
+        file_size=upload.size,
         label=label,
         sort_order=existing_count,
     )
@@ -128,18 +128,14 @@ def get_file_content(
     file_id: int,
     admin: Annotated[User, Depends(get_vault_user)],
     db: Session = Depends(get_db),
-) -> Response:
-    """Stream vault file content through the backend."""
-    from ..vault_storage import get_vault_storage
+) -> RedirectResponse:
+    """Redirect to a short-lived signed URL for the vault file."""
+    from ..vault_storage import get_vault_storage, vault_file_redirect
 
     vf = db.query(VaultFile).filter(VaultFile.id == file_id).first()
     if not vf:
         raise HTTPException(status_code=404, detail="File not found")
-    storage = get_vault_storage()
-    content = storage.read(vf.file_path)
-    if content is None:
-        raise HTTPException(status_code=404, detail="File not found in storage")
-    return Response(content=content, media_type=vf.mime_type)
+    return vault_file_redirect(get_vault_storage(), vf.file_path, vf.mime_type, None)
 
 
 @router.delete("/files/{file_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -268,9 +264,7 @@ def delete_travel_doc(
         raise HTTPException(status_code=404, detail="Travel document not found")
 
     # Delete files from storage
-    storage = get_vault_storage()
-    for f in td.files:
-        storage.delete(f.file_path)
+    get_vault_storage().delete_many(f.file_path for f in td.files)
 
     log.info(f"Deleting travel doc: {td.label}")
     db.delete(td)
@@ -315,15 +309,13 @@ def extract_travel_doc(
     """Upload a PDF/image and extract metadata with AI (no save)."""
     from ..extraction import extract_document_metadata
 
-    content = file.file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File too large (max 10 MB)")
+    upload = check_upload(file, max_size=MAX_FILE_SIZE, allowed_types=ALLOWED_MIME_TYPES)
 
     mime = file.content_type or "application/octet-stream"
     if mime not in ALLOWED_MIME_TYPES:
         raise HTTPException(status_code=400, detail=f"File type not allowed: {mime}")
 
-    result = extract_document_metadata(content, mime)
+    result = extract_document_metadata(upload.read(), mime)
     if result.error:
         return ExtractedMetadataResponse(error=result.error)
     if result.metadata is None:
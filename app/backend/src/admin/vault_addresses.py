@@ -1,10 +1,10 @@
 import time
 from typing import Annotated
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 
+from .. import http_client
 from ..auth.session import get_vault_user
 from ..crypto import encrypt, mask_value
 from ..database import get_db
@@ -79,7 +79,7 @@ def address_search(
 
     try:
         _nominatim_last_request = time.time()
-        response = httpx.get(
+        response = http_client.get(
             "https://nominatim.openstreetmap.org/search",
             params={
                 "q": q,
@@ -0,0 +1,147 @@
+"""Data version for conditional GET on public travel and photo endpoints.
+
+Any commit that touches the tables behind the public pages (trips, visits,
+flights, Instagram posts, drone flights and their child tables) stamps the
+current time into app_settings. Public endpoints derive a weak ETag and
+Last-Modified from that stamp, so repeat visitors get a 304 without the
+payload being recomputed. The stamp lives in the database rather than in
+process memory so every Cloud Run instance agrees on it.
+"""
+
+import hashlib
+import itertools
+from datetime import UTC, date, datetime, time
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+
+from .auth.session import SESSION_COOKIE_NAME
+from .database import get_db
+from .models import AppSetting
+
+DATA_VERSION_KEY = "public_data_version"
+
+# Public pages always revalidate; unchanged data costs a single PK lookup + 304
+CACHE_CONTROL = "public, no-cache"
+
+_TRACKED_TABLES = frozenset(
+    {
+        "cities",
+        "drone_flights",
+        "flights",
+        "airports",
+        "instagram_media",
+        "instagram_posts",
+        "microstates",
+        "nm_regions",
+        "tcc_destinations",
+        "trip_cities",
+        "trip_destinations",
+        "trips",
+        "un_countries",
+        "visits",
+    }
+)
+_CHANGED = "public_data_changed"
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_changes(session: Session, flush_context: UOWTransaction) -> None:
+    # new/dirty/deleted still hold the pre-flush state here
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if getattr(obj, "__tablename__", None) in _TRACKED_TABLES:
+            session.info[_CHANGED] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_changes(state: ORMExecuteState) -> None:
+    # Bulk query.update()/delete() bypass the unit of work
+    if not (state.is_update or state.is_delete) or state.bind_mapper is None:
+        return
+    if getattr(state.bind_mapper.class_, "__tablename__", None) in _TRACKED_TABLES:
+        state.session.info[_CHANGED] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _stamp_data_version(session: Session) -> None:
+    # Pending objects only reach after_flush once flushed
+    session.flush()
+    if not session.info.pop(_CHANGED, False):
+        return
+    stamp = datetime.now(UTC).isoformat()
+    setting = session.get(AppSetting, DATA_VERSION_KEY)
+    if setting:
+        setting.value = stamp
+    else:
+        session.add(AppSetting(key=DATA_VERSION_KEY, value=stamp))
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_data_version_flag(session: Session) -> None:
+    session.info.pop(_CHANGED, None)
+
+
+def get_data_version(db: Session) -> datetime:
+    """Return when public data last changed (epoch if never recorded)."""
+    setting = db.get(AppSetting, DATA_VERSION_KEY)
+    if not setting:
+        return _EPOCH
+    try:
+        stamp = datetime.fromisoformat(setting.value)
+    except ValueError:
+        return _EPOCH
+    return stamp if stamp.tzinfo else stamp.replace(tzinfo=UTC)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag."""
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def public_data_cache(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+) -> None:
+    """Route dependency: set ETag/Last-Modified/Cache-Control, answer 304 if unchanged.
+
+    Responses are also relative to today (visited vs planned) and may differ
+    for logged-in users, so both are folded into the ETag.
+    """
+    today = date.today()
+    authenticated = bool(
+        request.cookies.get(SESSION_COOKIE_NAME) or request.headers.get("authorization")
+    )
+    # Day rollover changes "visited" without any mutation
+    last_modified = max(get_data_version(db), datetime.combine(today, time.min, tzinfo=UTC))
+    seed = f"{last_modified.isoformat()}|{today.isoformat()}|{int(authenticated)}"
+    etag = f'W/"{hashlib.sha256(seed.encode()).hexdigest()[:20]}"'
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified.replace(microsecond=0), usegmt=True),
+        "Cache-Control": "private, no-cache" if authenticated else CACHE_CONTROL,
+        "Vary": "Cookie, Authorization",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    not_modified = False
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    elif if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            since = None
+        if since is not None and since.tzinfo is not None:
+            not_modified = last_modified.replace(microsecond=0) <= since
+
+    if not_modified:
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
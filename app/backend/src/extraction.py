@@ -1,14 +1,30 @@
-"""AI-powered metadata extraction from travel document PDFs/images."""
+"""AI-powered metadata extraction from travel document PDFs/images.
+
+Each kind of document is an ``Extractor`` in ``EXTRACTORS``: its prompt, the
+pydantic model the answer is validated into and the result it is wrapped
+in. ``extract`` runs one kind; ``extract_any`` asks the model to recognise
+which of several kinds a file is and extract it, in a single call.
+
+All model calls go through ``_ask_model``: one API client per process (its
+connection pool is reused), at most ``EXTRACTION_CONCURRENCY`` calls in
+flight, and answers cached by the file's SHA-256 and the prompt, so the
+same ticket uploaded again is answered without a call. The extractors are
+blocking; async endpoints run them with ``run_in_threadpool``.
+"""
 
 import base64
+import hashlib
 import json
 import re
-from typing import Any
+import threading
+from functools import cache
+from typing import Any, NamedTuple, cast
 
 from pydantic import BaseModel
 
 from .config import settings
 from .log_config import get_logger
+from .shared_cache import NullBackend, TieredCache
 
 log = get_logger(__name__)
 
@@ -291,393 +307,265 @@ class ExtractionResult(BaseModel):
     error: str | None = None
 
 
-def extract_document_metadata(file_content: bytes, mime_type: str) -> ExtractionResult:
-    """Extract metadata from a PDF or image using Claude Haiku."""
-    if not settings.anthropic_api_key:
-        return ExtractionResult(error="API key not configured")
-
-    try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-
-        # Build content based on mime type
-        content: list[dict[str, Any]] = []
-        if mime_type == "application/pdf":
-            content.append(
-                {
-                    "type": "document",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "application/pdf",
-                        "data": base64.b64encode(file_content).decode(),
-                    },
-                }
-            )
-        elif mime_type.startswith("image/"):
-            content.append(
-                {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": mime_type,
-                        "data": base64.b64encode(file_content).decode(),
-                    },
-                }
-            )
-        else:
-            return ExtractionResult(error=f"Unsupported file type: {mime_type}")
-
-        content.append({"type": "text", "text": EXTRACTION_PROMPT})
+EXTRACTION_MODEL = "claude-haiku-4-5-20251001"
+
+# Model calls in flight at once across the process; the rest wait their turn
+EXTRACTION_CONCURRENCY = 4
+_call_slots = threading.BoundedSemaphore(EXTRACTION_CONCURRENCY)
+
+# Answers hold vault data (passport numbers, booking codes), so they are
+# kept in process memory only, never in the shared cache table
+_answers = TieredCache("extraction", Any, ttl=24 * 3600, maxsize=128, backend=NullBackend())
+
+
+@cache
+def _client(api_key: str) -> Any:
+    import anthropic
+
+    return anthropic.Anthropic(api_key=api_key)
+
+
+def clear_extraction_cache() -> None:
+    """Forget cached answers and the API client (e.g. after the key changes)."""
+    _answers.clear()
+    _client.cache_clear()
+
+
+class Extractor(NamedTuple):
+    """One kind of document: how to ask for it and how to read the answer."""
+
+    prompt: str
+    # The answer is validated into this model...
+    item_type: type[BaseModel]
+    # ...and returned in this result, as its ``field``
+    result_type: type[BaseModel]
+    field: str
+    # For logs and the multi-kind prompt
+    description: str
+    # The answer is a list (every flight on a ticket)
+    many: bool = False
+    max_tokens: int = 1024
+    images_only: bool = False
+
+
+EXTRACTORS: dict[str, Extractor] = {
+    "document": Extractor(
+        EXTRACTION_PROMPT, ExtractedDocMetadata, ExtractionResult, "metadata", "travel document"
+    ),
+    "flight": Extractor(
+        FLIGHT_EXTRACTION_PROMPT,
+        ExtractedFlight,
+        FlightExtractionResult,
+        "flights",
+        "flight ticket",
+        many=True,
+        max_tokens=2048,
+    ),
+    "car_rental": Extractor(
+        CAR_RENTAL_EXTRACTION_PROMPT,
+        ExtractedCarRental,
+        CarRentalExtractionResult,
+        "rental",
+        "car rental booking",
+    ),
+    "transport_booking": Extractor(
+        TRANSPORT_BOOKING_EXTRACTION_PROMPT,
+        ExtractedTransportBooking,
+        TransportBookingExtractionResult,
+        "booking",
+        "train/bus/ferry booking",
+    ),
+    "accommodation": Extractor(
+        ACCOMMODATION_EXTRACTION_PROMPT,
+        ExtractedAccommodation,
+        AccommodationExtractionResult,
+        "accommodation",
+        "accommodation booking",
+    ),
+    "meme": Extractor(
+        MEME_EXTRACTION_PROMPT,
+        ExtractedMeme,
+        MemeExtractionResult,
+        "meme",
+        "meme",
+        images_only=True,
+    ),
+}
 
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": content}],  # type: ignore[typeddict-item]
-        )
+# Booking confirmations a trip upload can be, for ``extract_any``
+BOOKING_KINDS = ("flight", "car_rental", "transport_booking", "accommodation")
 
-        # Parse response text
-        text = response.content[0].text.strip()  # type: ignore[union-attr]
+DETECT_PROMPT = """\
+This file is one of the kinds of document described below. Work out which \
+one, then follow that kind's instructions, but return ONLY a JSON object \
+{{"kind": "<kind>", "data": <the JSON those instructions ask for>}}. \
+If it is none of them, return {{"kind": null, "data": null}}.
 
-        # Strip markdown code fences if present
-        text = re.sub(r"^```(?:json)?\s*", "", text)
-        text = re.sub(r"\s*```$", "", text)
+{sections}"""
 
-        data = json.loads(text)
-        return ExtractionResult(metadata=ExtractedDocMetadata(**data))
 
-    except json.JSONDecodeError:
-        log.warning("Failed to parse extraction response as JSON")
-        return ExtractionResult(error="Failed to parse AI response")
-    except Exception as exc:
-        log.exception("Document metadata extraction failed")
-        msg = str(exc)
-        if "credit" in msg.lower() or "balance" in msg.lower() or "402" in msg:
-            return ExtractionResult(error="Insufficient API balance")
-        if "401" in msg or "auth" in msg.lower():
-            return ExtractionResult(error="Invalid API key")
-        return ExtractionResult(error="Extraction failed")
+class Detection(NamedTuple):
+    """What ``extract_any`` found: the kind and its result, or an error."""
 
+    kind: str | None
+    result: BaseModel | None
+    error: str | None = None
 
-def extract_flight_data(file_content: bytes, mime_type: str) -> FlightExtractionResult:
-    """Extract flight data from a PDF or image using Claude Haiku."""
-    if not settings.anthropic_api_key:
-        return FlightExtractionResult(error="API key not configured")
 
-    try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-
-        content: list[dict[str, Any]] = []
-        if mime_type == "application/pdf":
-            content.append(
-                {
-                    "type": "document",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "application/pdf",
-                        "data": base64.b64encode(file_content).decode(),
-                    },
-                }
-            )
-        elif mime_type.startswith("image/"):
-            content.append(
-                {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": mime_type,
-                        "data": base64.b64encode(file_content).decode(),
-                    },
-                }
+def _unsupported(mime_type: str, *, images_only: bool = False) -> bool:
+    if mime_type.startswith("image/"):
+        return False
+    return images_only or mime_type != "application/pdf"
+
+
+def _error_message(exc: Exception) -> str:
+    msg = str(exc)
+    if "credit" in msg.lower() or "balance" in msg.lower() or "402" in msg:
+        return "Insufficient API balance"
+    if "401" in msg or "auth" in msg.lower():
+        return "Invalid API key"
+    return "Extraction failed"
+
+
+def _file_block(file_content: bytes, mime_type: str) -> dict[str, Any]:
+    return {
+        "type": "document" if mime_type == "application/pdf" else "image",
+        "source": {
+            "type": "base64",
+            "media_type": mime_type,
+            "data": base64.b64encode(file_content).decode(),
+        },
+    }
+
+
+def _ask_model(
+    kind: str, prompt: str, file_content: bytes, mime_type: str, *, max_tokens: int
+) -> Any:
+    """Send a file with a prompt and return the model's answer parsed as JSON.
+
+    Raises json.JSONDecodeError if the answer isn't JSON, and whatever the
+    API client raises; failures are not cached.
+    """
+    key = (kind, mime_type, hashlib.sha256(file_content).hexdigest())
+
+    def fetch() -> Any:
+        content = [_file_block(file_content, mime_type), {"type": "text", "text": prompt}]
+        with _call_slots:
+            response = _client(settings.anthropic_api_key).messages.create(
+                model=EXTRACTION_MODEL,
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": content}],
             )
-        else:
-            return FlightExtractionResult(error=f"Unsupported file type: {mime_type}")
-
-        content.append({"type": "text", "text": FLIGHT_EXTRACTION_PROMPT})
-
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=2048,
-            messages=[{"role": "user", "content": content}],  # type: ignore[typeddict-item]
-        )
-
-        text = response.content[0].text.strip()  # type: ignore[union-attr]
+        text = response.content[0].text.strip()
 
         # Strip markdown code fences if present
         text = re.sub(r"^```(?:json)?\s*", "", text)
         text = re.sub(r"\s*```$", "", text)
+        return json.loads(text)
 
-        data = json.loads(text)
-        if not isinstance(data, list):
-            data = [data]
-        flights = [ExtractedFlight(**f) for f in data]
-        return FlightExtractionResult(flights=flights)
+    # Concurrent uploads of the same file share one call
+    return _answers.get_or_fetch(key, fetch)
 
-    except json.JSONDecodeError:
-        log.warning("Failed to parse flight extraction response as JSON")
-        return FlightExtractionResult(error="Failed to parse AI response")
-    except Exception as exc:
-        log.exception("Flight data extraction failed")
-        msg = str(exc)
-        if "credit" in msg.lower() or "balance" in msg.lower() or "402" in msg:
-            return FlightExtractionResult(error="Insufficient API balance")
-        if "401" in msg or "auth" in msg.lower():
-            return FlightExtractionResult(error="Invalid API key")
-        return FlightExtractionResult(error="Extraction failed")
 
+def _to_result(extractor: Extractor, data: Any) -> BaseModel:
+    """Validate a parsed answer and wrap it in the extractor's result."""
+    if extractor.many:
+        items = data if isinstance(data, list) else [data]
+        value: Any = [extractor.item_type(**item) for item in items]
+    else:
+        value = extractor.item_type(**data)
+    return extractor.result_type(**{extractor.field: value})
 
-def extract_car_rental_data(file_content: bytes, mime_type: str) -> CarRentalExtractionResult:
-    """Extract car rental data from a PDF or image using Claude Haiku."""
+
+def extract(kind: str, file_content: bytes, mime_type: str) -> BaseModel:
+    """Extract a document of a known kind. Errors are returned in the result."""
+    extractor = EXTRACTORS[kind]
     if not settings.anthropic_api_key:
-        return CarRentalExtractionResult(error="API key not configured")
+        return extractor.result_type(error="API key not configured")
+    if _unsupported(mime_type, images_only=extractor.images_only):
+        return extractor.result_type(error=f"Unsupported file type: {mime_type}")
 
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-
-        content: list[dict[str, Any]] = []
-        if mime_type == "application/pdf":
-            content.append(
-                {
-                    "type": "document",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "application/pdf",
-                        "data": base64.b64encode(file_content).decode(),
-                    },
-                }
-            )
-        elif mime_type.startswith("image/"):
-            content.append(
-                {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": mime_type,
-                        "data": base64.b64encode(file_content).decode(),
-                    },
-                }
-            )
-        else:
-            return CarRentalExtractionResult(error=f"Unsupported file type: {mime_type}")
-
-        content.append({"type": "text", "text": CAR_RENTAL_EXTRACTION_PROMPT})
-
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": content}],  # type: ignore[typeddict-item]
+        data = _ask_model(
+            kind, extractor.prompt, file_content, mime_type, max_tokens=extractor.max_tokens
         )
+        return _to_result(extractor, data)
+    except json.JSONDecodeError:
+        log.warning("Failed to parse %s extraction response as JSON", extractor.description)
+        return extractor.result_type(error="Failed to parse AI response")
+    except Exception as exc:
+        log.exception("%s extraction failed", extractor.description.capitalize())
+        return extractor.result_type(error=_error_message(exc))
 
-        text = response.content[0].text.strip()  # type: ignore[union-attr]
 
-        # Strip markdown code fences if present
-        text = re.sub(r"^```(?:json)?\s*", "", text)
-        text = re.sub(r"\s*```$", "", text)
-
-        data = json.loads(text)
-        return CarRentalExtractionResult(rental=ExtractedCarRental(**data))
+def extract_any(
+    file_content: bytes, mime_type: str, kinds: tuple[str, ...] = BOOKING_KINDS
+) -> Detection:
+    """Recognise which of ``kinds`` a file is and extract it, in one model call.
 
+    Cheaper than trying each kind in turn when an upload could be any of
+    them: the file is encoded and sent once.
+    """
+    if not settings.anthropic_api_key:
+        return Detection(None, None, "API key not configured")
+    extractors = {kind: EXTRACTORS[kind] for kind in kinds}
+    if _unsupported(mime_type, images_only=any(e.images_only for e in extractors.values())):
+        return Detection(None, None, f"Unsupported file type: {mime_type}")
+
+    sections = "\n\n".join(
+        f"### {kind} ({e.description})\n{e.prompt}" for kind, e in extractors.items()
+    )
+    try:
+        answer = _ask_model(
+            "any:" + ",".join(kinds),
+            DETECT_PROMPT.format(sections=sections),
+            file_content,
+            mime_type,
+            max_tokens=max(e.max_tokens for e in extractors.values()),
+        )
+        kind = answer.get("kind") if isinstance(answer, dict) else None
+        if kind not in extractors:
+            return Detection(None, None, "Unrecognised document")
+        return Detection(kind, _to_result(extractors[kind], answer.get("data")))
     except json.JSONDecodeError:
-        log.warning("Failed to parse car rental extraction response as JSON")
-        return CarRentalExtractionResult(error="Failed to parse AI response")
+        log.warning("Failed to parse document detection response as JSON")
+        return Detection(None, None, "Failed to parse AI response")
     except Exception as exc:
-        log.exception("Car rental data extraction failed")
-        msg = str(exc)
-        if "credit" in msg.lower() or "balance" in msg.lower() or "402" in msg:
-            return CarRentalExtractionResult(error="Insufficient API balance")
-        if "401" in msg or "auth" in msg.lower():
-            return CarRentalExtractionResult(error="Invalid API key")
-        return CarRentalExtractionResult(error="Extraction failed")
+        log.exception("Document detection failed")
+        return Detection(None, None, _error_message(exc))
 
 
-def extract_transport_booking_data(
-    file_content: bytes, mime_type: str
-) -> TransportBookingExtractionResult:
-    """Extract transport booking data from a PDF or image using Claude Haiku."""
-    if not settings.anthropic_api_key:
-        return TransportBookingExtractionResult(error="API key not configured")
-
-    try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-
-        content: list[dict[str, Any]] = []
-        if mime_type == "application/pdf":
-            content.append(
-                {
-                    "type": "document",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "application/pdf",
-                        "data": base64.b64encode(file_content).decode(),
-                    },
-                }
-            )
-        elif mime_type.startswith("image/"):
-            content.append(
-                {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": mime_type,
-                        "data": base64.b64encode(file_content).decode(),
-                    },
-                }
-            )
-        else:
-            return TransportBookingExtractionResult(error=f"Unsupported file type: {mime_type}")
+def extract_document_metadata(file_content: bytes, mime_type: str) -> ExtractionResult:
+    """Extract metadata from a PDF or image using Claude Haiku."""
+    return cast(ExtractionResult, extract("document", file_content, mime_type))
 
-        content.append({"type": "text", "text": TRANSPORT_BOOKING_EXTRACTION_PROMPT})
 
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": content}],  # type: ignore[typeddict-item]
-        )
+def extract_flight_data(file_content: bytes, mime_type: str) -> FlightExtractionResult:
+    """Extract flight data from a PDF or image using Claude Haiku."""
+    return cast(FlightExtractionResult, extract("flight", file_content, mime_type))
 
-        text = response.content[0].text.strip()  # type: ignore[union-attr]
 
-        # Strip markdown code fences if present
-        text = re.sub(r"^```(?:json)?\s*", "", text)
-        text = re.sub(r"\s*```$", "", text)
+def extract_car_rental_data(file_content: bytes, mime_type: str) -> CarRentalExtractionResult:
+    """Extract car rental data from a PDF or image using Claude Haiku."""
+    return cast(CarRentalExtractionResult, extract("car_rental", file_content, mime_type))
 
-        data = json.loads(text)
-        return TransportBookingExtractionResult(booking=ExtractedTransportBooking(**data))
 
-    except json.JSONDecodeError:
-        log.warning("Failed to parse transport booking extraction response as JSON")
-        return TransportBookingExtractionResult(error="Failed to parse AI response")
-    except Exception as exc:
-        log.exception("Transport booking data extraction failed")
-        msg = str(exc)
-        if "credit" in msg.lower() or "balance" in msg.lower() or "402" in msg:
-            return TransportBookingExtractionResult(error="Insufficient API balance")
-        if "401" in msg or "auth" in msg.lower():
-            return TransportBookingExtractionResult(error="Invalid API key")
-        return TransportBookingExtractionResult(error="Extraction failed")
+def extract_transport_booking_data(
+    file_content: bytes, mime_type: str
+) -> TransportBookingExtractionResult:
+    """Extract transport booking data from a PDF or image using Claude Haiku."""
+    return cast(
+        TransportBookingExtractionResult, extract("transport_booking", file_content, mime_type)
+    )
 
 
 def extract_accommodation_data(
     file_content: bytes, mime_type: str
 ) -> AccommodationExtractionResult:
     """Extract accommodation booking data from a PDF or image using Claude Haiku."""
-    if not settings.anthropic_api_key:
-        return AccommodationExtractionResult(error="API key not configured")
-
-    try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-
-        content: list[dict[str, Any]] = []
-        if mime_type == "application/pdf":
-            content.append(
-                {
-                    "type": "document",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "application/pdf",
-                        "data": base64.b64encode(file_content).decode(),
-                    },
-                }
-            )
-        elif mime_type.startswith("image/"):
-            content.append(
-                {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": mime_type,
-                        "data": base64.b64encode(file_content).decode(),
-                    },
-                }
-            )
-        else:
-            return AccommodationExtractionResult(error=f"Unsupported file type: {mime_type}")
-
-        content.append({"type": "text", "text": ACCOMMODATION_EXTRACTION_PROMPT})
-
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": content}],  # type: ignore[typeddict-item]
-        )
-
-        text = response.content[0].text.strip()  # type: ignore[union-attr]
-
-        # Strip markdown code fences if present
-        text = re.sub(r"^```(?:json)?\s*", "", text)
-        text = re.sub(r"\s*```$", "", text)
-
-        data = json.loads(text)
-        return AccommodationExtractionResult(accommodation=ExtractedAccommodation(**data))
-
-    except json.JSONDecodeError:
-        log.warning("Failed to parse accommodation extraction response as JSON")
-        return AccommodationExtractionResult(error="Failed to parse AI response")
-    except Exception as exc:
-        log.exception("Accommodation data extraction failed")
-        msg = str(exc)
-        if "credit" in msg.lower() or "balance" in msg.lower() or "402" in msg:
-            return AccommodationExtractionResult(error="Insufficient API balance")
-        if "401" in msg or "auth" in msg.lower():
-            return AccommodationExtractionResult(error="Invalid API key")
-        return AccommodationExtractionResult(error="Extraction failed")
+    return cast(AccommodationExtractionResult, extract("accommodation", file_content, mime_type))
 
 
 def extract_meme_metadata(file_content: bytes, mime_type: str) -> MemeExtractionResult:
     """Extract meme metadata from an image using Claude Haiku."""
-    if not settings.anthropic_api_key:
-        return MemeExtractionResult(error="API key not configured")
-
-    if not mime_type.startswith("image/"):
-        return MemeExtractionResult(error=f"Unsupported file type: {mime_type}")
-
-    try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-
-        content: list[dict[str, Any]] = [
-            {
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": mime_type,
-                    "data": base64.b64encode(file_content).decode(),
-                },
-            },
-            {"type": "text", "text": MEME_EXTRACTION_PROMPT},
-        ]
-
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": content}],  # type: ignore[typeddict-item]
-        )
-
-        text = response.content[0].text.strip()  # type: ignore[union-attr]
-
-        # Strip markdown code fences if present
-        text = re.sub(r"^```(?:json)?\s*", "", text)
-        text = re.sub(r"\s*```$", "", text)
-
-        data = json.loads(text)
-        return MemeExtractionResult(meme=ExtractedMeme(**data))
-
-    except json.JSONDecodeError:
-        log.warning("Failed to parse meme extraction response as JSON")
-        return MemeExtractionResult(error="Failed to parse AI response")
-    except Exception as exc:
-        log.exception("Meme metadata extraction failed")
-        msg = str(exc)
-        if "credit" in msg.lower() or "balance" in msg.lower() or "402" in msg:
-            return MemeExtractionResult(error="Insufficient API balance")
-        if "401" in msg or "auth" in msg.lower():
-            return MemeExtractionResult(error="Invalid API key")
-        return MemeExtractionResult(error="Extraction failed")
+    return cast(MemeExtractionResult, extract("meme", file_content, mime_type))
@@ -0,0 +1,62 @@
+"""Shared HTTP client for outbound integrations.
+
+One pooled httpx client per process instead of a fresh connection per call:
+httpx keeps a keep-alive pool per origin, so repeat calls to the same API
+skip TCP+TLS setup. HTTP/2 is used when the optional ``h2`` package is
+installed. The client is created lazily and closed in the app lifespan.
+Callers are sync code (plain ``def`` endpoints run in the threadpool).
+"""
+
+import importlib.util
+import threading
+from typing import Any
+
+import httpx
+
+USER_AGENT = "rembish.org (+https://rembish.org)"
+
+# Callers pass their own per-request timeout where the upstream is slow
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30.0)
+# Transport-level retries cover connection failures only (never a sent request)
+CONNECT_RETRIES = 2
+
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+_client: httpx.Client | None = None
+_lock = threading.Lock()
+
+
+def get_client() -> httpx.Client:
+    """Return the process-wide sync client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        with _lock:
+            if _client is None or _client.is_closed:
+                _client = httpx.Client(
+                    timeout=DEFAULT_TIMEOUT,
+                    headers={"User-Agent": USER_AGENT},
+                    transport=httpx.HTTPTransport(
+                        retries=CONNECT_RETRIES, http2=_HTTP2, limits=LIMITS
+                    ),
+                )
+    return _client
+
+
+def get(url: str, **kwargs: Any) -> httpx.Response:
+    """GET through the shared client (drop-in for ``httpx.get``)."""
+    return get_client().get(url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> httpx.Response:
+    """POST through the shared client (drop-in for ``httpx.post``)."""
+    return get_client().post(url, **kwargs)
+
+
+def close_client() -> None:
+    """Close the client (app shutdown). It is recreated on next use."""
+    global _client
+    with _lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
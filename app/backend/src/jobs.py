@@ -0,0 +1,240 @@
+"""Durable background jobs for long-running admin operations.
+
+Jobs are rows in the jobs table, so a submitted operation survives client
+disconnects and restarts, and any instance can run it. A worker (the
+lifespan task, or ``python -m src.worker`` as a separate process) claims
+one due job at a time, runs its handler with a fresh session and stores the
+result. Failures are retried with exponential backoff up to
+``max_attempts``; ``JobError`` fails a job immediately. A running job whose
+worker stops heartbeating is handed out again, so handlers must be safe to
+re-run and should ``report()`` progress at least every ``STALE_AFTER``.
+
+Handlers live next to the operation they run and register themselves with
+``@job_handler("kind")``.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, update
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .models import Job
+
+log = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# First retry after 30s, then 60s, 120s, ...
+RETRY_BASE_DELAY = 30.0
+# Running jobs without a heartbeat for this long are considered abandoned
+STALE_AFTER = timedelta(minutes=5)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobError(Exception):
+    """Permanent failure: the job is failed without further attempts."""
+
+
+def _now() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class JobContext:
+    """What a handler gets: its parameters, uploaded payload and a session."""
+
+    def __init__(self, job: Job, db: Session, session_factory: Callable[[], Session]):
+        self.job_id = job.id
+        self.params: dict[str, Any] = dict(job.params or {})
+        self.payload = job.payload
+        self.db = db
+        self._session_factory = session_factory
+
+    def report(self, **progress: Any) -> None:
+        """Publish progress (visible to pollers right away) and heartbeat."""
+        with self._session_factory() as db:
+            db.execute(
+                update(Job)
+                .where(Job.id == self.job_id)
+                .values(progress=progress, heartbeat_at=_now())
+            )
+            db.commit()
+
+
+Handler = Callable[[JobContext], dict[str, Any] | None]
+
+_handlers: dict[str, Handler] = {}
+
+
+def job_handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register a function as the handler for jobs of ``kind``."""
+
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+
+    return register
+
+
+def job_kinds() -> list[str]:
+    return sorted(_handlers)
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    params: dict[str, Any] | None = None,
+    *,
+    payload: bytes | None = None,
+    user_id: int | None = None,
+    max_attempts: int = 3,
+) -> Job:
+    """Queue a job to run as soon as a worker is free."""
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+    now = _now()
+    job = Job(
+        kind=kind,
+        params=params or {},
+        payload=payload,
+        status=QUEUED,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_after=now,
+        created_by=user_id,
+        created_at=now,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    log.info("Queued job #%d (%s)", job.id, kind)
+    return job
+
+
+def _release_stale(db: Session, now: datetime) -> None:
+    """Requeue (or fail, if out of attempts) jobs whose worker went away."""
+    stale = (Job.status == RUNNING) & (Job.heartbeat_at < now - STALE_AFTER)
+    db.execute(
+        update(Job)
+        .where(stale, Job.attempts >= Job.max_attempts)
+        .values(status=FAILED, finished_at=now, locked_by=None, error="Worker stopped responding")
+    )
+    db.execute(update(Job).where(stale).values(status=QUEUED, run_after=now, locked_by=None))
+    db.commit()
+
+
+def _claim(db: Session) -> Job | None:
+    """Take the next due job. Safe against other workers racing for it."""
+    now = _now()
+    _release_stale(db, now)
+    candidates = (
+        db.query(Job.id)
+        .filter(Job.status == QUEUED, Job.run_after <= now)
+        .order_by(Job.run_after, Job.id)
+        .limit(5)
+        .all()
+    )
+    for (job_id,) in candidates:
+        claimed = cast(
+            CursorResult[Any],
+            db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == QUEUED)
+                .values(
+                    status=RUNNING,
+                    attempts=Job.attempts + 1,
+                    locked_by=WORKER_ID,
+                    started_at=now,
+                    heartbeat_at=now,
+                )
+            ),
+        )
+        db.commit()
+        if claimed.rowcount == 1:
+            return db.get(Job, job_id)
+    return None
+
+
+def _fail(db: Session, job: Job, error: Exception) -> None:
+    job.error = f"{type(error).__name__}: {error}"
+    job.locked_by = None
+    if isinstance(error, JobError) or job.attempts >= job.max_attempts:
+        job.status = FAILED
+        job.finished_at = _now()
+        log.error("Job #%d (%s) failed: %s", job.id, job.kind, job.error)
+    else:
+        delay = RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+        job.status = QUEUED
+        job.run_after = _now() + timedelta(seconds=delay)
+        log.warning(
+            "Job #%d (%s) attempt %d failed, retrying in %ds: %s",
+            job.id,
+            job.kind,
+            job.attempts,
+            delay,
+            job.error,
+        )
+    db.commit()
+
+
+def run_next_job(session_factory: Callable[[], Session] = SessionLocal) -> bool:
+    """Claim and run one due job. Returns False if there was nothing to do."""
+    with session_factory() as db:
+        job = _claim(db)
+        if job is None:
+            return False
+        try:
+            handler = _handlers.get(job.kind)
+            if handler is None:
+                raise JobError(f"No handler for job kind {job.kind!r}")
+            result = handler(JobContext(job, db, session_factory))
+        except Exception as e:
+            db.rollback()
+            if not isinstance(e, JobError):
+                log.exception("Job #%d (%s) raised", job.id, job.kind)
+            _fail(db, job, e)
+            return True
+        job.status = SUCCEEDED
+        job.result = result
+        job.error = None
+        job.locked_by = None
+        job.finished_at = _now()
+        # Uploaded files are only needed until the job has succeeded
+        job.payload = None
+        db.commit()
+        log.info("Job #%d (%s) succeeded", job.id, job.kind)
+        return True
+
+
+def run_pending_jobs(
+    session_factory: Callable[[], Session] = SessionLocal, *, limit: int = 10
+) -> int:
+    """Run due jobs one after another (at most ``limit``). Returns how many ran."""
+    ran = 0
+    while ran < limit and run_next_job(session_factory):
+        ran += 1
+    return ran
+
+
+async def run_worker_loop(interval: float) -> None:
+    """Work through the queue, polling every ``interval`` seconds, until cancelled.
+
+    Jobs run one at a time in a worker thread, which keeps heavy imports
+    from competing with each other for the instance.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(run_pending_jobs)
+        except Exception:
+            log.exception("Job worker failed")
+        await asyncio.sleep(interval)
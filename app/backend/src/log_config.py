@@ -26,3 +26,8 @@ def setup_logging() -> None:
 def get_logger(name: str) -> logging.Logger:
     """Get a logger with the given name."""
     return logging.getLogger(name)
+
+
+def log_fields(**fields: object) -> str:
+    """Render ``key=value`` pairs for log lines meant to be filtered and aggregated."""
+    return " ".join(f"{key}={value}" for key, value in fields.items())
@@ -1,8 +1,11 @@
+import asyncio
+import contextlib
+import logging
 import time
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 from typing import Any
 
-import httpx
 from fastapi import Depends, FastAPI, Form, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import EmailStr
@@ -12,25 +15,51 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.responses import JSONResponse as StarletteJSONResponse
 
+from . import http_client
 from .admin import router as admin_router
 from .auth import router as auth_router
 from .config import settings
 from .database import get_db
-from .log_config import get_logger, setup_logging
+from .jobs import run_worker_loop
+from .log_config import get_logger, log_fields, setup_logging
 from .og import router as og_router
+from .query_stats import server_timing, track_queries
+from .signed_files import router as signed_files_router
 from .telegram import router as telegram_router
 from .travels import router as travels_router
+from .travels.airport_index import airport_index
+from .travels.prefetch import run_prefetch_loop
 
 # Initialize logging
 setup_logging()
 log = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start the prefetcher and job worker; close the pooled HTTP client on shutdown."""
+    # Reference data used by flight endpoints, loaded before the first request
+    await asyncio.to_thread(airport_index)
+    tasks: list[asyncio.Task[None]] = []
+    if settings.trip_prefetch_interval > 0:
+        tasks.append(asyncio.create_task(run_prefetch_loop(settings.trip_prefetch_interval)))
+    if settings.job_poll_interval > 0:
+        tasks.append(asyncio.create_task(run_worker_loop(settings.job_poll_interval)))
+    yield
+    for task in tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    http_client.close_client()
+
+
 app = FastAPI(
     title="rembish.org API",
     version="0.47.9",
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
     openapi_url="/openapi.json" if settings.debug else None,
+    lifespan=lifespan,
 )
 
 # Session middleware for OAuth state
@@ -86,11 +115,40 @@ class CSRFMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(CSRFMiddleware)
 
+
+# SQL statement count and timing per request (Server-Timing header + log line)
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Any]) -> Response:
+        started = time.perf_counter()
+        with track_queries() as stats:
+            response: Response = await call_next(request)
+        elapsed = time.perf_counter() - started
+        response.headers["Server-Timing"] = server_timing(stats, elapsed)
+        route = request.scope.get("route")
+        level = logging.INFO if stats.count >= settings.query_log_threshold else logging.DEBUG
+        log.log(
+            level,
+            "request %s",
+            log_fields(
+                method=request.method,
+                route=getattr(route, "path", request.url.path),
+                status=response.status_code,
+                queries=stats.count,
+                db_ms=round(stats.seconds * 1000, 1),
+                total_ms=round(elapsed * 1000, 1),
+            ),
+        )
+        return response
+
+
+app.add_middleware(QueryStatsMiddleware)
+
 # Include routers
 app.include_router(auth_router, prefix="/api")
 app.include_router(admin_router, prefix="/api")
 app.include_router(travels_router, prefix="/api")
 app.include_router(og_router, prefix="/api/v1")
+app.include_router(signed_files_router, prefix="/api/v1")
 app.include_router(telegram_router, prefix="/api/v1")
 
 # Spam protection settings
@@ -108,7 +166,7 @@ def send_telegram_message(text: str) -> bool:
 
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     try:
-        response = httpx.post(
+        response = http_client.post(
             url,
             json={
                 "chat_id": chat_id,
@@ -146,7 +204,7 @@ def verify_turnstile(token: str) -> bool:
         return True  # Skip verification if not configured (dev)
 
     try:
-        response = httpx.post(
+        response = http_client.post(
             "https://challenges.cloudflare.com/turnstile/v0/siteverify",
             data={
                 "secret": settings.turnstile_secret,
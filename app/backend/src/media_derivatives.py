@@ -0,0 +1,188 @@
+"""Resized WebP/JPEG copies of Instagram photos for grids, maps and cards.
+
+Originals are full-size JPEGs (often 1440px+), far more than a 300px grid
+tile needs. At ingest (and via a batched backfill for older media) each
+photo gets a copy per width in DERIVATIVE_WIDTHS, in WebP and JPEG, stored
+next to the original as ``{ig_media_id}_w{width}.{ext}``. Widths at or above
+the original's are skipped: the original already serves those.
+"""
+
+from datetime import UTC, datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, RedirectResponse
+from PIL import ExifTags, Image, ImageOps
+from sqlalchemy.orm import Session
+
+from .log_config import get_logger
+from .models import InstagramMedia
+from .storage import StorageBackend
+
+log = get_logger(__name__)
+
+DERIVATIVE_WIDTHS = (320, 640, 1280)
+
+# format -> (Pillow format, extension, media type, save options)
+_FORMATS: dict[str, tuple[str, str, str, dict[str, Any]]] = {
+    "webp": ("WEBP", "webp", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", "image/jpeg", {"quality": 82, "progressive": True}),
+}
+
+# Where the Docker volume keeps local (dev) originals
+_LOCAL_MEDIA_DIR = Path("/app/data/instagram")
+
+
+def derivative_filename(ig_media_id: str, width: int, fmt: str) -> str:
+    return f"{ig_media_id}_w{width}.{_FORMATS[fmt][1]}"
+
+
+def display_size(image: Image.Image) -> tuple[int, int]:
+    """Size of an opened image once its EXIF orientation is applied.
+
+    Derivatives are cut from the transposed image, so stored dimensions must
+    match it or ``?size=`` could pick a width that was never generated.
+    Reads only the header, the pixels aren't decoded.
+    """
+    width, height = image.size
+    # Orientations 5-8 rotate by 90 degrees
+    if image.getexif().get(ExifTags.Base.Orientation, 1) in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+
+def derivative_widths(original_width: int) -> list[int]:
+    """Widths worth generating for an image of the given width."""
+    return [w for w in DERIVATIVE_WIDTHS if w < original_width]
+
+
+def generate_derivatives(content: bytes, ig_media_id: str, storage: StorageBackend) -> list[int]:
+    """Decode an original once and store every smaller width in every format.
+
+    Returns the widths stored. Raises if the image can't be decoded or saved.
+    """
+    with Image.open(BytesIO(content)) as original:
+        # Copies lose EXIF, so bake the orientation in
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    widths = derivative_widths(image.width)
+    files: list[tuple[str, bytes | BinaryIO, str]] = []
+    # Largest first, each step downscales the previous one (cheaper, same quality)
+    source = image
+    for width in reversed(widths):
+        height = max(1, round(image.height * width / image.width))
+        source = source.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        for fmt, (pil_format, _, media_type, options) in _FORMATS.items():
+            buf = BytesIO()
+            source.save(buf, format=pil_format, **options)
+            files.append((derivative_filename(ig_media_id, width, fmt), buf.getvalue(), media_type))
+    # Uploads are independent, send them together rather than one by one
+    storage.save_many(files)
+    return widths
+
+
+def backfill_derivatives(
+    db: Session, storage: StorageBackend, *, limit: int, batch_size: int = 25
+) -> tuple[int, int]:
+    """Generate derivatives for stored media that don't have them yet.
+
+    Works through media in ID order, committing after each batch so progress
+    survives a timeout. Returns (processed, failed).
+    """
+    processed = failed = 0
+    last_id = 0
+    while processed + failed < limit:
+        batch = (
+            db.query(InstagramMedia)
+            .filter(
+                InstagramMedia.id > last_id,
+                InstagramMedia.derivatives_at.is_(None),
+                InstagramMedia.storage_path.isnot(None),
+                InstagramMedia.media_type != "VIDEO",
+            )
+            .order_by(InstagramMedia.id)
+            .limit(min(batch_size, limit - processed - failed))
+            .all()
+        )
+        if not batch:
+            break
+        for media in batch:
+            last_id = media.id
+            if _backfill_one(media, storage):
+                processed += 1
+            else:
+                failed += 1
+        db.commit()
+    return processed, failed
+
+
+def _backfill_one(media: InstagramMedia, storage: StorageBackend) -> bool:
+    assert media.storage_path
+    content = storage.read(Path(media.storage_path).name)
+    if content is None:
+        log.warning("Original missing for media %d: %s", media.id, media.storage_path)
+        return False
+    try:
+        with Image.open(BytesIO(content)) as original:
+            size = display_size(original)
+        generate_derivatives(content, media.ig_media_id, storage)
+    except Exception:
+        log.warning("Failed to generate derivatives for media %d", media.id, exc_info=True)
+        return False
+    # Older rows stored the raw (pre-rotation) size
+    media.width, media.height = size
+    media.derivatives_at = datetime.now(UTC)
+    return True
+
+
+def _pick_format(accept: str | None) -> str:
+    return "webp" if accept and "image/webp" in accept else "jpeg"
+
+
+def _pick_width(media: InstagramMedia, size: int) -> int | None:
+    """Smallest stored width covering ``size`` (None = use the original)."""
+    if media.derivatives_at is None or not media.width:
+        return None
+    return next((w for w in derivative_widths(media.width) if w >= size), None)
+
+
+def media_file_response(
+    media: InstagramMedia, size: int | None = None, accept: str | None = None
+) -> FileResponse | RedirectResponse:
+    """Serve a media item, as the smallest derivative covering ``size`` if one exists.
+
+    GCS objects are redirected to; local (dev) files are served directly.
+    The WebP/JPEG choice follows the Accept header, hence ``Vary: Accept``.
+    """
+    assert media.storage_path
+    storage_path = media.storage_path
+    media_type = "image/jpeg"
+    headers: dict[str, str] = {}
+
+    width = _pick_width(media, size) if size else None
+    if width is not None:
+        fmt = _pick_format(accept)
+        # Derivatives sit next to the original, whatever the backend
+        base = storage_path.rsplit("/", 1)[0]
+        storage_path = f"{base}/{derivative_filename(media.ig_media_id, width, fmt)}"
+        media_type = _FORMATS[fmt][2]
+        headers["Vary"] = "Accept"
+
+    # If storage_path is a URL (GCS), redirect to it
+    if storage_path.startswith("http"):
+        return RedirectResponse(url=storage_path, status_code=302, headers=headers)
+
+    # Fallback to local file serving (dev mode)
+    path = Path(storage_path)
+
+    # If path doesn't exist, try Docker mount path
+    if not path.exists():
+        docker_path = _LOCAL_MEDIA_DIR / path.name
+        if docker_path.exists():
+            path = docker_path
+        else:
+            raise HTTPException(status_code=404, detail="File not found")
+
+    return FileResponse(path, media_type=media_type, headers=headers)
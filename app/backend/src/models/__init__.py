@@ -1,8 +1,10 @@
+from .cache import CacheEntry
 from .cosplay import CosplayCostume, CosplayPhoto
 from .drone import Battery, Drone, DroneFlight
 from .event import PersonalEvent
 from .fixer import Fixer, FixerCountry, TripFixer
-from .instagram import InstagramMedia, InstagramPost
+from .instagram import InstagramMedia, InstagramPost, InstagramSyncState
+from .job import Job
 from .location import UserLastLocation
 from .meme import Meme
 from .setting import AppSetting
@@ -41,6 +43,7 @@ __all__ = [
     "Airport",
     "AppSetting",
     "Battery",
+    "CacheEntry",
     "CarRental",
     "Drone",
     "DroneFlight",
@@ -52,6 +55,8 @@ __all__ = [
     "Flight",
     "InstagramMedia",
     "InstagramPost",
+    "InstagramSyncState",
+    "Job",
     "Meme",
     "Microstate",
     "NMRegion",
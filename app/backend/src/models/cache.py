@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, LargeBinary, String
+from sqlalchemy.dialects.mysql import LONGBLOB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class CacheEntry(Base):
+    """Persistent (L2) tier of the shared cache, see src/shared_cache.py."""
+
+    __tablename__ = "cache_entries"
+
+    namespace: Mapped[str] = mapped_column(String(50), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    value: Mapped[bytes] = mapped_column(
+        LargeBinary().with_variant(LONGBLOB(), "mysql"), nullable=False
+    )
+    # Naive UTC; value is fresh until stale_at and served stale until expires_at
+    stored_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    stale_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<CacheEntry {self.namespace}:{self.key}>"
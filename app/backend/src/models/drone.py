@@ -1,6 +1,17 @@
 from datetime import UTC, date, datetime
 
-from sqlalchemy import JSON, Boolean, Date, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..database import Base
@@ -61,6 +72,10 @@ class DroneFlight(Base):
     """Individual drone flight record from DJI Fly app."""
 
     __tablename__ = "drone_flights"
+    # Every public query excludes deleted, test and hidden flights
+    __table_args__ = (
+        Index("ix_drone_flights_visibility", "is_deleted", "is_test", "is_hidden", "flight_date"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     drone_id: Mapped[int | None] = mapped_column(
@@ -85,7 +100,7 @@ class DroneFlight(Base):
     city: Mapped[str | None] = mapped_column(String(200), nullable=True)
     is_hidden: Mapped[bool] = mapped_column(Boolean, default=False)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
-    source_file: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    source_file: Mapped[str | None] = mapped_column(String(200), nullable=True, index=True)
     flight_path: Mapped[list[list[float]] | None] = mapped_column(JSON, nullable=True)
     anomaly_severity: Mapped[str | None] = mapped_column(String(10), nullable=True)
     anomaly_actions: Mapped[str | None] = mapped_column(String(500), nullable=True)
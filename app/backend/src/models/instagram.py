@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, Numeric, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..database import Base
@@ -11,6 +11,21 @@ class InstagramPost(Base):
     """Instagram posts with labels for categorization."""
 
     __tablename__ = "instagram_posts"
+    # Trip and destination galleries filter on skipped/is_cover/labeled_at
+    # and the labeler walks posts by date
+    __table_args__ = (
+        Index("ix_instagram_posts_trip_id_labeled", "trip_id", "skipped", "is_cover", "labeled_at"),
+        Index(
+            "ix_instagram_posts_tcc_destination_id_labeled",
+            "tcc_destination_id",
+            "skipped",
+            "is_cover",
+            "labeled_at",
+        ),
+        Index("ix_instagram_posts_skipped_labeled_at", "skipped", "labeled_at"),
+        Index("ix_instagram_posts_labeled_at", "labeled_at"),
+        Index("ix_instagram_posts_posted_at", "posted_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     ig_id: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
@@ -68,6 +83,12 @@ class InstagramMedia(Base):
     """Individual media items within Instagram posts (images/videos)."""
 
     __tablename__ = "instagram_media"
+    # Media of a post in display order, type included so the photo-only
+    # filters never touch the table rows
+    __table_args__ = (
+        Index("ix_instagram_media_post_id", "post_id"),
+        Index("ix_instagram_media_post_id_order", "post_id", "media_order", "media_type"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     post_id: Mapped[int] = mapped_column(
@@ -80,6 +101,8 @@ class InstagramMedia(Base):
     width: Mapped[int | None] = mapped_column(Integer, nullable=True)
     height: Mapped[int | None] = mapped_column(Integer, nullable=True)
     downloaded_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Set once the resized copies (media_derivatives.DERIVATIVE_WIDTHS) are stored
+    derivatives_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     # Relationships
     post: Mapped[InstagramPost] = relationship(
@@ -92,3 +115,24 @@ class InstagramMedia(Base):
 
 # Import to complete relationships
 from .travel import City, TCCDestination, Trip, UNCountry  # noqa: E402, F401
+
+
+class InstagramSyncState(Base):
+    """Checkpoint of a paged Graph API crawl, so the next run resumes where it stopped."""
+
+    __tablename__ = "instagram_sync_state"
+
+    # "backfill" (fetch older posts) or "fill_gaps" (full feed scan)
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    # Next page URL, without the access token
+    cursor: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Timestamp of the oldest post processed so far (naive UTC)
+    last_seen_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    pages_scanned: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    run_started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Set when the crawl reached the end of the feed
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<InstagramSyncState {self.name}: {self.pages_scanned} pages>"
@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     LargeBinary,
     String,
@@ -75,6 +76,7 @@ class TCCDestination(Base):
     """TCC destinations (330 total) - includes territories and sub-regions."""
 
     __tablename__ = "tcc_destinations"
+    __table_args__ = (Index("ix_tcc_destinations_un_country_id", "un_country_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -110,6 +112,14 @@ class Visit(Base):
     """Records of first visits to TCC destinations."""
 
     __tablename__ = "visits"
+    # Covers the "visited by date" filters and the destination -> date lookups
+    __table_args__ = (
+        Index(
+            "ix_visits_first_visit_date_tcc_destination_id",
+            "first_visit_date",
+            "tcc_destination_id",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     tcc_destination_id: Mapped[int] = mapped_column(
@@ -160,6 +170,10 @@ class Trip(Base):
     """Personal trips with dates and metadata."""
 
     __tablename__ = "trips"
+    __table_args__ = (
+        Index("ix_trips_start_date_end_date", "start_date", "end_date"),
+        Index("ix_trips_end_date", "end_date"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     start_date: Mapped[date] = mapped_column(Date, nullable=False)
@@ -289,6 +303,12 @@ class City(Base):
     """Geocoded cities reference table."""
 
     __tablename__ = "cities"
+    __table_args__ = (
+        Index("ix_cities_name", "name"),
+        Index("ix_cities_country", "country"),
+        # Bounding-box lookups (nearest city to a geotag)
+        Index("ix_cities_lat_lng", "lat", "lng"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
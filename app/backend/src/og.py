@@ -2,13 +2,15 @@
 
 import html
 import re
-from datetime import date
+import threading
+from datetime import date, datetime
 
+from cachetools import TTLCache
 from fastapi import APIRouter, Depends
 from fastapi.responses import HTMLResponse
-from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
+from .data_version import get_data_version
 from .database import get_db
 from .models import (
     InstagramMedia,
@@ -17,8 +19,8 @@ from .models import (
     Trip,
     TripDestination,
     UNCountry,
-    Visit,
 )
+from .travels.snapshot import get_travel_snapshot
 
 router = APIRouter(tags=["og"])
 
@@ -61,6 +63,13 @@ STATIC_PAGES: dict[str, tuple[str, str | None]] = {
 TRIP_ALBUM_RE = re.compile(r"^/photos/albums/(\d+)$")
 COUNTRY_PHOTOS_RE = re.compile(r"^/photos/map/(\d+)$")
 
+# Rendered pages by normalized path: (data version, day, html). The data
+# version covers trips, destinations and Instagram labels and is shared by
+# all instances, so an edit anywhere invalidates every cached page; the day
+# covers the "visited" counters on /travels rolling over at midnight.
+_page_cache: TTLCache[str, tuple[datetime, date, str]] = TTLCache(maxsize=2048, ttl=3600)
+_page_lock = threading.Lock()
+
 
 def _get_trip_thumbnail(db: Session, trip_id: int) -> int | None:
     """Get cover media ID for a trip (simplified single-trip version)."""
@@ -183,6 +192,47 @@ def _get_country_thumbnail(db: Session, un_country_id: int) -> int | None:
     return None
 
 
+def _bulk_thumbnails(db: Session) -> tuple[dict[int, int], dict[int, int]]:
+    """Cover media IDs for every trip and UN country with labeled photos.
+
+    Same choice as the single-item lookups above (cover post first, then the
+    most recent post), in two queries instead of up to four per item.
+    """
+    first_media: dict[int, int] = {}
+    for post_id, media_id in (
+        db.query(InstagramMedia.post_id, InstagramMedia.id)
+        .filter(InstagramMedia.media_type != "VIDEO")
+        .order_by(InstagramMedia.post_id, InstagramMedia.media_order)
+    ):
+        first_media.setdefault(post_id, media_id)
+
+    posts = (
+        db.query(
+            InstagramPost.id,
+            InstagramPost.trip_id,
+            TCCDestination.un_country_id,
+            InstagramPost.is_cover,
+            InstagramPost.cover_media_id,
+        )
+        .outerjoin(TCCDestination, InstagramPost.tcc_destination_id == TCCDestination.id)
+        .filter(InstagramPost.labeled_at.isnot(None), InstagramPost.skipped.is_(False))
+        # Covers first, then newest first: the first post seen per key wins
+        .order_by(InstagramPost.is_cover.desc(), InstagramPost.posted_at.desc())
+        .all()
+    )
+    trips: dict[int, int] = {}
+    countries: dict[int, int] = {}
+    for post_id, trip_id, country_id, is_cover, cover_media_id in posts:
+        if post_id not in first_media:
+            continue
+        media_id = (is_cover and cover_media_id) or first_media[post_id]
+        if trip_id is not None:
+            trips.setdefault(trip_id, media_id)
+        if country_id is not None:
+            countries.setdefault(country_id, media_id)
+    return trips, countries
+
+
 def _render_og_html(
     title: str,
     description: str,
@@ -227,31 +277,38 @@ def _get_travels_og(
     db: Session,
 ) -> tuple[str, str, str, str, str]:
     """Build OG data for /travels with dynamic stats and map image."""
-    today = date.today()
-
-    un_total = db.query(func.count(UNCountry.id)).scalar() or 0
-    un_visited = (
-        db.query(func.count(func.distinct(TCCDestination.un_country_id)))
-        .join(Visit, Visit.tcc_destination_id == TCCDestination.id)
-        .filter(TCCDestination.un_country_id.isnot(None))
-        .filter(Visit.first_visit_date <= today)
-        .scalar()
-        or 0
-    )
-    tcc_total = db.query(func.count(TCCDestination.id)).scalar() or 0
-    tcc_visited = (
-        db.query(func.count(Visit.id)).filter(Visit.first_visit_date <= today).scalar() or 0
-    )
+    stats = get_travel_snapshot(db).stats
 
     title = STATIC_PAGES["/travels"][0]
     description = (
-        f"{un_visited} of {un_total} UN countries "
-        f"\u00b7 {tcc_visited} of {tcc_total} TCC destinations"
+        f"{stats.un_visited} of {stats.un_total} UN countries "
+        f"\u00b7 {stats.tcc_visited} of {stats.tcc_total} TCC destinations"
     )
     image = f"{BASE_URL}/api/v1/travels/og/map.png"
     return title, description, image, MAP_IMAGE_WIDTH, MAP_IMAGE_HEIGHT
 
 
+def _media_image(media_id: int | None) -> str:
+    return f"{BASE_URL}/api/v1/travels/photos/media/{media_id}" if media_id else DEFAULT_IMAGE
+
+
+def _trip_album_og(trip: Trip, media_id: int | None) -> tuple[str, str, str, str, str]:
+    """OG data for /photos/albums/:id (trip.destinations must be loaded)."""
+    destinations = [td.tcc_destination.name for td in trip.destinations if td.tcc_destination]
+    dest_str = ", ".join(destinations) if destinations else "Trip"
+    date_str = trip.start_date.strftime("%b %Y")
+    title = f"{dest_str} ({date_str}) \u2014 Photos"
+    description = f"Photo album from {dest_str}"
+    return title, description, _media_image(media_id), IMAGE_WIDTH, IMAGE_HEIGHT
+
+
+def _country_photos_og(country: UNCountry, media_id: int | None) -> tuple[str, str, str, str, str]:
+    """OG data for /photos/map/:id."""
+    title = f"{country.name} \u2014 Photos"
+    description = f"Photos from {country.name}"
+    return title, description, _media_image(media_id), IMAGE_WIDTH, IMAGE_HEIGHT
+
+
 def _resolve_path(path: str, db: Session) -> tuple[str, str, str, str, str]:
     """Resolve a path to (title, description, image_url, width, height)."""
     # Normalize path
@@ -277,19 +334,7 @@ def _resolve_path(path: str, db: Session) -> tuple[str, str, str, str, str]:
             .first()
         )
         if trip:
-            destinations = [
-                td.tcc_destination.name for td in trip.destinations if td.tcc_destination
-            ]
-            dest_str = ", ".join(destinations) if destinations else "Trip"
-            date_str = trip.start_date.strftime("%b %Y")
-            title = f"{dest_str} ({date_str}) \u2014 Photos"
-            description = f"Photo album from {dest_str}"
-
-            media_id = _get_trip_thumbnail(db, trip_id)
-            image = (
-                f"{BASE_URL}/api/v1/travels/photos/media/{media_id}" if media_id else DEFAULT_IMAGE
-            )
-            return title, description, image, IMAGE_WIDTH, IMAGE_HEIGHT
+            return _trip_album_og(trip, _get_trip_thumbnail(db, trip_id))
 
         return DEFAULT_TITLE, DEFAULT_DESCRIPTION, DEFAULT_IMAGE, IMAGE_WIDTH, IMAGE_HEIGHT
 
@@ -299,14 +344,7 @@ def _resolve_path(path: str, db: Session) -> tuple[str, str, str, str, str]:
         country_id = int(match.group(1))
         country = db.query(UNCountry).filter(UNCountry.id == country_id).first()
         if country:
-            title = f"{country.name} \u2014 Photos"
-            description = f"Photos from {country.name}"
-
-            media_id = _get_country_thumbnail(db, country_id)
-            image = (
-                f"{BASE_URL}/api/v1/travels/photos/media/{media_id}" if media_id else DEFAULT_IMAGE
-            )
-            return title, description, image, IMAGE_WIDTH, IMAGE_HEIGHT
+            return _country_photos_og(country, _get_country_thumbnail(db, country_id))
 
         return DEFAULT_TITLE, DEFAULT_DESCRIPTION, DEFAULT_IMAGE, IMAGE_WIDTH, IMAGE_HEIGHT
 
@@ -314,18 +352,64 @@ def _resolve_path(path: str, db: Session) -> tuple[str, str, str, str, str]:
     return DEFAULT_TITLE, DEFAULT_DESCRIPTION, DEFAULT_IMAGE, IMAGE_WIDTH, IMAGE_HEIGHT
 
 
-@router.get("/og")
-def get_og_tags(path: str = "/", db: Session = Depends(get_db)) -> HTMLResponse:
-    """Return minimal HTML with Open Graph meta tags for link preview bots."""
-    title, description, image, img_w, img_h = _resolve_path(path, db)
-    canonical_url = f"{BASE_URL}{path.rstrip('/') or '/'}"
-
-    content = _render_og_html(
+def _render_page(path: str, og: tuple[str, str, str, str, str]) -> str:
+    title, description, image, img_w, img_h = og
+    return _render_og_html(
         title=title,
         description=description,
         image=image,
-        url=canonical_url,
+        url=f"{BASE_URL}{path}",
         image_width=img_w,
         image_height=img_h,
     )
+
+
+def clear_og_cache() -> None:
+    """Drop every cached page."""
+    with _page_lock:
+        _page_cache.clear()
+
+
+def precompute_og_pages(db: Session) -> int:
+    """Render and cache every photo album and country photos page.
+
+    Covers all trips and UN countries that have labeled photos, using bulk
+    queries. Returns the number of pages cached.
+    """
+    version, today = get_data_version(db), date.today()
+    trip_media, country_media = _bulk_thumbnails(db)
+
+    pages: dict[str, str] = {}
+    trips = (
+        db.query(Trip)
+        .options(joinedload(Trip.destinations).joinedload(TripDestination.tcc_destination))
+        .filter(Trip.id.in_(trip_media))
+        .all()
+    )
+    for trip in trips:
+        path = f"/photos/albums/{trip.id}"
+        pages[path] = _render_page(path, _trip_album_og(trip, trip_media[trip.id]))
+    for country in db.query(UNCountry).filter(UNCountry.id.in_(country_media)):
+        path = f"/photos/map/{country.id}"
+        pages[path] = _render_page(path, _country_photos_og(country, country_media[country.id]))
+
+    with _page_lock:
+        for path, content in pages.items():
+            _page_cache[path] = (version, today, content)
+    return len(pages)
+
+
+@router.get("/og")
+def get_og_tags(path: str = "/", db: Session = Depends(get_db)) -> HTMLResponse:
+    """Return minimal HTML with Open Graph meta tags for link preview bots."""
+    path = path.rstrip("/") or "/"
+    version, today = get_data_version(db), date.today()
+    with _page_lock:
+        cached = _page_cache.get(path)
+    if cached is not None and cached[:2] == (version, today):
+        return HTMLResponse(content=cached[2])
+
+    content = _render_page(path, _resolve_path(path, db))
+    with _page_lock:
+        _page_cache[path] = (version, today, content)
     return HTMLResponse(content=content)
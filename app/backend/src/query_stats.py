@@ -0,0 +1,70 @@
+"""Count SQL statements and database time per request (or any block of code).
+
+Listeners on every engine add each statement to the ``QueryStats`` of the
+enclosing ``track_queries`` block. The block lives in a context variable, so
+it follows the request into the threadpool and into ``call_next``; nested
+blocks add their totals to the outer one when they exit. Statements outside
+any block (background loops, startup) are not counted.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """Statements executed and seconds spent waiting on them."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+
+    def add(self, other: "QueryStats") -> None:
+        self.count += other.count
+        self.seconds += other.seconds
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the statements run inside the block."""
+    stats = QueryStats()
+    parent = _current.get()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        if parent is not None:
+            parent.add(stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_execute(conn: Any, *_args: Any) -> None:
+    # A connection runs one statement at a time
+    conn.info["query_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_execute(conn: Any, *_args: Any) -> None:
+    stats = _current.get()
+    started = conn.info.pop("query_started", None)
+    if stats is None or started is None:
+        return
+    stats.count += 1
+    stats.seconds += time.perf_counter() - started
+
+
+def server_timing(stats: QueryStats, total_seconds: float) -> str:
+    """Server-Timing header value: database time (with statement count) and total."""
+    return (
+        f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries", '
+        f"total;dur={total_seconds * 1000:.1f}"
+    )
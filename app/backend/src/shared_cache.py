@@ -0,0 +1,338 @@
+"""Two-tier cache for external API results and rendered images.
+
+L1 is a per-process TTLCache, as before. L2 is a persistent store shared by
+every instance (the cache_entries table by default), so a cold Cloud Run
+instance starts warm and scaling out doesn't multiply upstream API calls.
+
+Each entry is fresh for ``ttl`` seconds and can then be served stale for
+another ``stale_ttl`` seconds while a single background refresh runs.
+Concurrent misses for the same key wait on one fetch instead of all
+hitting the upstream.
+"""
+
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Hashable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from typing import Any, NamedTuple, TypeVar
+
+from cachetools import TTLCache
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import SessionLocal
+from .models import CacheEntry
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_MISSING: Any = object()
+
+# Background refreshes are rare (one per stale key), a few workers suffice
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+
+class StoredValue(NamedTuple):
+    """Serialized entry as kept in the persistent tier (times are epoch seconds)."""
+
+    data: bytes
+    stale_at: float
+    expires_at: float
+
+
+class CacheBackend(ABC):
+    """Persistent (L2) cache storage."""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> StoredValue | None:
+        """Return the stored entry, or None if absent."""
+        pass
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: StoredValue) -> None:
+        """Insert or replace an entry."""
+        pass
+
+    @abstractmethod
+    def clear(self, namespace: str) -> None:
+        """Delete every entry in a namespace."""
+        pass
+
+
+class NullBackend(CacheBackend):
+    """No persistent tier: the cache behaves like a plain per-process TTLCache."""
+
+    def get(self, namespace: str, key: str) -> StoredValue | None:
+        return None
+
+    def set(self, namespace: str, key: str, value: StoredValue) -> None:
+        pass
+
+    def clear(self, namespace: str) -> None:
+        pass
+
+
+def _to_datetime(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, UTC).replace(tzinfo=None)
+
+
+def _to_timestamp(dt: datetime) -> float:
+    return dt.replace(tzinfo=UTC).timestamp()
+
+
+class DatabaseBackend(CacheBackend):
+    """Persistent tier in the cache_entries table, shared by all instances."""
+
+    # Expired rows are purged on every Nth write
+    PURGE_EVERY = 200
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+        self._writes = 0
+
+    def get(self, namespace: str, key: str) -> StoredValue | None:
+        with self.session_factory() as db:
+            row = db.get(CacheEntry, (namespace, key))
+            if row is None:
+                return None
+            return StoredValue(
+                row.value, _to_timestamp(row.stale_at), _to_timestamp(row.expires_at)
+            )
+
+    def set(self, namespace: str, key: str, value: StoredValue) -> None:
+        with self.session_factory() as db:
+            db.merge(
+                CacheEntry(
+                    namespace=namespace,
+                    key=key,
+                    value=value.data,
+                    stored_at=_to_datetime(time.time()),
+                    stale_at=_to_datetime(value.stale_at),
+                    expires_at=_to_datetime(value.expires_at),
+                )
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                db.execute(
+                    delete(CacheEntry).where(CacheEntry.expires_at < _to_datetime(time.time()))
+                )
+            db.commit()
+
+    def clear(self, namespace: str) -> None:
+        with self.session_factory() as db:
+            db.execute(delete(CacheEntry).where(CacheEntry.namespace == namespace))
+            db.commit()
+
+
+_backend: CacheBackend | None = None
+
+
+def get_backend() -> CacheBackend:
+    """Return the configured persistent tier."""
+    global _backend
+    if _backend is None:
+        if settings.cache_backend == "database":
+            _backend = DatabaseBackend(SessionLocal)
+        else:
+            _backend = NullBackend()
+    return _backend
+
+
+def set_backend(backend: CacheBackend | None) -> None:
+    """Replace the persistent tier (None = back to the configured one)."""
+    global _backend
+    _backend = backend
+
+
+class _Entry(NamedTuple):
+    value: Any
+    stale_at: float
+    expires_at: float
+
+
+class TieredCache:
+    """L1 (in-process) + L2 (persistent) cache for one namespace.
+
+    Dict-style access (``get``, ``in``, ``[]``) only sees fresh entries, like
+    the TTLCache it replaces. ``get_or_fetch`` adds stale-while-revalidate and
+    single-flight fetching. Values are serialized for L2 with pydantic, so
+    ``value_type`` must be something pydantic can round-trip through JSON
+    (raw ``bytes`` are stored as-is).
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        value_type: Any,
+        *,
+        ttl: float,
+        stale_ttl: float = 0,
+        maxsize: int = 256,
+        backend: CacheBackend | None = None,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._backend = backend
+        self._adapter: TypeAdapter[Any] | None = (
+            None if value_type is bytes else TypeAdapter(value_type)
+        )
+        self._l1: TTLCache[Hashable, _Entry] = TTLCache(maxsize=maxsize, ttl=ttl + stale_ttl)
+        # cachetools caches are not thread-safe
+        self._lock = threading.Lock()
+        self._fetch_locks: dict[Hashable, threading.Lock] = {}
+        self._refreshing: set[Hashable] = set()
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend or get_backend()
+
+    # --- dict-style access ---
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._lookup(key)
+        if entry is None or entry.stale_at <= time.time():
+            return default
+        return entry.value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def set(
+        self, key: Hashable, value: Any, *, ttl: float | None = None, persist: bool = True
+    ) -> None:
+        """Store a value in L1 and (unless ``persist`` is False) in L2.
+
+        Use ``persist=False`` with a short ``ttl`` for fallbacks after an
+        upstream failure, so other instances don't inherit the outage.
+        """
+        now = time.time()
+        fresh_for = self.ttl if ttl is None else ttl
+        entry = _Entry(value, now + fresh_for, now + fresh_for + self.stale_ttl)
+        with self._lock:
+            self._l1[key] = entry
+        if persist:
+            self._store(key, entry)
+
+    def clear(self) -> None:
+        """Drop the in-process tier (the persistent tier is left alone)."""
+        with self._lock:
+            self._l1.clear()
+
+    # --- fetch-through ---
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], T]) -> T:
+        """Return the cached value, calling ``fetch`` on a miss.
+
+        A stale value is returned immediately and refreshed in the background.
+        Exceptions from ``fetch`` propagate on a miss and nothing is cached.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            if entry.stale_at <= time.time():
+                self._refresh_in_background(key, fetch)
+            cached: T = entry.value
+            return cached
+
+        with self._fetch_lock(key):
+            # Another thread may have fetched it while we waited
+            entry = self._lookup(key)
+            if entry is not None:
+                cached = entry.value
+                return cached
+            value = fetch()
+            self.set(key, value)
+            return value
+
+    # --- internals ---
+
+    def _l2_key(self, key: Hashable) -> str:
+        return json.dumps(key, separators=(",", ":"))
+
+    def _lookup(self, key: Hashable) -> _Entry | None:
+        """Fresh or stale entry from L1, else from L2 (promoted into L1)."""
+        now = time.time()
+        with self._lock:
+            entry = self._l1.get(key)
+        if entry is not None and entry.expires_at > now:
+            return entry
+
+        try:
+            stored = self.backend.get(self.namespace, self._l2_key(key))
+        except Exception:
+            log.warning("Cache read failed for %s:%r", self.namespace, key, exc_info=True)
+            return None
+        if stored is None or stored.expires_at <= now:
+            return None
+        try:
+            value = (
+                stored.data if self._adapter is None else self._adapter.validate_json(stored.data)
+            )
+        except ValidationError:
+            log.warning("Discarding undecodable cache entry %s:%r", self.namespace, key)
+            return None
+        entry = _Entry(value, stored.stale_at, stored.expires_at)
+        with self._lock:
+            self._l1[key] = entry
+        return entry
+
+    def _store(self, key: Hashable, entry: _Entry) -> None:
+        data = entry.value if self._adapter is None else self._adapter.dump_json(entry.value)
+        try:
+            self.backend.set(
+                self.namespace,
+                self._l2_key(key),
+                StoredValue(data, entry.stale_at, entry.expires_at),
+            )
+        except Exception:
+            log.warning("Cache write failed for %s:%r", self.namespace, key, exc_info=True)
+
+    @contextmanager
+    def _fetch_lock(self, key: Hashable) -> Iterator[None]:
+        with self._lock:
+            lock = self._fetch_locks.setdefault(key, threading.Lock())
+        with lock:
+            try:
+                yield
+            finally:
+                # Waiters already holding this lock find the value in L1
+                with self._lock:
+                    self._fetch_locks.pop(key, None)
+
+    def _refresh_in_background(self, key: Hashable, fetch: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        _refresh_pool.submit(self._refresh, key, fetch)
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Any]) -> None:
+        try:
+            self.set(key, fetch())
+        except Exception:
+            log.warning(
+                "Refreshing %s:%r failed, keeping the stale value",
+                self.namespace,
+                key,
+                exc_info=True,
+            )
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
@@ -0,0 +1,55 @@
+"""Serve locally stored files behind signed URLs (development stand-in for GCS).
+
+With GCS, ``signed_url`` links point at the bucket. Local backends link
+here instead; the HMAC signature and expiry in the query string are the
+only credentials checked, exactly like a GCS signed URL.
+"""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+
+from .storage import LocalStorage, content_disposition, verify_local_signature
+from .vault_storage import VAULT_SCOPE, LocalVaultStorage, vault_file_response
+
+router = APIRouter(prefix="/signed", tags=["signed-files"])
+
+
+@router.get("/{path:path}", response_model=None)
+def get_signed_file(
+    path: str,
+    expires: int,
+    signature: str,
+    media_type: Annotated[str, Query(alias="type")] = "",
+    download_name: Annotated[str, Query(alias="name")] = "",
+    range_header: Annotated[str | None, Header(alias="range")] = None,
+) -> FileResponse | StreamingResponse:
+    """Serve a file from a link minted by a local backend's ``signed_url``."""
+    from .storage import get_storage
+    from .vault_storage import get_vault_storage
+
+    if not verify_local_signature(path, expires, media_type, download_name, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired link")
+    scope, _, key = path.partition("/")
+
+    if scope == VAULT_SCOPE:
+        vault = get_vault_storage()
+        if not isinstance(vault, LocalVaultStorage):
+            raise HTTPException(status_code=404, detail="File not found")
+        return vault_file_response(
+            vault, key, media_type or None, range_header, download_name=download_name or None
+        )
+
+    storage = get_storage(scope)
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="File not found")
+    file_path = storage.base_path / key
+    if not file_path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+    headers = {}
+    disposition = content_disposition(download_name)
+    if disposition:
+        headers["Content-Disposition"] = disposition
+    # FileResponse handles Range requests itself
+    return FileResponse(file_path, media_type=media_type or None, headers=headers)
@@ -1,17 +1,173 @@
-"""Storage abstraction for local and GCS backends."""
+"""Storage abstraction for local and GCS backends.
 
+Backends are built once per process and bucket/collection (``get_storage``
+is called on every request), and every GCS backend shares one client, so
+credentials and pooled HTTPS connections are reused instead of being set up
+per request. The ``*_many`` operations run on a shared thread pool.
+
+``signed_url`` hands out short-lived links that fetch a file straight from
+the bucket, so downloads don't pass through the app. Local storage has no
+such thing, so it signs links to ``/api/v1/signed/...`` (src/signed_files.py)
+with the app's secret key instead.
+"""
+
+import hashlib
+import hmac
+import shutil
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import cache
 from pathlib import Path
+from typing import Any, BinaryIO
+from urllib.parse import quote, urlencode
+
+from cachetools import TTLCache
 
 from .config import settings
 
+# Concurrent requests for batch operations
+STORAGE_WORKERS = 8
+
+_storage_pool = ThreadPoolExecutor(STORAGE_WORKERS, thread_name_prefix="storage")
+
+
+def run_parallel(fn: Callable[[Any], Any], items: Iterable[Any]) -> list[Any]:
+    """Apply ``fn`` to every item on the storage pool, results in input order."""
+    return list(_storage_pool.map(fn, items))
+
+
+@cache
+def gcs_client() -> Any:
+    """The process-wide GCS client: one auth lookup, one pooled HTTP session."""
+    import google.auth
+    from google.auth.transport.requests import AuthorizedSession
+    from google.cloud import storage
+    from requests.adapters import HTTPAdapter
+
+    credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    # Default pool keeps 10 connections, fewer than concurrent requests can use
+    adapter = HTTPAdapter(pool_maxsize=STORAGE_WORKERS * 4)
+    session.mount("https://", adapter)
+    return storage.Client(project=project, credentials=credentials, _http=session)
+
+
+# How long a signed download link stays valid
+SIGNED_URL_TTL = 15 * 60
+
+LOCAL_SIGNED_PREFIX = "/api/v1/signed"
+
+# Reused for half their lifetime: signing may cost an IAM round trip, and a
+# stable URL stays in the browser cache
+_signed_urls: TTLCache[tuple[Any, ...], str] = TTLCache(maxsize=4096, ttl=SIGNED_URL_TTL / 2)
+_signed_urls_lock = threading.Lock()
+
+
+def content_disposition(filename: str | None) -> str | None:
+    """Inline Content-Disposition naming the file, or None without a name."""
+    if not filename:
+        return None
+    return f"inline; filename*=UTF-8''{quote(filename)}"
+
+
+def _signing_credentials() -> dict[str, Any]:
+    """Extra generate_signed_url arguments for credentials that can't sign.
+
+    Service account keys sign locally. Cloud Run's metadata-server
+    credentials have no key, so GCS signs through the IAM API using the
+    service account's own access token.
+    """
+    from google.auth.credentials import Signing
+    from google.auth.transport.requests import Request
+
+    credentials = gcs_client()._credentials
+    if isinstance(credentials, Signing):
+        return {}
+    if not credentials.valid:
+        credentials.refresh(Request())
+    return {
+        "service_account_email": credentials.service_account_email,
+        "access_token": credentials.token,
+    }
+
+
+def gcs_signed_url(
+    bucket: Any, name: str, *, expires_in: int, media_type: str | None, download_name: str | None
+) -> str:
+    """V4 signed GET URL for a blob."""
+    key = (bucket.name, name, media_type, download_name)
+    cacheable = expires_in >= SIGNED_URL_TTL
+    if cacheable:
+        with _signed_urls_lock:
+            cached = _signed_urls.get(key)
+        if cached:
+            return cached
+    url = str(
+        bucket.blob(name).generate_signed_url(
+            version="v4",
+            expiration=timedelta(seconds=expires_in),
+            method="GET",
+            response_type=media_type,
+            response_disposition=content_disposition(download_name),
+            **_signing_credentials(),
+        )
+    )
+    if cacheable:
+        with _signed_urls_lock:
+            _signed_urls[key] = url
+    return url
+
+
+def _local_signature(path: str, expires: int, media_type: str, download_name: str) -> str:
+    message = "\n".join((path, str(expires), media_type, download_name)).encode()
+    return hmac.new(settings.secret_key.encode(), message, hashlib.sha256).hexdigest()
+
+
+def local_signed_url(
+    scope: str,
+    key: str,
+    *,
+    expires_in: int,
+    media_type: str | None,
+    download_name: str | None,
+) -> str:
+    """App URL serving a locally stored file, valid for ``expires_in`` seconds."""
+    path = f"{scope}/{key}"
+    expires = int(time.time()) + expires_in
+    params: dict[str, str | int] = {"expires": expires}
+    if media_type:
+        params["type"] = media_type
+    if download_name:
+        params["name"] = download_name
+    params["signature"] = _local_signature(path, expires, media_type or "", download_name or "")
+    return f"{LOCAL_SIGNED_PREFIX}/{quote(path)}?{urlencode(params)}"
+
+
+def verify_local_signature(
+    path: str, expires: int, media_type: str, download_name: str, signature: str
+) -> bool:
+    """Whether a local signed URL is genuine and hasn't expired."""
+    if expires < time.time():
+        return False
+    expected = _local_signature(path, expires, media_type, download_name)
+    return hmac.compare_digest(signature, expected)
+
 
 class StorageBackend(ABC):
     """Abstract storage backend."""
 
     @abstractmethod
-    def save(self, filename: str, content: bytes, content_type: str = "image/jpeg") -> str:
-        """Save content and return public URL or path."""
+    def save(
+        self, filename: str, content: bytes | BinaryIO, content_type: str = "image/jpeg"
+    ) -> str:
+        """Save content (bytes, or a file streamed from its current position).
+
+        Returns the public URL or path.
+        """
         pass
 
     @abstractmethod
@@ -24,17 +180,72 @@ class StorageBackend(ABC):
         """Check if file exists."""
         pass
 
+    @abstractmethod
+    def read(self, filename: str) -> bytes | None:
+        """Read file contents. Returns None if not found."""
+        pass
+
+    @abstractmethod
+    def delete(self, filename: str) -> bool:
+        """Delete a file. Returns True if it existed."""
+        pass
+
+    @abstractmethod
+    def signed_url(
+        self,
+        filename: str,
+        *,
+        expires_in: int = SIGNED_URL_TTL,
+        media_type: str | None = None,
+        download_name: str | None = None,
+    ) -> str:
+        """Short-lived URL fetching the file directly, without the app's auth."""
+        pass
+
+    def save_many(self, files: Iterable[tuple[str, bytes | BinaryIO, str]]) -> list[str]:
+        """Save (filename, content, content_type) files in parallel. Returns their URLs."""
+        return run_parallel(lambda f: self.save(*f), files)
+
+    def exists_many(self, filenames: Iterable[str]) -> set[str]:
+        """The subset of ``filenames`` that exist."""
+        names = list(filenames)
+        return {n for n, found in zip(names, run_parallel(self.exists, names)) if found}
+
+    def delete_many(self, filenames: Iterable[str]) -> None:
+        """Delete files, skipping any that don't exist."""
+        run_parallel(self.delete, filenames)
+
+
+def write_content(path: Path, content: bytes | BinaryIO) -> None:
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+        return
+    with path.open("wb") as f:
+        shutil.copyfileobj(content, f)
+
+
+def upload_to_blob(blob: Any, content: bytes | BinaryIO, content_type: str) -> None:
+    if isinstance(content, bytes):
+        blob.upload_from_string(content, content_type=content_type)
+    else:
+        # Resumable upload in chunks, the file is never loaded whole
+        blob.upload_from_file(content, content_type=content_type)
+
 
 class LocalStorage(StorageBackend):
     """Local filesystem storage (for development)."""
 
-    def __init__(self, base_path: Path):
+    def __init__(self, base_path: Path, scope: str | None = None):
         self.base_path = base_path
         self.base_path.mkdir(parents=True, exist_ok=True)
+        # Names this storage in signed URLs (the collection)
+        self.scope = scope or base_path.name
 
-    def save(self, filename: str, content: bytes, content_type: str = "image/jpeg") -> str:
+    def save(
+        self, filename: str, content: bytes | BinaryIO, content_type: str = "image/jpeg"
+    ) -> str:
         path = self.base_path / filename
-        path.write_bytes(content)
+        write_content(path, content)
         return str(path)
 
     def get_public_url(self, filename: str) -> str:
@@ -43,21 +254,50 @@ class LocalStorage(StorageBackend):
     def exists(self, filename: str) -> bool:
         return (self.base_path / filename).exists()
 
+    def read(self, filename: str) -> bytes | None:
+        path = self.base_path / filename
+        if path.exists():
+            return path.read_bytes()
+        return None
+
+    def delete(self, filename: str) -> bool:
+        path = self.base_path / filename
+        if path.exists():
+            path.unlink()
+            return True
+        return False
+
+    def signed_url(
+        self,
+        filename: str,
+        *,
+        expires_in: int = SIGNED_URL_TTL,
+        media_type: str | None = None,
+        download_name: str | None = None,
+    ) -> str:
+        return local_signed_url(
+            self.scope,
+            filename,
+            expires_in=expires_in,
+            media_type=media_type,
+            download_name=download_name,
+        )
+
 
 class GCSStorage(StorageBackend):
     """Google Cloud Storage backend."""
 
     def __init__(self, bucket_name: str, prefix: str):
-        from google.cloud import storage
-
-        self.client = storage.Client()
+        self.client = gcs_client()
         self.bucket = self.client.bucket(bucket_name)
         self.bucket_name = bucket_name
         self.prefix = prefix
 
-    def save(self, filename: str, content: bytes, content_type: str = "image/jpeg") -> str:
+    def save(
+        self, filename: str, content: bytes | BinaryIO, content_type: str = "image/jpeg"
+    ) -> str:
         blob = self.bucket.blob(f"{self.prefix}/{filename}")
-        blob.upload_from_string(content, content_type=content_type)
+        upload_to_blob(blob, content, content_type)
         return self.get_public_url(filename)
 
     def get_public_url(self, filename: str) -> str:
@@ -67,9 +307,58 @@ class GCSStorage(StorageBackend):
         blob = self.bucket.blob(f"{self.prefix}/{filename}")
         return bool(blob.exists())
 
+    def read(self, filename: str) -> bytes | None:
+        blob = self.bucket.blob(f"{self.prefix}/{filename}")
+        if not blob.exists():
+            return None
+        return bytes(blob.download_as_bytes())
+
+    def delete(self, filename: str) -> bool:
+        blob = self.bucket.blob(f"{self.prefix}/{filename}")
+        if blob.exists():
+            blob.delete()
+            return True
+        return False
+
+    def delete_many(self, filenames: Iterable[str]) -> None:
+        delete_blobs(self.client, self.bucket, [f"{self.prefix}/{f}" for f in filenames])
+
+    def signed_url(
+        self,
+        filename: str,
+        *,
+        expires_in: int = SIGNED_URL_TTL,
+        media_type: str | None = None,
+        download_name: str | None = None,
+    ) -> str:
+        return gcs_signed_url(
+            self.bucket,
+            f"{self.prefix}/{filename}",
+            expires_in=expires_in,
+            media_type=media_type,
+            download_name=download_name,
+        )
+
+
+# GCS recommends at most 100 calls per batch request
+_GCS_BATCH_SIZE = 100
+
+
+def delete_blobs(client: Any, bucket: Any, names: list[str]) -> None:
+    """Delete blobs in batch requests, ignoring ones that are already gone."""
+    for i in range(0, len(names), _GCS_BATCH_SIZE):
+        with client.batch(raise_exception=False):
+            for name in names[i : i + _GCS_BATCH_SIZE]:
+                bucket.delete_blob(name)
+
+
+@cache
+def _storage(bucket: str, collection: str) -> StorageBackend:
+    if bucket:
+        return GCSStorage(bucket, prefix=collection)
+    return LocalStorage(Path(f"/app/data/{collection}"), scope=collection)
+
 
 def get_storage(collection: str = "instagram") -> StorageBackend:
-    """Get configured storage backend for a collection."""
-    if settings.gcs_bucket:
-        return GCSStorage(settings.gcs_bucket, prefix=collection)
-    return LocalStorage(Path(f"/app/data/{collection}"))
+    """Get configured storage backend for a collection (shared per process)."""
+    return _storage(settings.gcs_bucket, collection)
@@ -2,10 +2,10 @@
 
 from typing import Any
 
-import httpx
-from fastapi import APIRouter, Depends, Header, Request
+from fastapi import APIRouter, Body, Depends, Header
 from sqlalchemy.orm import Session
 
+from .. import http_client
 from ..config import settings
 from ..database import get_db
 from ..log_config import get_logger
@@ -24,7 +24,7 @@ def _reply(chat_id: int, reply_to: int, text: str) -> None:
         return
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     try:
-        resp = httpx.post(
+        resp = http_client.post(
             url,
             json={"chat_id": chat_id, "text": text, "reply_to_message_id": reply_to},
         )
@@ -38,11 +38,11 @@ def _download_file(file_id: str) -> bytes:
     """Download a file from Telegram by file_id."""
     token = settings.telegram_token
     # Get file path
-    resp = httpx.get(f"https://api.telegram.org/bot{token}/getFile?file_id={file_id}")
+    resp = http_client.get(f"https://api.telegram.org/bot{token}/getFile?file_id={file_id}")
     resp.raise_for_status()
     file_path = resp.json()["result"]["file_path"]
     # Download file content
-    dl_resp = httpx.get(f"https://api.telegram.org/file/bot{token}/{file_path}")
+    dl_resp = http_client.get(f"https://api.telegram.org/file/bot{token}/{file_path}")
     dl_resp.raise_for_status()
     return dl_resp.content
 
@@ -99,19 +99,22 @@ def _handle_meme_photo(
 
 
 @router.post("/webhook")
-async def telegram_webhook(
-    request: Request,
+def telegram_webhook(
+    body: dict[str, Any] = Body(...),
     db: Session = Depends(get_db),
     x_telegram_bot_api_secret_token: str | None = Header(None),
 ) -> dict[str, str]:
-    """Handle incoming Telegram webhook updates."""
+    """Handle incoming Telegram webhook updates.
+
+    A plain ``def``: downloads, replies and meme extraction all block, so
+    FastAPI runs the handler in its threadpool, off the event loop.
+    """
     # Verify webhook secret
     if settings.telegram_webhook_secret:
         if x_telegram_bot_api_secret_token != settings.telegram_webhook_secret:
             log.warning("Telegram webhook: invalid secret token")
             return {"status": "ok"}
 
-    body: dict[str, Any] = await request.json()
     message: dict[str, Any] | None = body.get("message")
     if not message:
         return {"status": "ok"}
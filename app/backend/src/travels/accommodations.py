@@ -1,8 +1,10 @@
 import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..auth.session import (
     get_admin_user,
@@ -14,6 +16,7 @@ from ..crypto import decrypt, encrypt, mask_value
 from ..database import get_db
 from ..extraction import extract_accommodation_data
 from ..models import Accommodation, Trip, User
+from ..uploads import read_upload
 from .models import (
     AccommodationCreateRequest,
     AccommodationData,
@@ -92,11 +95,14 @@ async def extract_accommodation(
             error=f"Unsupported file type: {content_type}. Use PDF or image."
         )
 
-    content = await file.read()
-    if len(content) > MAX_EXTRACT_SIZE:
-        return AccommodationExtractResponse(error="File too large (max 10 MB)")
+    try:
+        upload = await read_upload(
+            file, max_size=MAX_EXTRACT_SIZE, allowed_types=EXTRACT_MIME_TYPES
+        )
+    except HTTPException as e:
+        return AccommodationExtractResponse(error=e.detail)
 
-    result = extract_accommodation_data(content, content_type)
+    result = await run_in_threadpool(extract_accommodation_data, upload.read(), content_type)
     if result.error:
         return AccommodationExtractResponse(error=result.error)
     if not result.accommodation:
@@ -315,9 +321,7 @@ async def upload_accommodation_document(
             detail=f"Unsupported file type: {content_type}. Use PDF, JPEG, PNG, or WebP.",
         )
 
-    content = await file.read()
-    if len(content) > MAX_DOC_SIZE:
-        raise HTTPException(status_code=400, detail="File too large (max 10 MB)")
+    upload = await read_upload(file, max_size=MAX_DOC_SIZE, allowed_types=DOC_MIME_TYPES)
 
     storage = get_vault_storage()
 
@@ -332,11 +336,11 @@ async def upload_accommodation_document(
                 exc_info=True,
             )
 
-    key = storage.save(admin.id, file.filename or "document", content, content_type)
+    key = storage.save(admin.id, file.filename or "document", upload.file, content_type)
     acc.document_path = key
     acc.document_name = file.filename
     acc.document_mime_type = content_type
-    acc.document_size = len(content)
+    acc.document_size = upload.size
     db.commit()
     db.refresh(acc)
     return _acc_to_data(acc)
@@ -347,9 +351,9 @@ def get_accommodation_document(
     accommodation_id: int,
     viewer: Annotated[User, Depends(get_trips_viewer)],
     db: Session = Depends(get_db),
-) -> Response:
-    """Stream accommodation document content through the backend."""
-    from ..vault_storage import get_vault_storage
+) -> RedirectResponse:
+    """Redirect to a short-lived signed URL for the accommodation document."""
+    from ..vault_storage import get_vault_storage, vault_file_redirect
 
     acc = db.query(Accommodation).filter(Accommodation.id == accommodation_id).first()
     if not acc:
@@ -357,12 +361,8 @@ def get_accommodation_document(
     if not acc.document_path:
         raise HTTPException(status_code=404, detail="No document attached")
 
-    storage = get_vault_storage()
-    content = storage.read(acc.document_path)
-    if content is None:
-        raise HTTPException(status_code=404, detail="Document not found in storage")
-    return Response(
-        content=content, media_type=acc.document_mime_type or "application/octet-stream"
+    return vault_file_redirect(
+        get_vault_storage(), acc.document_path, acc.document_mime_type, acc.document_name
     )
 
 
@@ -0,0 +1,136 @@
+"""Compact in-memory index of the airportsdata IATA dataset.
+
+The dataset ships as ~8k dicts; this keeps one row per airport in parallel
+columns (coordinates in ``array('d')``), an IATA -> row map and a 1°
+lat/lng grid for nearest-airport lookups. It is built once, during app
+startup (see ``main.lifespan``), so no request pays for loading it.
+"""
+
+import threading
+from array import array
+from collections.abc import Iterator
+from math import cos, floor, radians
+from typing import NamedTuple
+
+import airportsdata
+
+from .location import haversine_km
+
+# Grid cell size in degrees (~111 km of latitude)
+GRID_DEGREES = 1.0
+KM_PER_DEGREE = 111.2
+# Longitude cells per full turn; cell numbers run from -_LNG_CELLS // 2
+_LNG_CELLS = round(360 / GRID_DEGREES)
+
+
+class ReferenceAirport(NamedTuple):
+    iata_code: str
+    name: str
+    city: str
+    country_code: str
+    latitude: float
+    longitude: float
+    timezone: str
+
+
+def _wrap_lng_cell(lng_cell: int) -> int:
+    """Longitude cell number wrapped across the antimeridian."""
+    return (lng_cell + _LNG_CELLS // 2) % _LNG_CELLS - _LNG_CELLS // 2
+
+
+def _cell(latitude: float, longitude: float) -> tuple[int, int]:
+    return floor(latitude / GRID_DEGREES), _wrap_lng_cell(floor(longitude / GRID_DEGREES))
+
+
+class AirportIndex:
+    """Airports by IATA code and by position."""
+
+    def __init__(self, rows: list[ReferenceAirport]) -> None:
+        self._codes = [r.iata_code for r in rows]
+        self._names = [r.name for r in rows]
+        self._cities = [r.city for r in rows]
+        self._countries = [r.country_code for r in rows]
+        self._timezones = [r.timezone for r in rows]
+        self._latitudes = array("d", (r.latitude for r in rows))
+        self._longitudes = array("d", (r.longitude for r in rows))
+        self._rows = {code: i for i, code in enumerate(self._codes)}
+        self._grid: dict[tuple[int, int], list[int]] = {}
+        for i, row in enumerate(rows):
+            self._grid.setdefault(_cell(row.latitude, row.longitude), []).append(i)
+
+    @classmethod
+    def from_airportsdata(cls) -> "AirportIndex":
+        return cls(
+            [
+                ReferenceAirport(
+                    iata_code=code,
+                    name=str(ref.get("name", "")),
+                    city=str(ref.get("city", "")),
+                    country_code=str(ref.get("country", "")),
+                    latitude=float(ref["lat"]),
+                    longitude=float(ref["lon"]),
+                    timezone=str(ref.get("tz", "")),
+                )
+                for code, ref in airportsdata.load("IATA").items()
+            ]
+        )
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _row(self, i: int) -> ReferenceAirport:
+        return ReferenceAirport(
+            iata_code=self._codes[i],
+            name=self._names[i],
+            city=self._cities[i],
+            country_code=self._countries[i],
+            latitude=self._latitudes[i],
+            longitude=self._longitudes[i],
+            timezone=self._timezones[i],
+        )
+
+    def get(self, iata_code: str) -> ReferenceAirport | None:
+        i = self._rows.get(iata_code.upper().strip())
+        return None if i is None else self._row(i)
+
+    def _ring(self, center: tuple[int, int], radius: int) -> Iterator[int]:
+        """Airport rows in the cells exactly ``radius`` cells away from ``center``."""
+        lat_cell, lng_cell = center
+        for dlat in range(-radius, radius + 1):
+            for dlng in range(-radius, radius + 1):
+                if max(abs(dlat), abs(dlng)) == radius:
+                    cell = (lat_cell + dlat, _wrap_lng_cell(lng_cell + dlng))
+                    yield from self._grid.get(cell, ())
+
+    def nearest(
+        self, latitude: float, longitude: float, max_km: float = 100.0
+    ) -> ReferenceAirport | None:
+        """Closest airport within ``max_km``, or None."""
+        center = _cell(latitude, longitude)
+        # Longitude cells shrink towards the poles; search wide enough to cover max_km
+        km_per_cell = KM_PER_DEGREE * GRID_DEGREES * max(cos(radians(latitude)), 0.01)
+        best: tuple[float, int] | None = None
+        for radius in range(int(max_km / km_per_cell) + 2):
+            for i in self._ring(center, radius):
+                lat, lng = self._latitudes[i], self._longitudes[i]
+                distance = haversine_km(latitude, longitude, lat, lng)
+                if distance <= max_km and (best is None or distance < best[0]):
+                    best = (distance, i)
+            # Anything in the next ring is at least `radius` cells away
+            if best is not None and best[0] <= radius * km_per_cell:
+                break
+        return None if best is None else self._row(best[1])
+
+
+_index: AirportIndex | None = None
+_lock = threading.Lock()
+
+
+def airport_index() -> AirportIndex:
+    """The process-wide index, built on first use (normally at startup)."""
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = AirportIndex.from_airportsdata()
+    return _index
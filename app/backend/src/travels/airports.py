@@ -0,0 +1,153 @@
+"""Batched airport lookups for flight import, creation, stats and the map.
+
+Every caller resolves all the airports it needs with a single ``IN`` query
+instead of one query per flight leg. A stored airport's id and IATA code
+never change, so the pairs seen here are remembered process-wide: once
+warm, turning ids into codes (duplicate detection) or codes into ids
+(creating a flight) needs no query at all. Missing names, countries and
+coordinates are filled from the offline reference index (airport_index.py).
+"""
+
+import threading
+from collections.abc import Iterable, Mapping
+from typing import NamedTuple
+
+from sqlalchemy.orm import Session
+
+from ..models import Airport
+from .airport_index import airport_index
+
+_lock = threading.Lock()
+# Only airports read back from the database (not ones created in the
+# current, possibly rolled back, transaction)
+_code_by_id: dict[int, str] = {}
+_id_by_code: dict[str, int] = {}
+
+
+class AirportDetails(NamedTuple):
+    """What a flight data API knows about an airport; None = unknown."""
+
+    name: str | None = None
+    city: str | None = None
+    country_code: str | None = None
+    latitude: float | None = None
+    longitude: float | None = None
+    timezone: str | None = None
+
+
+def clear_airport_cache() -> None:
+    with _lock:
+        _code_by_id.clear()
+        _id_by_code.clear()
+
+
+def _remember(pairs: Iterable[tuple[int, str]]) -> None:
+    with _lock:
+        for airport_id, code in pairs:
+            _code_by_id[airport_id] = code
+            _id_by_code[code] = airport_id
+
+
+def _normalize(code: str) -> str:
+    return code.upper().strip()
+
+
+def _enrich(airport: Airport, details: AirportDetails | None) -> None:
+    """Fill empty fields from API details, then from the offline dataset."""
+    if details:
+        if details.name and not airport.name:
+            airport.name = details.name
+        if details.city and not airport.city:
+            airport.city = details.city
+        if details.country_code and not airport.country_code:
+            airport.country_code = details.country_code
+        if details.latitude is not None and airport.latitude is None:
+            airport.latitude = details.latitude
+        if details.longitude is not None and airport.longitude is None:
+            airport.longitude = details.longitude
+        if details.timezone and not airport.timezone:
+            airport.timezone = details.timezone
+
+    if airport.country_code and airport.name:
+        return
+    ref = airport_index().get(airport.iata_code)
+    if not ref:
+        return
+    if not airport.name:
+        airport.name = ref.name
+    if not airport.city:
+        airport.city = ref.city
+    if not airport.country_code:
+        airport.country_code = ref.country_code
+    if airport.latitude is None:
+        airport.latitude = ref.latitude
+    if airport.longitude is None:
+        airport.longitude = ref.longitude
+    if not airport.timezone:
+        airport.timezone = ref.timezone
+
+
+def resolve_airports(
+    db: Session,
+    codes: Iterable[str],
+    details: Mapping[str, AirportDetails] | None = None,
+) -> dict[str, Airport]:
+    """Find or create airports by IATA code (upper-cased), in one query.
+
+    Existing records are enriched with ``details`` (keyed by upper-cased
+    code) and the offline dataset, never overwritten. New ones are flushed,
+    so their ids are set; committing is up to the caller.
+    """
+    wanted = {_normalize(code) for code in codes}
+    if not wanted:
+        return {}
+    airports = {
+        a.iata_code: a for a in db.query(Airport).filter(Airport.iata_code.in_(wanted)).all()
+    }
+    _remember((a.id, code) for code, a in airports.items())
+
+    created = False
+    for code in sorted(wanted - airports.keys()):
+        airports[code] = Airport(iata_code=code)
+        db.add(airports[code])
+        created = True
+    for code, airport in airports.items():
+        _enrich(airport, details.get(code) if details else None)
+    if created:
+        db.flush()
+    return airports
+
+
+def airport_ids(db: Session, codes: Iterable[str]) -> dict[str, int]:
+    """IATA code -> airport id, creating unknown airports. No query once warm."""
+    wanted = {_normalize(code) for code in codes}
+    with _lock:
+        ids = {code: _id_by_code[code] for code in wanted if code in _id_by_code}
+    missing = wanted - ids.keys()
+    if missing:
+        ids.update((code, a.id) for code, a in resolve_airports(db, missing).items())
+    return ids
+
+
+def iata_codes(db: Session, ids: Iterable[int]) -> dict[int, str]:
+    """Airport id -> IATA code. No query once warm."""
+    wanted = set(ids)
+    with _lock:
+        codes = {i: _code_by_id[i] for i in wanted if i in _code_by_id}
+    missing = wanted - codes.keys()
+    if missing:
+        rows = db.query(Airport.id, Airport.iata_code).filter(Airport.id.in_(missing)).all()
+        pairs = [(airport_id, code) for airport_id, code in rows]
+        _remember(pairs)
+        codes.update(pairs)
+    return codes
+
+
+def airports_by_id(db: Session, ids: Iterable[int]) -> dict[int, Airport]:
+    """Airport records for a set of ids, in one query."""
+    wanted = set(ids)
+    if not wanted:
+        return {}
+    airports = db.query(Airport).filter(Airport.id.in_(wanted)).all()
+    _remember((a.id, a.iata_code) for a in airports)
+    return {a.id: a for a in airports}
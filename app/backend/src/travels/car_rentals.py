@@ -3,6 +3,7 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..auth.session import (
     get_admin_user,
@@ -14,6 +15,7 @@ from ..crypto import decrypt, encrypt, mask_value
 from ..database import get_db
 from ..extraction import extract_car_rental_data
 from ..models import CarRental, Trip, User
+from ..uploads import read_upload
 from .models import (
     CarRentalCreateRequest,
     CarRentalData,
@@ -80,11 +82,14 @@ async def extract_car_rental_from_pdf(
             error=f"Unsupported file type: {content_type}. Use PDF or image."
         )
 
-    content = await file.read()
-    if len(content) > MAX_EXTRACT_SIZE:
-        return CarRentalExtractResponse(error="File too large (max 10 MB)")
+    try:
+        upload = await read_upload(
+            file, max_size=MAX_EXTRACT_SIZE, allowed_types=EXTRACT_MIME_TYPES
+        )
+    except HTTPException as e:
+        return CarRentalExtractResponse(error=e.detail)
 
-    result = extract_car_rental_data(content, content_type)
+    result = await run_in_threadpool(extract_car_rental_data, upload.read(), content_type)
     if result.error:
         return CarRentalExtractResponse(error=result.error)
     if not result.rental:
@@ -6,9 +6,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy.sql.functions import coalesce
 
 from ..auth.session import get_admin_user
+from ..data_version import public_data_cache
 from ..database import get_db
 from ..models import (
-    Airport,
     City,
     Flight,
     Microstate,
@@ -21,6 +21,7 @@ from ..models import (
     User,
     Visit,
 )
+from .airports import airports_by_id
 from .models import (
     CityMarkerData,
     FlightMapAirport,
@@ -38,6 +39,7 @@ from .models import (
     UNCountryActivityUpdate,
     UNCountryData,
 )
+from .snapshot import get_travel_snapshot, invalidate_travel_snapshot
 
 router = APIRouter()
 
@@ -191,242 +193,30 @@ def get_travel_data(db: Session = Depends(get_db)) -> TravelData:
     )
 
 
-@router.get("/map-data", response_model=MapData)
+@router.get("/map-data", response_model=MapData, dependencies=[Depends(public_data_cache)])
 def get_map_data(db: Session = Depends(get_db)) -> MapData:
     """Get map data: stats, visited regions, and microstates (fast, ~50 items)."""
-
-    today = date.today()
-
-    # Visited filter: destination has first_visit_date <= today
-    # This allows location check-in to immediately update counters
-    # (check-in sets first_visit_date to today for matching destinations)
-
-    # Count UN countries
-    un_total = db.query(func.count(UNCountry.id)).scalar() or 0
-
-    # Count visited UN countries (those with first_visit_date <= today)
-    un_visited = (
-        db.query(func.count(func.distinct(TCCDestination.un_country_id)))
-        .join(Visit, Visit.tcc_destination_id == TCCDestination.id)
-        .filter(TCCDestination.un_country_id.isnot(None))
-        .filter(Visit.first_visit_date <= today)
-        .scalar()
-        or 0
-    )
-
-    # Count planned UN countries (first_visit_date > today, i.e., future trips)
-    un_planned = (
-        db.query(func.count(func.distinct(TCCDestination.un_country_id)))
-        .join(Visit, Visit.tcc_destination_id == TCCDestination.id)
-        .filter(TCCDestination.un_country_id.isnot(None))
-        .filter(Visit.first_visit_date > today)
-        .scalar()
-        or 0
-    )
-
-    # Count TCC destinations
-    tcc_total = db.query(func.count(TCCDestination.id)).scalar() or 0
-    tcc_visited = (
-        db.query(func.count(Visit.id)).filter(Visit.first_visit_date <= today).scalar() or 0
-    )
-
-    # Count planned TCC destinations (first_visit_date > today)
-    tcc_planned = (
-        db.query(func.count(Visit.id)).filter(Visit.first_visit_date > today).scalar() or 0
-    )
-
-    # Get NM stats
-    nm_total = db.query(func.count(NMRegion.id)).scalar() or 0
-    nm_visited = db.query(func.count(NMRegion.id)).filter(NMRegion.visited.is_(True)).scalar() or 0
-
-    # Get all map region codes with their first visit dates and trip counts
-    visited_map_regions: dict[str, date] = {}
-    visit_counts: dict[str, int] = {}
-    visited_countries: list[str] = []
-
-    # Count trips per TCC destination (for visit_counts display)
-    # Trip counts use start_date - once trip starts, it counts
-    tcc_trip_counts_query = (
-        db.query(
-            TripDestination.tcc_destination_id, func.count(func.distinct(TripDestination.trip_id))
-        )
-        .join(Trip, Trip.id == TripDestination.trip_id)
-        .filter(Trip.start_date <= today)
-        .group_by(TripDestination.tcc_destination_id)
-        .all()
-    )
-    tcc_trip_counts = {tcc_id: count for tcc_id, count in tcc_trip_counts_query}
-
-    # Get trip counts per UN country
-    un_trip_counts_query = (
-        db.query(TCCDestination.un_country_id, func.count(func.distinct(TripDestination.trip_id)))
-        .join(TripDestination, TripDestination.tcc_destination_id == TCCDestination.id)
-        .join(Trip, Trip.id == TripDestination.trip_id)
-        .filter(TCCDestination.un_country_id.isnot(None))
-        .filter(Trip.start_date <= today)
-        .group_by(TCCDestination.un_country_id)
-        .all()
-    )
-    un_trip_counts = {un_id: count for un_id, count in un_trip_counts_query}
-
-    # Get visited UN countries with first_visit_date (for map coloring)
-    visited_un_data = (
-        db.query(UNCountry, func.min(Visit.first_visit_date).label("first_visit"))
-        .join(TCCDestination, TCCDestination.un_country_id == UNCountry.id)
-        .join(Visit, Visit.tcc_destination_id == TCCDestination.id)
-        .filter(Visit.first_visit_date <= today)
-        .group_by(UNCountry.id)
-        .all()
-    )
-
-    for country, first_visit in visited_un_data:
-        visited_countries.append(country.name)
-        trip_count = un_trip_counts.get(country.id, 0)
-        for code in country.map_region_codes.split(","):
-            code = code.strip()
-            if code and first_visit:
-                if code not in visited_map_regions or first_visit < visited_map_regions[code]:
-                    visited_map_regions[code] = first_visit
-                # Accumulate trip counts for regions with multiple polygons
-                visit_counts[code] = visit_counts.get(code, 0) + trip_count
-
-    # Get map regions from TCC destinations with their own polygon (Kosovo, Somaliland, etc.)
-    visited_tcc_with_polygon = (
-        db.query(TCCDestination, Visit.first_visit_date)
-        .join(Visit, Visit.tcc_destination_id == TCCDestination.id)
-        .filter(
-            TCCDestination.map_region_code.isnot(None),
-            TCCDestination.un_country_id.is_(None),
-            Visit.first_visit_date <= today,
-        )
-        .all()
-    )
-
-    for dest, first_visit in visited_tcc_with_polygon:
-        if dest.map_region_code and first_visit:
-            code = dest.map_region_code
-            if code not in visited_map_regions or first_visit < visited_map_regions[code]:
-                visited_map_regions[code] = first_visit
-            visit_counts[code] = tcc_trip_counts.get(dest.id, 0)
-            visited_countries.append(dest.name)
-
-    # Get all microstates
-    microstates = db.query(Microstate).all()
-    microstates_data = [
-        MicrostateData(
-            name=m.name,
-            longitude=m.longitude,
-            latitude=m.latitude,
-            map_region_code=m.map_region_code,
-        )
-        for m in microstates
-    ]
-
-    # Convert dates to ISO strings
-    visited_map_regions_iso = {code: d.isoformat() for code, d in visited_map_regions.items()}
-
-    # Build region names - use parent country name for all territories
-    region_names: dict[str, str] = {}
-
-    # Map all region codes to their UN country name
-    all_un_countries = db.query(UNCountry).all()
-    for country in all_un_countries:
-        codes = [c.strip() for c in country.map_region_codes.split(",")]
-        for code in codes:
-            region_names[code] = country.name
-
-    # Add names for non-UN territories with their own polygons
-    tcc_with_polygon = (
-        db.query(TCCDestination)
-        .filter(
-            TCCDestination.map_region_code.isnot(None),
-            TCCDestination.un_country_id.is_(None),
-        )
-        .all()
-    )
-    for dest in tcc_with_polygon:
-        if dest.map_region_code:
-            region_names[dest.map_region_code] = dest.name
-
+    # Visited = first_visit_date <= today, so location check-in immediately
+    # updates counters (check-in sets first_visit_date to today)
+    snapshot = get_travel_snapshot(db)
     return MapData(
-        stats=TravelStats(
-            un_visited=un_visited,
-            un_total=un_total,
-            un_planned=un_planned,
-            tcc_visited=tcc_visited,
-            tcc_total=tcc_total,
-            tcc_planned=tcc_planned,
-            nm_visited=nm_visited,
-            nm_total=nm_total,
-        ),
-        visited_map_regions=visited_map_regions_iso,
-        visit_counts=visit_counts,
-        region_names=region_names,
-        visited_countries=sorted(visited_countries),
-        microstates=microstates_data,
+        stats=snapshot.stats,
+        visited_map_regions={
+            code: d.isoformat() for code, d in snapshot.visited_map_regions.items()
+        },
+        visit_counts=snapshot.visit_counts,
+        region_names=snapshot.region_names,
+        visited_countries=snapshot.visited_countries,
+        microstates=snapshot.microstates,
     )
 
 
-@router.get("/un-countries", response_model=UNCountriesResponse)
+@router.get(
+    "/un-countries", response_model=UNCountriesResponse, dependencies=[Depends(public_data_cache)]
+)
 def get_un_countries(db: Session = Depends(get_db)) -> UNCountriesResponse:
     """Get all 193 UN countries with visit dates and counts."""
-
-    today = date.today()
-
-    # Get visited UN countries with last visit date (from visits table)
-    visited_un_data = (
-        db.query(UNCountry, func.max(Visit.first_visit_date).label("last_visit"))
-        .join(TCCDestination, TCCDestination.un_country_id == UNCountry.id)
-        .join(Visit, Visit.tcc_destination_id == TCCDestination.id)
-        .filter(Visit.first_visit_date <= today)
-        .group_by(UNCountry.id)
-        .all()
-    )
-
-    un_visit_dates: dict[int, date] = {}
-    for country, last_visit in visited_un_data:
-        un_visit_dates[country.id] = last_visit
-
-    # Get trip counts per UN country (trips that have started)
-    un_trip_counts = (
-        db.query(TCCDestination.un_country_id, func.count(func.distinct(TripDestination.trip_id)))
-        .join(TripDestination, TripDestination.tcc_destination_id == TCCDestination.id)
-        .join(Trip, Trip.id == TripDestination.trip_id)
-        .filter(TCCDestination.un_country_id.isnot(None))
-        .filter(Trip.start_date <= today)
-        .group_by(TCCDestination.un_country_id)
-        .all()
-    )
-    un_counts: dict[int, int] = {un_id: count for un_id, count in un_trip_counts}
-
-    # Get planned counts per UN country (first_visit_date > today)
-    un_planned_counts = (
-        db.query(TCCDestination.un_country_id, func.count(func.distinct(Visit.id)))
-        .join(Visit, Visit.tcc_destination_id == TCCDestination.id)
-        .filter(TCCDestination.un_country_id.isnot(None))
-        .filter(Visit.first_visit_date > today)
-        .group_by(TCCDestination.un_country_id)
-        .all()
-    )
-    un_planned: dict[int, int] = {un_id: count for un_id, count in un_planned_counts}
-
-    # Get all UN countries
-    all_un_countries = db.query(UNCountry).order_by(UNCountry.continent, UNCountry.name).all()
-
-    countries_data = [
-        UNCountryData(
-            name=c.name,
-            continent=c.continent,
-            visit_date=un_visit_dates[c.id].isoformat() if c.id in un_visit_dates else None,
-            visit_count=un_counts.get(c.id, 0),
-            planned_count=un_planned.get(c.id, 0),
-            driving_type=c.driving_type,
-            drone_flown=c.drone_flown,
-        )
-        for c in all_un_countries
-    ]
-
-    return UNCountriesResponse(countries=countries_data)
+    return UNCountriesResponse(countries=get_travel_snapshot(db).un_countries)
 
 
 @router.patch("/un-countries/{country_name}/activities")
@@ -445,6 +235,7 @@ def update_un_country_activities(
     country.driving_type = update.driving_type
     country.drone_flown = update.drone_flown
     db.commit()
+    invalidate_travel_snapshot()
     db.refresh(country)
 
     # Get visit info for response
@@ -479,61 +270,19 @@ def update_un_country_activities(
     )
 
 
-@router.get("/tcc-destinations", response_model=TCCDestinationsResponse)
+@router.get(
+    "/tcc-destinations",
+    response_model=TCCDestinationsResponse,
+    dependencies=[Depends(public_data_cache)],
+)
 def get_tcc_destinations(db: Session = Depends(get_db)) -> TCCDestinationsResponse:
     """Get all 330 TCC destinations with visit dates and counts."""
+    return TCCDestinationsResponse(destinations=get_travel_snapshot(db).tcc_destinations)
 
-    today = date.today()
 
-    # Get visit dates per TCC destination (from visits table, where visited)
-    tcc_visit_data = (
-        db.query(
-            Visit.tcc_destination_id,
-            Visit.first_visit_date,
-        )
-        .filter(Visit.first_visit_date <= today)
-        .all()
-    )
-    tcc_visit_dates: dict[int, date] = {tcc_id: visit_date for tcc_id, visit_date in tcc_visit_data}
-
-    # Get trip counts per TCC destination (trips that have started)
-    tcc_trip_counts = (
-        db.query(
-            TripDestination.tcc_destination_id,
-            func.count(func.distinct(TripDestination.trip_id)).label("trip_count"),
-        )
-        .join(Trip, Trip.id == TripDestination.trip_id)
-        .filter(Trip.start_date <= today)
-        .group_by(TripDestination.tcc_destination_id)
-        .all()
-    )
-    tcc_counts: dict[int, int] = {tcc_id: count for tcc_id, count in tcc_trip_counts}
-
-    # Get planned counts per TCC destination (first_visit_date > today)
-    tcc_planned_data = (
-        db.query(Visit.tcc_destination_id).filter(Visit.first_visit_date > today).all()
-    )
-    tcc_planned: dict[int, int] = {tcc_id: 1 for (tcc_id,) in tcc_planned_data}
-
-    all_tcc = (
-        db.query(TCCDestination).order_by(TCCDestination.tcc_region, TCCDestination.name).all()
-    )
-
-    destinations_data = [
-        TCCDestinationData(
-            name=dest.name,
-            region=dest.tcc_region,
-            visit_date=tcc_visit_dates[dest.id].isoformat() if dest.id in tcc_visit_dates else None,
-            visit_count=tcc_counts.get(dest.id, 0),
-            planned_count=tcc_planned.get(dest.id, 0),
-        )
-        for dest in all_tcc
-    ]
-
-    return TCCDestinationsResponse(destinations=destinations_data)
-
-
-@router.get("/map-cities", response_model=MapCitiesResponse)
+@router.get(
+    "/map-cities", response_model=MapCitiesResponse, dependencies=[Depends(public_data_cache)]
+)
 def get_map_cities(db: Session = Depends(get_db)) -> MapCitiesResponse:
     """Get all properly visited cities with coordinates for map markers."""
 
@@ -577,7 +326,7 @@ def get_map_cities(db: Session = Depends(get_db)) -> MapCitiesResponse:
     )
 
 
-@router.get("/map-flights", response_model=FlightMapData)
+@router.get("/map-flights", response_model=FlightMapData, dependencies=[Depends(public_data_cache)])
 def get_map_flights(db: Session = Depends(get_db)) -> FlightMapData:
     """Get airports and flight routes for the map flights layer (past flights only)."""
     today = date.today()
@@ -600,12 +349,11 @@ def get_map_flights(db: Session = Depends(get_db)) -> FlightMapData:
         airport_flight_counts[dep_id] = airport_flight_counts.get(dep_id, 0) + 1
         airport_flight_counts[arr_id] = airport_flight_counts.get(arr_id, 0) + 1
 
-    airports = (
-        db.query(Airport)
-        .filter(Airport.id.in_(all_ids))
-        .filter(Airport.latitude.isnot(None), Airport.longitude.isnot(None))
-        .all()
-    )
+    airports = [
+        a
+        for a in airports_by_id(db, all_ids).values()
+        if a.latitude is not None and a.longitude is not None
+    ]
 
     airport_data = [
         FlightMapAirport(
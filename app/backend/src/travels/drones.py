@@ -2,17 +2,20 @@
 
 from collections import defaultdict
 from datetime import date, datetime
-from typing import Annotated
+from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..auth.session import get_admin_user, get_trips_viewer
+from ..data_version import public_data_cache
 from ..database import get_db
+from ..jobs import JobContext, JobError, job_handler
 from ..log_config import get_logger
 from ..models import Battery, Drone, DroneFlight, Trip, User
 from ..telegram.processing import process_flight_record
+from ..uploads import read_upload
 from .models import (
     BatteriesResponse,
     BatteryCreateRequest,
@@ -438,15 +441,11 @@ async def upload_drone_flight(
     if not file.filename or not file.filename.lower().endswith(".txt"):
         raise HTTPException(status_code=400, detail="Only .txt flight record files are accepted")
 
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="File is empty")
-    if len(content) > 10 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File too large (max 10MB)")
+    upload = await read_upload(file)
 
     is_test = x_test_mode == "true"
     try:
-        result = process_flight_record(content, file.filename, db, is_test=is_test)
+        result = process_flight_record(upload.read(), file.filename, db, is_test=is_test)
     except Exception:
         log.exception("Failed to process flight record: %s", file.filename)
         raise HTTPException(status_code=422, detail="Failed to parse flight record")
@@ -454,6 +453,20 @@ async def upload_drone_flight(
     return {"result": result}
 
 
+@job_handler("drones.flight_record")
+def _flight_record_job(ctx: JobContext) -> dict[str, Any]:
+    """Process an uploaded flight record (duplicates are detected, so retries are safe)."""
+    if not ctx.payload:
+        raise JobError("No file uploaded")
+    filename = str(ctx.params.get("filename") or "")
+    if not filename.lower().endswith(".txt"):
+        raise JobError("Only .txt flight record files are accepted")
+    result = process_flight_record(
+        ctx.payload, filename, ctx.db, is_test=bool(ctx.params.get("is_test"))
+    )
+    return {"result": result}
+
+
 @router.put("/drone-flights/{flight_id}", response_model=DroneFlightData)
 def update_drone_flight(
     flight_id: int,
@@ -576,7 +589,9 @@ def get_trip_drone_flights(
 # ---------------------------------------------------------------------------
 
 
-@router.get("/drone-stats", response_model=DroneStatsResponse)
+@router.get(
+    "/drone-stats", response_model=DroneStatsResponse, dependencies=[Depends(public_data_cache)]
+)
 def get_drone_stats(
     db: Session = Depends(get_db),
 ) -> DroneStatsResponse:
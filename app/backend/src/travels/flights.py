@@ -1,12 +1,13 @@
 import logging
 from datetime import date
-from typing import Annotated, Any
+from typing import Annotated
 
-import airportsdata
 import httpx
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
+from .. import http_client
 from ..auth.session import (
     get_admin_user,
     get_trips_viewer,
@@ -18,6 +19,8 @@ from ..crypto import decrypt, encrypt, mask_value
 from ..database import get_db
 from ..extraction import extract_flight_data
 from ..models import Airport, Flight, Trip, User
+from ..uploads import read_upload
+from .airports import AirportDetails, airport_ids, iata_codes, resolve_airports
 from .models import (
     AirportData,
     ExtractedFlightResponse,
@@ -31,79 +34,9 @@ from .models import (
 
 log = logging.getLogger(__name__)
 
-_AIRPORTS_DB: dict[str, Any] | None = None
-
-
-def _get_airports_db() -> dict[str, Any]:
-    global _AIRPORTS_DB
-    if _AIRPORTS_DB is None:
-        _AIRPORTS_DB = airportsdata.load("IATA")
-    return _AIRPORTS_DB
-
-
 router = APIRouter()
 
 
-def _upsert_airport(
-    db: Session,
-    iata_code: str,
-    name: str | None = None,
-    city: str | None = None,
-    country_code: str | None = None,
-    latitude: float | None = None,
-    longitude: float | None = None,
-    timezone: str | None = None,
-) -> Airport:
-    """Find or create an airport by IATA code. Enriches existing records with new data."""
-    iata = iata_code.upper().strip()
-    airport = db.query(Airport).filter(Airport.iata_code == iata).first()
-    if airport:
-        # Enrich with richer data from API if we have it
-        if name and not airport.name:
-            airport.name = name
-        if city and not airport.city:
-            airport.city = city
-        if country_code and not airport.country_code:
-            airport.country_code = country_code
-        if latitude is not None and airport.latitude is None:
-            airport.latitude = latitude
-        if longitude is not None and airport.longitude is None:
-            airport.longitude = longitude
-        if timezone and not airport.timezone:
-            airport.timezone = timezone
-    else:
-        airport = Airport(
-            iata_code=iata,
-            name=name,
-            city=city,
-            country_code=country_code,
-            latitude=latitude,
-            longitude=longitude,
-            timezone=timezone,
-        )
-        db.add(airport)
-        db.flush()
-
-    # Fill gaps from offline dataset when key fields are missing
-    if not airport.country_code or not airport.name:
-        ref = _get_airports_db().get(iata)
-        if ref:
-            if not airport.name:
-                airport.name = str(ref.get("name", ""))
-            if not airport.city:
-                airport.city = str(ref.get("city", ""))
-            if not airport.country_code:
-                airport.country_code = str(ref.get("country", ""))
-            if airport.latitude is None:
-                airport.latitude = float(ref["lat"])
-            if airport.longitude is None:
-                airport.longitude = float(ref["lon"])
-            if not airport.timezone:
-                airport.timezone = str(ref.get("tz", ""))
-
-    return airport
-
-
 def _airport_to_data(airport: Airport) -> AirportData:
     return AirportData(
         id=airport.id,
@@ -194,7 +127,7 @@ def lookup_flight(
 
     fn = flight_number.upper().strip()
     try:
-        resp = httpx.get(
+        resp = http_client.get(
             f"https://aerodatabox.p.rapidapi.com/flights/number/{fn}/{date}",
             headers={
                 "X-RapidAPI-Key": settings.aerodatabox_api_key,
@@ -210,6 +143,7 @@ def lookup_flight(
 
         data = resp.json()
         legs: list[FlightLookupLeg] = []
+        details: dict[str, AirportDetails] = {}
 
         # API returns a list of flight legs
         items = data if isinstance(data, list) else [data]
@@ -225,29 +159,20 @@ def lookup_flight(
             if not dep_iata or not arr_iata:
                 continue
 
-            # Upsert airports from API data (including coordinates and timezone)
-            dep_loc = dep_airport.get("location", {})
-            arr_loc = arr_airport.get("location", {})
-            _upsert_airport(
-                db,
-                dep_iata,
-                name=dep_airport.get("name"),
-                city=dep_airport.get("municipalityName"),
-                country_code=dep_airport.get("countryCode"),
-                latitude=dep_loc.get("lat"),
-                longitude=dep_loc.get("lon"),
-                timezone=dep_airport.get("timeZone"),
-            )
-            _upsert_airport(
-                db,
-                arr_iata,
-                name=arr_airport.get("name"),
-                city=arr_airport.get("municipalityName"),
-                country_code=arr_airport.get("countryCode"),
-                latitude=arr_loc.get("lat"),
-                longitude=arr_loc.get("lon"),
-                timezone=arr_airport.get("timeZone"),
-            )
+            # Airports from API data (including coordinates and timezone)
+            for code, airport in ((dep_iata, dep_airport), (arr_iata, arr_airport)):
+                location = airport.get("location", {})
+                details.setdefault(
+                    code.upper().strip(),
+                    AirportDetails(
+                        name=airport.get("name"),
+                        city=airport.get("municipalityName"),
+                        country_code=airport.get("countryCode"),
+                        latitude=location.get("lat"),
+                        longitude=location.get("lon"),
+                        timezone=airport.get("timeZone"),
+                    ),
+                )
 
             dep_local = dep.get("scheduledTime", {}).get("local")
             arr_local = arr.get("scheduledTime", {}).get("local")
@@ -272,6 +197,7 @@ def lookup_flight(
                 )
             )
 
+        resolve_airports(db, details, details)
         db.commit()
         return FlightLookupResponse(legs=legs)
     except httpx.HTTPError as e:
@@ -301,24 +227,33 @@ async def extract_flights_from_ticket(
             error=f"Unsupported file type: {content_type}. Use PDF or image."
         )
 
-    content = await file.read()
-    if len(content) > MAX_EXTRACT_SIZE:
-        return FlightExtractResponse(error="File too large (max 10 MB)")
+    try:
+        upload = await read_upload(
+            file, max_size=MAX_EXTRACT_SIZE, allowed_types=EXTRACT_MIME_TYPES
+        )
+    except HTTPException as e:
+        return FlightExtractResponse(error=e.detail)
 
-    result = extract_flight_data(content, content_type)
+    result = await run_in_threadpool(extract_flight_data, upload.read(), content_type)
     if result.error:
         return FlightExtractResponse(error=result.error)
     if not result.flights:
         return FlightExtractResponse(flights=[])
 
     # Check for duplicates against existing flights in this trip
-    existing = db.query(Flight).filter(Flight.trip_id == trip_id).all()
-    existing_keys = set()
-    for f in existing:
-        dep = db.query(Airport).filter(Airport.id == f.departure_airport_id).first()
-        arr = db.query(Airport).filter(Airport.id == f.arrival_airport_id).first()
-        if dep and arr:
-            existing_keys.add((f.flight_date.isoformat(), dep.iata_code, arr.iata_code))
+    existing = (
+        db.query(Flight.flight_date, Flight.departure_airport_id, Flight.arrival_airport_id)
+        .filter(Flight.trip_id == trip_id)
+        .all()
+    )
+    codes = iata_codes(
+        db, {f.departure_airport_id for f in existing} | {f.arrival_airport_id for f in existing}
+    )
+    existing_keys = {
+        (flight_date.isoformat(), codes[dep_id], codes[arr_id])
+        for flight_date, dep_id, arr_id in existing
+        if dep_id in codes and arr_id in codes
+    }
 
     extracted: list[ExtractedFlightResponse] = []
     for flight in result.flights:
@@ -420,16 +355,15 @@ def create_flight(
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
 
-    dep_airport = _upsert_airport(db, request.departure_iata)
-    arr_airport = _upsert_airport(db, request.arrival_iata)
+    ids = airport_ids(db, [request.departure_iata, request.arrival_iata])
 
     flight = Flight(
         trip_id=trip_id,
         flight_date=date.fromisoformat(request.flight_date),
         flight_number=request.flight_number.upper().strip(),
         airline_name=request.airline_name,
-        departure_airport_id=dep_airport.id,
-        arrival_airport_id=arr_airport.id,
+        departure_airport_id=ids[request.departure_iata.upper().strip()],
+        arrival_airport_id=ids[request.arrival_iata.upper().strip()],
         departure_time=request.departure_time,
         arrival_time=request.arrival_time,
         arrival_date=date.fromisoformat(request.arrival_date) if request.arrival_date else None,
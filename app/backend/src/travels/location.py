@@ -4,12 +4,12 @@ from datetime import UTC, date, datetime
 from math import atan2, cos, radians, sin, sqrt
 from typing import Annotated
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
+from .. import http_client
 from ..auth.session import get_admin_user, get_current_user
 from ..database import get_db
 from ..models import (
@@ -21,8 +21,9 @@ from ..models import (
     UNCountry,
     User,
     UserLastLocation,
-    Visit,
 )
+from .snapshot import invalidate_travel_snapshot
+from .visits import record_visits
 
 log = logging.getLogger(__name__)
 
@@ -106,7 +107,7 @@ def _reverse_geocode(lat: float, lng: float) -> dict | None:
 
     try:
         _nominatim_last_request = time.time()
-        response = httpx.get(
+        response = http_client.get(
             "https://nominatim.openstreetmap.org/reverse",
             params={
                 "lat": lat,
@@ -392,34 +393,13 @@ def check_in_location(
                     )
                     .all()
                 )
-                # Batch-load visits for all matching destinations
-                dest_ids = [td.tcc_destination_id for td in matching_destinations]
-                existing_visits = (
-                    {
-                        v.tcc_destination_id: v
-                        for v in db.query(Visit)
-                        .filter(Visit.tcc_destination_id.in_(dest_ids))
-                        .all()
-                    }
-                    if dest_ids
-                    else {}
+                record_visits(
+                    db, {td.tcc_destination_id for td in matching_destinations}, visit_date
                 )
-                for td in matching_destinations:
-                    visit = existing_visits.get(td.tcc_destination_id)
-                    if visit:
-                        # Update if no date set or if trip start is earlier
-                        if visit.first_visit_date is None or visit.first_visit_date > visit_date:
-                            visit.first_visit_date = visit_date
-                    else:
-                        # Create new visit record with trip's start date
-                        db.add(
-                            Visit(
-                                tcc_destination_id=td.tcc_destination_id,
-                                first_visit_date=visit_date,
-                            )
-                        )
 
     db.commit()
+    if request.add_to_trip:
+        invalidate_travel_snapshot()
 
     return CheckInResponse(
         success=True,
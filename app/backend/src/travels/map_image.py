@@ -1,20 +1,29 @@
-"""Generate a static PNG world map showing visited countries for OG preview."""
+"""Render static world map images (visited countries, flights, drone flights).
+
+Used for OG/Twitter previews and thumbnails. Every variant (size preset,
+format, layers) is rendered once and cached.
+"""
 
 import colorsys
+import hashlib
 import io
 import json
+import threading
 from datetime import date
 from pathlib import Path
 
-from cachetools import TTLCache
-from fastapi import APIRouter, Depends
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import Response
-from PIL import Image, ImageDraw
-from sqlalchemy import func
+from PIL import Image, ImageDraw, features
 from sqlalchemy.orm import Session
 
+from ..data_version import get_data_version
 from ..database import get_db
-from ..models import TCCDestination, Trip, TripDestination, UNCountry, Visit
+from ..models import DroneFlight
+from ..shared_cache import TieredCache
+from .data import get_map_flights
+from .snapshot import get_travel_snapshot
 
 router = APIRouter()
 
@@ -32,32 +41,26 @@ def _load_topo() -> dict:
     return _topo
 
 
-def _decode_arcs(topo: dict) -> list[list[tuple[float, float]]]:
-    """Decode delta-encoded TopoJSON arcs into (lon, lat) coordinate lists."""
+def _decode_arcs(topo: dict) -> list[np.ndarray]:
+    """Decode delta-encoded TopoJSON arcs into (N, 2) lon/lat arrays."""
     raw_arcs = topo["arcs"]
-    scale = topo["transform"]["scale"]
-    translate = topo["transform"]["translate"]
-    decoded: list[list[tuple[float, float]]] = []
-
-    for arc in raw_arcs:
-        coords: list[tuple[float, float]] = []
-        x = 0
-        y = 0
-        for dx, dy in arc:
-            x += dx
-            y += dy
-            lon = x * scale[0] + translate[0]
-            lat = y * scale[1] + translate[1]
-            coords.append((lon, lat))
-        decoded.append(coords)
-    return decoded
-
-
-def _resolve_geometry(
-    geom: dict, arcs: list[list[tuple[float, float]]]
-) -> list[list[tuple[float, float]]]:
+    scale = np.asarray(topo["transform"]["scale"], dtype=np.float64)
+    translate = np.asarray(topo["transform"]["translate"], dtype=np.float64)
+
+    # One cumulative sum over all arcs, then rebase each arc to its own start
+    lengths = np.fromiter((len(arc) for arc in raw_arcs), dtype=np.intp, count=len(raw_arcs))
+    deltas = np.asarray([point for arc in raw_arcs for point in arc], dtype=np.int64)
+    totals = np.cumsum(deltas, axis=0)
+    ends = np.cumsum(lengths)
+    offsets = np.zeros((len(raw_arcs), 2), dtype=np.int64)
+    offsets[1:] = totals[ends[:-1] - 1]
+    coords = (totals - np.repeat(offsets, lengths, axis=0)) * scale + translate
+    return np.split(coords, ends[:-1])
+
+
+def _resolve_geometry(geom: dict, arcs: list[np.ndarray]) -> list[np.ndarray]:
     """Resolve a TopoJSON geometry into a list of polygon rings (lon, lat)."""
-    polygons: list[list[tuple[float, float]]] = []
+    polygons: list[np.ndarray] = []
     geom_type = geom["type"]
 
     if geom_type == "Polygon":
@@ -70,22 +73,14 @@ def _resolve_geometry(
     return polygons
 
 
-def _resolve_ring(
-    arc_refs: list[int], arcs: list[list[tuple[float, float]]]
-) -> list[tuple[float, float]]:
+def _resolve_ring(arc_refs: list[int], arcs: list[np.ndarray]) -> np.ndarray:
     """Resolve arc references into a single coordinate ring."""
-    coords: list[tuple[float, float]] = []
+    parts: list[np.ndarray] = []
     for ref in arc_refs:
-        if ref >= 0:
-            arc_coords = arcs[ref]
-        else:
-            arc_coords = list(reversed(arcs[~ref]))
+        arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
         # Avoid duplicate join points
-        if coords and arc_coords:
-            coords.extend(arc_coords[1:])
-        else:
-            coords.extend(arc_coords)
-    return coords
+        parts.append(arc[1:] if parts else arc)
+    return np.concatenate(parts) if parts else np.empty((0, 2))
 
 
 # --- Color calculation (port of frontend getVisitColor) ---
@@ -131,11 +126,20 @@ def _visit_color(visit_date: date, newest_date: date, visit_count: int) -> tuple
 _UNVISITED_COLOR = (230, 233, 236)
 _BG_COLOR = (240, 242, 244)
 _OUTLINE_COLOR = (200, 200, 200)
+_ROUTE_COLOR = (214, 96, 44)
+_DRONE_COLOR = (128, 64, 160)
 
 # --- Projection ---
 
-_IMG_W = 1200
-_IMG_H = 630
+# Size presets (width, height); "og" is the reference size for pads and strokes
+MAP_SIZES: dict[str, tuple[int, int]] = {
+    "og": (1200, 630),
+    "twitter": (1200, 600),
+    "thumbnail": (600, 315),
+    "retina": (2400, 1260),
+}
+
+_IMG_W, _IMG_H = MAP_SIZES["og"]
 _PAD = 8
 
 # Visible lat/lon window — cropped to exclude Antarctica and reduce dead space.
@@ -148,162 +152,259 @@ _LAT_MAX = 85.0
 _LON_RANGE = _LON_MAX - _LON_MIN  # 360°
 _LAT_RANGE = _LAT_MAX - _LAT_MIN  # 143°
 
-_MAP_W = _IMG_W - 2 * _PAD
-_MAP_H = _IMG_H - 2 * _PAD
 
+def _scale(size: tuple[int, int]) -> float:
+    """Stroke/pad multiplier relative to the 1200px reference width."""
+    return size[0] / _IMG_W
 
-def _project(lon: float, lat: float) -> tuple[float, float]:
-    """Equirectangular projection to pixel coords with custom viewport."""
-    x = (lon - _LON_MIN) / _LON_RANGE * _MAP_W + _PAD
-    y = (_LAT_MAX - lat) / _LAT_RANGE * _MAP_H + _PAD
-    return x, y
 
+def _stroke(size: tuple[int, int]) -> int:
+    """Outline and route width in pixels."""
+    return max(1, round(_scale(size)))
 
-# --- Map data query (reuses logic from data.py's get_map_data) ---
 
+def _project(points: np.ndarray, size: tuple[int, int] = (_IMG_W, _IMG_H)) -> np.ndarray:
+    """Equirectangular projection of (N, 2) lon/lat to pixel coords with custom viewport."""
+    pad = _PAD * _scale(size)
+    x = (points[:, 0] - _LON_MIN) / _LON_RANGE * (size[0] - 2 * pad) + pad
+    y = (_LAT_MAX - points[:, 1]) / _LAT_RANGE * (size[1] - 2 * pad) + pad
+    return np.column_stack((x, y))
 
-def _query_map_colors(
-    db: Session,
-) -> dict[str, tuple[date, int]]:
-    """Return {region_code: (first_visit_date, trip_count)} for visited regions."""
-    today = date.today()
-    regions: dict[str, tuple[date, int]] = {}
-
-    # Trip counts per UN country
-    un_trip_counts_q = (
-        db.query(
-            TCCDestination.un_country_id,
-            func.count(func.distinct(TripDestination.trip_id)),
-        )
-        .join(TripDestination, TripDestination.tcc_destination_id == TCCDestination.id)
-        .join(Trip, Trip.id == TripDestination.trip_id)
-        .filter(TCCDestination.un_country_id.isnot(None))
-        .filter(Trip.start_date <= today)
-        .group_by(TCCDestination.un_country_id)
-        .all()
-    )
-    un_trip_counts = {un_id: count for un_id, count in un_trip_counts_q}
-
-    # Trip counts per TCC destination
-    tcc_trip_counts_q = (
-        db.query(
-            TripDestination.tcc_destination_id,
-            func.count(func.distinct(TripDestination.trip_id)),
-        )
-        .join(Trip, Trip.id == TripDestination.trip_id)
-        .filter(Trip.start_date <= today)
-        .group_by(TripDestination.tcc_destination_id)
-        .all()
-    )
-    tcc_trip_counts = {tcc_id: count for tcc_id, count in tcc_trip_counts_q}
-
-    # Visited UN countries
-    visited_un = (
-        db.query(UNCountry, func.min(Visit.first_visit_date).label("first_visit"))
-        .join(TCCDestination, TCCDestination.un_country_id == UNCountry.id)
-        .join(Visit, Visit.tcc_destination_id == TCCDestination.id)
-        .filter(Visit.first_visit_date <= today)
-        .group_by(UNCountry.id)
-        .all()
-    )
-    for country, first_visit in visited_un:
-        trip_count = un_trip_counts.get(country.id, 0)
-        for code in country.map_region_codes.split(","):
-            code = code.strip()
-            if code and first_visit:
-                if code not in regions or first_visit < regions[code][0]:
-                    regions[code] = (first_visit, trip_count)
-
-    # Non-UN territories with own polygons (Kosovo, Somaliland, etc.)
-    visited_tcc = (
-        db.query(TCCDestination, Visit.first_visit_date)
-        .join(Visit, Visit.tcc_destination_id == TCCDestination.id)
-        .filter(
-            TCCDestination.map_region_code.isnot(None),
-            TCCDestination.un_country_id.is_(None),
-            Visit.first_visit_date <= today,
-        )
-        .all()
-    )
-    for dest, first_visit in visited_tcc:
-        if dest.map_region_code and first_visit:
-            code = dest.map_region_code
-            if code not in regions or first_visit < regions[code][0]:
-                regions[code] = (first_visit, tcc_trip_counts.get(dest.id, 0))
 
-    return regions
-
-
-def _normalize_ring(
-    ring: list[tuple[float, float]],
-) -> list[tuple[float, float]]:
+def _normalize_ring(ring: np.ndarray) -> np.ndarray:
     """Shift longitudes in antimeridian-crossing rings to avoid coordinate jumps.
 
     For rings that cross ±180° (e.g. Russia), shifts negative longitudes to
     positive (lon + 360) so the polygon draws continuously. Points that end up
     beyond the map edge are simply off-screen rather than causing artifacts.
     """
-    crosses = False
-    for i in range(len(ring) - 1):
-        if abs(ring[i + 1][0] - ring[i][0]) > 180.0:
-            crosses = True
-            break
-    if not crosses:
+    if not (np.abs(np.diff(ring[:, 0])) > 180.0).any():
         return ring
-    return [(lon + 360.0 if lon < 0 else lon, lat) for lon, lat in ring]
+    shifted = ring.copy()
+    shifted[:, 0] = np.where(ring[:, 0] < 0, ring[:, 0] + 360.0, ring[:, 0])
+    return shifted
+
+
+# --- Precomputed geometry ---
+
+# Lon/lat rings per geo id, in TopoJSON draw order. The TopoJSON is static,
+# so it is decoded once per process; pixel rings and the unvisited base layer
+# are then derived once per size preset.
+_lonlat_rings: dict[str, list[np.ndarray]] | None = None
+_rings: dict[tuple[int, int], dict[str, list[np.ndarray]]] = {}
+_base_images: dict[tuple[int, int], Image.Image] = {}
+_geometry_lock = threading.Lock()
+
+
+def _country_lonlat_rings() -> dict[str, list[np.ndarray]]:
+    global _lonlat_rings
+    if _lonlat_rings is None:
+        with _geometry_lock:
+            if _lonlat_rings is None:
+                topo = _load_topo()
+                arcs = _decode_arcs(topo)
+                rings: dict[str, list[np.ndarray]] = {}
+                for geom in topo["objects"]["countries"]["geometries"]:
+                    geo_id = str(geom.get("id", ""))
+                    # Skip Antarctica (010) — wraps 360° and causes fill artifacts
+                    if geo_id == "010":
+                        continue
+                    rings.setdefault(geo_id, []).extend(
+                        _normalize_ring(ring)
+                        for ring in _resolve_geometry(geom, arcs)
+                        if len(ring) >= 3
+                    )
+                _lonlat_rings = rings
+    return _lonlat_rings
+
+
+def _country_rings(size: tuple[int, int] = (_IMG_W, _IMG_H)) -> dict[str, list[np.ndarray]]:
+    """Projected pixel rings per geo id for one image size."""
+    rings = _rings.get(size)
+    if rings is None:
+        lonlat = _country_lonlat_rings()
+        with _geometry_lock:
+            rings = _rings.get(size)
+            if rings is None:
+                rings = {
+                    geo_id: [_project(ring, size).astype(np.float32) for ring in country]
+                    for geo_id, country in lonlat.items()
+                }
+                _rings[size] = rings
+    return rings
+
+
+def _draw_country(
+    draw: ImageDraw.ImageDraw,
+    rings: list[np.ndarray],
+    fill: tuple[int, int, int],
+    width: int = 1,
+) -> None:
+    for ring in rings:
+        draw.polygon(ring.ravel().tolist(), fill=fill, outline=_OUTLINE_COLOR, width=width)
+
+
+def _base_map(size: tuple[int, int] = (_IMG_W, _IMG_H)) -> Image.Image:
+    """The map with every country unvisited; rendered once per size, copied per render."""
+    image = _base_images.get(size)
+    if image is None:
+        rings = _country_rings(size)
+        with _geometry_lock:
+            image = _base_images.get(size)
+            if image is None:
+                image = Image.new("RGB", size, _BG_COLOR)
+                draw = ImageDraw.Draw(image)
+                width = _stroke(size)
+                for country_rings in rings.values():
+                    _draw_country(draw, country_rings, _UNVISITED_COLOR, width)
+                _base_images[size] = image
+    return image
+
+
+# --- Layers ---
+
+LAYER_REGIONS = "regions"
+LAYER_FLIGHTS = "flights"
+LAYER_DRONES = "drones"
+MAP_LAYERS = frozenset({LAYER_REGIONS, LAYER_FLIGHTS, LAYER_DRONES})
+
+# Output formats: media type and Pillow save options. WebP lossless is
+# about half the size of the PNG for these flat-colored maps.
+_FORMATS: dict[str, tuple[str, str, dict[str, int | bool]]] = {
+    "png": ("PNG", "image/png", {"compress_level": 6}),
+    "webp": ("WEBP", "image/webp", {"lossless": True, "method": 6}),
+    "avif": ("AVIF", "image/avif", {"quality": 70}),
+}
+
+
+def supported_formats() -> list[str]:
+    """Output formats this Pillow build can encode."""
+    return [fmt for fmt in _FORMATS if fmt == "png" or features.check(fmt)]
+
+
+def _flight_routes(db: Session) -> list[np.ndarray]:
+    """Past flight routes as (2, 2) lon/lat segments."""
+    data = get_map_flights(db)
+    airports = {a.iata_code: (a.lng, a.lat) for a in data.airports}
+    routes: list[np.ndarray] = []
+    for route in data.routes:
+        if route.from_iata not in airports or route.to_iata not in airports:
+            continue
+        segment = np.array([airports[route.from_iata], airports[route.to_iata]])
+        # Draw trans-Pacific legs the short way, like the country rings
+        routes.append(_normalize_ring(segment))
+    return routes
+
+
+def _drone_points(db: Session) -> np.ndarray:
+    """Takeoff locations of public drone flights as (N, 2) lon/lat."""
+    rows = (
+        db.query(DroneFlight.longitude, DroneFlight.latitude)
+        .filter(
+            DroneFlight.is_hidden == False,  # noqa: E712
+            DroneFlight.is_deleted == False,  # noqa: E712
+            DroneFlight.is_test == False,  # noqa: E712
+            DroneFlight.latitude.isnot(None),
+            DroneFlight.longitude.isnot(None),
+        )
+        .all()
+    )
+    points = np.array(rows, dtype=np.float64).reshape(-1, 2)
+    # Far-east points live past the antimeridian on this viewport
+    points[:, 0] = np.where(points[:, 0] < _LON_MIN, points[:, 0] + 360.0, points[:, 0])
+    return points
 
 
 # --- Rendering ---
 
-_cache: TTLCache[str, bytes] = TTLCache(maxsize=1, ttl=3600)
+# One entry per variant; the key carries a digest of the inputs, so instances
+# share renders and a variant is only redrawn when its data actually changes
+_cache = TieredCache("og_map", bytes, ttl=7 * 86400, maxsize=32)
 
 
-def _render_map(db: Session) -> bytes:
-    topo = _load_topo()
-    arcs = _decode_arcs(topo)
-    geometries = topo["objects"]["countries"]["geometries"]
+def _colors_digest(region_colors: dict[str, tuple[date, int]]) -> str:
+    """Stable hash of the inputs to _render_map (plus today, for the lightness scale)."""
+    payload = json.dumps(
+        {
+            "today": date.today().isoformat(),
+            "colors": {k: [d.isoformat(), n] for k, (d, n) in sorted(region_colors.items())},
+        },
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
 
-    region_colors = _query_map_colors(db)
+def _render_map(
+    region_colors: dict[str, tuple[date, int]],
+    *,
+    size: str = "og",
+    fmt: str = "png",
+    routes: list[np.ndarray] | None = None,
+    drone_points: np.ndarray | None = None,
+) -> bytes:
+    dimensions = MAP_SIZES[size]
+    scale = _scale(dimensions)
 
     # Find newest date for lightness calculation
     newest = date.today()
     if region_colors:
         newest = max(d for d, _ in region_colors.values())
 
-    img = Image.new("RGB", (_IMG_W, _IMG_H), _BG_COLOR)
+    rings = _country_rings(dimensions)
+    img = _base_map(dimensions).copy()
     draw = ImageDraw.Draw(img)
-
-    for geom in geometries:
-        geo_id = str(geom.get("id", ""))
-        # Skip Antarctica (010) — wraps 360° and causes fill artifacts
-        if geo_id == "010":
-            continue
-        polygons = _resolve_geometry(geom, arcs)
-
-        if geo_id in region_colors:
-            visit_date, trip_count = region_colors[geo_id]
-            fill = _visit_color(visit_date, newest, trip_count)
-        else:
-            fill = _UNVISITED_COLOR
-
-        for ring in polygons:
-            ring = _normalize_ring(ring)
-            projected = [_project(lon, lat) for lon, lat in ring]
-            if len(projected) >= 3:
-                draw.polygon(projected, fill=fill, outline=_OUTLINE_COLOR)
-
+    width = _stroke(dimensions)
+    # Only visited countries are repainted over the base layer
+    for geo_id, (visit_date, trip_count) in region_colors.items():
+        if geo_id in rings:
+            color = _visit_color(visit_date, newest, trip_count)
+            _draw_country(draw, rings[geo_id], color, width)
+
+    for segment in routes or []:
+        draw.line(_project(segment, dimensions).ravel().tolist(), fill=_ROUTE_COLOR, width=width)
+
+    if drone_points is not None and len(drone_points):
+        radius = max(1.5, 2.5 * scale)
+        for x, y in _project(drone_points, dimensions).tolist():
+            draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=_DRONE_COLOR)
+
+    pil_format, _, options = _FORMATS[fmt]
     buf = io.BytesIO()
-    img.save(buf, format="PNG", optimize=True)
+    img.save(buf, format=pil_format, **options)
     return buf.getvalue()
 
 
-@router.get("/og/map.png")
-def get_og_map_image(db: Session = Depends(get_db)) -> Response:
-    """Serve a static PNG world map with visited countries colored."""
-    cached = _cache.get("map")
-    if cached:
-        return Response(content=cached, media_type="image/png")
-
-    png_bytes = _render_map(db)
-    _cache["map"] = png_bytes
-    return Response(content=png_bytes, media_type="image/png")
+@router.get("/og/map.{fmt}")
+def get_og_map_image(
+    fmt: str,
+    size: str = Query("og", description="Size preset: og, twitter, thumbnail or retina"),
+    layers: str = Query(LAYER_REGIONS, description="Comma-separated: regions, flights, drones"),
+    db: Session = Depends(get_db),
+) -> Response:
+    """Serve a static world map image (visited countries by default)."""
+    if fmt not in supported_formats():
+        raise HTTPException(status_code=404, detail="Unsupported image format")
+    if size not in MAP_SIZES:
+        raise HTTPException(status_code=400, detail=f"Unknown size: {size}")
+    selected = {layer.strip() for layer in layers.split(",") if layer.strip()}
+    if not selected or not selected <= MAP_LAYERS:
+        raise HTTPException(status_code=400, detail=f"Unknown layers: {layers}")
+
+    region_colors = get_travel_snapshot(db).region_colors if LAYER_REGIONS in selected else {}
+    key = [size, fmt, ",".join(sorted(selected)), _colors_digest(region_colors)]
+    if selected & {LAYER_FLIGHTS, LAYER_DRONES}:
+        key.append(get_data_version(db).isoformat())
+
+    # No stale window on this cache, so the fetch always runs in this request
+    # and may use its session
+    image = _cache.get_or_fetch(
+        tuple(key),
+        lambda: _render_map(
+            region_colors,
+            size=size,
+            fmt=fmt,
+            routes=_flight_routes(db) if LAYER_FLIGHTS in selected else None,
+            drone_points=_drone_points(db) if LAYER_DRONES in selected else None,
+        ),
+    )
+    return Response(content=image, media_type=_FORMATS[fmt][1])
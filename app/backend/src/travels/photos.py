@@ -1,16 +1,17 @@
 """Public photos endpoints for displaying trip photos."""
 
-from pathlib import Path
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import FileResponse, RedirectResponse
 from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
 from ..auth.session import get_admin_user
+from ..data_version import public_data_cache
 from ..database import get_db
+from ..media_derivatives import media_file_response
 from ..models import (
     InstagramMedia,
     InstagramPost,
@@ -256,7 +257,7 @@ def _batch_get_thumbnail_media_ids(db: Session, trip_ids: list[int]) -> dict[int
     return result
 
 
-@router.get("", response_model=PhotosIndexResponse)
+@router.get("", response_model=PhotosIndexResponse, dependencies=[Depends(public_data_cache)])
 def get_photos_index(
     db: Session = Depends(get_db),
     show_hidden: bool = False,
@@ -342,7 +343,7 @@ def get_photos_index(
     )
 
 
-@router.get("/map", response_model=PhotoMapResponse)
+@router.get("/map", response_model=PhotoMapResponse, dependencies=[Depends(public_data_cache)])
 def get_photo_map(
     aerial: bool = False,
     db: Session = Depends(get_db),
@@ -744,6 +745,8 @@ def toggle_trip_hidden(
 @router.get("/media/{media_id}", response_model=None)
 def get_public_media_file(
     media_id: int,
+    size: int | None = Query(None, ge=1, description="Display width in px (serves a resized copy)"),
+    accept: str | None = Header(None),
     db: Session = Depends(get_db),
 ) -> FileResponse | RedirectResponse:
     """Serve a media file (public, only for labeled non-skipped photos)."""
@@ -762,20 +765,4 @@ def get_public_media_file(
     if not media or not media.storage_path:
         raise HTTPException(status_code=404, detail="Media not found")
 
-    # If storage_path is a URL (GCS), redirect to it
-    if media.storage_path.startswith("http"):
-        return RedirectResponse(url=media.storage_path, status_code=302)
-
-    # Fallback to local file serving (dev mode)
-    path = Path(media.storage_path)
-
-    # If path doesn't exist, try Docker mount path
-    if not path.exists():
-        filename = path.name
-        docker_path = Path("/app/data/instagram") / filename
-        if docker_path.exists():
-            path = docker_path
-        else:
-            raise HTTPException(status_code=404, detail="File not found")
-
-    return FileResponse(path, media_type="image/jpeg")
+    return media_file_response(media, size, accept)
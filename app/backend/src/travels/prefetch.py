@@ -0,0 +1,77 @@
+"""Warm the trip info caches for upcoming and ongoing trips.
+
+The country-info tab fans out to currency, climate, holiday and sunrise
+APIs. Running the same lookups ahead of time (on startup, then every few
+hours) means the first view of an upcoming trip is answered from the
+shared cache instead of waiting on the upstreams. Advisories are computed
+from static tables and need no warming. The same pass pre-renders the OG
+pages for photo albums, which crawlers fetch in bursts.
+"""
+
+import asyncio
+import logging
+from datetime import date, timedelta
+
+from sqlalchemy.orm import Session, joinedload
+
+from ..database import SessionLocal
+from ..models import TCCDestination, Trip, TripDestination, UNCountry
+from ..og import precompute_og_pages
+from .trips_country_info import _start_enrichment
+
+log = logging.getLogger(__name__)
+
+# Trips that started this long ago may still be ongoing
+PREFETCH_LOOKBACK_DAYS = 30
+# Per-trip wait; lookups still running after it finish in the background
+PREFETCH_TRIP_TIMEOUT = 30.0
+
+
+def prefetch_trip_info(db: Session, *, lookback_days: int = PREFETCH_LOOKBACK_DAYS) -> int:
+    """Pre-populate the country-info caches for upcoming/ongoing trips.
+
+    Trips are warmed one at a time so the shared lookup pool stays free for
+    live requests. Returns the number of trips processed.
+    """
+    cutoff = date.today() - timedelta(days=lookback_days)
+    trips = (
+        db.query(Trip)
+        .options(
+            joinedload(Trip.destinations)
+            .joinedload(TripDestination.tcc_destination)
+            .joinedload(TCCDestination.un_country),
+        )
+        .filter(Trip.start_date >= cutoff)
+        .order_by(Trip.start_date)
+        .all()
+    )
+    for trip in trips:
+        countries: dict[int, UNCountry] = {}
+        for td in trip.destinations:
+            un = td.tcc_destination.un_country
+            if un:
+                countries[un.id] = un
+        if not countries:
+            continue
+        enrichment = _start_enrichment(
+            list(countries.values()), trip.start_date, trip.end_date or trip.start_date
+        )
+        enrichment.wait(PREFETCH_TRIP_TIMEOUT)
+    return len(trips)
+
+
+def _prefetch_once() -> None:
+    with SessionLocal() as db:
+        count = prefetch_trip_info(db)
+        pages = precompute_og_pages(db)
+    log.info("Prefetched trip info for %d upcoming trips, %d OG pages", count, pages)
+
+
+async def run_prefetch_loop(interval: float) -> None:
+    """Prefetch now and then every ``interval`` seconds until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(_prefetch_once)
+        except Exception:
+            log.exception("Trip info prefetch failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,233 @@
+"""Precomputed travel statistics shared by the public travel endpoints.
+
+/map-data, /un-countries, /tcc-destinations, og/map.png and the /travels OG
+tags all derive from the same aggregates over visits, trip_destinations and
+trips. They are built once into a snapshot and served from memory until a
+trip/visit mutation invalidates it. The snapshot is keyed by date because
+"visited" vs "planned" is relative to today.
+"""
+
+import threading
+from datetime import date
+
+from cachetools import TTLCache
+from pydantic import BaseModel
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from ..models import (
+    Microstate,
+    NMRegion,
+    TCCDestination,
+    Trip,
+    TripDestination,
+    UNCountry,
+    Visit,
+)
+from .models import MicrostateData, TCCDestinationData, TravelStats, UNCountryData
+
+
+class TravelSnapshot(BaseModel):
+    """Everything the public travel map and counters need, computed in one pass."""
+
+    version: int
+    day: date
+    stats: TravelStats
+    visited_map_regions: dict[str, date]  # region_code -> earliest visit date
+    visit_counts: dict[str, int]  # region_code -> number of started trips
+    region_names: dict[str, str]  # region_code -> display name
+    region_colors: dict[str, tuple[date, int]]  # region_code -> (first visit, trip count)
+    visited_countries: list[str]
+    microstates: list[MicrostateData]
+    un_countries: list[UNCountryData]
+    tcc_destinations: list[TCCDestinationData]
+
+
+# Safety-net TTL: other Cloud Run instances never see our invalidations
+_snapshot_cache: TTLCache[date, TravelSnapshot] = TTLCache(maxsize=1, ttl=600)
+_snapshot_lock = threading.Lock()
+_snapshot_version = 0
+
+
+def invalidate_travel_snapshot() -> None:
+    """Drop the cached snapshot. Call after committing trip/visit changes."""
+    with _snapshot_lock:
+        _snapshot_cache.clear()
+
+
+def get_travel_snapshot(db: Session) -> TravelSnapshot:
+    """Return today's snapshot, building it on first use."""
+    today = date.today()
+    cached = _snapshot_cache.get(today)
+    if cached is not None:
+        return cached
+
+    with _snapshot_lock:
+        # Another request may have built it while we waited for the lock
+        cached = _snapshot_cache.get(today)
+        if cached is not None:
+            return cached
+        snapshot = _build_snapshot(db, today)
+        _snapshot_cache[today] = snapshot
+        return snapshot
+
+
+def _build_snapshot(db: Session, today: date) -> TravelSnapshot:
+    global _snapshot_version
+    _snapshot_version += 1
+
+    un_countries = db.query(UNCountry).order_by(UNCountry.continent, UNCountry.name).all()
+    tcc_destinations = (
+        db.query(TCCDestination).order_by(TCCDestination.tcc_region, TCCDestination.name).all()
+    )
+    visit_dates: dict[int, date] = {
+        tcc_id: visit_date
+        for tcc_id, visit_date in db.query(Visit.tcc_destination_id, Visit.first_visit_date)
+        if visit_date is not None
+    }
+    # Distinct (destination, trip) pairs for trips that have started
+    started_pairs = (
+        db.query(TripDestination.tcc_destination_id, TripDestination.trip_id)
+        .join(Trip, Trip.id == TripDestination.trip_id)
+        .filter(Trip.start_date <= today)
+        .distinct()
+        .all()
+    )
+    nm_total, nm_visited = db.query(
+        func.count(NMRegion.id),
+        func.sum(case((NMRegion.visited.is_(True), 1), else_=0)),
+    ).one()
+    microstates = db.query(Microstate).all()
+
+    un_by_id = {c.id: c for c in un_countries}
+
+    # Trip counts: once a trip starts, it counts
+    tcc_trip_ids: dict[int, set[int]] = {}
+    un_trip_ids: dict[int, set[int]] = {}
+    tcc_un_id = {d.id: d.un_country_id for d in tcc_destinations}
+    for tcc_id, trip_id in started_pairs:
+        tcc_trip_ids.setdefault(tcc_id, set()).add(trip_id)
+        un_id = tcc_un_id.get(tcc_id)
+        if un_id is not None:
+            un_trip_ids.setdefault(un_id, set()).add(trip_id)
+    tcc_trip_counts = {tcc_id: len(ids) for tcc_id, ids in tcc_trip_ids.items()}
+    un_trip_counts = {un_id: len(ids) for un_id, ids in un_trip_ids.items()}
+
+    # Visited = first_visit_date <= today (check-in sets it to today),
+    # planned = first_visit_date in the future
+    un_first_visit: dict[int, date] = {}
+    un_last_visit: dict[int, date] = {}
+    un_planned_counts: dict[int, int] = {}
+    tcc_visited = 0
+    tcc_planned = 0
+    for dest in tcc_destinations:
+        visit_date = visit_dates.get(dest.id)
+        if visit_date is None:
+            continue
+        un_id = dest.un_country_id
+        if visit_date <= today:
+            tcc_visited += 1
+            if un_id is not None:
+                if un_id not in un_first_visit or visit_date < un_first_visit[un_id]:
+                    un_first_visit[un_id] = visit_date
+                if un_id not in un_last_visit or visit_date > un_last_visit[un_id]:
+                    un_last_visit[un_id] = visit_date
+        else:
+            tcc_planned += 1
+            if un_id is not None:
+                un_planned_counts[un_id] = un_planned_counts.get(un_id, 0) + 1
+
+    visited_map_regions: dict[str, date] = {}
+    visit_counts: dict[str, int] = {}
+    region_colors: dict[str, tuple[date, int]] = {}
+    visited_countries: list[str] = []
+
+    for un_id, first_visit in un_first_visit.items():
+        country = un_by_id[un_id]
+        visited_countries.append(country.name)
+        trip_count = un_trip_counts.get(un_id, 0)
+        for code in country.map_region_codes.split(","):
+            code = code.strip()
+            if not code:
+                continue
+            if code not in visited_map_regions or first_visit < visited_map_regions[code]:
+                visited_map_regions[code] = first_visit
+            # Accumulate trip counts for regions with multiple polygons
+            visit_counts[code] = visit_counts.get(code, 0) + trip_count
+            if code not in region_colors or first_visit < region_colors[code][0]:
+                region_colors[code] = (first_visit, trip_count)
+
+    # Non-UN territories with their own polygon (Kosovo, Somaliland, etc.)
+    region_names: dict[str, str] = {}
+    for country in un_countries:
+        for code in country.map_region_codes.split(","):
+            region_names[code.strip()] = country.name
+    for dest in tcc_destinations:
+        if not dest.map_region_code or dest.un_country_id is not None:
+            continue
+        code = dest.map_region_code
+        region_names[code] = dest.name
+        visit_date = visit_dates.get(dest.id)
+        if visit_date is None or visit_date > today:
+            continue
+        if code not in visited_map_regions or visit_date < visited_map_regions[code]:
+            visited_map_regions[code] = visit_date
+        visit_counts[code] = tcc_trip_counts.get(dest.id, 0)
+        if code not in region_colors or visit_date < region_colors[code][0]:
+            region_colors[code] = (visit_date, tcc_trip_counts.get(dest.id, 0))
+        visited_countries.append(dest.name)
+
+    return TravelSnapshot(
+        version=_snapshot_version,
+        day=today,
+        stats=TravelStats(
+            un_visited=len(un_first_visit),
+            un_total=len(un_countries),
+            un_planned=len(un_planned_counts),
+            tcc_visited=tcc_visited,
+            tcc_total=len(tcc_destinations),
+            tcc_planned=tcc_planned,
+            nm_visited=nm_visited or 0,
+            nm_total=nm_total or 0,
+        ),
+        visited_map_regions=visited_map_regions,
+        visit_counts=visit_counts,
+        region_names=region_names,
+        region_colors=region_colors,
+        visited_countries=sorted(visited_countries),
+        microstates=[
+            MicrostateData(
+                name=m.name,
+                longitude=m.longitude,
+                latitude=m.latitude,
+                map_region_code=m.map_region_code,
+            )
+            for m in microstates
+        ],
+        un_countries=[
+            UNCountryData(
+                name=c.name,
+                continent=c.continent,
+                visit_date=un_last_visit[c.id].isoformat() if c.id in un_last_visit else None,
+                visit_count=un_trip_counts.get(c.id, 0),
+                planned_count=un_planned_counts.get(c.id, 0),
+                driving_type=c.driving_type,
+                drone_flown=c.drone_flown,
+            )
+            for c in un_countries
+        ],
+        tcc_destinations=[
+            TCCDestinationData(
+                name=dest.name,
+                region=dest.tcc_region,
+                visit_date=(
+                    visit_dates[dest.id].isoformat()
+                    if dest.id in visit_dates and visit_dates[dest.id] <= today
+                    else None
+                ),
+                visit_count=tcc_trip_counts.get(dest.id, 0),
+                planned_count=(1 if dest.id in visit_dates and visit_dates[dest.id] > today else 0),
+            )
+            for dest in tcc_destinations
+        ],
+    )
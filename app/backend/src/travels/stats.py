@@ -11,8 +11,10 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
 from ..auth import get_current_user_optional
+from ..data_version import public_data_cache
 from ..database import get_db
-from ..models import Airport, Flight, TCCDestination, Trip, TripDestination, User, Visit
+from ..models import Flight, TCCDestination, Trip, TripDestination, User, Visit
+from .airports import airports_by_id
 from .models import FlightStatsResponse, RankedItem, YearFlightCount
 
 router = APIRouter()
@@ -71,7 +73,7 @@ def get_trip_month(trip: Trip) -> int:
     return trip.start_date.month
 
 
-@router.get("/stats", response_model=TravelStatsResponse)
+@router.get("/stats", response_model=TravelStatsResponse, dependencies=[Depends(public_data_cache)])
 def get_travel_stats(
     db: Session = Depends(get_db),
     user: Annotated[User | None, Depends(get_current_user_optional)] = None,
@@ -370,7 +372,9 @@ def _aircraft_family(aircraft_type: str) -> str:
     return t
 
 
-@router.get("/flight-stats", response_model=FlightStatsResponse)
+@router.get(
+    "/flight-stats", response_model=FlightStatsResponse, dependencies=[Depends(public_data_cache)]
+)
 def get_flight_stats(db: Session = Depends(get_db)) -> FlightStatsResponse:
     """Get detailed flight statistics: top airlines, airports, routes, aircraft types."""
 
@@ -384,10 +388,7 @@ def get_flight_stats(db: Session = Depends(get_db)) -> FlightStatsResponse:
         airport_ids.add(f.departure_airport_id)
         airport_ids.add(f.arrival_airport_id)
 
-    airports_by_id: dict[int, Airport] = {}
-    if airport_ids:
-        for a in db.query(Airport).filter(Airport.id.in_(airport_ids)).all():
-            airports_by_id[a.id] = a
+    airports = airports_by_id(db, airport_ids)
 
     # Single pass aggregation
     airline_counts: dict[str, int] = {}
@@ -442,7 +443,7 @@ def get_flight_stats(db: Session = Depends(get_db)) -> FlightStatsResponse:
     # Format airports (name=IATA, extra=country_code|full_name for flag+tooltip)
     top_airports: list[RankedItem] = []
     for aid, count in top_airports_raw:
-        ap = airports_by_id.get(aid)
+        ap = airports.get(aid)
         if ap:
             extra = f"{ap.country_code or ''}|{ap.name or ''}"
             top_airports.append(RankedItem(name=ap.iata_code, count=count, extra=extra))
@@ -450,8 +451,8 @@ def get_flight_stats(db: Session = Depends(get_db)) -> FlightStatsResponse:
     # Format routes
     top_routes: list[RankedItem] = []
     for (a_id, b_id), count in top_routes_raw:
-        ap_a = airports_by_id.get(a_id)
-        ap_b = airports_by_id.get(b_id)
+        ap_a = airports.get(a_id)
+        ap_b = airports.get(b_id)
         if ap_a and ap_b:
             label = f"{ap_a.iata_code} — {ap_b.iata_code}"
             top_routes.append(RankedItem(name=label, count=count))
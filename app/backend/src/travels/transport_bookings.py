@@ -1,8 +1,10 @@
 import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..auth.session import (
     get_admin_user,
@@ -14,6 +16,7 @@ from ..crypto import decrypt, encrypt, mask_value
 from ..database import get_db
 from ..extraction import extract_transport_booking_data
 from ..models import TransportBooking, Trip, User
+from ..uploads import read_upload
 from .models import (
     ExtractedTransportBookingResponse,
     TransportBookingCreateRequest,
@@ -89,11 +92,14 @@ async def extract_transport_booking(
             error=f"Unsupported file type: {content_type}. Use PDF or image."
         )
 
-    content = await file.read()
-    if len(content) > MAX_EXTRACT_SIZE:
-        return TransportBookingExtractResponse(error="File too large (max 10 MB)")
+    try:
+        upload = await read_upload(
+            file, max_size=MAX_EXTRACT_SIZE, allowed_types=EXTRACT_MIME_TYPES
+        )
+    except HTTPException as e:
+        return TransportBookingExtractResponse(error=e.detail)
 
-    result = extract_transport_booking_data(content, content_type)
+    result = await run_in_threadpool(extract_transport_booking_data, upload.read(), content_type)
     if result.error:
         return TransportBookingExtractResponse(error=result.error)
     if not result.booking:
@@ -292,9 +298,7 @@ async def upload_transport_document(
             detail=f"Unsupported file type: {content_type}. Use PDF, JPEG, PNG, or WebP.",
         )
 
-    content = await file.read()
-    if len(content) > MAX_DOC_SIZE:
-        raise HTTPException(status_code=400, detail="File too large (max 10 MB)")
+    upload = await read_upload(file, max_size=MAX_DOC_SIZE, allowed_types=DOC_MIME_TYPES)
 
     storage = get_vault_storage()
 
@@ -309,11 +313,11 @@ async def upload_transport_document(
                 exc_info=True,
             )
 
-    key = storage.save(admin.id, file.filename or "document", content, content_type)
+    key = storage.save(admin.id, file.filename or "document", upload.file, content_type)
     booking.document_path = key
     booking.document_name = file.filename
     booking.document_mime_type = content_type
-    booking.document_size = len(content)
+    booking.document_size = upload.size
     db.commit()
     db.refresh(booking)
     return _booking_to_data(booking)
@@ -324,9 +328,9 @@ def get_transport_document(
     booking_id: int,
     viewer: Annotated[User, Depends(get_trips_viewer)],
     db: Session = Depends(get_db),
-) -> Response:
-    """Stream transport booking document content through the backend."""
-    from ..vault_storage import get_vault_storage
+) -> RedirectResponse:
+    """Redirect to a short-lived signed URL for the transport booking document."""
+    from ..vault_storage import get_vault_storage, vault_file_redirect
 
     booking = db.query(TransportBooking).filter(TransportBooking.id == booking_id).first()
     if not booking:
@@ -334,12 +338,11 @@ def get_transport_document(
     if not booking.document_path:
         raise HTTPException(status_code=404, detail="No document attached")
 
-    storage = get_vault_storage()
-    content = storage.read(booking.document_path)
-    if content is None:
-        raise HTTPException(status_code=404, detail="Document not found in storage")
-    return Response(
-        content=content, media_type=booking.document_mime_type or "application/octet-stream"
+    return vault_file_redirect(
+        get_vault_storage(),
+        booking.document_path,
+        booking.document_mime_type,
+        booking.document_name,
     )
 
 
@@ -1,7 +1,8 @@
 import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session, joinedload
 
 from ..auth.session import get_admin_user, get_trips_viewer, get_vault_user
@@ -13,6 +14,7 @@ from ..models import (
     TripDocument,
     User,
 )
+from ..uploads import read_upload
 from .models import (
     PassportInfo,
     TripDocumentData,
@@ -153,12 +155,10 @@ async def upload_trip_document(
             detail=f"Unsupported file type: {content_type}. Use PDF, JPEG, PNG, or WebP.",
         )
 
-    content = await file.read()
-    if len(content) > MAX_DOC_SIZE:
-        raise HTTPException(status_code=400, detail="File too large (max 10 MB)")
+    upload = await read_upload(file, max_size=MAX_DOC_SIZE, allowed_types=DOC_MIME_TYPES)
 
     storage = get_vault_storage()
-    key = storage.save(admin.id, file.filename or "document", content, content_type)
+    key = storage.save(admin.id, file.filename or "document", upload.file, content_type)
 
     # Determine next sort_order
     max_order = (
@@ -175,7 +175,7 @@ async def upload_trip_document(
         document_path=key,
         document_name=file.filename,
         document_mime_type=content_type,
-        document_size=len(content),
+        document_size=upload.size,
         notes=notes.strip() if notes else None,
         sort_order=next_order,
     )
@@ -245,9 +245,9 @@ def get_trip_document_file(
     doc_id: int,
     vault_user: Annotated[User, Depends(get_vault_user)],
     db: Session = Depends(get_db),
-) -> Response:
-    """Download a trip document file (vault must be unlocked)."""
-    from ..vault_storage import get_vault_storage
+) -> RedirectResponse:
+    """Download a trip document file via a signed URL (vault must be unlocked)."""
+    from ..vault_storage import get_vault_storage, vault_file_redirect
 
     doc = (
         db.query(TripDocument)
@@ -257,11 +257,6 @@ def get_trip_document_file(
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    storage = get_vault_storage()
-    content = storage.read(doc.document_path)
-    if content is None:
-        raise HTTPException(status_code=404, detail="File not found in storage")
-    return Response(
-        content=content,
-        media_type=doc.document_mime_type or "application/octet-stream",
+    return vault_file_redirect(
+        get_vault_storage(), doc.document_path, doc.document_mime_type, doc.document_name
     )
@@ -2,7 +2,6 @@ import logging
 from datetime import date
 from typing import Annotated
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
@@ -17,7 +16,6 @@ from ..models import (
     TripDestination,
     TripParticipant,
     User,
-    Visit,
 )
 from .models import (
     HolidaysResponse,
@@ -38,6 +36,7 @@ from .models import (
     UserOptionsResponse,
     VacationSummary,
 )
+from .snapshot import invalidate_travel_snapshot
 
 # Re-export for backward compatibility with tests
 from .trips_country_info import (  # noqa: F401
@@ -64,6 +63,7 @@ from .trips_external import (
 from .trips_nominatim import _search_nominatim
 from .trips_nominatim import router as nominatim_router
 from .vacation import ANNUAL_LEAVE_DAYS, count_vacation_days
+from .visits import recalculate_visits
 
 log = logging.getLogger(__name__)
 
@@ -145,57 +145,6 @@ def get_users_options(
     )
 
 
-def _update_visits_for_trip(db: Session, trip: Trip) -> None:
-    """Create/update Visit records when trip adds new destinations."""
-    # Use end_date (trip completion) or start_date for single-day trips
-    visit_date = trip.end_date or trip.start_date
-
-    for trip_dest in trip.destinations:
-        visit = (
-            db.query(Visit).filter(Visit.tcc_destination_id == trip_dest.tcc_destination_id).first()
-        )
-
-        if visit is None:
-            # New destination - create Visit
-            db.add(
-                Visit(
-                    tcc_destination_id=trip_dest.tcc_destination_id,
-                    first_visit_date=visit_date,
-                )
-            )
-        elif visit.first_visit_date is None or visit_date < visit.first_visit_date:
-            # Earlier visit found - update
-            visit.first_visit_date = visit_date
-
-
-def _recalculate_visit(db: Session, tcc_destination_id: int) -> None:
-    """Find earliest trip visiting this destination and update Visit.
-
-    Only updates first_visit_date if trip date is earlier than existing.
-    Never clears existing dates (preserves check-in data).
-    """
-    earliest_trip = (
-        db.query(Trip)
-        .join(TripDestination)
-        .filter(TripDestination.tcc_destination_id == tcc_destination_id)
-        .order_by(Trip.start_date)
-        .first()
-    )
-
-    visit = db.query(Visit).filter(Visit.tcc_destination_id == tcc_destination_id).first()
-
-    if earliest_trip:
-        # Use end_date (trip completion) or start_date for single-day trips
-        visit_date = earliest_trip.end_date or earliest_trip.start_date
-        if visit:
-            # Only update if trip date is earlier (preserve check-in dates)
-            if visit.first_visit_date is None or visit_date < visit.first_visit_date:
-                visit.first_visit_date = visit_date
-        else:
-            db.add(Visit(tcc_destination_id=tcc_destination_id, first_visit_date=visit_date))
-    # If no trips, don't clear existing visit date (may have been set by check-in)
-
-
 def _trip_to_data(trip: Trip, *, drone_flights_count: int = 0) -> TripData:
     """Convert Trip ORM object to TripData response."""
     return TripData(
@@ -338,9 +287,10 @@ def create_trip(
     db.flush()
 
     # Update visit records
-    _update_visits_for_trip(db, trip)
+    recalculate_visits(db, {td.tcc_destination_id for td in trip.destinations})
 
     db.commit()
+    invalidate_travel_snapshot()
 
     # Reload with relationships
     db.refresh(trip)
@@ -459,11 +409,10 @@ def update_trip(
     new_destination_ids = {td.tcc_destination_id for td in trip.destinations}
 
     # Recalculate visits for all affected destinations
-    affected_ids = old_destination_ids | new_destination_ids
-    for dest_id in affected_ids:
-        _recalculate_visit(db, dest_id)
+    recalculate_visits(db, old_destination_ids | new_destination_ids)
 
     db.commit()
+    invalidate_travel_snapshot()
 
     # Reload with relationships
     loaded_trip = (
@@ -500,10 +449,10 @@ def delete_trip(
     db.flush()
 
     # Recalculate visits for affected destinations
-    for dest_id in destination_ids:
-        _recalculate_visit(db, dest_id)
+    recalculate_visits(db, destination_ids)
 
     db.commit()
+    invalidate_travel_snapshot()
 
     return {"message": "Trip deleted"}
 
@@ -585,51 +534,18 @@ def get_holidays(
 ) -> HolidaysResponse:
     """Get public holidays for a year/country from Nager.Date API (admin only).
 
-    Uses in-memory cache with 24h TTL.
+    Served from the shared holidays cache (24h TTL).
     """
-    country_code = country_code.upper()
-    cache_key = (year, country_code)
-
-    # Check cache
-    cached_holidays = _holidays_cache.get(cache_key)
-    if cached_holidays is not None:
-        return HolidaysResponse(
-            holidays=[
-                PublicHoliday(
-                    date=h["date"],
-                    name=h["name"],
-                    local_name=h.get("localName"),
-                )
-                for h in cached_holidays
-            ]
-        )
-
-    # Fetch from Nager.Date API
-    try:
-        response = httpx.get(
-            f"https://date.nager.at/api/v3/PublicHolidays/{year}/{country_code}",
-            timeout=10.0,
-        )
-        if response.status_code in (204, 404):
-            _holidays_cache[cache_key] = []
-            return HolidaysResponse(holidays=[])
-
-        response.raise_for_status()
-        data = response.json()
-        _holidays_cache[cache_key] = data
-
-        return HolidaysResponse(
-            holidays=[
-                PublicHoliday(
-                    date=h["date"],
-                    name=h["name"],
-                    local_name=h.get("localName"),
-                )
-                for h in data
-            ]
-        )
-    except Exception:
-        return HolidaysResponse(holidays=[])
+    return HolidaysResponse(
+        holidays=[
+            PublicHoliday(
+                date=h["date"],
+                name=h["name"],
+                local_name=h.get("localName"),
+            )
+            for h in _fetch_holidays_raw(year, country_code.upper())
+        ]
+    )
 
 
 @router.get("/advisories/{country_code}", response_model=TravelAdvisoriesResponse)
@@ -1,9 +1,11 @@
 import calendar
 import json
 import logging
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import date, datetime
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any
 from zoneinfo import ZoneInfo
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -63,11 +65,77 @@ if _drone_rules_path.exists():
 # Czech socket types for adapter comparison
 _CZ_SOCKETS = {"C", "E"}
 
+# External lookups (currency, weather, holidays, sunrise) run concurrently.
+# Whatever hasn't answered by the deadline is left empty; the worker keeps
+# running and fills its provider cache for the next view.
+_ENRICH_WORKERS = 16
+_ENRICH_DEADLINE = 8.0
+_enrich_pool = ThreadPoolExecutor(max_workers=_ENRICH_WORKERS, thread_name_prefix="country-info")
+
 log = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+class _Enrichment:
+    """Fan-out of external lookups for one request, collected under a shared deadline."""
+
+    def __init__(self) -> None:
+        self._futures: dict[tuple[str, str], Future[Any]] = {}
+        self.tz_offsets: dict[str, float | None] = {}
+
+    def submit(self, key: tuple[str, str], fn: Callable[..., Any], *args: Any) -> None:
+        self._futures[key] = _enrich_pool.submit(fn, *args)
+
+    def wait(self, timeout: float) -> None:
+        _done, pending = wait(self._futures.values(), timeout=timeout)
+        if pending:
+            slow = sorted(k for k, f in self._futures.items() if f in pending)
+            log.warning("Country info lookups timed out after %.1fs: %s", timeout, slow)
+
+    def result(self, key: tuple[str, str], default: Any = None) -> Any:
+        future = self._futures.get(key)
+        if future is None or not future.done():
+            return default
+        try:
+            return future.result()
+        except Exception:
+            log.warning("Country info lookup %s failed", key, exc_info=True)
+            return default
+
+
+def _start_enrichment(countries: list[UNCountry], trip_start: date, trip_end: date) -> _Enrichment:
+    """Submit every external lookup the country-info tab needs for a trip.
+
+    Shared with the prefetcher (prefetch.py) so both warm the same cache keys.
+    """
+    mid_trip = trip_start + (trip_end - trip_start) / 2
+    enrichment = _Enrichment()
+    for un_country in countries:
+        iso = un_country.iso_alpha2
+        enrichment.tz_offsets[iso] = (
+            _compute_timezone_offset(un_country.timezone, trip_start)
+            if un_country.timezone
+            else None
+        )
+        if un_country.currency_code:
+            enrichment.submit((iso, "currency"), _fetch_currency_rates, un_country.currency_code)
+        enrichment.submit((iso, "holidays"), _fetch_holidays_for_country, iso, trip_start, trip_end)
+        if un_country.capital_lat is not None and un_country.capital_lng is not None:
+            lat, lng = un_country.capital_lat, un_country.capital_lng
+            # Climate averages for the mid-trip month, sunrise on the mid-trip day
+            enrichment.submit((iso, "weather"), _fetch_weather, lat, lng, mid_trip.month)
+            enrichment.submit(
+                (iso, "sunrise"),
+                _fetch_sunrise_sunset,
+                lat,
+                lng,
+                mid_trip,
+                enrichment.tz_offsets[iso],
+            )
+    return enrichment
+
+
 def _needs_adapter(socket_types: str | None) -> bool | None:
     """Check if country needs a power adapter (compared to Czech C/E)."""
     if not socket_types:
@@ -408,11 +476,17 @@ def get_trip_country_info(
     mid_trip = trip_start + (trip_end - trip_start) / 2
     trip_month = mid_trip.month
 
+    ordered = sorted(
+        grouped.values(),
+        key=lambda x: x[0].name if x[0] else x[1][0][0],
+    )
+
+    # Issue every external lookup up front, then wait once for all of them
+    enrichment = _start_enrichment([un for un, _ in ordered if un], trip_start, trip_end)
+    enrichment.wait(_ENRICH_DEADLINE)
+
     countries: list[CountryInfoData] = []
-    for _key, (un_country, tcc_dests) in sorted(
-        grouped.items(),
-        key=lambda x: x[1][0].name if x[1][0] else x[1][1][0][0],
-    ):
+    for un_country, tcc_dests in ordered:
         if un_country:
             country_name = un_country.name
             iso = un_country.iso_alpha2
@@ -420,17 +494,16 @@ def get_trip_country_info(
             # Currency
             currency = None
             if un_country.currency_code:
-                rates = _fetch_currency_rates(un_country.currency_code)
                 currency = CurrencyInfo(
                     code=un_country.currency_code,
                     name=_get_currency_name(un_country.currency_code),
-                    rates=rates,
+                    rates=enrichment.result((iso, "currency")),
                 )
 
-            # Weather
+            # Weather (climate averages for the mid-trip month)
             weather = None
-            if un_country.capital_lat is not None and un_country.capital_lng is not None:
-                w = _fetch_weather(un_country.capital_lat, un_country.capital_lng, trip_month)
+            w = enrichment.result((iso, "weather"))
+            if w is not None:
                 rainy_days_val = w.get("rainy_days")
                 weather = WeatherInfo(
                     avg_temp_c=w.get("avg_temp_c"),
@@ -441,23 +514,10 @@ def get_trip_country_info(
                     month=calendar.month_name[trip_month],
                 )
 
-            # Timezone
-            tz_offset = None
-            if un_country.timezone:
-                tz_offset = _compute_timezone_offset(un_country.timezone, trip_start)
-
-            # Holidays
-            holidays = _fetch_holidays_for_country(iso, trip_start, trip_end)
-
+            tz_offset = enrichment.tz_offsets[iso]
+            holidays = enrichment.result((iso, "holidays"), [])
             # Sunrise/sunset for mid-trip date
-            sunrise_sunset = None
-            if un_country.capital_lat is not None and un_country.capital_lng is not None:
-                sunrise_sunset = _fetch_sunrise_sunset(
-                    un_country.capital_lat,
-                    un_country.capital_lng,
-                    mid_trip,
-                    tz_offset,
-                )
+            sunrise_sunset = enrichment.result((iso, "sunrise"))
 
             countries.append(
                 CountryInfoData(
@@ -3,21 +3,26 @@ import logging
 from datetime import date, datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
-import httpx
-from cachetools import TTLCache
-
+from .. import http_client
 from ..config import settings
+from ..shared_cache import TieredCache
 from .models import CountryHoliday, SunriseSunset
 
-# TTL caches for external API responses (auto-evict expired entries, bounded size)
-_holidays_cache: TTLCache[tuple[int, str], list[dict]] = TTLCache(maxsize=256, ttl=86400)
-_currency_cache: TTLCache[str, dict[str, float] | None] = TTLCache(maxsize=64, ttl=3600)
-_weather_cache: TTLCache[tuple[float, float, int], dict[str, float | None | int]] = TTLCache(
-    maxsize=256, ttl=86400
+# Two-tier caches (in-process + shared table) for external API responses.
+# Past the TTL an entry is served stale while one background refresh runs,
+# so a flaky upstream never blanks out data we already had.
+_STALE_TTL = 7 * 86400
+# Fallbacks after an upstream failure stay in-process and are retried sooner
+_RETRY_AFTER = 600
+
+_holidays_cache = TieredCache("holidays", list[dict], ttl=86400, stale_ttl=_STALE_TTL)
+_currency_cache = TieredCache(
+    "currency", dict[str, float] | None, ttl=3600, stale_ttl=86400, maxsize=64
 )
-_sunrise_cache: TTLCache[tuple[float, float, str], SunriseSunset | None] = TTLCache(
-    maxsize=256, ttl=86400
+_weather_cache = TieredCache(
+    "weather", dict[str, float | None | int], ttl=86400, stale_ttl=_STALE_TTL
 )
+_sunrise_cache = TieredCache("sunrise", SunriseSunset | None, ttl=86400, stale_ttl=_STALE_TTL)
 
 log = logging.getLogger(__name__)
 
@@ -191,9 +196,16 @@ def _fetch_currency_rates(currency_code: str) -> dict[str, float] | None:
     Uses Frankfurter (ECB) for supported currencies, falls back to
     open.er-api.com (free, no key, 150+ currencies) for others.
     """
-    if currency_code in _currency_cache:
-        return _currency_cache[currency_code]
+    try:
+        return _currency_cache.get_or_fetch(
+            currency_code, lambda: _load_currency_rates(currency_code)
+        )
+    except LookupError:
+        _currency_cache.set(currency_code, None, ttl=_RETRY_AFTER, persist=False)
+        return None
+
 
+def _load_currency_rates(currency_code: str) -> dict[str, float]:
     # ECB-supported currencies via Frankfurter (more reliable)
     ecb_supported = {
         "AUD",
@@ -232,8 +244,9 @@ def _fetch_currency_rates(currency_code: str) -> dict[str, float] | None:
     rates = _fetch_frankfurter(currency_code) if currency_code in ecb_supported else None
     if rates is None:
         rates = _fetch_open_er(currency_code)
-
-    _currency_cache[currency_code] = rates
+    if rates is None:
+        # Both providers already logged; don't cache the miss
+        raise LookupError(f"No exchange rates for {currency_code}")
     return rates
 
 
@@ -241,7 +254,7 @@ def _fetch_frankfurter(currency_code: str) -> dict[str, float] | None:
     """Fetch from Frankfurter API (ECB data, 31 currencies)."""
     try:
         targets = {"CZK", "EUR", "USD"} - {currency_code}
-        resp = httpx.get(
+        resp = http_client.get(
             f"https://api.frankfurter.app/latest?from={currency_code}&to={','.join(sorted(targets))}",
             timeout=5.0,
         )
@@ -257,7 +270,7 @@ def _fetch_frankfurter(currency_code: str) -> dict[str, float] | None:
 def _fetch_open_er(currency_code: str) -> dict[str, float] | None:
     """Fetch from open.er-api.com (free, no key, 150+ currencies)."""
     try:
-        resp = httpx.get(
+        resp = http_client.get(
             f"https://open.er-api.com/v6/latest/{currency_code}",
             timeout=5.0,
         )
@@ -281,53 +294,8 @@ def _fetch_weather(lat: float, lng: float, month: int) -> dict[str, float | None
     """Fetch climate averages from Open-Meteo Climate API with caching."""
     # Round coords to 2 decimal places for cache key stability
     cache_key = (round(lat, 2), round(lng, 2), month)
-    cached_data = _weather_cache.get(cache_key)
-    if cached_data is not None:
-        return cached_data
-
-    # Use a representative year range for climate data
-    year = 2020
-    last_day = min(28, calendar.monthrange(year, month)[1])
-    start = f"{year}-{month:02d}-01"
-    end = f"{year}-{month:02d}-{last_day:02d}"
-
     try:
-        resp = httpx.get(
-            "https://climate-api.open-meteo.com/v1/climate",
-            params={
-                "latitude": lat,
-                "longitude": lng,
-                "start_date": start,
-                "end_date": end,
-                "daily": ",".join(
-                    [
-                        "temperature_2m_mean",
-                        "temperature_2m_min",
-                        "temperature_2m_max",
-                        "precipitation_sum",
-                    ]
-                ),
-                "models": "EC_Earth3P_HR",
-            },
-            timeout=10.0,
-        )
-        resp.raise_for_status()
-        daily = resp.json().get("daily", {})
-        temps = [t for t in (daily.get("temperature_2m_mean") or []) if t is not None]
-        mins = [t for t in (daily.get("temperature_2m_min") or []) if t is not None]
-        maxs = [t for t in (daily.get("temperature_2m_max") or []) if t is not None]
-        precip = [p for p in (daily.get("precipitation_sum") or []) if p is not None]
-        rainy = sum(1 for p in precip if p > 0.5)
-
-        result: dict[str, float | None | int] = {
-            "avg_temp_c": round(sum(temps) / len(temps), 1) if temps else None,
-            "min_temp_c": round(sum(mins) / len(mins), 1) if mins else None,
-            "max_temp_c": round(sum(maxs) / len(maxs), 1) if maxs else None,
-            "avg_precipitation_mm": round(sum(precip) / len(precip), 1) if precip else None,
-            "rainy_days": rainy if precip else None,
-        }
-        _weather_cache[cache_key] = result
-        return result
+        return _weather_cache.get_or_fetch(cache_key, lambda: _load_weather(lat, lng, month))
     except Exception:
         log.warning(
             "Open-Meteo weather API failed for (%.2f, %.2f, %d)", lat, lng, month, exc_info=True
@@ -339,76 +307,121 @@ def _fetch_weather(lat: float, lng: float, month: int) -> dict[str, float | None
             "avg_precipitation_mm": None,
             "rainy_days": None,
         }
-        _weather_cache[cache_key] = fallback
+        _weather_cache.set(cache_key, fallback, ttl=_RETRY_AFTER, persist=False)
         return fallback
 
 
+def _load_weather(lat: float, lng: float, month: int) -> dict[str, float | None | int]:
+    # Use a representative year range for climate data
+    year = 2020
+    last_day = min(28, calendar.monthrange(year, month)[1])
+    start = f"{year}-{month:02d}-01"
+    end = f"{year}-{month:02d}-{last_day:02d}"
+
+    resp = http_client.get(
+        "https://climate-api.open-meteo.com/v1/climate",
+        params={
+            "latitude": lat,
+            "longitude": lng,
+            "start_date": start,
+            "end_date": end,
+            "daily": ",".join(
+                [
+                    "temperature_2m_mean",
+                    "temperature_2m_min",
+                    "temperature_2m_max",
+                    "precipitation_sum",
+                ]
+            ),
+            "models": "EC_Earth3P_HR",
+        },
+        timeout=10.0,
+    )
+    resp.raise_for_status()
+    daily = resp.json().get("daily", {})
+    temps = [t for t in (daily.get("temperature_2m_mean") or []) if t is not None]
+    mins = [t for t in (daily.get("temperature_2m_min") or []) if t is not None]
+    maxs = [t for t in (daily.get("temperature_2m_max") or []) if t is not None]
+    precip = [p for p in (daily.get("precipitation_sum") or []) if p is not None]
+    rainy = sum(1 for p in precip if p > 0.5)
+
+    return {
+        "avg_temp_c": round(sum(temps) / len(temps), 1) if temps else None,
+        "min_temp_c": round(sum(mins) / len(mins), 1) if mins else None,
+        "max_temp_c": round(sum(maxs) / len(maxs), 1) if maxs else None,
+        "avg_precipitation_mm": round(sum(precip) / len(precip), 1) if precip else None,
+        "rainy_days": rainy if precip else None,
+    }
+
+
 def _fetch_sunrise_sunset(
     lat: float, lng: float, trip_date: date, tz_offset: float | None
 ) -> SunriseSunset | None:
     """Fetch sunrise/sunset for a location and date."""
     date_str = trip_date.isoformat()
     cache_key = (round(lat, 2), round(lng, 2), date_str)
-    if cache_key in _sunrise_cache:
-        return _sunrise_cache[cache_key]
-
     try:
-        resp = httpx.get(
-            "https://api.sunrise-sunset.org/json",
-            params={
-                "lat": lat,
-                "lng": lng,
-                "date": date_str,
-                "formatted": 0,
-            },
-            timeout=5.0,
+        return _sunrise_cache.get_or_fetch(
+            cache_key, lambda: _load_sunrise_sunset(lat, lng, trip_date, tz_offset)
         )
-        resp.raise_for_status()
-        data = resp.json()
-        if data.get("status") != "OK":
-            _sunrise_cache[cache_key] = None
-            return None
-
-        results = data["results"]
-        sunrise_utc = results["sunrise"]  # ISO 8601
-        sunset_utc = results["sunset"]
-        day_length = results.get("day_length", 0)
-
-        # Parse UTC times and apply timezone offset
-        offset_h = tz_offset if tz_offset is not None else 0
-        # tz_offset is relative to CET; compute actual UTC offset
-        # CET = UTC+1 (winter) or UTC+2 (summer)
-        try:
-            cet = ZoneInfo("Europe/Prague")
-            cet_offset = datetime(
-                trip_date.year, trip_date.month, trip_date.day, 12, tzinfo=cet
-            ).utcoffset()
-            cet_h = cet_offset.total_seconds() / 3600 if cet_offset else 1
-        except Exception:
-            cet_h = 1
-        country_utc_offset = cet_h + offset_h
-
-        tz = timezone(timedelta(hours=country_utc_offset))
-        sr = datetime.fromisoformat(sunrise_utc).astimezone(tz)
-        ss = datetime.fromisoformat(sunset_utc).astimezone(tz)
-
-        result = SunriseSunset(
-            sunrise=sr.strftime("%H:%M"),
-            sunset=ss.strftime("%H:%M"),
-            day_length_hours=round(day_length / 3600, 1),
-        )
-        _sunrise_cache[cache_key] = result
-        return result
     except Exception:
         log.warning(
             "Sunrise-sunset API failed for (%.2f, %.2f, %s)", lat, lng, date_str, exc_info=True
         )
-        _sunrise_cache[cache_key] = None
+        _sunrise_cache.set(cache_key, None, ttl=_RETRY_AFTER, persist=False)
+        return None
+
+
+def _load_sunrise_sunset(
+    lat: float, lng: float, trip_date: date, tz_offset: float | None
+) -> SunriseSunset | None:
+    resp = http_client.get(
+        "https://api.sunrise-sunset.org/json",
+        params={
+            "lat": lat,
+            "lng": lng,
+            "date": trip_date.isoformat(),
+            "formatted": 0,
+        },
+        timeout=5.0,
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    if data.get("status") != "OK":
         return None
 
+    results = data["results"]
+    sunrise_utc = results["sunrise"]  # ISO 8601
+    sunset_utc = results["sunset"]
+    day_length = results.get("day_length", 0)
+
+    # Parse UTC times and apply timezone offset
+    offset_h = tz_offset if tz_offset is not None else 0
+    # tz_offset is relative to CET; compute actual UTC offset
+    # CET = UTC+1 (winter) or UTC+2 (summer)
+    try:
+        cet = ZoneInfo("Europe/Prague")
+        cet_offset = datetime(
+            trip_date.year, trip_date.month, trip_date.day, 12, tzinfo=cet
+        ).utcoffset()
+        cet_h = cet_offset.total_seconds() / 3600 if cet_offset else 1
+    except Exception:
+        cet_h = 1
+    country_utc_offset = cet_h + offset_h
+
+    tz = timezone(timedelta(hours=country_utc_offset))
+    sr = datetime.fromisoformat(sunrise_utc).astimezone(tz)
+    ss = datetime.fromisoformat(sunset_utc).astimezone(tz)
+
+    return SunriseSunset(
+        sunrise=sr.strftime("%H:%M"),
+        sunset=ss.strftime("%H:%M"),
+        day_length_hours=round(day_length / 3600, 1),
+    )
 
-_tripclimate_cache: TTLCache[tuple[str, str, str], list[CountryHoliday]] = TTLCache(
-    maxsize=256, ttl=86400
+
+_tripclimate_cache = TieredCache(
+    "tripclimate", list[CountryHoliday], ttl=86400, stale_ttl=_STALE_TTL
 )
 
 
@@ -429,33 +442,10 @@ def _fetch_holidays_for_country(country_code: str, start: date, end: date) -> li
 def _fetch_holidays_tripclimate(country_code: str, start: date, end: date) -> list[CountryHoliday]:
     """Fetch holidays + cultural events from TripClimate API."""
     cache_key = (country_code.upper(), start.isoformat(), end.isoformat())
-    if cache_key in _tripclimate_cache:
-        return _tripclimate_cache[cache_key]
-
     try:
-        resp = httpx.get(
-            f"{settings.tripclimate_api_url}/api/v1/calendar",
-            params={
-                "country": country_code.upper(),
-                "start": start.isoformat(),
-                "end": end.isoformat(),
-                "types": "holiday,cultural_event",
-            },
-            headers={"X-Api-Key": settings.tripclimate_api_key},
-            timeout=10.0,
+        return _tripclimate_cache.get_or_fetch(
+            cache_key, lambda: _load_holidays_tripclimate(country_code, start, end)
         )
-        resp.raise_for_status()
-        events = resp.json().get("events", [])
-        holidays = [
-            CountryHoliday(
-                date=e["date"],
-                name=e["name"],
-                local_name=e.get("details") or e.get("summary") or None,
-            )
-            for e in events
-        ]
-        _tripclimate_cache[cache_key] = holidays
-        return holidays
     except Exception:
         log.warning(
             "TripClimate API failed for %s (%s–%s), falling back to Nager.Date",
@@ -467,19 +457,36 @@ def _fetch_holidays_tripclimate(country_code: str, start: date, end: date) -> li
         return _fetch_holidays_nager(country_code, start, end)
 
 
+def _load_holidays_tripclimate(country_code: str, start: date, end: date) -> list[CountryHoliday]:
+    resp = http_client.get(
+        f"{settings.tripclimate_api_url}/api/v1/calendar",
+        params={
+            "country": country_code.upper(),
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "types": "holiday,cultural_event",
+        },
+        headers={"X-Api-Key": settings.tripclimate_api_key},
+        timeout=10.0,
+    )
+    resp.raise_for_status()
+    events = resp.json().get("events", [])
+    return [
+        CountryHoliday(
+            date=e["date"],
+            name=e["name"],
+            local_name=e.get("details") or e.get("summary") or None,
+        )
+        for e in events
+    ]
+
+
 def _fetch_holidays_nager(country_code: str, start: date, end: date) -> list[CountryHoliday]:
     """Fetch public holidays from Nager.Date API (fallback)."""
     holidays: list[CountryHoliday] = []
 
     for year in range(start.year, end.year + 1):
-        cache_key = (year, country_code.upper())
-
-        if cache_key in _holidays_cache:
-            raw_holidays: list[dict] = _holidays_cache[cache_key]
-        else:
-            raw_holidays = _fetch_holidays_raw(year, country_code)
-
-        for h in raw_holidays:
+        for h in _fetch_holidays_raw(year, country_code):
             h_date = h.get("date", "")
             if h_date and start.isoformat() <= h_date <= end.isoformat():
                 holidays.append(
@@ -494,21 +501,25 @@ def _fetch_holidays_nager(country_code: str, start: date, end: date) -> list[Cou
 
 
 def _fetch_holidays_raw(year: int, country_code: str) -> list[dict]:
-    """Fetch raw holidays from Nager.Date API and cache them."""
+    """Fetch raw holidays for a year from Nager.Date API with caching."""
     cache_key = (year, country_code.upper())
     try:
-        resp = httpx.get(
-            f"https://date.nager.at/api/v3/PublicHolidays/{year}/{country_code.upper()}",
-            timeout=10.0,
+        return _holidays_cache.get_or_fetch(
+            cache_key, lambda: _load_holidays_raw(year, country_code)
         )
-        if resp.status_code in (204, 404):
-            _holidays_cache[cache_key] = []
-            return []
-        resp.raise_for_status()
-        data: list[dict] = resp.json()
-        _holidays_cache[cache_key] = data
-        return data
     except Exception:
         log.warning("Nager.Date holidays API failed for %s/%d", country_code, year, exc_info=True)
-        _holidays_cache[cache_key] = []
+        _holidays_cache.set(cache_key, [], ttl=_RETRY_AFTER, persist=False)
+        return []
+
+
+def _load_holidays_raw(year: int, country_code: str) -> list[dict]:
+    resp = http_client.get(
+        f"https://date.nager.at/api/v3/PublicHolidays/{year}/{country_code.upper()}",
+        timeout=10.0,
+    )
+    if resp.status_code in (204, 404):
         return []
+    resp.raise_for_status()
+    data: list[dict] = resp.json()
+    return data
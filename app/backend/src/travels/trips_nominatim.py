@@ -3,10 +3,10 @@ import time
 from datetime import UTC, datetime
 from typing import Annotated
 
-import httpx
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
+from .. import http_client
 from ..auth.session import get_admin_user
 from ..database import get_db
 from ..models import City, UNCountry, User
@@ -52,7 +52,7 @@ def _search_nominatim(
 
     try:
         _nominatim_last_request = time.time()
-        response = httpx.get(
+        response = http_client.get(
             "https://nominatim.openstreetmap.org/search",
             params=params,
             headers={
@@ -1,5 +1,5 @@
 from io import BytesIO
-from typing import Annotated
+from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from openpyxl import load_workbook
@@ -7,8 +7,11 @@ from sqlalchemy.orm import Session
 
 from ..auth.session import get_admin_user
 from ..database import get_db
+from ..jobs import JobContext, JobError, job_handler
 from ..models import NMRegion, User
+from ..uploads import read_upload
 from .models import UploadResult
+from .snapshot import invalidate_travel_snapshot
 
 router = APIRouter()
 
@@ -24,21 +27,16 @@ def extract_country(region_name: str) -> str:
     return region_name
 
 
-@router.post("/upload-nm", response_model=UploadResult)
-async def upload_nm_regions(
-    file: Annotated[UploadFile, File()],
-    admin: Annotated[User, Depends(get_admin_user)],
-    db: Session = Depends(get_db),
-) -> UploadResult:
-    """Upload NomadMania regions XLSX file (admin only)."""
-    if not file.filename or not file.filename.endswith(".xlsx"):
-        raise HTTPException(status_code=400, detail="File must be an .xlsx file")
+def import_nm_regions(db: Session, content: bytes) -> UploadResult:
+    """Replace all NomadMania regions with the contents of an XLSX export.
 
-    content = await file.read()
+    Raises ValueError if the file can't be parsed; the database is only
+    touched once every row has been validated.
+    """
     try:
         wb = load_workbook(BytesIO(content))
     except Exception:
-        raise HTTPException(status_code=400, detail="Invalid XLSX file")
+        raise ValueError("Invalid XLSX file")
 
     ws = wb.active
 
@@ -62,13 +60,10 @@ async def upload_nm_regions(
                 }
             )
         except (ValueError, TypeError) as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid data in row {row_num}: {e}",
-            )
+            raise ValueError(f"Invalid data in row {row_num}: {e}")
 
     if not parsed_regions:
-        raise HTTPException(status_code=400, detail="No valid regions found in file")
+        raise ValueError("No valid regions found in file")
 
     # All data validated - now safe to update database
     try:
@@ -84,10 +79,41 @@ async def upload_nm_regions(
         db.commit()
     except Exception:
         db.rollback()
-        raise HTTPException(status_code=500, detail="Database error, changes rolled back")
+        raise
+    invalidate_travel_snapshot()
 
     return UploadResult(
         total=len(parsed_regions),
         visited=visited_count,
         message=f"Updated {len(parsed_regions)} regions, {visited_count} visited",
     )
+
+
+@router.post("/upload-nm", response_model=UploadResult)
+async def upload_nm_regions(
+    file: Annotated[UploadFile, File()],
+    admin: Annotated[User, Depends(get_admin_user)],
+    db: Session = Depends(get_db),
+) -> UploadResult:
+    """Upload NomadMania regions XLSX file (admin only)."""
+    if not file.filename or not file.filename.endswith(".xlsx"):
+        raise HTTPException(status_code=400, detail="File must be an .xlsx file")
+
+    upload = await read_upload(file, allowed_types={"application/zip"})
+    try:
+        return import_nm_regions(db, upload.read())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=500, detail="Database error, changes rolled back")
+
+
+@job_handler("nm.import")
+def _import_nm_job(ctx: JobContext) -> dict[str, Any]:
+    if not ctx.payload:
+        raise JobError("No file uploaded")
+    try:
+        return import_nm_regions(ctx.db, ctx.payload).model_dump()
+    except ValueError as e:
+        # A bad file stays bad, no point retrying
+        raise JobError(str(e))
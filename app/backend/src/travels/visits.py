@@ -0,0 +1,125 @@
+"""Keep visits.first_visit_date in step with trips and check-ins.
+
+A destination's first visit is the earliest date any trip to it was
+completed (end_date, or start_date for single-day trips), or an earlier
+check-in. Dates only ever move earlier: removing a trip never clears or
+raises a date, which may come from a check-in or manual edit.
+
+Both entry points update a whole batch of destinations in two statements
+(an UPDATE for existing visits, an INSERT ... SELECT for new ones), so
+bulk trip edits and imports cost the same number of queries whatever
+their size. Called with no ids, ``recalculate_visits`` rebuilds every
+destination that has a trip (also available as the ``visits.rebuild`` job).
+"""
+
+from collections.abc import Collection
+from datetime import date
+from typing import Any, cast
+
+from sqlalchemy import (
+    CursorResult,
+    Date,
+    Executable,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session
+
+from ..jobs import JobContext, job_handler
+from ..models import TCCDestination, Trip, TripDestination, Visit
+from .snapshot import invalidate_travel_snapshot
+
+# Trips count as visited once completed; single-day trips have no end_date
+_EARLIEST_TRIP = func.min(func.coalesce(Trip.end_date, Trip.start_date))
+
+
+def _rowcount(db: Session, statement: Executable) -> int:
+    result = cast(CursorResult[Any], db.execute(statement))
+    return result.rowcount
+
+
+def _no_visit(tcc_destination_id: Any) -> Any:
+    return ~exists().where(Visit.tcc_destination_id == tcc_destination_id)
+
+
+def recalculate_visits(db: Session, tcc_destination_ids: Collection[int] | None = None) -> int:
+    """Move first visits earlier to match trips; None = every destination.
+
+    Pending ORM changes are flushed first. Loaded Visit objects are not
+    refreshed (they expire on commit). Returns the number of visits changed.
+    """
+    if tcc_destination_ids is not None and not tcc_destination_ids:
+        return 0
+    db.flush()
+
+    trip_date = (
+        select(_EARLIEST_TRIP)
+        .select_from(Trip)
+        .join(TripDestination, TripDestination.trip_id == Trip.id)
+        .where(TripDestination.tcc_destination_id == Visit.tcc_destination_id)
+        .scalar_subquery()
+    )
+    changed = update(Visit)
+    if tcc_destination_ids is not None:
+        changed = changed.where(Visit.tcc_destination_id.in_(tcc_destination_ids))
+    changed = changed.where(
+        trip_date.isnot(None),
+        or_(Visit.first_visit_date.is_(None), Visit.first_visit_date > trip_date),
+    )
+    updated = _rowcount(
+        db, changed.values(first_visit_date=trip_date).execution_options(synchronize_session=False)
+    )
+
+    first_trips = (
+        select(TripDestination.tcc_destination_id, _EARLIEST_TRIP)
+        .join(Trip, Trip.id == TripDestination.trip_id)
+        .where(_no_visit(TripDestination.tcc_destination_id))
+        .group_by(TripDestination.tcc_destination_id)
+    )
+    if tcc_destination_ids is not None:
+        first_trips = first_trips.where(TripDestination.tcc_destination_id.in_(tcc_destination_ids))
+    created = _rowcount(
+        db,
+        insert(Visit).from_select(["tcc_destination_id", "first_visit_date"], first_trips),
+    )
+    return updated + created
+
+
+def record_visits(db: Session, tcc_destination_ids: Collection[int], visit_date: date) -> int:
+    """Set first visits to ``visit_date`` where it is earlier (or there is none).
+
+    Used by check-ins; returns the number of visits changed.
+    """
+    if not tcc_destination_ids:
+        return 0
+    db.flush()
+    updated = _rowcount(
+        db,
+        update(Visit)
+        .where(
+            Visit.tcc_destination_id.in_(tcc_destination_ids),
+            or_(Visit.first_visit_date.is_(None), Visit.first_visit_date > visit_date),
+        )
+        .values(first_visit_date=visit_date)
+        .execution_options(synchronize_session=False),
+    )
+    new_visits = select(TCCDestination.id, literal(visit_date, Date)).where(
+        TCCDestination.id.in_(tcc_destination_ids), _no_visit(TCCDestination.id)
+    )
+    created = _rowcount(
+        db, insert(Visit).from_select(["tcc_destination_id", "first_visit_date"], new_visits)
+    )
+    return updated + created
+
+
+@job_handler("visits.rebuild")
+def _rebuild_visits_job(ctx: JobContext) -> dict[str, Any]:
+    changed = recalculate_visits(ctx.db)
+    ctx.db.commit()
+    invalidate_travel_snapshot()
+    return {"changed": changed}
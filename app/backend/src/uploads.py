@@ -0,0 +1,127 @@
+"""Reading uploaded files without holding them in memory.
+
+Starlette spools multipart files to a temporary file as the request comes
+in. ``check_upload`` (``read_upload`` in async endpoints) checks the size
+limit before touching the content (and again while reading, in case the
+size is unknown) in a single chunked pass, sniffing the file's type from
+its leading bytes. The rewound file can be handed straight to a storage
+backend's ``save``; only callers that need the bytes themselves (image
+decoding, AI extraction, parsers) call ``read()``.
+"""
+
+from collections.abc import Collection
+from typing import BinaryIO, NamedTuple
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+# Leading bytes of the types we accept anywhere
+_SIGNATURES: tuple[tuple[bytes, str], ...] = (
+    (b"%PDF-", "application/pdf"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"PK\x03\x04", "application/zip"),  # also XLSX/DOCX
+)
+
+
+def sniff_mime_type(head: bytes) -> str | None:
+    """MIME type from a file's first bytes, or None if not recognised."""
+    for signature, mime in _SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"heic", b"heix", b"mif1"):
+        return "image/heic"
+    return None
+
+
+class Upload(NamedTuple):
+    """A size-checked upload. ``file`` is rewound and ready to be read or stored."""
+
+    file: BinaryIO
+    filename: str
+    content_type: str
+    size: int
+    # From the content itself, None if unrecognised
+    sniffed_type: str | None
+
+    def read(self) -> bytes:
+        """The whole content, for callers that need it in memory."""
+        self.file.seek(0)
+        content = self.file.read()
+        self.file.seek(0)
+        return content
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=400, detail=f"File too large (max {max_size // (1024 * 1024)} MB)"
+    )
+
+
+def check_upload(
+    file: UploadFile,
+    *,
+    max_size: int = MAX_UPLOAD_SIZE,
+    allowed_types: Collection[str] | None = None,
+    allow_empty: bool = False,
+) -> Upload:
+    """Validate an upload in one chunked pass. Raises HTTPException(400).
+
+    ``allowed_types`` only checks the sniffed type (when recognised): the
+    declared content type is still checked by the caller, with its own
+    message. This catches files whose content doesn't match their label.
+    Blocking, so sync endpoints call it directly; async ones use
+    ``read_upload``.
+    """
+    if file.size is not None and file.size > max_size:
+        raise _too_large(max_size)
+
+    size = 0
+    head = b""
+    file.file.seek(0)
+    while chunk := file.file.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_size:
+            raise _too_large(max_size)
+        if len(head) < 16:
+            head += chunk[: 16 - len(head)]
+    file.file.seek(0)
+
+    if size == 0 and not allow_empty:
+        raise HTTPException(status_code=400, detail="File is empty")
+    sniffed = sniff_mime_type(head)
+    if allowed_types is not None and sniffed is not None and sniffed not in allowed_types:
+        raise HTTPException(
+            status_code=400, detail=f"File content doesn't match an allowed type ({sniffed})"
+        )
+    return Upload(
+        file=file.file,
+        filename=file.filename or "",
+        content_type=file.content_type or "application/octet-stream",
+        size=size,
+        sniffed_type=sniffed,
+    )
+
+
+async def read_upload(
+    file: UploadFile,
+    *,
+    max_size: int = MAX_UPLOAD_SIZE,
+    allowed_types: Collection[str] | None = None,
+    allow_empty: bool = False,
+) -> Upload:
+    """``check_upload`` for async endpoints (the reads run in the threadpool)."""
+    return await run_in_threadpool(
+        check_upload,
+        file,
+        max_size=max_size,
+        allowed_types=allowed_types,
+        allow_empty=allow_empty,
+    )
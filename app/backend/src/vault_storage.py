@@ -1,18 +1,44 @@
 """Private vault file storage."""
 
+import re
 import uuid
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from functools import cache
 from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import HTTPException
+from fastapi.responses import RedirectResponse, StreamingResponse
 
 from .config import settings
+from .storage import (
+    SIGNED_URL_TTL,
+    content_disposition,
+    delete_blobs,
+    gcs_client,
+    gcs_signed_url,
+    local_signed_url,
+    run_parallel,
+    upload_to_blob,
+    write_content,
+)
+
+# Bytes per chunk when streaming a file out (one GCS range request each)
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Local vault files are served under /api/v1/signed/vault/...
+VAULT_SCOPE = "vault"
 
 
 class VaultStorageBackend(ABC):
     """Abstract storage backend for private vault files."""
 
     @abstractmethod
-    def save(self, user_id: int, filename: str, content: bytes, content_type: str) -> str:
-        """Save content and return storage key."""
+    def save(
+        self, user_id: int, filename: str, content: bytes | BinaryIO, content_type: str
+    ) -> str:
+        """Save content (bytes, or a file streamed from its position) and return storage key."""
 
     @abstractmethod
     def delete(self, key: str) -> bool:
@@ -26,6 +52,40 @@ class VaultStorageBackend(ABC):
     def read(self, key: str) -> bytes | None:
         """Read file contents (for AI extraction). Returns None if not found."""
 
+    @abstractmethod
+    def size(self, key: str) -> int | None:
+        """File size in bytes, or None if not found."""
+
+    @abstractmethod
+    def iter_bytes(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        """Stream bytes ``start``..``end`` (inclusive, None = to the end) in chunks."""
+
+    @abstractmethod
+    def signed_url(
+        self,
+        key: str,
+        *,
+        expires_in: int = SIGNED_URL_TTL,
+        media_type: str | None = None,
+        download_name: str | None = None,
+    ) -> str:
+        """Short-lived URL fetching the file directly (check access before handing it out)."""
+
+    def save_many(
+        self, user_id: int, files: Iterable[tuple[str, bytes | BinaryIO, str]]
+    ) -> list[str]:
+        """Save (filename, content, content_type) files in parallel. Returns their keys."""
+        return run_parallel(lambda f: self.save(user_id, *f), files)
+
+    def exists_many(self, keys: Iterable[str]) -> set[str]:
+        """The subset of ``keys`` that exist."""
+        keys = list(keys)
+        return {k for k, found in zip(keys, run_parallel(self.exists, keys)) if found}
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """Delete files, skipping any that don't exist."""
+        run_parallel(self.delete, keys)
+
     def generate_key(self, user_id: int, original_filename: str) -> str:
         """Generate a unique storage key: {user_id}/{uuid}.{ext}"""
         ext = Path(original_filename).suffix.lstrip(".")
@@ -41,11 +101,13 @@ class LocalVaultStorage(VaultStorageBackend):
         self.base_path = base_path
         self.base_path.mkdir(parents=True, exist_ok=True)
 
-    def save(self, user_id: int, filename: str, content: bytes, content_type: str) -> str:
+    def save(
+        self, user_id: int, filename: str, content: bytes | BinaryIO, content_type: str
+    ) -> str:
         key = self.generate_key(user_id, filename)
         file_path = self.base_path / key
         file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_bytes(content)
+        write_content(file_path, content)
         return key
 
     def delete(self, key: str) -> bool:
@@ -64,23 +126,55 @@ class LocalVaultStorage(VaultStorageBackend):
             return file_path.read_bytes()
         return None
 
+    def size(self, key: str) -> int | None:
+        file_path = self.base_path / key
+        return file_path.stat().st_size if file_path.exists() else None
+
+    def iter_bytes(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        with (self.base_path / key).open("rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(
+                    STREAM_CHUNK_SIZE if remaining is None else min(STREAM_CHUNK_SIZE, remaining)
+                )
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def signed_url(
+        self,
+        key: str,
+        *,
+        expires_in: int = SIGNED_URL_TTL,
+        media_type: str | None = None,
+        download_name: str | None = None,
+    ) -> str:
+        return local_signed_url(
+            VAULT_SCOPE,
+            key,
+            expires_in=expires_in,
+            media_type=media_type,
+            download_name=download_name,
+        )
+
 
 class GCSVaultStorage(VaultStorageBackend):
-    """Google Cloud Storage backend (private bucket, streamed through backend)."""
+    """Google Cloud Storage backend (private bucket, downloads via signed URLs)."""
 
     def __init__(self, bucket_name: str):
-        import google.auth
-        from google.cloud import storage
-
-        self._credentials, project = google.auth.default()
-        self.client = storage.Client(credentials=self._credentials, project=project)
+        self.client = gcs_client()
         self.bucket = self.client.bucket(bucket_name)
         self.bucket_name = bucket_name
 
-    def save(self, user_id: int, filename: str, content: bytes, content_type: str) -> str:
+    def save(
+        self, user_id: int, filename: str, content: bytes | BinaryIO, content_type: str
+    ) -> str:
         key = self.generate_key(user_id, filename)
         blob = self.bucket.blob(key)
-        blob.upload_from_string(content, content_type=content_type)
+        upload_to_blob(blob, content, content_type)
         return key
 
     def delete(self, key: str) -> bool:
@@ -100,9 +194,134 @@ class GCSVaultStorage(VaultStorageBackend):
             return None
         return bytes(blob.download_as_bytes())
 
+    def delete_many(self, keys: Iterable[str]) -> None:
+        delete_blobs(self.client, self.bucket, list(keys))
 
-def get_vault_storage() -> VaultStorageBackend:
-    """Get configured vault storage backend."""
-    if settings.vault_gcs_bucket:
-        return GCSVaultStorage(settings.vault_gcs_bucket)
+    def signed_url(
+        self,
+        key: str,
+        *,
+        expires_in: int = SIGNED_URL_TTL,
+        media_type: str | None = None,
+        download_name: str | None = None,
+    ) -> str:
+        return gcs_signed_url(
+            self.bucket,
+            key,
+            expires_in=expires_in,
+            media_type=media_type,
+            download_name=download_name,
+        )
+
+    def size(self, key: str) -> int | None:
+        blob = self.bucket.get_blob(key)
+        return int(blob.size) if blob is not None and blob.size is not None else None
+
+    def iter_bytes(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        if end is None:
+            size = self.size(key)
+            if size is None:
+                return
+            end = size - 1
+        blob = self.bucket.blob(key)
+        for pos in range(start, end + 1, STREAM_CHUNK_SIZE):
+            yield bytes(
+                blob.download_as_bytes(start=pos, end=min(pos + STREAM_CHUNK_SIZE, end + 1) - 1)
+            )
+
+
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Byte range (inclusive) requested by a Range header, None for the whole file.
+
+    Only single ranges are honoured; anything else gets the whole file, which
+    RFC 9110 allows. Raises HTTPException(416) if the range is unsatisfiable.
+    """
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip())
+    if not m or not (m.group(1) or m.group(2)):
+        return None
+    if m.group(1):
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(m.group(2)), 0)
+        end = size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def vault_file_response(
+    storage: VaultStorageBackend,
+    key: str,
+    media_type: str | None,
+    range_header: str | None = None,
+    *,
+    not_found: str = "File not found in storage",
+    download_name: str | None = None,
+) -> StreamingResponse:
+    """Stream a stored file in chunks, honouring a single-range Range header."""
+    size = storage.size(key)
+    if size is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    headers = {"Accept-Ranges": "bytes"}
+    disposition = content_disposition(download_name)
+    if disposition:
+        headers["Content-Disposition"] = disposition
+    byte_range = parse_range(range_header, size)
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(
+            # Size is known: spare GCS a second metadata lookup
+            storage.iter_bytes(key, 0, size - 1),
+            media_type=media_type or "application/octet-stream",
+            headers=headers,
+        )
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        storage.iter_bytes(key, start, end),
+        status_code=206,
+        media_type=media_type or "application/octet-stream",
+        headers=headers,
+    )
+
+
+def vault_file_redirect(
+    storage: VaultStorageBackend,
+    key: str,
+    media_type: str | None,
+    download_name: str | None,
+    *,
+    not_found: str = "File not found in storage",
+) -> RedirectResponse:
+    """Send the client to a signed URL for the file instead of proxying it."""
+    # Signing doesn't touch the object, so check it's there: a signed URL to a
+    # missing blob ends in the bucket's own error page instead of our 404
+    if storage.size(key) is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    url = storage.signed_url(key, media_type=media_type, download_name=download_name)
+    # The link is short-lived, so the redirect itself mustn't be cached
+    return RedirectResponse(url, status_code=302, headers={"Cache-Control": "no-store"})
+
+
+@cache
+def _vault_storage(bucket: str) -> VaultStorageBackend:
+    if bucket:
+        return GCSVaultStorage(bucket)
     return LocalVaultStorage(Path("/app/data/vault-docs"))
+
+
+def get_vault_storage() -> VaultStorageBackend:
+    """Get configured vault storage backend (shared per process)."""
+    return _vault_storage(settings.vault_gcs_bucket)
@@ -0,0 +1,25 @@
+"""Standalone job worker: ``python -m src.worker``.
+
+Runs the same loop as the in-process worker, for deployments where the API
+instances set JOB_POLL_INTERVAL=0 and background work gets its own
+container.
+"""
+
+import asyncio
+
+from . import main  # noqa: F401  (importing the app registers every job handler)
+from .config import settings
+from .jobs import run_worker_loop
+from .log_config import get_logger
+
+log = get_logger(__name__)
+
+
+def run() -> None:
+    interval = settings.job_poll_interval or 5.0
+    log.info("Job worker polling every %.1fs", interval)
+    asyncio.run(run_worker_loop(interval))
+
+
+if __name__ == "__main__":
+    run()
@@ -19,8 +19,12 @@ os.environ["AERODATABOX_API_KEY"] = ""
 os.environ["ANTHROPIC_API_KEY"] = ""
 os.environ["APP_TOKEN"] = ""
 os.environ["VAULT_ENCRYPTION_KEY"] = ""
+os.environ["CACHE_BACKEND"] = ""
+os.environ["TRIP_PREFETCH_INTERVAL"] = "0"
+os.environ["JOB_POLL_INTERVAL"] = "0"
 
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Iterator
+from contextlib import AbstractContextManager, contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
@@ -30,19 +34,40 @@ from sqlalchemy.pool import StaticPool
 
 from src.auth.session import get_admin_user, get_trips_viewer
 from src.database import Base, get_db
+from src.extraction import clear_extraction_cache
 from src.main import app
 from src.models import User
+from src.og import clear_og_cache
+from src.query_stats import QueryStats, track_queries
+from src.travels.airports import clear_airport_cache
+from src.travels.snapshot import invalidate_travel_snapshot
+
+from .query_plan import QueryPlanAuditor
+
+
+@pytest.fixture(autouse=True)
+def _reset_travel_snapshot() -> None:
+    """Each test gets a fresh database, so drop snapshots/pages built from a previous one."""
+    invalidate_travel_snapshot()
+    clear_og_cache()
+    clear_extraction_cache()
+    clear_airport_cache()
 
 
 @pytest.fixture()
 def db_session() -> Generator[Session, None, None]:
-    """Create an in-memory SQLite database session for testing."""
+    """Create an in-memory SQLite database session for testing.
+
+    Queries are audited for full scans of large tables (see query_plan.py).
+    """
     engine = create_engine(
         "sqlite://",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
     Base.metadata.create_all(bind=engine)
+    auditor = QueryPlanAuditor()
+    auditor.install(engine)
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     session = TestingSessionLocal()
     try:
@@ -50,6 +75,8 @@ def db_session() -> Generator[Session, None, None]:
     finally:
         session.close()
         engine.dispose()
+    if auditor.violations:
+        pytest.fail(auditor.report())
 
 
 @pytest.fixture()
@@ -97,3 +124,20 @@ def admin_client(db_session: Session, admin_user: User) -> Generator[TestClient,
     with TestClient(app, headers={"X-CSRF": "1"}) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def query_budget() -> Callable[[int], AbstractContextManager[QueryStats]]:
+    """``with query_budget(5): client.get(...)`` fails if the block runs more than 5 statements.
+
+    Catches N+1 regressions: budgets are set at the endpoint's current count.
+    """
+
+    @contextmanager
+    def budget(limit: int) -> Iterator[QueryStats]:
+        with track_queries() as stats:
+            yield stats
+        if stats.count > limit:
+            pytest.fail(f"{stats.count} SQL statements, budget is {limit}")
+
+    return budget
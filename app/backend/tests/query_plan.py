@@ -0,0 +1,75 @@
+"""Query plan auditor for the test database.
+
+Every filtered statement the suite sends to the test engine is run through
+EXPLAIN QUERY PLAN. When the plan reads a whole large table without an
+index, the test that issued it fails, so a new query (or a changed filter)
+that no index can serve is caught in CI rather than in production.
+
+SQLite's planner is not MySQL's, but a filter that no index covers shows
+up as a full scan in both. Unfiltered reads (exports, full listings) are
+deliberate and not audited.
+"""
+
+import re
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+# Tables that grow with use; full scans of the small reference tables are fine
+LARGE_TABLES = frozenset(
+    {"instagram_posts", "instagram_media", "visits", "trips", "cities", "drone_flights"}
+)
+
+# Expected full scans: statement fragment -> why no index helps
+ALLOWED_SCANS = {
+    "FROM instagram_posts WHERE instagram_posts.media_type != ?": (
+        "labeler stats count nearly every post"
+    ),
+    "WHERE instagram_media.derivatives_at IS": "derivative backfill walks all media once",
+    "lower(cities.name) LIKE lower(?)": "substring search, no B-tree index can serve it",
+    ") WHERE (SELECT min(coalesce(trips.end_date, trips.start_date))": (
+        "the visits.rebuild job recalculates every visit"
+    ),
+}
+
+_AUDITED = ("SELECT", "UPDATE", "DELETE")
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN|UPDATE) (\w+)(?: AS (\w+))?")
+# A scan with an index reads "SCAN t USING [COVERING] INDEX ix"
+_FULL_SCAN = re.compile(r"SCAN (\w+)")
+
+
+class QueryPlanAuditor:
+    """Collects full scans of large tables seen on an engine."""
+
+    def __init__(self) -> None:
+        self.violations: list[str] = []
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "after_cursor_execute", self._audit)
+
+    def _audit(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        sql = " ".join(statement.split())
+        if executemany or not sql.startswith(_AUDITED) or " WHERE " not in sql:
+            return
+        if any(fragment in sql for fragment in ALLOWED_SCANS):
+            return
+        tables = {}
+        for table, alias in _TABLE_REF.findall(sql):
+            tables[alias or table] = table
+        plan = cursor.connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        for _id, _parent, _unused, detail in plan.fetchall():
+            match = _FULL_SCAN.fullmatch(detail)
+            if match and tables.get(match[1], match[1]) in LARGE_TABLES:
+                self.violations.append(f"{detail}: {sql}")
+
+    def report(self) -> str:
+        lines = "\n".join(f"  {v}" for v in dict.fromkeys(self.violations))
+        return f"Full scans of large tables (add an index or an ALLOWED_SCANS entry):\n{lines}"
@@ -387,13 +387,17 @@ def test_accommodation_document_get_content(
 
     with patch("src.vault_storage.get_vault_storage") as mock_storage_fn:
         mock_storage = MagicMock()
-        mock_storage.read.return_value = b"%PDF-fake-content"
+        mock_storage.signed_url.return_value = "https://storage.example/signed"
         mock_storage_fn.return_value = mock_storage
 
-        res = admin_client.get(f"/api/v1/travels/accommodations/{acc.id}/document")
-        assert res.status_code == 200
-        assert res.headers["content-type"] == "application/pdf"
-        assert res.content == b"%PDF-fake-content"
+        res = admin_client.get(
+            f"/api/v1/travels/accommodations/{acc.id}/document", follow_redirects=False
+        )
+        assert res.status_code == 302
+        assert res.headers["location"] == "https://storage.example/signed"
+        mock_storage.signed_url.assert_called_once_with(
+            acc.document_path, media_type="application/pdf", download_name="booking.pdf"
+        )
 
 
 def test_accommodation_document_get_no_document(
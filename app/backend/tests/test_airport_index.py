@@ -0,0 +1,64 @@
+"""Tests for the in-memory airport reference index."""
+
+from src.travels.airport_index import AirportIndex, ReferenceAirport, airport_index
+
+
+def _airport(code: str, lat: float, lng: float) -> ReferenceAirport:
+    return ReferenceAirport(code, f"{code} Airport", "City", "XX", lat, lng, "UTC")
+
+
+def test_get_by_iata() -> None:
+    index = airport_index()
+    assert index is airport_index()
+    assert len(index) > 5000
+
+    prg = index.get(" prg")
+    assert prg is not None
+    assert prg.iata_code == "PRG"
+    assert prg.country_code == "CZ"
+    assert prg.timezone == "Europe/Prague"
+    assert 50 < prg.latitude < 50.2
+    assert index.get("ZZZ") is None
+
+
+def test_nearest_from_dataset() -> None:
+    # Prague city centre
+    nearest = airport_index().nearest(50.087, 14.421)
+    assert nearest is not None
+    assert nearest.iata_code == "PRG"
+    # Middle of the South Pacific
+    assert airport_index().nearest(-40.0, -130.0) is None
+
+
+def test_nearest_looks_past_the_first_cell() -> None:
+    index = AirportIndex(
+        [
+            # Same grid cell as the query point, but ~100 km away
+            _airport("FAR", 10.99, 10.99),
+            # Neighbouring cell, ~1 km away
+            _airport("NEA", 10.0, 9.99),
+        ]
+    )
+    nearest = index.nearest(10.0, 10.001, max_km=500)
+    assert nearest is not None
+    assert nearest.iata_code == "NEA"
+    assert index.nearest(10.0, 10.001, max_km=0.5) is None
+    assert index.nearest(40.0, 40.0) is None
+
+
+def test_nearest_across_the_antimeridian() -> None:
+    index = AirportIndex(
+        [
+            # Across the antimeridian, ~11 km from the query point
+            _airport("WST", -16.5, 179.95),
+            # Same side as the query point, ~100 km away
+            _airport("FAR", -16.5, -179.0),
+        ]
+    )
+    nearest = index.nearest(-16.5, -179.95, max_km=500)
+    assert nearest is not None
+    assert nearest.iata_code == "WST"
+
+    nearest = AirportIndex([_airport("EST", -16.5, -179.95)]).nearest(-16.5, 179.95)
+    assert nearest is not None
+    assert nearest.iata_code == "EST"
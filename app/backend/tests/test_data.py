@@ -576,3 +576,102 @@ def test_update_activities_clears_values(admin_client: TestClient, db_session: S
     assert res.status_code == 200
     assert res.json()["driving_type"] is None
     assert res.json()["drone_flown"] is None
+
+
+# ---------------------------------------------------------------------------
+# Travel snapshot (shared by /map-data, /un-countries, /tcc-destinations)
+# ---------------------------------------------------------------------------
+
+
+def test_snapshot_planned_and_territories(client: TestClient, db_session: Session) -> None:
+    """Future visits count as planned; non-UN territories get their own region."""
+    cz = _create_country(db_session, name="Czechia", iso2="CZ", iso3="CZE", iso_num="203")
+    jp = _create_country(db_session, name="Japan", iso2="JP", iso3="JPN", iso_num="392")
+    tcc_cz = _create_tcc(db_session, name="Czechia", tcc_index=1, un_country=cz)
+    tcc_jp = _create_tcc(db_session, name="Japan", tcc_index=2, un_country=jp)
+    tcc_ko = _create_tcc(db_session, name="Kosovo", tcc_index=3, map_region_code="XKX")
+    _create_visit(db_session, tcc_cz, visit_date=date(2020, 3, 15))
+    _create_visit(db_session, tcc_jp, visit_date=date(2099, 4, 1))
+    _create_visit(db_session, tcc_ko, visit_date=date(2019, 8, 1))
+    trip = _create_trip(db_session, start=date(2019, 7, 25), end=date(2019, 8, 1))
+    db_session.add(TripDestination(trip_id=trip.id, tcc_destination_id=tcc_ko.id))
+    db_session.commit()
+
+    data = client.get(f"{BASE}/map-data").json()
+    assert data["stats"]["un_visited"] == 1
+    assert data["stats"]["un_planned"] == 1
+    assert data["stats"]["tcc_visited"] == 2
+    assert data["stats"]["tcc_planned"] == 1
+    assert data["visited_map_regions"] == {"203": "2020-03-15", "XKX": "2019-08-01"}
+    assert data["visit_counts"]["XKX"] == 1
+    assert data["region_names"]["XKX"] == "Kosovo"
+    assert data["visited_countries"] == ["Czechia", "Kosovo"]
+
+    countries = {c["name"]: c for c in client.get(f"{BASE}/un-countries").json()["countries"]}
+    assert countries["Japan"]["visit_date"] is None
+    assert countries["Japan"]["planned_count"] == 1
+
+    dests = {
+        d["name"]: d for d in client.get(f"{BASE}/tcc-destinations").json()["destinations"]
+    }
+    assert dests["Japan"]["planned_count"] == 1
+    assert dests["Kosovo"]["visit_count"] == 1
+
+
+def test_snapshot_served_from_memory(client: TestClient, db_session: Session) -> None:
+    """Direct DB changes are invisible until the snapshot is invalidated."""
+    from src.travels.snapshot import invalidate_travel_snapshot
+
+    cz = _create_country(db_session, name="Czechia", iso2="CZ", iso3="CZE", iso_num="203")
+    tcc_cz = _create_tcc(db_session, name="Czechia", tcc_index=1, un_country=cz)
+    db_session.commit()
+    assert client.get(f"{BASE}/map-data").json()["stats"]["tcc_visited"] == 0
+
+    _create_visit(db_session, tcc_cz, visit_date=date(2020, 3, 15))
+    db_session.commit()
+    assert client.get(f"{BASE}/map-data").json()["stats"]["tcc_visited"] == 0
+
+    invalidate_travel_snapshot()
+    assert client.get(f"{BASE}/map-data").json()["stats"]["tcc_visited"] == 1
+
+
+def test_snapshot_invalidated_by_trip_create(
+    admin_client: TestClient, db_session: Session
+) -> None:
+    """Creating a trip through the API refreshes the public counters."""
+    cz = _create_country(db_session, name="Czechia", iso2="CZ", iso3="CZE", iso_num="203")
+    tcc_cz = _create_tcc(db_session, name="Czechia", tcc_index=1, un_country=cz)
+    db_session.commit()
+    assert admin_client.get(f"{BASE}/map-data").json()["stats"]["un_visited"] == 0
+
+    res = admin_client.post(
+        f"{BASE}/trips",
+        json={
+            "start_date": "2020-03-15",
+            "end_date": "2020-03-20",
+            "destinations": [{"tcc_destination_id": tcc_cz.id, "is_partial": False}],
+        },
+    )
+    assert res.status_code == 200
+
+    data = admin_client.get(f"{BASE}/map-data").json()
+    assert data["stats"]["un_visited"] == 1
+    assert data["visit_counts"]["203"] == 1
+
+
+def test_snapshot_invalidated_by_activities_update(
+    admin_client: TestClient, db_session: Session
+) -> None:
+    """Activity changes show up in /un-countries right away."""
+    _create_country(db_session, name="Czechia", iso2="CZ", iso3="CZE", iso_num="203")
+    db_session.commit()
+    admin_client.get(f"{BASE}/un-countries")
+
+    admin_client.patch(
+        f"{BASE}/un-countries/Czechia/activities",
+        json={"driving_type": "own", "drone_flown": True},
+    )
+
+    countries = admin_client.get(f"{BASE}/un-countries").json()["countries"]
+    assert countries[0]["driving_type"] == "own"
+    assert countries[0]["drone_flown"] is True
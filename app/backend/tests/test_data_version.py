@@ -0,0 +1,134 @@
+"""Tests for data-version ETag / conditional GET on public endpoints."""
+
+from datetime import UTC, date, datetime, timedelta
+from email.utils import format_datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.data_version import DATA_VERSION_KEY, get_data_version
+from src.models import AppSetting, TCCDestination, UNCountry, User, Visit
+
+BASE = "/api/v1/travels"
+
+
+def _make_destination(db: Session) -> TCCDestination:
+    country = UNCountry(
+        name="Czechia",
+        iso_alpha2="CZ",
+        iso_alpha3="CZE",
+        iso_numeric="203",
+        continent="Europe",
+        map_region_codes="203",
+    )
+    db.add(country)
+    db.flush()
+    tcc = TCCDestination(
+        name="Czechia", tcc_region="EUROPE & MEDITERRANEAN", tcc_index=1, un_country_id=country.id
+    )
+    db.add(tcc)
+    db.commit()
+    return tcc
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/map-data",
+        "/un-countries",
+        "/tcc-destinations",
+        "/map-cities",
+        "/map-flights",
+        "/stats",
+        "/flight-stats",
+        "/drone-stats",
+        "/photos",
+        "/photos/map",
+    ],
+)
+def test_public_endpoints_send_validators(client: TestClient, path: str) -> None:
+    res = client.get(f"{BASE}{path}")
+    assert res.status_code == 200
+    assert res.headers["etag"].startswith('W/"')
+    assert res.headers["last-modified"].endswith("GMT")
+    assert res.headers["cache-control"] == "public, no-cache"
+
+
+def test_if_none_match_returns_304(client: TestClient) -> None:
+    etag = client.get(f"{BASE}/map-data").headers["etag"]
+
+    res = client.get(f"{BASE}/map-data", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["etag"] == etag
+
+    # Strong form and lists are matched weakly
+    strong = etag.removeprefix("W/")
+    res = client.get(f"{BASE}/map-data", headers={"If-None-Match": f'"other", {strong}'})
+    assert res.status_code == 304
+
+
+def test_etag_changes_after_tracked_commit(client: TestClient, db_session: Session) -> None:
+    tcc = _make_destination(db_session)
+    etag = client.get(f"{BASE}/map-data").headers["etag"]
+
+    db_session.add(Visit(tcc_destination_id=tcc.id, first_visit_date=date(2020, 3, 15)))
+    db_session.commit()
+
+    res = client.get(f"{BASE}/map-data", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["etag"] != etag
+
+
+def test_untracked_commit_keeps_version(db_session: Session) -> None:
+    _make_destination(db_session)
+    version = get_data_version(db_session)
+
+    db_session.add(User(email="someone@test.com", name="Someone"))
+    db_session.commit()
+    assert get_data_version(db_session) == version
+
+
+def test_bulk_delete_bumps_version(db_session: Session) -> None:
+    _make_destination(db_session)
+    version = get_data_version(db_session)
+
+    db_session.query(TCCDestination).delete()
+    db_session.commit()
+    assert get_data_version(db_session) > version
+
+
+def test_rollback_discards_pending_bump(db_session: Session) -> None:
+    tcc = _make_destination(db_session)
+    version = get_data_version(db_session)
+
+    db_session.add(Visit(tcc_destination_id=tcc.id, first_visit_date=date(2020, 3, 15)))
+    db_session.flush()
+    db_session.rollback()
+    db_session.commit()
+    assert get_data_version(db_session) == version
+
+
+def test_missing_or_invalid_version_is_epoch(db_session: Session) -> None:
+    assert get_data_version(db_session).year == 1970
+    db_session.add(AppSetting(key=DATA_VERSION_KEY, value="garbage"))
+    db_session.commit()
+    assert get_data_version(db_session).year == 1970
+
+
+def test_if_modified_since(client: TestClient) -> None:
+    future = format_datetime(datetime.now(UTC) + timedelta(days=2), usegmt=True)
+    past = format_datetime(datetime(2000, 1, 1, tzinfo=UTC), usegmt=True)
+
+    assert client.get(f"{BASE}/stats", headers={"If-Modified-Since": future}).status_code == 304
+    assert client.get(f"{BASE}/stats", headers={"If-Modified-Since": past}).status_code == 200
+    assert client.get(f"{BASE}/stats", headers={"If-Modified-Since": "junk"}).status_code == 200
+
+
+def test_authenticated_responses_are_private(client: TestClient) -> None:
+    anonymous = client.get(f"{BASE}/stats")
+    authed = client.get(f"{BASE}/stats", headers={"Authorization": "Bearer nope"})
+
+    assert authed.headers["cache-control"] == "private, no-cache"
+    assert authed.headers["etag"] != anonymous.headers["etag"]
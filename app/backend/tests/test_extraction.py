@@ -1,9 +1,19 @@
 """Tests for AI document metadata extraction."""
 
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
 
-from src.extraction import ExtractionResult, extract_document_metadata, extract_flight_data
+from src import extraction
+from src.extraction import (
+    ExtractionResult,
+    FlightExtractionResult,
+    extract_any,
+    extract_document_metadata,
+    extract_flight_data,
+)
 
 
 @patch("src.extraction.settings")
@@ -251,3 +261,129 @@ def test_extract_flights_invalid_json(mock_settings: MagicMock) -> None:
 
         result = extract_flight_data(b"data", "application/pdf")
         assert result.error == "Failed to parse AI response"
+
+
+# --- Shared client, cache and concurrency limit ---
+
+
+def _answer(text: str) -> MagicMock:
+    block = MagicMock()
+    block.text = text
+    response = MagicMock()
+    response.content = [block]
+    return response
+
+
+@patch("src.extraction.settings")
+def test_same_file_is_answered_from_cache(mock_settings: MagicMock) -> None:
+    mock_settings.anthropic_api_key = "test-key"
+
+    with patch("anthropic.Anthropic") as mock_cls:
+        create = mock_cls.return_value.messages.create
+        create.return_value = _answer('{"doc_type": "eta", "label": "UK ETA"}')
+
+        first = extract_document_metadata(b"ticket", "application/pdf")
+        second = extract_document_metadata(b"ticket", "application/pdf")
+        assert first == second
+        assert create.call_count == 1
+
+        # Another file or another prompt is a new call
+        extract_document_metadata(b"other ticket", "application/pdf")
+        extract_flight_data(b"ticket", "application/pdf")
+        assert create.call_count == 3
+    # One client for every call
+    mock_cls.assert_called_once_with(api_key="test-key")
+
+
+@patch("src.extraction.settings")
+def test_failures_are_not_cached(mock_settings: MagicMock) -> None:
+    mock_settings.anthropic_api_key = "test-key"
+
+    with patch("anthropic.Anthropic") as mock_cls:
+        create = mock_cls.return_value.messages.create
+        create.side_effect = [Exception("overloaded"), _answer('{"doc_type": "eta"}')]
+
+        assert extract_document_metadata(b"ticket", "application/pdf").error is not None
+        result = extract_document_metadata(b"ticket", "application/pdf")
+        assert result.metadata is not None
+        assert create.call_count == 2
+
+
+@patch("src.extraction.settings")
+def test_concurrent_calls_are_limited(mock_settings: MagicMock) -> None:
+    mock_settings.anthropic_api_key = "test-key"
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def create(**kwargs: object) -> MagicMock:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return _answer('{"doc_type": "eta"}')
+
+    with (
+        patch("anthropic.Anthropic") as mock_cls,
+        patch.object(extraction, "_call_slots", threading.BoundedSemaphore(2)),
+        ThreadPoolExecutor(6) as pool,
+    ):
+        mock_cls.return_value.messages.create.side_effect = create
+        files = [f"file {i}".encode() for i in range(6)]
+        results = list(pool.map(lambda f: extract_document_metadata(f, "image/png"), files))
+
+    assert all(r.metadata is not None for r in results)
+    assert peak == 2
+
+
+# --- Multi-kind extraction ---
+
+
+@patch("src.extraction.settings")
+def test_extract_any_recognises_kind_in_one_call(mock_settings: MagicMock) -> None:
+    mock_settings.anthropic_api_key = "test-key"
+    answer = {"kind": "flight", "data": {"flight_number": "TK1770", "departure_iata": "IST"}}
+
+    with patch("anthropic.Anthropic") as mock_cls:
+        create = mock_cls.return_value.messages.create
+        create.return_value = _answer(json.dumps(answer))
+
+        detection = extract_any(b"ticket", "application/pdf")
+
+    assert detection.kind == "flight"
+    assert isinstance(detection.result, FlightExtractionResult)
+    assert detection.result.flights is not None
+    assert detection.result.flights[0].flight_number == "TK1770"
+    assert create.call_count == 1
+    prompt = create.call_args.kwargs["messages"][0]["content"][1]["text"]
+    for kind in ("flight", "car_rental", "transport_booking", "accommodation"):
+        assert f"### {kind} " in prompt
+
+
+@patch("src.extraction.settings")
+def test_extract_any_unrecognised(mock_settings: MagicMock) -> None:
+    mock_settings.anthropic_api_key = "test-key"
+
+    with patch("anthropic.Anthropic") as mock_cls:
+        mock_cls.return_value.messages.create.return_value = _answer('{"kind": null, "data": null}')
+        detection = extract_any(b"menu", "image/jpeg", ("accommodation", "car_rental"))
+
+    assert detection.kind is None
+    assert detection.result is None
+    assert detection.error == "Unrecognised document"
+
+
+@patch("src.extraction.settings")
+def test_extract_any_errors(mock_settings: MagicMock) -> None:
+    mock_settings.anthropic_api_key = "test-key"
+    assert extract_any(b"data", "text/plain").error == "Unsupported file type: text/plain"
+
+    with patch("anthropic.Anthropic") as mock_cls:
+        mock_cls.return_value.messages.create.side_effect = Exception("401 unauthorized")
+        assert extract_any(b"data", "application/pdf").error == "Invalid API key"
+
+    mock_settings.anthropic_api_key = ""
+    assert extract_any(b"data", "application/pdf").error == "API key not configured"
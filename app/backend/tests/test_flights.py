@@ -1,5 +1,7 @@
 """Tests for flight tracking API."""
 
+from collections.abc import Callable
+from contextlib import AbstractContextManager
 from datetime import date
 from unittest.mock import patch
 
@@ -8,6 +10,8 @@ from sqlalchemy.orm import Session
 
 from src.extraction import ExtractedFlight, FlightExtractionResult
 from src.models import Airport, Flight, Trip, UNCountry
+from src.query_stats import QueryStats
+from src.travels.airports import AirportDetails, airport_ids, iata_codes, resolve_airports
 
 
 def _create_trip(db: Session) -> Trip:
@@ -626,11 +630,9 @@ def test_extract_flights_dedup(
     assert data["flights"][1]["is_duplicate"] is False
 
 
-def test_upsert_airport_enriches_from_airportsdata(db_session: Session) -> None:
-    """_upsert_airport fills missing fields from offline airportsdata package."""
-    from src.travels.flights import _upsert_airport
-
-    airport = _upsert_airport(db_session, "BLR")
+def test_resolve_airports_enriches_from_airportsdata(db_session: Session) -> None:
+    """resolve_airports fills missing fields from offline airportsdata package."""
+    airport = resolve_airports(db_session, ["blr"])["BLR"]
     db_session.commit()
 
     assert airport.iata_code == "BLR"
@@ -642,14 +644,10 @@ def test_upsert_airport_enriches_from_airportsdata(db_session: Session) -> None:
     assert airport.timezone is not None and len(airport.timezone) > 0
 
 
-def test_upsert_airport_preserves_existing_data(db_session: Session) -> None:
-    """_upsert_airport does not overwrite data already present."""
-    from src.travels.flights import _upsert_airport
-
+def test_resolve_airports_preserves_existing_data(db_session: Session) -> None:
+    """resolve_airports does not overwrite data already present."""
     # First create with full data
-    airport = _upsert_airport(
-        db_session,
-        "DOH",
+    details = AirportDetails(
         name="Custom Name",
         city="Custom City",
         country_code="QA",
@@ -657,10 +655,11 @@ def test_upsert_airport_preserves_existing_data(db_session: Session) -> None:
         longitude=51.0,
         timezone="Asia/Qatar",
     )
+    airport = resolve_airports(db_session, ["DOH"], {"DOH": details})["DOH"]
     db_session.commit()
 
-    # Upsert again with no data — existing values should be preserved
-    airport2 = _upsert_airport(db_session, "DOH")
+    # Resolve again with no data — existing values should be preserved
+    airport2 = resolve_airports(db_session, ["DOH"])["DOH"]
     db_session.commit()
 
     assert airport2.id == airport.id
@@ -672,6 +671,26 @@ def test_upsert_airport_preserves_existing_data(db_session: Session) -> None:
     assert airport2.timezone == "Asia/Qatar"
 
 
+def test_airport_lookups_are_batched_and_cached(
+    db_session: Session, query_budget: Callable[[int], AbstractContextManager[QueryStats]]
+) -> None:
+    """One query resolves every code; known ids and codes need none."""
+    prg = _create_airport(db_session, "PRG", name="Prague", country_code="CZ")
+
+    with query_budget(2):  # one SELECT, one INSERT for the unknown airport
+        airports = resolve_airports(db_session, ["PRG", "IST", "prg"])
+    assert set(airports) == {"PRG", "IST"}
+    assert airports["PRG"].id == prg.id
+    db_session.commit()
+
+    with query_budget(1):  # IST was created here, so only PRG is known
+        ids = airport_ids(db_session, ["PRG", " ist"])
+    assert ids == {"PRG": prg.id, "IST": airports["IST"].id}
+    with query_budget(0):
+        assert airport_ids(db_session, ["PRG", "IST"]) == ids
+        assert iata_codes(db_session, ids.values()) == {v: k for k, v in ids.items()}
+
+
 def test_extract_flights_trip_not_found(admin_client: TestClient) -> None:
     """Extract endpoint returns 404 for non-existent trip."""
     res = admin_client.post(
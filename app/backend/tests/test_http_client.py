@@ -0,0 +1,46 @@
+"""Tests for the shared outbound HTTP client layer."""
+
+from unittest.mock import patch
+
+import httpx
+from fastapi.testclient import TestClient
+
+from src import http_client
+from src.main import app
+
+
+def test_sync_client_is_shared_and_recreated_after_close() -> None:
+    client = http_client.get_client()
+    assert http_client.get_client() is client
+
+    http_client.close_client()
+    assert client.is_closed
+    assert http_client.get_client() is not client
+
+
+def test_get_and_post_use_shared_client() -> None:
+    seen: list[tuple[str, str, str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, str(request.url), request.headers["user-agent"]))
+        return httpx.Response(200, json={"ok": True})
+
+    mock_client = httpx.Client(
+        transport=httpx.MockTransport(handler),
+        headers={"User-Agent": http_client.USER_AGENT},
+    )
+    with patch("src.http_client.get_client", return_value=mock_client):
+        assert http_client.get("https://example.com/a", params={"q": 1}).json() == {"ok": True}
+        assert http_client.post("https://example.com/b", json={}).status_code == 200
+    mock_client.close()
+
+    assert seen == [
+        ("GET", "https://example.com/a?q=1", http_client.USER_AGENT),
+        ("POST", "https://example.com/b", http_client.USER_AGENT),
+    ]
+
+
+def test_lifespan_closes_clients() -> None:
+    with TestClient(app):
+        client = http_client.get_client()
+    assert client.is_closed
@@ -5,7 +5,8 @@ External API endpoints (fetch, sync, fill-gaps) are excluded — they
 require mocked HTTP and are better tested via integration tests.
 """
 
-from collections.abc import Generator
+from collections.abc import Callable, Generator
+from contextlib import AbstractContextManager
 from datetime import UTC, datetime
 
 import pytest
@@ -16,6 +17,7 @@ from src.auth.session import get_admin_user
 from src.database import Base, get_db
 from src.main import app
 from src.models import InstagramMedia, InstagramPost, User
+from src.query_stats import QueryStats
 
 
 @pytest.fixture()
@@ -221,6 +223,21 @@ def test_navigation_edges(ig_client: TestClient, db_session: Session) -> None:
     assert data["next_ig_id"] is None
 
 
+def test_navigation_query_budget(
+    ig_client: TestClient,
+    db_session: Session,
+    query_budget: Callable[[int], AbstractContextManager[QueryStats]],
+) -> None:
+    """Navigation and the labeling queue don't grow with the number of posts."""
+    _create_post(db_session, "older", datetime(2025, 1, 1, tzinfo=UTC))
+    _create_post(db_session, "current", datetime(2025, 6, 1, tzinfo=UTC))
+
+    with query_budget(3):
+        assert ig_client.get("/api/v1/admin/instagram/posts/current/nav").status_code == 200
+    with query_budget(7):
+        assert ig_client.get("/api/v1/admin/instagram/posts/next").status_code == 200
+
+
 def test_navigation_not_found(ig_client: TestClient) -> None:
     """Navigation for non-existent post returns 404."""
     r = ig_client.get("/api/v1/admin/instagram/posts/ghost/nav")
@@ -317,30 +334,28 @@ def test_cover_replaces_previous(ig_client: TestClient, db_session: Session) ->
     assert new.cover_media_id == 99
 
 
-# --- Cursor storage ---
+# --- Sync checkpoints ---
 
 
-def test_cursor_file_uses_tmp() -> None:
-    """Cursor file is stored in /tmp, not in /app/data (non-root safe)."""
-    from src.admin.instagram import CURSOR_FILE
+def test_checkpoint_is_stored_in_db_without_token(db_session: Session) -> None:
+    """Sync checkpoints survive restarts and don't persist the access token."""
+    from src.admin.instagram import _checkpoint, _sync_state
+    from src.models import InstagramSyncState
 
-    # Cursor lives in /tmp — writable by non-root Docker containers
-    assert str(CURSOR_FILE).startswith("/tmp"), (
-        f"CURSOR_FILE should be in /tmp, got {CURSOR_FILE}"
+    state = _sync_state(db_session, "backfill")
+    _checkpoint(
+        db_session,
+        state,
+        cursor="https://graph.facebook.com/v24.0/1/media?access_token=secret&after=abc",
+        last_seen_at=datetime(2024, 6, 5, 14, 0, tzinfo=UTC),
     )
 
-
-def test_save_and_load_cursor() -> None:
-    """Cursor save/load round-trips correctly."""
-    from src.admin.instagram import CURSOR_FILE, _load_cursor, _save_cursor
-
-    try:
-        _save_cursor("https://example.com/next")
-        assert _load_cursor() == "https://example.com/next"
-        _save_cursor(None)
-        assert _load_cursor() is None
-    finally:
-        CURSOR_FILE.unlink(missing_ok=True)
+    db_session.expire_all()
+    stored = db_session.get(InstagramSyncState, "backfill")
+    assert stored is not None
+    assert stored.cursor == "https://graph.facebook.com/v24.0/1/media?after=abc"
+    assert stored.last_seen_at == datetime(2024, 6, 5, 14, 0)
+    assert stored.pages_scanned == 1
 
 
 # --- Auth ---
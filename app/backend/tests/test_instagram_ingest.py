@@ -0,0 +1,336 @@
+"""Tests for the pipelined Instagram ingestion (concurrency, ordering, endpoints)."""
+
+import threading
+from datetime import UTC, datetime
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.admin.instagram import IngestResult, PreparedMedia, _ingest_posts, _insert_page
+from src.models import InstagramMedia, InstagramPost, InstagramSyncState
+
+
+def _post(ig_id: str, media_type: str = "IMAGE") -> dict[str, Any]:
+    return {
+        "id": ig_id,
+        "caption": f"Caption {ig_id}",
+        "media_type": media_type,
+        "timestamp": "2024-06-05T12:00:00+0000",
+        "permalink": f"https://instagram.com/p/{ig_id}",
+    }
+
+
+def _fake_download(url: str, filename: str, storage: object) -> tuple[str, tuple[int, int], bool]:
+    return f"/data/{filename}", (1080, 1080), True
+
+
+@patch("src.admin.instagram._fetch_media_url", side_effect=lambda ig_id: f"https://cdn/{ig_id}")
+def test_downloads_run_in_parallel_and_results_keep_order(_mock_url: MagicMock) -> None:
+    # Four downloads must all be running at once to get past the barrier
+    barrier = threading.Barrier(4, timeout=5)
+
+    def download(url: str, filename: str, storage: object) -> tuple[str, None, bool]:
+        barrier.wait()
+        return f"/data/{filename}", None, False
+
+    posts = [_post(f"P{i}") for i in range(4)]
+    with patch("src.admin.instagram._download_image", side_effect=download):
+        results = list(_ingest_posts(posts, MagicMock()))
+
+    assert [r.post_data["id"] for r in results] == ["P0", "P1", "P2", "P3"]
+    assert all(r.error is None for r in results)
+    assert results[2].media[0].storage_path == "/data/P2.jpg"
+
+
+@patch("src.admin.instagram._download_image", side_effect=_fake_download)
+@patch("src.admin.instagram._fetch_media_url", return_value="https://cdn/x")
+def test_input_is_consumed_at_most_window_ahead(
+    _mock_url: MagicMock, _mock_download: MagicMock
+) -> None:
+    pulled: list[str] = []
+
+    def listing() -> Any:
+        for i in range(10):
+            pulled.append(f"P{i}")
+            yield _post(f"P{i}")
+
+    results = _ingest_posts(listing(), MagicMock(), max_in_flight=3)
+    next(results)
+    assert len(pulled) == 3
+    results.close()
+
+
+@patch("src.admin.instagram._download_image", side_effect=_fake_download)
+@patch("src.admin.instagram._fetch_carousel_children")
+@patch("src.admin.instagram._fetch_media_url")
+def test_failed_post_does_not_stop_the_run(
+    mock_url: MagicMock, mock_children: MagicMock, _mock_download: MagicMock
+) -> None:
+    mock_url.side_effect = RuntimeError("graph api down")
+    mock_children.return_value = [
+        {"id": "C1", "media_type": "IMAGE", "media_url": "https://cdn/c1"},
+        {"id": "C2", "media_type": "VIDEO", "media_url": "https://cdn/c2"},
+    ]
+
+    broken, carousel = _ingest_posts([_post("P1"), _post("P2", "CAROUSEL_ALBUM")], MagicMock())
+    assert isinstance(broken.error, RuntimeError)
+    assert carousel.error is None
+    assert [(m.ig_media_id, m.order, m.storage_path) for m in carousel.media] == [
+        ("C1", 0, "/data/C1.jpg"),
+        ("C2", 1, None),
+    ]
+
+
+@patch("src.admin.instagram.get_storage", return_value=MagicMock())
+@patch("src.admin.instagram._download_image", side_effect=_fake_download)
+@patch("src.admin.instagram._fetch_media_url", return_value="https://cdn/x")
+@patch("src.http_client.get")
+def test_sync_new_inserts_prepared_posts(
+    mock_get: MagicMock,
+    _mock_url: MagicMock,
+    _mock_download: MagicMock,
+    _mock_storage: MagicMock,
+    admin_client: TestClient,
+    db_session: Session,
+) -> None:
+    existing = _post("OLD")
+    db_session.add(
+        InstagramPost(
+            ig_id="OLD",
+            media_type="IMAGE",
+            posted_at=datetime(2020, 1, 1),
+            permalink="https://instagram.com/p/OLD",
+            fetched_at=datetime(2020, 1, 1),
+        )
+    )
+    db_session.commit()
+    page = MagicMock()
+    page.json.return_value = {"data": [_post("N1"), _post("N2"), existing]}
+    mock_get.return_value = page
+
+    with (
+        patch("src.admin.instagram.settings.instagram_account_id", "acct"),
+        patch("src.admin.instagram.settings.instagram_page_token", "token"),
+    ):
+        r = admin_client.post("/api/v1/admin/instagram/sync-new")
+
+    assert r.status_code == 200
+    assert r.json()["fetched"] == 2
+    assert r.json()["skipped"] == 1
+    media = db_session.query(InstagramMedia).order_by(InstagramMedia.ig_media_id).all()
+    assert [(m.ig_media_id, m.storage_path, m.width) for m in media] == [
+        ("N1", "/data/N1.jpg", 1080),
+        ("N2", "/data/N2.jpg", 1080),
+    ]
+    assert all(m.derivatives_at is not None for m in media)
+
+
+def _stored(db: Session, ig_id: str) -> InstagramPost:
+    post = InstagramPost(
+        ig_id=ig_id,
+        media_type="IMAGE",
+        posted_at=datetime(2024, 1, 1),
+        permalink=f"https://instagram.com/p/{ig_id}",
+        fetched_at=datetime(2024, 1, 1),
+    )
+    db.add(post)
+    db.commit()
+    return post
+
+
+@patch("src.admin.instagram.get_storage", return_value=MagicMock())
+@patch("src.admin.instagram._download_image", side_effect=_fake_download)
+@patch("src.admin.instagram._fetch_media_url", return_value="https://cdn/x")
+@patch("src.http_client.get")
+def test_fill_gaps_checks_each_page_with_one_query(
+    mock_get: MagicMock,
+    _mock_url: MagicMock,
+    _mock_download: MagicMock,
+    _mock_storage: MagicMock,
+    admin_client: TestClient,
+    db_session: Session,
+) -> None:
+    _stored(db_session, "P1")
+    _stored(db_session, "P3")
+    pages = [
+        {"data": [_post("P1"), _post("P2"), _post("P3")], "paging": {"next": "https://page2"}},
+        {"data": [_post("P4"), _post("P5")]},
+    ]
+    mock_get.side_effect = [MagicMock(json=MagicMock(return_value=p)) for p in pages]
+
+    statements: list[str] = []
+
+    def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with (
+            patch("src.admin.instagram.settings.instagram_account_id", "acct"),
+            patch("src.admin.instagram.settings.instagram_page_token", "token"),
+        ):
+            r = admin_client.get("/api/v1/admin/instagram/fill-gaps")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert r.text.rstrip().endswith('"done": true, "fetched": 3, "checked": 5, "page": 2}')
+    lookups = [s for s in statements if "instagram_posts.ig_id IN" in s]
+    assert len(lookups) == 2
+    ids = {p.ig_id for p in db_session.query(InstagramPost)}
+    assert ids == {"P1", "P2", "P3", "P4", "P5"}
+
+
+def test_insert_page_skips_posts_inserted_concurrently(db_session: Session) -> None:
+    media = [PreparedMedia("M", "IMAGE", 0, "/data/M.jpg", (10, 10), False)]
+    prepared = [IngestResult(_post(ig_id), media, None) for ig_id in ("A", "B")]
+    _stored(db_session, "A")  # another run got there first
+
+    assert _insert_page(db_session, prepared) == 1
+    b = db_session.query(InstagramPost).filter(InstagramPost.ig_id == "B").one()
+    assert [m.storage_path for m in b.media] == ["/data/M.jpg"]
+
+
+def _page(posts: list[dict[str, Any]], next_url: str | None = None) -> MagicMock:
+    body: dict[str, Any] = {"data": posts}
+    if next_url:
+        body["paging"] = {"next": next_url}
+    return MagicMock(json=MagicMock(return_value=body))
+
+
+def _configured() -> Any:
+    return patch.multiple(
+        "src.admin.instagram.settings", instagram_account_id="acct", instagram_page_token="token"
+    )
+
+
+@patch("src.admin.instagram.get_storage", return_value=MagicMock())
+@patch("src.admin.instagram._download_image", side_effect=_fake_download)
+@patch("src.admin.instagram._fetch_media_url", return_value="https://cdn/x")
+@patch("src.http_client.get")
+def test_fetch_starts_below_oldest_post_without_checkpoint(
+    mock_get: MagicMock,
+    _mock_url: MagicMock,
+    _mock_download: MagicMock,
+    _mock_storage: MagicMock,
+    admin_client: TestClient,
+    db_session: Session,
+) -> None:
+    _stored(db_session, "NEWEST")  # posted 2024-01-01
+    mock_get.return_value = _page(
+        [_post("O1"), _post("O2")], "https://graph/next?access_token=token&after=X"
+    )
+
+    with _configured():
+        r = admin_client.post("/api/v1/admin/instagram/fetch", params={"count": 2})
+
+    assert r.json()["fetched"] == 2
+    # No calibration crawl: straight to posts older than ours
+    first_params = mock_get.call_args_list[0].kwargs["params"]
+    assert first_params["until"] == int(datetime(2024, 1, 1, tzinfo=UTC).timestamp()) + 1
+    state = db_session.get(InstagramSyncState, "backfill")
+    assert state is not None
+    assert state.cursor == "https://graph/next?after=X"
+    assert state.pages_scanned == 1
+
+
+@patch("src.admin.instagram.get_storage", return_value=MagicMock())
+@patch("src.admin.instagram._download_image", side_effect=_fake_download)
+@patch("src.admin.instagram._fetch_media_url", return_value="https://cdn/x")
+@patch("src.http_client.get")
+def test_fetch_resumes_from_saved_cursor(
+    mock_get: MagicMock,
+    _mock_url: MagicMock,
+    _mock_download: MagicMock,
+    _mock_storage: MagicMock,
+    admin_client: TestClient,
+    db_session: Session,
+) -> None:
+    db_session.add(
+        InstagramSyncState(name="backfill", cursor="https://graph/next?after=X", pages_scanned=3)
+    )
+    db_session.commit()
+    mock_get.return_value = _page([_post("O3")])
+
+    with _configured():
+        r = admin_client.post("/api/v1/admin/instagram/fetch")
+
+    assert r.json()["fetched"] == 1
+    assert mock_get.call_args.args[0] == "https://graph/next?after=X"
+    assert mock_get.call_args.kwargs["params"] == {"access_token": "token"}
+    db_session.expire_all()
+    state = db_session.get(InstagramSyncState, "backfill")
+    assert state is not None
+    assert state.pages_scanned == 4
+    # Last page had no next link: history is complete, later runs don't call the API
+    assert state.completed_at is not None
+    mock_get.reset_mock()
+    with _configured():
+        r = admin_client.post("/api/v1/admin/instagram/fetch")
+    assert r.json()["fetched"] == 0
+    mock_get.assert_not_called()
+
+
+@patch("src.admin.instagram.get_storage", return_value=MagicMock())
+@patch("src.admin.instagram._download_image", side_effect=_fake_download)
+@patch("src.admin.instagram._fetch_media_url", return_value="https://cdn/x")
+@patch("src.http_client.get")
+def test_fetch_stopping_mid_page_resumes_by_time(
+    mock_get: MagicMock,
+    _mock_url: MagicMock,
+    _mock_download: MagicMock,
+    _mock_storage: MagicMock,
+    admin_client: TestClient,
+    db_session: Session,
+) -> None:
+    first = _post("O1") | {"timestamp": "2023-05-01T10:00:00+0000"}
+    mock_get.return_value = _page([first, _post("O2")], "https://graph/next?after=X")
+
+    with _configured():
+        r = admin_client.post("/api/v1/admin/instagram/fetch", params={"count": 1})
+
+    assert r.json()["fetched"] == 1
+    state = db_session.get(InstagramSyncState, "backfill")
+    assert state is not None
+    # O2 wasn't taken, so the next run must not skip ahead to the next page
+    assert state.cursor is None
+    assert state.last_seen_at == datetime(2023, 5, 1, 10, 0)
+
+
+@patch("src.admin.instagram.get_storage", return_value=MagicMock())
+@patch("src.admin.instagram._download_image", side_effect=_fake_download)
+@patch("src.admin.instagram._fetch_media_url", return_value="https://cdn/x")
+@patch("src.http_client.get")
+def test_fill_gaps_continues_an_interrupted_scan(
+    mock_get: MagicMock,
+    _mock_url: MagicMock,
+    _mock_download: MagicMock,
+    _mock_storage: MagicMock,
+    admin_client: TestClient,
+    db_session: Session,
+) -> None:
+    mock_get.side_effect = [
+        _page([_post("P1")], "https://graph/page2?access_token=token"),
+        _page([_post("P2")]),
+    ]
+
+    with _configured():
+        admin_client.get("/api/v1/admin/instagram/fill-gaps", params={"max_pages": 1})
+        state = db_session.get(InstagramSyncState, "fill_gaps")
+        assert state is not None
+        assert state.cursor == "https://graph/page2"
+        assert state.completed_at is None
+
+        admin_client.get("/api/v1/admin/instagram/fill-gaps")
+
+    assert mock_get.call_args.args[0] == "https://graph/page2"
+    db_session.expire_all()
+    state = db_session.get(InstagramSyncState, "fill_gaps")
+    assert state is not None
+    assert state.cursor is None
+    assert state.completed_at is not None
+    assert state.pages_scanned == 2
+    assert {p.ig_id for p in db_session.query(InstagramPost)} == {"P1", "P2"}
@@ -0,0 +1,312 @@
+"""Tests for the DB-backed background job queue."""
+
+import threading
+from collections.abc import Callable, Generator
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+
+from src import jobs
+from src.jobs import JobContext, JobError, enqueue, job_handler, run_next_job
+from src.main import app
+from src.models import Job, NMRegion
+
+from .test_upload import _make_xlsx
+
+
+@pytest.fixture()
+def factory(db_session: Session) -> Callable[[], Session]:
+    return sessionmaker(bind=db_session.get_bind())
+
+
+@pytest.fixture()
+def handler() -> Generator[MagicMock, None, None]:
+    """A mock registered as the handler for the "test.op" kind."""
+    mock = MagicMock(return_value={"ok": True})
+    job_handler("test.op")(mock)
+    yield mock
+    jobs._handlers.pop("test.op", None)
+
+
+def _reload(db: Session, job: Job) -> Job:
+    db.expire_all()
+    reloaded = db.get(Job, job.id)
+    assert reloaded is not None
+    return reloaded
+
+
+def _make_due(db: Session, job: Job) -> None:
+    job.run_after = jobs._now() - timedelta(seconds=1)
+    db.commit()
+
+
+def test_enqueue_and_run(
+    handler: MagicMock, db_session: Session, factory: Callable[[], Session]
+) -> None:
+    job = enqueue(db_session, "test.op", {"n": 1}, payload=b"data")
+
+    assert run_next_job(factory) is True
+    ctx = handler.call_args.args[0]
+    assert ctx.params == {"n": 1}
+    assert ctx.payload == b"data"
+
+    job = _reload(db_session, job)
+    assert job.status == "succeeded"
+    assert job.attempts == 1
+    assert job.result == {"ok": True}
+    assert job.payload is None
+    assert job.finished_at is not None
+    assert run_next_job(factory) is False
+
+
+def test_unknown_kind_rejected(db_session: Session) -> None:
+    with pytest.raises(ValueError):
+        enqueue(db_session, "no.such.kind")
+
+
+def test_failure_retries_with_backoff(
+    handler: MagicMock, db_session: Session, factory: Callable[[], Session]
+) -> None:
+    handler.side_effect = RuntimeError("upstream down")
+    job = enqueue(db_session, "test.op")
+
+    assert run_next_job(factory) is True
+    job = _reload(db_session, job)
+    assert job.status == "queued"
+    assert job.attempts == 1
+    assert job.error == "RuntimeError: upstream down"
+    delay = (job.run_after - jobs._now()).total_seconds()
+    assert 25 < delay <= 30
+
+    # Not due yet
+    assert run_next_job(factory) is False
+
+    _make_due(db_session, job)
+    run_next_job(factory)
+    job = _reload(db_session, job)
+    assert job.attempts == 2
+    assert 55 < (job.run_after - jobs._now()).total_seconds() <= 60
+
+    _make_due(db_session, job)
+    run_next_job(factory)
+    job = _reload(db_session, job)
+    assert job.status == "failed"
+    assert job.attempts == 3
+    assert handler.call_count == 3
+
+
+def test_job_error_fails_immediately(
+    handler: MagicMock, db_session: Session, factory: Callable[[], Session]
+) -> None:
+    handler.side_effect = JobError("bad file")
+    job = enqueue(db_session, "test.op")
+
+    run_next_job(factory)
+    job = _reload(db_session, job)
+    assert job.status == "failed"
+    assert job.attempts == 1
+    assert job.error == "JobError: bad file"
+
+
+def test_stale_running_job_is_reclaimed(
+    handler: MagicMock, db_session: Session, factory: Callable[[], Session]
+) -> None:
+    job = enqueue(db_session, "test.op")
+    job.status = "running"
+    job.attempts = 1
+    job.locked_by = "gone:1"
+    job.heartbeat_at = jobs._now() - jobs.STALE_AFTER - timedelta(seconds=1)
+    db_session.commit()
+
+    assert run_next_job(factory) is True
+    job = _reload(db_session, job)
+    assert job.status == "succeeded"
+    assert job.attempts == 2
+
+
+def test_fresh_running_job_is_left_alone(
+    handler: MagicMock, db_session: Session, factory: Callable[[], Session]
+) -> None:
+    job = enqueue(db_session, "test.op")
+    job.status = "running"
+    job.heartbeat_at = jobs._now()
+    db_session.commit()
+
+    assert run_next_job(factory) is False
+    handler.assert_not_called()
+
+
+def test_stale_job_out_of_attempts_fails(
+    handler: MagicMock, db_session: Session, factory: Callable[[], Session]
+) -> None:
+    job = enqueue(db_session, "test.op", max_attempts=1)
+    job.status = "running"
+    job.attempts = 1
+    job.heartbeat_at = jobs._now() - jobs.STALE_AFTER - timedelta(seconds=1)
+    db_session.commit()
+
+    assert run_next_job(factory) is False
+    job = _reload(db_session, job)
+    assert job.status == "failed"
+    assert job.error == "Worker stopped responding"
+
+
+def test_report_publishes_progress(
+    handler: MagicMock, db_session: Session, factory: Callable[[], Session]
+) -> None:
+    seen: list[dict] = []
+
+    def run(ctx: JobContext) -> None:
+        ctx.report(page=1)
+        with factory() as other:
+            row = other.get(Job, ctx.job_id)
+            assert row is not None
+            seen.append(row.progress or {})
+
+    handler.side_effect = run
+    job = enqueue(db_session, "test.op")
+    run_next_job(factory)
+
+    assert seen == [{"page": 1}]
+    assert _reload(db_session, job).progress == {"page": 1}
+
+
+def test_nm_import_job(db_session: Session, factory: Callable[[], Session]) -> None:
+    xlsx = _make_xlsx([["Czechia – Prague", 1, 2015, 2025], ["Czechia – Brno", 0, None, None]])
+    job = enqueue(db_session, "nm.import", payload=xlsx)
+
+    run_next_job(factory)
+    job = _reload(db_session, job)
+    assert job.status == "succeeded"
+    assert job.result is not None
+    assert job.result["visited"] == 1
+    assert db_session.query(NMRegion).count() == 2
+
+
+def test_nm_import_job_bad_file_is_permanent(
+    db_session: Session, factory: Callable[[], Session]
+) -> None:
+    job = enqueue(db_session, "nm.import", payload=b"not a workbook")
+
+    run_next_job(factory)
+    job = _reload(db_session, job)
+    assert job.status == "failed"
+    assert job.error == "JobError: Invalid XLSX file"
+
+
+def test_instagram_job_without_config_fails(
+    db_session: Session, factory: Callable[[], Session]
+) -> None:
+    job = enqueue(db_session, "instagram.sync_new", {"max_pages": 1})
+
+    with patch("src.admin.instagram.settings.instagram_page_token", ""):
+        run_next_job(factory)
+    job = _reload(db_session, job)
+    assert job.status == "failed"
+    assert "not configured" in (job.error or "")
+
+
+# --- API ---
+
+
+def test_submit_and_poll_job(
+    handler: MagicMock,
+    admin_client: TestClient,
+    db_session: Session,
+    factory: Callable[[], Session],
+) -> None:
+    res = admin_client.post("/api/v1/admin/jobs", json={"kind": "test.op", "params": {"n": 2}})
+    assert res.status_code == 202
+    job_id = res.json()["id"]
+    assert res.json()["status"] == "queued"
+
+    run_next_job(factory)
+
+    res = admin_client.get(f"/api/v1/admin/jobs/{job_id}")
+    assert res.status_code == 200
+    assert res.json()["status"] == "succeeded"
+    assert res.json()["result"] == {"ok": True}
+
+    res = admin_client.get("/api/v1/admin/jobs", params={"status": "succeeded"})
+    assert [j["id"] for j in res.json()["jobs"]] == [job_id]
+
+
+def test_submit_unknown_kind(admin_client: TestClient) -> None:
+    res = admin_client.post("/api/v1/admin/jobs", json={"kind": "nope"})
+    assert res.status_code == 400
+
+
+def test_get_missing_job(admin_client: TestClient) -> None:
+    assert admin_client.get("/api/v1/admin/jobs/999").status_code == 404
+
+
+def test_upload_job(admin_client: TestClient, db_session: Session) -> None:
+    res = admin_client.post(
+        "/api/v1/admin/jobs/upload",
+        data={"kind": "drones.flight_record"},
+        files={"file": ("DJIFlightRecord_2025-01-01.txt", b"\x00\x01", "text/plain")},
+    )
+    assert res.status_code == 202
+    job = db_session.get(Job, res.json()["id"])
+    assert job is not None
+    assert job.payload == b"\x00\x01"
+    assert job.params == {"filename": "DJIFlightRecord_2025-01-01.txt", "is_test": False}
+
+    res = admin_client.post(
+        "/api/v1/admin/jobs/upload",
+        data={"kind": "nm.import"},
+        files={"file": ("empty.xlsx", b"", "application/octet-stream")},
+    )
+    assert res.status_code == 400
+
+
+def test_events_stream_until_finished(
+    handler: MagicMock,
+    admin_client: TestClient,
+    db_session: Session,
+    factory: Callable[[], Session],
+) -> None:
+    job = enqueue(db_session, "test.op")
+    worker = threading.Timer(0.2, run_next_job, args=(factory,))
+    worker.start()
+
+    with patch("src.admin.jobs.EVENTS_POLL_INTERVAL", 0.05):
+        res = admin_client.get(f"/api/v1/admin/jobs/{job.id}/events")
+    worker.join(5)
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    events = [line for line in res.text.splitlines() if line.startswith("data: ")]
+    assert '"status":"queued"' in events[0]
+    assert '"status":"succeeded"' in events[-1]
+
+
+def test_events_stream_gives_up_on_a_stuck_job(
+    handler: MagicMock, admin_client: TestClient, db_session: Session
+) -> None:
+    # Nobody runs the job, so it stays queued
+    job = enqueue(db_session, "test.op")
+
+    with (
+        patch("src.admin.jobs.EVENTS_POLL_INTERVAL", 0.05),
+        patch("src.admin.jobs.EVENTS_MAX_DURATION", 0.2),
+    ):
+        res = admin_client.get(f"/api/v1/admin/jobs/{job.id}/events")
+
+    assert res.status_code == 200
+    lines = res.text.splitlines()
+    assert "event: timeout" in lines
+    assert '"status":"queued"' in lines[lines.index("event: timeout") + 1]
+
+
+def test_lifespan_runs_job_worker() -> None:
+    ran = threading.Event()
+    with (
+        patch("src.main.settings.job_poll_interval", 3600),
+        patch("src.jobs.run_pending_jobs", side_effect=lambda: ran.set()),
+        TestClient(app),
+    ):
+        assert ran.wait(5)
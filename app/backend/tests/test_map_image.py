@@ -1,16 +1,36 @@
 """Tests for the travel map OG preview image endpoint."""
 
 from datetime import date
+from io import BytesIO
+from unittest.mock import patch
 
+import numpy as np
+import pytest
 from fastapi.testclient import TestClient
+from PIL import Image
 from sqlalchemy.orm import Session
 
-from src.models import TCCDestination, Trip, TripDestination, UNCountry, Visit
+from src.models import (
+    Airport,
+    DroneFlight,
+    Flight,
+    TCCDestination,
+    Trip,
+    TripDestination,
+    UNCountry,
+    Visit,
+)
 from src.travels.map_image import (
+    MAP_SIZES,
+    _base_map,
+    _cache,
+    _country_rings,
     _decode_arcs,
     _hsl_to_rgb,
     _load_topo,
     _normalize_ring,
+    _project,
+    _render_map,
     _resolve_geometry,
     _resolve_ring,
     _visit_color,
@@ -44,25 +64,35 @@ def test_decode_arcs() -> None:
         assert -90.0 <= lat <= 90.0
 
 
+def test_decode_arcs_matches_running_sum() -> None:
+    """Every arc restarts its delta sum, not just the first one."""
+    topo = {
+        "arcs": [[[10, 20], [1, 1]], [[5, 5], [2, -1], [1, 1]]],
+        "transform": {"scale": [0.5, 2.0], "translate": [-1.0, 1.0]},
+    }
+    arcs = _decode_arcs(topo)
+    assert arcs[0].tolist() == [[4.0, 41.0], [4.5, 43.0]]
+    assert arcs[1].tolist() == [[1.5, 11.0], [2.5, 9.0], [3.0, 11.0]]
+
+
 def test_resolve_ring() -> None:
     """Ring resolution concatenates arcs, handling reversed refs."""
     arcs = [
-        [(0.0, 0.0), (1.0, 1.0), (2.0, 2.0)],
-        [(3.0, 3.0), (4.0, 4.0)],
+        np.array([(0.0, 0.0), (1.0, 1.0), (2.0, 2.0)]),
+        np.array([(2.0, 2.0), (3.0, 3.0), (4.0, 4.0)]),
     ]
-    # Forward reference
+    # Forward reference; the shared join point is not duplicated
     ring = _resolve_ring([0, 1], arcs)
-    assert ring[0] == (0.0, 0.0)
-    assert ring[-1] == (4.0, 4.0)
+    assert ring.tolist() == [[0.0, 0.0], [1.0, 1.0], [2.0, 2.0], [3.0, 3.0], [4.0, 4.0]]
     # Negative reference = reversed arc (index ~(-1) = 0)
     ring2 = _resolve_ring([-1], arcs)
-    assert ring2[0] == (2.0, 2.0)
-    assert ring2[-1] == (0.0, 0.0)
+    assert ring2[0].tolist() == [2.0, 2.0]
+    assert ring2[-1].tolist() == [0.0, 0.0]
 
 
 def test_resolve_geometry_polygon() -> None:
     """Polygon geometry resolves to list of rings."""
-    arcs = [[(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 0.0)]]
+    arcs = [np.array([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 0.0)])]
     geom = {"type": "Polygon", "arcs": [[0]]}
     rings = _resolve_geometry(geom, arcs)
     assert len(rings) == 1
@@ -72,8 +102,8 @@ def test_resolve_geometry_polygon() -> None:
 def test_resolve_geometry_multipolygon() -> None:
     """MultiPolygon geometry resolves to multiple rings."""
     arcs = [
-        [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 0.0)],
-        [(5.0, 5.0), (6.0, 5.0), (6.0, 6.0), (5.0, 5.0)],
+        np.array([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 0.0)]),
+        np.array([(5.0, 5.0), (6.0, 5.0), (6.0, 6.0), (5.0, 5.0)]),
     ]
     geom = {"type": "MultiPolygon", "arcs": [[[0]], [[1]]]}
     rings = _resolve_geometry(geom, arcs)
@@ -87,20 +117,22 @@ def test_resolve_geometry_multipolygon() -> None:
 
 def test_normalize_ring_no_crossing() -> None:
     """Non-crossing ring is returned unchanged."""
-    ring = [(10.0, 50.0), (20.0, 50.0), (20.0, 60.0), (10.0, 50.0)]
+    ring = np.array([(10.0, 50.0), (20.0, 50.0), (20.0, 60.0), (10.0, 50.0)])
     assert _normalize_ring(ring) is ring  # same object, no copy
 
 
 def test_normalize_ring_crossing() -> None:
     """Antimeridian-crossing ring shifts negative lons to positive."""
-    ring = [(170.0, 60.0), (175.0, 65.0), (-170.0, 65.0), (-175.0, 60.0)]
+    ring = np.array([(170.0, 60.0), (175.0, 65.0), (-170.0, 65.0), (-175.0, 60.0)])
     normalized = _normalize_ring(ring)
     # -170 should become 190, -175 should become 185
-    assert normalized[2] == (190.0, 65.0)
-    assert normalized[3] == (185.0, 60.0)
+    assert normalized[2].tolist() == [190.0, 65.0]
+    assert normalized[3].tolist() == [185.0, 60.0]
     # Positive lons unchanged
-    assert normalized[0] == (170.0, 60.0)
-    assert normalized[1] == (175.0, 65.0)
+    assert normalized[0].tolist() == [170.0, 60.0]
+    assert normalized[1].tolist() == [175.0, 65.0]
+    # Input is not modified
+    assert ring[2].tolist() == [-170.0, 65.0]
 
 
 # ---------------------------------------------------------------------------
@@ -190,6 +222,123 @@ def test_og_map_with_visits(client: TestClient, db_session: Session) -> None:
     assert r.content[:4] == b"\x89PNG"
 
 
+def test_render_repaints_only_visited_countries() -> None:
+    """Visited countries are painted over a shared, untouched base layer."""
+    base = _base_map()
+    base_pixels = base.tobytes()
+    assert _base_map() is base
+
+    # Czechia (203): sample the middle of its first ring
+    cz = _country_rings()["203"][0]
+    x, y = (int(v) for v in cz.mean(axis=0))
+    rendered = Image.open(BytesIO(_render_map({"203": (date(2020, 1, 1), 3)}))).convert("RGB")
+
+    assert rendered.getpixel((x, y)) == _visit_color(date(2020, 1, 1), date(2020, 1, 1), 3)
+    assert base.getpixel((x, y)) == (230, 233, 236)
+    assert base.tobytes() == base_pixels
+
+
+def test_render_map_sizes_scale_geometry() -> None:
+    """Size presets render at their dimensions, with rings projected per size."""
+    small = Image.open(BytesIO(_render_map({}, size="thumbnail")))
+    assert small.size == MAP_SIZES["thumbnail"]
+
+    og_ring = _country_rings()["203"][0]
+    retina_ring = _country_rings(MAP_SIZES["retina"])["203"][0]
+    assert np.allclose(retina_ring, og_ring * 2, atol=0.01)
+
+
+def test_render_map_draws_flight_and_drone_layers() -> None:
+    """Routes and drone points are drawn over the map."""
+    route = np.array([[0.0, 0.0], [40.0, 0.0]])  # along the equator, mostly ocean
+    drone = np.array([[-30.0, -40.0]])  # South Atlantic
+    mid_x, mid_y = _project(np.array([[20.0, 0.0]]))[0]
+    dot_x, dot_y = _project(drone)[0]
+
+    plain = Image.open(BytesIO(_render_map({}))).convert("RGB")
+    layered = Image.open(BytesIO(_render_map({}, routes=[route], drone_points=drone))).convert(
+        "RGB"
+    )
+
+    assert plain.getpixel((int(mid_x), int(mid_y))) != (214, 96, 44)
+    assert layered.getpixel((int(mid_x), int(mid_y))) == (214, 96, 44)
+    assert layered.getpixel((int(dot_x), int(dot_y))) == (128, 64, 160)
+
+
+@pytest.mark.parametrize(
+    ("fmt", "media_type", "pil_format"),
+    [("png", "image/png", "PNG"), ("webp", "image/webp", "WEBP")],
+)
+def test_og_map_formats(client: TestClient, fmt: str, media_type: str, pil_format: str) -> None:
+    """The map is served in each supported format."""
+    r = client.get(f"/api/v1/travels/og/map.{fmt}", params={"size": "twitter"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == media_type
+    image = Image.open(BytesIO(r.content))
+    assert image.format == pil_format
+    assert image.size == (1200, 600)
+
+
+@pytest.mark.parametrize(
+    ("path", "params", "status"),
+    [
+        ("/og/map.gif", {}, 404),
+        ("/og/map.png", {"size": "huge"}, 400),
+        ("/og/map.png", {"layers": "regions,cities"}, 400),
+        ("/og/map.png", {"layers": ","}, 400),
+    ],
+)
+def test_og_map_invalid_params(
+    client: TestClient, path: str, params: dict[str, str], status: int
+) -> None:
+    assert client.get(f"/api/v1/travels{path}", params=params).status_code == status
+
+
+def test_og_map_layers_use_flights_and_drones(client: TestClient, db_session: Session) -> None:
+    """flights/drones layers load past routes and public drone takeoffs."""
+    prg = Airport(iata_code="PRG", latitude=50.1, longitude=14.26)
+    nrt = Airport(iata_code="NRT", latitude=35.76, longitude=140.39)
+    trip = Trip(start_date=date(2023, 5, 1), end_date=date(2023, 5, 10))
+    db_session.add_all([prg, nrt, trip])
+    db_session.flush()
+    db_session.add_all(
+        [
+            Flight(
+                trip_id=trip.id,
+                flight_date=date(2023, 5, 1),
+                flight_number="OK50",
+                departure_airport_id=prg.id,
+                arrival_airport_id=nrt.id,
+            ),
+            DroneFlight(flight_date=date(2023, 5, 2), latitude=35.0, longitude=139.0),
+            DroneFlight(flight_date=date(2023, 5, 3), latitude=1.0, longitude=1.0, is_hidden=True),
+        ]
+    )
+    db_session.commit()
+    _cache.clear()
+
+    with patch("src.travels.map_image._render_map", return_value=b"img") as render:
+        r = client.get("/api/v1/travels/og/map.png", params={"layers": "flights,drones"})
+    assert r.status_code == 200
+    _, kwargs = render.call_args
+    assert render.call_args.args[0] == {}
+    assert len(kwargs["routes"]) == 1
+    assert kwargs["drone_points"].tolist() == [[139.0, 35.0]]
+    _cache.clear()
+
+
+def test_og_map_variants_cached_separately(client: TestClient) -> None:
+    """Each variant renders once; repeat requests are served from the cache."""
+    _cache.clear()
+    with patch("src.travels.map_image._render_map", return_value=b"img") as render:
+        for _ in range(2):
+            client.get("/api/v1/travels/og/map.png")
+            client.get("/api/v1/travels/og/map.webp")
+            client.get("/api/v1/travels/og/map.png", params={"size": "thumbnail"})
+    assert render.call_count == 3
+    _cache.clear()
+
+
 # ---------------------------------------------------------------------------
 # OG tags for /travels include map image
 # ---------------------------------------------------------------------------
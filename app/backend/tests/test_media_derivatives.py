@@ -0,0 +1,208 @@
+"""Tests for resized Instagram photo copies (generation, backfill, serving)."""
+
+from collections.abc import Generator
+from datetime import UTC, datetime
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import ExifTags, Image
+from sqlalchemy.orm import Session
+
+from src.admin.instagram import _download_image
+from src.media_derivatives import backfill_derivatives, generate_derivatives
+from src.models import InstagramMedia, InstagramPost
+from src.storage import LocalStorage
+
+
+def _jpeg(width: int, height: int, orientation: int = 1) -> bytes:
+    buf = BytesIO()
+    image = Image.new("RGB", (width, height), (200, 120, 40))
+    exif = image.getexif()
+    exif[ExifTags.Base.Orientation] = orientation
+    image.save(buf, format="JPEG", exif=exif)
+    return buf.getvalue()
+
+
+@pytest.fixture()
+def storage(tmp_path: Path) -> LocalStorage:
+    return LocalStorage(tmp_path)
+
+
+def _media(
+    db: Session,
+    storage_path: str,
+    *,
+    ig_media_id: str = "M1",
+    width: int | None = 1440,
+    derived: bool = False,
+) -> InstagramMedia:
+    post = InstagramPost(
+        ig_id=f"P_{ig_media_id}",
+        media_type="IMAGE",
+        posted_at=datetime(2024, 6, 5),
+        permalink=f"https://instagram.com/p/{ig_media_id}",
+        fetched_at=datetime(2024, 6, 5),
+        labeled_at=datetime(2024, 7, 1),
+    )
+    db.add(post)
+    db.flush()
+    media = InstagramMedia(
+        post_id=post.id,
+        ig_media_id=ig_media_id,
+        media_type="IMAGE",
+        storage_path=storage_path,
+        width=width,
+        height=width,
+        derivatives_at=datetime.now(UTC) if derived else None,
+    )
+    db.add(media)
+    db.commit()
+    return media
+
+
+def test_generate_derivatives_widths_and_formats(storage: LocalStorage) -> None:
+    assert generate_derivatives(_jpeg(1440, 960), "M1", storage) == [320, 640, 1280]
+
+    for width in (320, 640, 1280):
+        with Image.open(storage.base_path / f"M1_w{width}.webp") as webp:
+            assert webp.format == "WEBP"
+            assert webp.size == (width, round(width * 960 / 1440))
+        with Image.open(storage.base_path / f"M1_w{width}.jpg") as jpeg:
+            assert jpeg.format == "JPEG"
+
+
+def test_small_original_gets_no_derivatives(storage: LocalStorage) -> None:
+    assert generate_derivatives(_jpeg(300, 300), "tiny", storage) == []
+    assert list(storage.base_path.iterdir()) == []
+
+
+def test_backfill_processes_in_batches(db_session: Session, storage: LocalStorage) -> None:
+    for i in range(3):
+        path = storage.save(f"M{i}.jpg", _jpeg(800, 600))
+        _media(db_session, path, ig_media_id=f"M{i}")
+    missing = _media(db_session, str(storage.base_path / "gone.jpg"), ig_media_id="gone")
+
+    assert backfill_derivatives(db_session, storage, limit=10, batch_size=2) == (3, 1)
+    assert storage.exists("M2_w640.webp")
+    assert missing.derivatives_at is None
+    done = db_session.query(InstagramMedia).filter(InstagramMedia.derivatives_at.isnot(None))
+    assert done.count() == 3
+
+    # Already processed media are not picked up again
+    assert backfill_derivatives(db_session, storage, limit=10) == (0, 1)
+
+
+def test_backfill_stores_rotated_dimensions(db_session: Session, storage: LocalStorage) -> None:
+    # Stored before dimensions honoured EXIF: raw landscape size, displayed portrait
+    path = storage.save("M1.jpg", _jpeg(1440, 1080, orientation=6))
+    media = _media(db_session, path)
+
+    assert backfill_derivatives(db_session, storage, limit=10) == (1, 0)
+    assert (media.width, media.height) == (1080, 1440)
+    assert not storage.exists("M1_w1280.jpg")
+
+
+def test_backfill_endpoint_reports_remaining(
+    admin_client: TestClient, db_session: Session, storage: LocalStorage
+) -> None:
+    for i in range(3):
+        _media(db_session, storage.save(f"M{i}.jpg", _jpeg(800, 600)), ig_media_id=f"M{i}")
+
+    with patch("src.admin.instagram.get_storage", return_value=storage):
+        r = admin_client.post("/api/v1/admin/instagram/derivatives/backfill", params={"limit": 2})
+    assert r.status_code == 200
+    assert r.json() == {"processed": 2, "failed": 0, "remaining": 1}
+
+
+@pytest.fixture()
+def gcs_media(db_session: Session) -> Generator[InstagramMedia, None, None]:
+    yield _media(
+        db_session,
+        "https://storage.googleapis.com/bucket/instagram/M1.jpg",
+        width=1080,
+        derived=True,
+    )
+
+
+def test_size_redirects_to_smallest_covering_derivative(
+    client: TestClient, gcs_media: InstagramMedia
+) -> None:
+    url = f"/api/v1/travels/photos/media/{gcs_media.id}"
+    base = "https://storage.googleapis.com/bucket/instagram"
+
+    r = client.get(
+        url, params={"size": 500}, headers={"Accept": "image/webp,*/*"}, follow_redirects=False
+    )
+    assert r.status_code == 302
+    assert r.headers["location"] == f"{base}/M1_w640.webp"
+    assert r.headers["vary"] == "Accept"
+
+    r = client.get(url, params={"size": 500}, follow_redirects=False)
+    assert r.headers["location"] == f"{base}/M1_w640.jpg"
+
+    # Wider than any derivative (1280 >= 1080 original is not stored): original
+    r = client.get(url, params={"size": 1100}, follow_redirects=False)
+    assert r.headers["location"] == f"{base}/M1.jpg"
+    assert r.headers["location"] == client.get(url, follow_redirects=False).headers["location"]
+
+
+def test_size_ignored_without_derivatives(client: TestClient, db_session: Session) -> None:
+    media = _media(db_session, "https://storage.googleapis.com/b/instagram/M1.jpg")
+    r = client.get(
+        f"/api/v1/travels/photos/media/{media.id}", params={"size": 320}, follow_redirects=False
+    )
+    assert r.headers["location"].endswith("/M1.jpg")
+
+
+def test_local_derivative_served_with_media_type(
+    admin_client: TestClient, db_session: Session, storage: LocalStorage
+) -> None:
+    path = storage.save("M1.jpg", _jpeg(800, 600))
+    generate_derivatives(_jpeg(800, 600), "M1", storage)
+    media = _media(db_session, path, width=800, derived=True)
+
+    r = admin_client.get(
+        f"/api/v1/admin/instagram/media/{media.id}",
+        params={"size": 300},
+        headers={"Accept": "image/avif,image/webp"},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/webp"
+    assert Image.open(BytesIO(r.content)).width == 320
+
+
+@patch("src.http_client.get")
+def test_download_image_stores_derivatives(mock_get: MagicMock, storage: LocalStorage) -> None:
+    mock_get.return_value = MagicMock(content=_jpeg(1000, 500))
+
+    path, dimensions, derived = _download_image("https://cdn/x.jpg", "IG9.jpg", storage)
+    assert path == str(storage.base_path / "IG9.jpg")
+    assert dimensions == (1000, 500)
+    assert derived
+    assert storage.exists("IG9_w640.jpg")
+
+
+@patch("src.http_client.get")
+def test_download_image_keeps_original_when_not_decodable(
+    mock_get: MagicMock, storage: LocalStorage
+) -> None:
+    mock_get.return_value = MagicMock(content=b"not an image")
+
+    path, dimensions, derived = _download_image("https://cdn/x.jpg", "IG9.jpg", storage)
+    assert storage.exists("IG9.jpg")
+    assert (dimensions, derived) == (None, False)
+
+
+@patch("src.http_client.get")
+def test_download_image_uses_exif_orientation(mock_get: MagicMock, storage: LocalStorage) -> None:
+    # Rotated 90 degrees: derivatives are cut from the 1080px-wide upright image
+    mock_get.return_value = MagicMock(content=_jpeg(1440, 1080, orientation=6))
+
+    _path, dimensions, derived = _download_image("https://cdn/x.jpg", "IG9.jpg", storage)
+    assert dimensions == (1080, 1440)
+    assert derived
+    assert storage.exists("IG9_w640.jpg")
+    assert not storage.exists("IG9_w1280.jpg")
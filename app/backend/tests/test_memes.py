@@ -1,12 +1,14 @@
 """Tests for meme admin endpoints, meme processing, and meme upload."""
 
 from datetime import UTC, datetime
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from src.models.meme import Meme
+from src.storage import LocalStorage
 
 
 # ---------------------------------------------------------------------------
@@ -116,6 +118,42 @@ def test_meme_update(admin_client: TestClient, db_session: Session) -> None:
     assert data["description_en"] == "Updated desc"
 
 
+def test_meme_media_redirects_to_signed_url(
+    admin_client: TestClient, db_session: Session, tmp_path: Path
+) -> None:
+    storage = LocalStorage(tmp_path, scope="memes")
+    storage.save("test.jpg", b"jpeg-bytes")
+    meme = _create_meme(db_session)
+
+    with (
+        patch("src.admin.memes.get_storage", return_value=storage),
+        patch("src.storage.get_storage", return_value=storage),
+    ):
+        redirect = admin_client.get(f"/api/v1/admin/memes/{meme.id}/media", follow_redirects=False)
+        res = admin_client.get(redirect.headers["location"])
+        missing = admin_client.get(
+            storage.signed_url("gone.jpg", media_type="image/jpeg"), follow_redirects=False
+        )
+
+    assert redirect.status_code == 302
+    assert redirect.headers["location"].startswith("/api/v1/signed/memes/test.jpg?")
+    assert res.status_code == 200
+    assert res.content == b"jpeg-bytes"
+    assert res.headers["content-type"] == "image/jpeg"
+    assert missing.status_code == 404
+
+
+def test_meme_media_missing_file(
+    admin_client: TestClient, db_session: Session, tmp_path: Path
+) -> None:
+    meme = _create_meme(db_session)
+
+    with patch("src.admin.memes.get_storage", return_value=LocalStorage(tmp_path, scope="memes")):
+        res = admin_client.get(f"/api/v1/admin/memes/{meme.id}/media", follow_redirects=False)
+    assert res.status_code == 404
+    assert res.json()["detail"] == "Media file not found"
+
+
 def test_meme_admin_required(client: TestClient) -> None:
     """Meme endpoints require admin auth."""
     resp = client.get("/api/v1/admin/memes/stats")
@@ -1,6 +1,7 @@
 """Tests for Open Graph meta tag endpoint."""
 
 from datetime import date, datetime
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
@@ -13,6 +14,7 @@ from src.models import (
     TripDestination,
     UNCountry,
 )
+from src.og import _resolve_path, clear_og_cache, precompute_og_pages
 
 
 def _make_country(db: Session, **overrides: object) -> UNCountry:
@@ -275,3 +277,62 @@ def test_og_html_escapes_special_chars(client: TestClient) -> None:
     assert r.status_code == 200
     assert "<script>" not in r.text
     assert "&lt;script&gt;" in r.text
+
+
+# ---------------------------------------------------------------------------
+# Page cache
+# ---------------------------------------------------------------------------
+
+
+def test_og_page_served_from_cache(client: TestClient, db_session: Session) -> None:
+    """Repeat requests for a path don't resolve it again until data changes."""
+    trip = _make_trip(db_session)
+    path = f"/photos/albums/{trip.id}/"
+
+    with patch("src.og._resolve_path", side_effect=_resolve_path) as resolve:
+        first = client.get("/api/v1/og", params={"path": path})
+        second = client.get("/api/v1/og", params={"path": path.rstrip("/")})
+    assert second.text == first.text
+    assert resolve.call_count == 1
+
+
+def test_og_page_refreshed_after_label_change(client: TestClient, db_session: Session) -> None:
+    """Labeling a photo (a tracked table) invalidates the cached album page."""
+    country = _make_country(db_session)
+    tcc = _make_tcc(db_session, country, name="Berlin")
+    trip = _make_trip(db_session)
+    _link_dest(db_session, trip, tcc)
+    post = _make_post(db_session, trip, tcc, labeled=False)
+    media = _make_media(db_session, post)
+    path = f"/photos/albums/{trip.id}"
+
+    assert f"/media/{media.id}" not in client.get("/api/v1/og", params={"path": path}).text
+
+    post.labeled_at = datetime(2024, 7, 2)
+    db_session.commit()
+    assert f"/media/{media.id}" in client.get("/api/v1/og", params={"path": path}).text
+
+
+def test_precompute_matches_on_demand_pages(client: TestClient, db_session: Session) -> None:
+    """Bulk-precomputed album/country pages equal the on-demand render."""
+    germany = _make_country(db_session, name="Germany")
+    berlin = _make_tcc(db_session, germany, name="Berlin")
+    trip = _make_trip(db_session)
+    _link_dest(db_session, trip, berlin)
+    older = _make_post(db_session, trip, berlin, ig_id="IG_OLD")
+    older.posted_at = datetime(2024, 6, 2)
+    _make_media(db_session, older)
+    cover = _make_post(db_session, trip, berlin, ig_id="IG_COVER", is_cover=True)
+    cover.posted_at = datetime(2024, 6, 3)
+    _make_media(db_session, cover, media_order=1)
+    _make_media(db_session, cover, media_order=0)
+    _make_trip(db_session, start_date=date(2024, 8, 1))  # no photos, not precomputed
+    db_session.commit()
+
+    assert precompute_og_pages(db_session) == 2
+    paths = [f"/photos/albums/{trip.id}", f"/photos/map/{germany.id}"]
+    with patch("src.og._resolve_path") as resolve:
+        cached = [client.get("/api/v1/og", params={"path": p}).text for p in paths]
+    resolve.assert_not_called()
+    clear_og_cache()
+    assert [client.get("/api/v1/og", params={"path": p}).text for p in paths] == cached
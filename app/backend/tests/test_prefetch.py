@@ -0,0 +1,111 @@
+"""Tests for the background trip info prefetcher."""
+
+import threading
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.main import app
+from src.models import TCCDestination, Trip, TripDestination, UNCountry
+from src.travels.prefetch import prefetch_trip_info
+
+
+def _trip_to(db: Session, country: UNCountry, start: date, tcc_index: int) -> Trip:
+    tcc = TCCDestination(
+        name=f"{country.name} {tcc_index}",
+        tcc_region="EUROPE",
+        tcc_index=tcc_index,
+        un_country_id=country.id,
+    )
+    db.add(tcc)
+    db.flush()
+    trip = Trip(start_date=start, end_date=start + timedelta(days=6))
+    db.add(trip)
+    db.flush()
+    db.add(TripDestination(trip_id=trip.id, tcc_destination_id=tcc.id))
+    db.commit()
+    return trip
+
+
+def _country(db: Session) -> UNCountry:
+    country = UNCountry(
+        name="Prefetchland",
+        iso_alpha2="PF",
+        iso_alpha3="PFL",
+        iso_numeric="998",
+        continent="Europe",
+        map_region_codes="998",
+        currency_code="PFX",
+        capital_lat=12.34,
+        capital_lng=56.78,
+        timezone="Europe/Prague",
+    )
+    db.add(country)
+    db.flush()
+    return country
+
+
+@patch("src.travels.trips_country_info._fetch_sunrise_sunset", return_value=None)
+@patch("src.travels.trips_country_info._fetch_weather", return_value={})
+@patch("src.travels.trips_country_info._fetch_holidays_for_country", return_value=[])
+@patch("src.travels.trips_country_info._fetch_currency_rates", return_value=None)
+def test_prefetch_only_upcoming_trips(
+    mock_currency: MagicMock,
+    mock_holidays: MagicMock,
+    mock_weather: MagicMock,
+    mock_sunrise: MagicMock,
+    db_session: Session,
+) -> None:
+    country = _country(db_session)
+    today = date.today()
+    upcoming = _trip_to(db_session, country, today + timedelta(days=20), 1)
+    _trip_to(db_session, country, today - timedelta(days=400), 2)
+
+    assert prefetch_trip_info(db_session) == 1
+
+    mock_currency.assert_called_once_with("PFX")
+    mock_holidays.assert_called_once_with("PF", upcoming.start_date, upcoming.end_date)
+    mid_trip = upcoming.start_date + timedelta(days=3)
+    mock_weather.assert_called_once_with(12.34, 56.78, mid_trip.month)
+    mock_sunrise.assert_called_once()
+
+
+@patch("src.http_client.get")
+def test_prefetched_trip_info_needs_no_upstream_calls(
+    mock_get: MagicMock, admin_client: TestClient, db_session: Session
+) -> None:
+    from src.travels.trips_external import (
+        _currency_cache,
+        _holidays_cache,
+        _sunrise_cache,
+        _weather_cache,
+    )
+
+    for cache in (_currency_cache, _holidays_cache, _sunrise_cache, _weather_cache):
+        cache.clear()
+    mock_resp = MagicMock(status_code=200)
+    mock_resp.json.return_value = {}
+    mock_get.return_value = mock_resp
+
+    country = _country(db_session)
+    trip = _trip_to(db_session, country, date.today() + timedelta(days=20), 1)
+
+    prefetch_trip_info(db_session)
+    warmed_calls = mock_get.call_count
+    assert warmed_calls > 0
+
+    response = admin_client.get(f"/api/v1/travels/trips/{trip.id}/country-info")
+    assert response.status_code == 200
+    assert mock_get.call_count == warmed_calls
+
+
+def test_lifespan_runs_prefetch_loop() -> None:
+    ran = threading.Event()
+    with (
+        patch("src.main.settings.trip_prefetch_interval", 3600),
+        patch("src.travels.prefetch._prefetch_once", side_effect=ran.set),
+        TestClient(app),
+    ):
+        assert ran.wait(5)
@@ -0,0 +1,61 @@
+"""Tests for the query plan auditor the db_session fixture installs."""
+
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.pool import StaticPool
+
+from src.database import Base
+from src.models import City, DroneFlight, InstagramPost, Trip
+
+from .query_plan import QueryPlanAuditor
+
+
+@pytest.fixture()
+def audited() -> Generator[tuple[Session, QueryPlanAuditor], None, None]:
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    auditor = QueryPlanAuditor()
+    auditor.install(engine)
+    with Session(engine) as session:
+        yield session, auditor
+    engine.dispose()
+
+
+def test_unindexed_filter_is_reported(audited: tuple[Session, QueryPlanAuditor]) -> None:
+    session, auditor = audited
+    session.query(DroneFlight).filter(DroneFlight.city == "Tbilisi").all()
+
+    assert len(auditor.violations) == 1
+    assert auditor.violations[0].startswith("SCAN drone_flights: SELECT")
+    assert "drone_flights.city = ?" in auditor.report()
+
+
+def test_aliased_table_is_resolved(audited: tuple[Session, QueryPlanAuditor]) -> None:
+    session, auditor = audited
+    trip = aliased(Trip)
+    session.query(trip).filter(trip.description == "x").all()
+
+    assert [v.split(":")[0] for v in auditor.violations] == ["SCAN trips_1"]
+
+
+def test_indexed_and_allowed_queries_pass(audited: tuple[Session, QueryPlanAuditor]) -> None:
+    session, auditor = audited
+    session.query(DroneFlight).filter(
+        DroneFlight.is_deleted.is_(False),
+        DroneFlight.is_test.is_(False),
+        DroneFlight.is_hidden.is_(False),
+    ).all()
+    session.query(InstagramPost).filter(
+        InstagramPost.trip_id == 1,
+        InstagramPost.skipped.is_(False),
+        InstagramPost.labeled_at.isnot(None),
+    ).all()
+    session.query(City).filter(City.lat.between(1, 2), City.lng.between(3, 4)).all()
+    # Unfiltered and allow-listed reads are not audited
+    session.query(Trip).all()
+    session.query(City).filter(City.name.ilike("%bil%")).all()
+
+    assert auditor.violations == []
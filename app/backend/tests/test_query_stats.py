@@ -0,0 +1,63 @@
+"""Tests for per-request SQL statement counting and the query budget fixture."""
+
+import logging
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.query_stats import QueryStats, server_timing, track_queries
+
+
+def test_track_queries_counts_and_nests(db_session: Session) -> None:
+    with track_queries() as outer:
+        db_session.execute(text("SELECT 1"))
+        with track_queries() as inner:
+            db_session.execute(text("SELECT 2"))
+            db_session.execute(text("SELECT 3"))
+    db_session.execute(text("SELECT 4"))
+
+    assert inner.count == 2
+    assert outer.count == 3
+    assert outer.seconds >= inner.seconds > 0
+
+
+def test_server_timing_format() -> None:
+    stats = QueryStats()
+    stats.count = 3
+    stats.seconds = 0.0125
+    assert server_timing(stats, 0.05) == 'db;dur=12.5;desc="3 queries", total;dur=50.0'
+
+
+def test_server_timing_header(client: TestClient) -> None:
+    res = client.get("/health")
+    assert res.status_code == 200
+    assert res.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="1 queries"' in res.headers["server-timing"]
+
+
+def test_heavy_request_logged(client: TestClient, caplog: pytest.LogCaptureFixture) -> None:
+    with (
+        patch("src.main.settings.query_log_threshold", 1),
+        caplog.at_level(logging.INFO, logger="src.main"),
+    ):
+        client.get("/health")
+    line = next(r.getMessage() for r in caplog.records if r.getMessage().startswith("request "))
+    assert "method=GET route=/health status=200 queries=1 " in line
+
+
+def test_query_budget(
+    client: TestClient, query_budget: Callable[[int], AbstractContextManager[QueryStats]]
+) -> None:
+    with query_budget(1) as stats:
+        client.get("/health")
+    assert stats.count == 1
+
+    with pytest.raises(pytest.fail.Exception, match="2 SQL statements, budget is 1"):
+        with query_budget(1):
+            client.get("/health")
+            client.get("/health")
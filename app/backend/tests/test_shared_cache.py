@@ -0,0 +1,158 @@
+"""Tests for the two-tier (in-process + persistent) shared cache."""
+
+import threading
+from collections.abc import Generator
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.models import CacheEntry
+from src.shared_cache import DatabaseBackend, StoredValue, TieredCache, set_backend
+from src.travels.models import SunriseSunset
+
+
+@pytest.fixture()
+def backend(db_session: Session) -> Generator[DatabaseBackend, None, None]:
+    db_backend = DatabaseBackend(sessionmaker(bind=db_session.get_bind()))
+    set_backend(db_backend)
+    yield db_backend
+    set_backend(None)
+
+
+def test_cold_instance_reads_persistent_tier(backend: DatabaseBackend) -> None:
+    warm = TieredCache("sunrise", SunriseSunset | None, ttl=60)
+    value = SunriseSunset(sunrise="06:00", sunset="18:00", day_length_hours=12.0)
+    warm[(50.0, 14.0, "2026-03-10")] = value
+
+    # Fresh process: empty L1, same table
+    cold = TieredCache("sunrise", SunriseSunset | None, ttl=60)
+    fetch = MagicMock()
+    assert cold.get_or_fetch((50.0, 14.0, "2026-03-10"), fetch) == value
+    fetch.assert_not_called()
+    assert (50.0, 14.0, "2026-03-10") in cold
+
+
+def test_bytes_round_trip_and_clear(backend: DatabaseBackend, db_session: Session) -> None:
+    cache = TieredCache("blobs", bytes, ttl=60)
+    cache["k"] = b"\x89PNG\x00\xff"
+    assert TieredCache("blobs", bytes, ttl=60)["k"] == b"\x89PNG\x00\xff"
+
+    backend.clear("blobs")
+    assert db_session.query(CacheEntry).count() == 0
+
+
+def test_fallbacks_are_not_persisted(backend: DatabaseBackend, db_session: Session) -> None:
+    cache = TieredCache("currency", dict[str, float] | None, ttl=60)
+    cache.set("XXX", None, ttl=5, persist=False)
+    assert "XXX" in cache
+    assert db_session.query(CacheEntry).count() == 0
+
+
+def test_stale_value_served_while_refreshing() -> None:
+    cache = TieredCache("t", int, ttl=10, stale_ttl=100)
+    with patch("src.shared_cache.time.time", return_value=1000.0):
+        cache["k"] = 1
+
+    release = threading.Event()
+
+    def fetch() -> int:
+        release.wait(5)
+        return 2
+
+    with patch("src.shared_cache.time.time", return_value=1050.0):
+        # Past the TTL: dict access misses, fetch-through serves stale
+        assert cache.get("k") is None
+        assert cache.get_or_fetch("k", fetch) == 1
+        release.set()
+        for _ in range(500):
+            if cache.get("k") == 2:
+                break
+            threading.Event().wait(0.01)
+        assert cache.get("k") == 2
+
+
+def test_failed_refresh_keeps_stale_value() -> None:
+    cache = TieredCache("t", int, ttl=10, stale_ttl=100)
+    with patch("src.shared_cache.time.time", return_value=1000.0):
+        cache["k"] = 1
+
+    attempted = threading.Event()
+
+    def fetch() -> int:
+        attempted.set()
+        raise RuntimeError("upstream down")
+
+    with patch("src.shared_cache.time.time", return_value=1050.0):
+        assert cache.get_or_fetch("k", fetch) == 1
+        assert attempted.wait(5)
+        assert cache.get_or_fetch("k", fetch) == 1
+
+
+def test_expired_value_is_refetched() -> None:
+    cache = TieredCache("t", int, ttl=10, stale_ttl=100)
+    with patch("src.shared_cache.time.time", return_value=1000.0):
+        cache["k"] = 1
+    with patch("src.shared_cache.time.time", return_value=2000.0):
+        assert cache.get_or_fetch("k", lambda: 3) == 3
+
+
+def test_concurrent_misses_fetch_once() -> None:
+    cache = TieredCache("t", int, ttl=60)
+    release = threading.Event()
+    calls: list[int] = []
+
+    def fetch() -> int:
+        calls.append(1)
+        release.wait(5)
+        return 42
+
+    results: list[int] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch("k", fetch)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert results == [42] * 8
+    assert len(calls) == 1
+
+
+def test_fetch_error_on_miss_propagates() -> None:
+    cache = TieredCache("t", int, ttl=60)
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch("k", MagicMock(side_effect=RuntimeError("boom")))
+    assert "k" not in cache
+
+
+def test_backend_errors_degrade_to_l1() -> None:
+    broken = MagicMock()
+    broken.get.side_effect = RuntimeError("db down")
+    broken.set.side_effect = RuntimeError("db down")
+    cache = TieredCache("t", int, ttl=60, backend=broken)
+
+    assert cache.get_or_fetch("k", lambda: 7) == 7
+    assert cache["k"] == 7
+
+
+def test_undecodable_entry_is_ignored() -> None:
+    backend = MagicMock()
+    backend.get.return_value = StoredValue(b"not json", 4e9, 4e9)
+    cache = TieredCache("t", int, ttl=60, backend=backend)
+    assert cache.get_or_fetch("k", lambda: 5) == 5
+
+
+@patch("src.http_client.get", side_effect=Exception("error"))
+def test_weather_failure_not_shared(
+    _mock_get: object, backend: DatabaseBackend, db_session: Session
+) -> None:
+    from src.travels.trips_external import _fetch_weather, _weather_cache
+
+    _weather_cache.clear()
+    assert _fetch_weather(1.0, 2.0, 3)["avg_temp_c"] is None
+    assert db_session.query(CacheEntry).count() == 0
+    _weather_cache.clear()
@@ -1,10 +1,33 @@
 """Tests for storage backends (LocalStorage + LocalVaultStorage)."""
 
+import asyncio
+import io
 import tempfile
+from collections.abc import Generator
 from pathlib import Path
+from unittest.mock import MagicMock, patch
+from urllib.parse import parse_qsl, urlsplit
 
-from src.storage import LocalStorage
-from src.vault_storage import LocalVaultStorage
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src import storage as storage_module
+from src import vault_storage as vault_storage_module
+from src.storage import (
+    GCSStorage,
+    LocalStorage,
+    get_storage,
+    local_signed_url,
+    verify_local_signature,
+)
+from src.vault_storage import (
+    GCSVaultStorage,
+    LocalVaultStorage,
+    get_vault_storage,
+    parse_range,
+    vault_file_response,
+)
 
 
 # --- LocalStorage (Instagram) ---
@@ -22,6 +45,13 @@ def test_local_storage_save_and_read() -> None:
         assert not storage.exists("nonexistent.jpg")
 
 
+def test_local_storage_streams_file_objects() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = LocalStorage(Path(tmpdir))
+        storage.save("big.jpg", io.BytesIO(b"x" * 300_000))
+        assert storage.read("big.jpg") == b"x" * 300_000
+
+
 def test_local_storage_public_url() -> None:
     with tempfile.TemporaryDirectory() as tmpdir:
         storage = LocalStorage(Path(tmpdir))
@@ -57,6 +87,13 @@ def test_vault_storage_save_read_delete() -> None:
         assert storage.delete(key) is False  # already deleted
 
 
+def test_vault_storage_saves_file_objects() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = LocalVaultStorage(Path(tmpdir))
+        key = storage.save(1, "scan.pdf", io.BytesIO(b"%PDF-1.7 data"), "application/pdf")
+        assert storage.read(key) == b"%PDF-1.7 data"
+
+
 def test_vault_storage_generate_key() -> None:
     with tempfile.TemporaryDirectory() as tmpdir:
         storage = LocalVaultStorage(Path(tmpdir))
@@ -82,3 +119,193 @@ def test_vault_storage_subdirectory_creation() -> None:
         key = storage.save(99, "photo.jpg", b"jpeg-data", "image/jpeg")
         assert (Path(tmpdir) / key).exists()
         assert (Path(tmpdir) / "99").is_dir()
+
+
+def test_vault_storage_size_and_ranges() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = LocalVaultStorage(Path(tmpdir))
+        key = storage.save(1, "doc.pdf", b"0123456789", "application/pdf")
+
+        assert storage.size(key) == 10
+        assert storage.size("1/missing.pdf") is None
+        assert b"".join(storage.iter_bytes(key)) == b"0123456789"
+        assert b"".join(storage.iter_bytes(key, 2, 5)) == b"2345"
+        assert b"".join(storage.iter_bytes(key, 8)) == b"89"
+
+
+def test_parse_range() -> None:
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    # Malformed and multi-range headers get the whole file
+    assert parse_range("bytes=-", 100) is None
+    assert parse_range("items=0-9", 100) is None
+    assert parse_range("bytes=0-1,5-6", 100) is None
+
+    with pytest.raises(HTTPException) as exc:
+        parse_range("bytes=100-", 100)
+    assert exc.value.status_code == 416
+    assert exc.value.headers == {"Content-Range": "bytes */100"}
+
+
+# --- Batch operations ---
+
+
+def test_local_storage_batch_operations() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = LocalStorage(Path(tmpdir))
+        urls = storage.save_many(
+            [("a.jpg", b"a", "image/jpeg"), ("b.webp", io.BytesIO(b"b"), "image/webp")]
+        )
+        assert urls == [f"{tmpdir}/a.jpg", f"{tmpdir}/b.webp"]
+        assert storage.exists_many(["a.jpg", "b.webp", "c.jpg"]) == {"a.jpg", "b.webp"}
+
+        storage.delete_many(["a.jpg", "c.jpg"])
+        assert storage.exists_many(["a.jpg", "b.webp"]) == {"b.webp"}
+
+
+def test_vault_storage_batch_operations() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = LocalVaultStorage(Path(tmpdir))
+        keys = storage.save_many(
+            7, [("a.pdf", b"a", "application/pdf"), ("b.png", b"b", "image/png")]
+        )
+        assert [k.split("/")[0] for k in keys] == ["7", "7"]
+        assert storage.read(keys[1]) == b"b"
+
+        storage.delete_many([keys[0], "7/missing.pdf"])
+        assert storage.exists_many(keys) == {keys[1]}
+
+
+# --- Shared GCS client and backends ---
+
+
+@pytest.fixture()
+def fake_gcs() -> Generator[MagicMock, None, None]:
+    client = MagicMock()
+    with (
+        patch("src.storage.gcs_client", return_value=client),
+        patch("src.vault_storage.gcs_client", return_value=client),
+    ):
+        yield client
+    storage_module._storage.cache_clear()
+    vault_storage_module._vault_storage.cache_clear()
+    storage_module._signed_urls.clear()
+
+
+def test_backends_are_built_once(fake_gcs: MagicMock) -> None:
+    with (
+        patch("src.storage.settings.gcs_bucket", "media"),
+        patch("src.vault_storage.settings.vault_gcs_bucket", "vault"),
+    ):
+        assert get_storage("memes") is get_storage("memes")
+        assert get_storage("memes") is not get_storage("cosplay")
+        assert get_vault_storage() is get_vault_storage()
+    fake_gcs.bucket.assert_any_call("media")
+    fake_gcs.bucket.assert_any_call("vault")
+
+
+def test_gcs_delete_many_uses_batches(fake_gcs: MagicMock) -> None:
+    storage = GCSStorage("media", prefix="memes")
+    storage.delete_many(f"{i}.jpg" for i in range(150))
+
+    assert fake_gcs.batch.call_count == 2
+    fake_gcs.batch.assert_called_with(raise_exception=False)
+    assert storage.bucket.delete_blob.call_count == 150
+    storage.bucket.delete_blob.assert_any_call("memes/149.jpg")
+
+
+def test_gcs_vault_download_reads_metadata_once(fake_gcs: MagicMock) -> None:
+    storage = GCSVaultStorage("vault")
+    storage.bucket.get_blob.return_value.size = 3
+    storage.bucket.blob.return_value.download_as_bytes.return_value = b"pdf"
+
+    response = vault_file_response(storage, "1/a.pdf", "application/pdf")
+
+    async def body() -> bytes:
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    assert asyncio.run(body()) == b"pdf"
+    storage.bucket.get_blob.assert_called_once_with("1/a.pdf")
+    storage.bucket.blob.return_value.download_as_bytes.assert_called_once_with(start=0, end=2)
+
+
+def test_gcs_client_is_created_once() -> None:
+    storage_module.gcs_client.cache_clear()
+    try:
+        with (
+            patch("google.auth.default", return_value=(MagicMock(), "proj")) as auth,
+            patch("google.cloud.storage.Client") as client_cls,
+        ):
+            assert storage_module.gcs_client() is storage_module.gcs_client()
+        auth.assert_called_once()
+        assert client_cls.call_args.kwargs["project"] == "proj"
+        session = client_cls.call_args.kwargs["_http"]
+        assert session.get_adapter("https://storage.googleapis.com")._pool_maxsize == 32
+    finally:
+        storage_module.gcs_client.cache_clear()
+
+
+# --- Signed URLs ---
+
+
+def _query(url: str) -> dict[str, str]:
+    return dict(parse_qsl(urlsplit(url).query))
+
+
+def test_local_signed_url_round_trip() -> None:
+    url = local_signed_url(
+        "vault", "1/a b.pdf", expires_in=60, media_type="application/pdf", download_name="x.pdf"
+    )
+    assert urlsplit(url).path == "/api/v1/signed/vault/1/a%20b.pdf"
+    q = _query(url)
+    args = ("vault/1/a b.pdf", int(q["expires"]), q["type"], q["name"])
+    assert verify_local_signature(*args, q["signature"])
+
+    # Any change to the path, type or name invalidates it
+    assert not verify_local_signature("vault/1/other.pdf", *args[1:], q["signature"])
+    assert not verify_local_signature(*args[:2], "text/html", q["name"], q["signature"])
+    assert not verify_local_signature(*args[:3], "y.pdf", q["signature"])
+
+
+def test_local_signed_url_expires() -> None:
+    q = _query(
+        local_signed_url("memes", "a.jpg", expires_in=-1, media_type=None, download_name=None)
+    )
+    assert not verify_local_signature("memes/a.jpg", int(q["expires"]), "", "", q["signature"])
+
+
+def test_signed_file_endpoint_rejects_bad_signature(client: TestClient) -> None:
+    url = local_signed_url("vault", "1/a.pdf", expires_in=60, media_type=None, download_name=None)
+    res = client.get(url.replace("signature=", "signature=0"))
+    assert res.status_code == 403
+
+
+def test_gcs_signed_url(fake_gcs: MagicMock) -> None:
+    fake_gcs._credentials = MagicMock(
+        spec=["valid", "token", "service_account_email", "refresh"],
+        valid=True,
+        token="tok",
+        service_account_email="app@example.iam.gserviceaccount.com",
+    )
+    storage = GCSStorage("media", prefix="memes")
+    storage.bucket.name = "media"
+    blob = storage.bucket.blob.return_value
+    blob.generate_signed_url.return_value = "https://storage.googleapis.com/signed"
+
+    for _ in range(2):
+        url = storage.signed_url("a.jpg", media_type="image/jpeg", download_name="a.jpg")
+    assert url == "https://storage.googleapis.com/signed"
+
+    # The second call is served from the cache
+    blob.generate_signed_url.assert_called_once()
+    storage.bucket.blob.assert_called_with("memes/a.jpg")
+    kwargs = blob.generate_signed_url.call_args.kwargs
+    assert kwargs["version"] == "v4"
+    assert kwargs["response_type"] == "image/jpeg"
+    assert kwargs["response_disposition"] == "inline; filename*=UTF-8''a.jpg"
+    # Metadata-server credentials can't sign, so signing goes through IAM
+    assert kwargs["service_account_email"] == "app@example.iam.gserviceaccount.com"
+    assert kwargs["access_token"] == "tok"
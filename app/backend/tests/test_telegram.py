@@ -1,5 +1,6 @@
 """Tests for Telegram webhook and flight record processing."""
 
+import asyncio
 from datetime import date
 from unittest.mock import MagicMock, patch
 
@@ -119,6 +120,50 @@ def test_webhook_image_document_routes_to_meme(
     assert mock_meme.call_args[0][0] == "abc"
 
 
+@patch("src.telegram.webhook.settings")
+@patch("src.telegram.webhook._reply")
+@patch("src.telegram.webhook._download_file", return_value=b"fake-image-data")
+@patch("src.telegram.meme_processing.get_storage")
+def test_webhook_meme_extraction_runs_off_the_event_loop(
+    mock_storage_fn: MagicMock,
+    mock_dl: MagicMock,
+    mock_reply: MagicMock,
+    mock_settings: MagicMock,
+    client: TestClient,
+) -> None:
+    """Meme extraction blocks, so it must not run on the event loop thread."""
+    from src.extraction import MemeExtractionResult
+
+    mock_settings.telegram_webhook_secret = ""
+    mock_settings.telegram_chat_id = "12345"
+    mock_settings.telegram_token = "test-token"
+    mock_storage_fn.return_value.save.return_value = "/app/data/memes/abc.jpg"
+    on_loop: list[bool] = []
+
+    def extract(file_data: bytes, mime_type: str) -> MemeExtractionResult:
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return MemeExtractionResult(error="skipped")
+
+    with patch("src.telegram.meme_processing.extract_meme_metadata", side_effect=extract):
+        resp = client.post(
+            "/api/v1/telegram/webhook",
+            json={
+                "message": {
+                    "chat": {"id": 12345},
+                    "message_id": 7,
+                    "photo": [{"file_id": "small"}, {"file_id": "large"}],
+                }
+            },
+        )
+    assert resp.status_code == 200
+    assert on_loop == [False]
+    mock_dl.assert_called_once_with("large")
+
+
 @patch("src.telegram.webhook.settings")
 @patch("src.telegram.webhook._reply")
 def test_webhook_secret_mismatch(mock_reply: MagicMock, mock_settings: MagicMock, client: TestClient) -> None:
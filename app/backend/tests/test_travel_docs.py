@@ -388,13 +388,15 @@ def test_get_file_content(
     db_session.refresh(vf)
 
     mock_storage = MagicMock()
-    mock_storage.read.return_value = b"%PDF-fake-content"
+    mock_storage.signed_url.return_value = "https://storage.example/signed"
     mock_storage_fn.return_value = mock_storage
 
-    res = vault_client.get(f"/api/v1/admin/vault/files/{vf.id}/content")
-    assert res.status_code == 200
-    assert res.headers["content-type"] == "application/pdf"
-    assert res.content == b"%PDF-fake-content"
+    res = vault_client.get(f"/api/v1/admin/vault/files/{vf.id}/content", follow_redirects=False)
+    assert res.status_code == 302
+    assert res.headers["location"] == "https://storage.example/signed"
+    mock_storage.signed_url.assert_called_once_with(
+        "1/abc.pdf", media_type="application/pdf", download_name=None
+    )
 
 
 def test_file_not_found(vault_client: TestClient) -> None:
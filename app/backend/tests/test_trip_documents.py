@@ -2,6 +2,7 @@
 
 from collections.abc import Generator
 from datetime import date
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from fastapi.testclient import TestClient
@@ -11,6 +12,7 @@ from src.auth.session import get_admin_user, get_trips_viewer, get_vault_user
 from src.database import get_db
 from src.main import app
 from src.models import Trip, TripDocument, User
+from src.vault_storage import LocalVaultStorage
 
 
 def _create_trip(db: Session, *, start: date | None = None, end: date | None = None) -> Trip:
@@ -376,17 +378,56 @@ def test_download_file(
     admin_user: User,
 ) -> None:
     mock_storage = MagicMock()
-    mock_storage.read.return_value = b"pdf-bytes-here"
+    mock_storage.signed_url.return_value = "https://storage.example/signed"
     mock_storage_fn.return_value = mock_storage
 
     trip = _create_trip(db_session)
-    doc = _create_doc(db_session, trip, path="1/file.pdf", mime="application/pdf")
+    doc = _create_doc(
+        db_session, trip, path="1/file.pdf", mime="application/pdf", name="policy.pdf"
+    )
 
     for c in _make_vault_client(db_session, admin_user):
-        res = c.get(f"/api/v1/travels/trips/{trip.id}/documents/{doc.id}/file")
-    assert res.status_code == 200
-    assert res.content == b"pdf-bytes-here"
-    assert res.headers["content-type"] == "application/pdf"
+        res = c.get(
+            f"/api/v1/travels/trips/{trip.id}/documents/{doc.id}/file", follow_redirects=False
+        )
+    assert res.status_code == 302
+    assert res.headers["location"] == "https://storage.example/signed"
+    assert res.headers["cache-control"] == "no-store"
+    mock_storage.signed_url.assert_called_once_with(
+        "1/file.pdf", media_type="application/pdf", download_name="policy.pdf"
+    )
+
+
+@patch("src.vault_storage.get_vault_storage")
+def test_download_file_local_signed_url(
+    mock_storage_fn: MagicMock,
+    db_session: Session,
+    admin_user: User,
+    tmp_path: Path,
+) -> None:
+    storage = LocalVaultStorage(tmp_path)
+    key = storage.save(1, "file.pdf", b"%PDF-1.7 body", "application/pdf")
+    mock_storage_fn.return_value = storage
+
+    trip = _create_trip(db_session)
+    doc = _create_doc(db_session, trip, path=key, mime="application/pdf", name="policy.pdf")
+    url = f"/api/v1/travels/trips/{trip.id}/documents/{doc.id}/file"
+
+    for c in _make_vault_client(db_session, admin_user):
+        full = c.get(url)
+        partial = c.get(url, headers={"Range": "bytes=0-4"})
+        unsatisfiable = c.get(url, headers={"Range": "bytes=100-"})
+    assert full.status_code == 200
+    assert full.url.path.startswith("/api/v1/signed/vault/")
+    assert full.content == b"%PDF-1.7 body"
+    assert full.headers["content-type"] == "application/pdf"
+    assert full.headers["content-disposition"] == "inline; filename*=UTF-8''policy.pdf"
+    assert full.headers["accept-ranges"] == "bytes"
+    assert partial.status_code == 206
+    assert partial.content == b"%PDF-"
+    assert partial.headers["content-range"] == "bytes 0-4/13"
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == "bytes */13"
 
 
 @patch("src.vault_storage.get_vault_storage")
@@ -396,15 +437,20 @@ def test_download_file_not_in_storage(
     admin_user: User,
 ) -> None:
     mock_storage = MagicMock()
-    mock_storage.read.return_value = None
+    mock_storage.size.return_value = None
     mock_storage_fn.return_value = mock_storage
 
     trip = _create_trip(db_session)
     doc = _create_doc(db_session, trip, path="1/missing.pdf")
 
     for c in _make_vault_client(db_session, admin_user):
-        res = c.get(f"/api/v1/travels/trips/{trip.id}/documents/{doc.id}/file")
+        res = c.get(
+            f"/api/v1/travels/trips/{trip.id}/documents/{doc.id}/file", follow_redirects=False
+        )
+    # Answered by the app, not by a signed URL to a missing object
     assert res.status_code == 404
+    assert res.json()["detail"] == "File not found in storage"
+    mock_storage.signed_url.assert_not_called()
 
 
 def test_download_file_doc_not_found(
@@ -1,7 +1,8 @@
 """Tests for trip management and country-info endpoints."""
 
+import threading
 from datetime import date
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
@@ -426,6 +427,73 @@ def test_country_info_orphan_destination(
     assert c["weather"] is None
 
 
+@patch("src.travels.trips_country_info._fetch_currency_rates", return_value={"CZK": 25.5})
+@patch("src.travels.trips_country_info._fetch_sunrise_sunset", return_value=None)
+@patch("src.travels.trips_country_info._fetch_holidays_for_country")
+def test_country_info_fans_out_lookups_concurrently(
+    mock_holidays: MagicMock,
+    _mock_sunrise: object,
+    _mock_currency: object,
+    admin_client: TestClient,
+    db_session: Session,
+) -> None:
+    """Per-country lookups run in parallel, not one country after another."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def holidays(iso: str, start: date, end: date) -> list:
+        # Deadlocks (and times out) unless both countries are fetched at once
+        barrier.wait()
+        return []
+
+    mock_holidays.side_effect = holidays
+    c1 = _create_country(db_session, name="Alpha", iso2="AA", iso3="AAA", iso_num="001")
+    c2 = _create_country(db_session, name="Beta", iso2="BB", iso3="BBB", iso_num="002")
+    tcc1 = _create_tcc(db_session, name="City A", tcc_index=1, un_country=c1)
+    tcc2 = _create_tcc(db_session, name="City B", tcc_index=2, un_country=c2)
+    trip = _create_trip(db_session, destinations=[tcc1, tcc2])
+
+    with patch("src.travels.trips_country_info._fetch_weather", return_value={}):
+        response = admin_client.get(f"/api/v1/travels/trips/{trip.id}/country-info")
+    assert response.status_code == 200
+    assert not barrier.broken
+    assert [c["holidays"] for c in response.json()["countries"]] == [[], []]
+
+
+@patch("src.travels.trips_country_info._ENRICH_DEADLINE", 0.2)
+@patch("src.travels.trips_country_info._fetch_currency_rates", side_effect=RuntimeError("down"))
+@patch("src.travels.trips_country_info._fetch_sunrise_sunset", return_value=None)
+@patch("src.travels.trips_country_info._fetch_holidays_for_country", return_value=[])
+def test_country_info_partial_results_on_slow_or_failing_provider(
+    _mock_holidays: object,
+    _mock_sunrise: object,
+    _mock_currency: object,
+    admin_client: TestClient,
+    db_session: Session,
+) -> None:
+    """A slow provider misses the deadline and a failing one is skipped; the rest is served."""
+    release = threading.Event()
+
+    def slow_weather(lat: float, lng: float, month: int) -> dict:
+        release.wait(5)
+        return {"avg_temp_c": 20.0}
+
+    country = _create_country(db_session)
+    tcc = _create_tcc(db_session, name="Prague", un_country=country)
+    trip = _create_trip(db_session, destinations=[tcc])
+
+    with patch("src.travels.trips_country_info._fetch_weather", side_effect=slow_weather):
+        response = admin_client.get(f"/api/v1/travels/trips/{trip.id}/country-info")
+        release.set()
+    assert response.status_code == 200
+
+    c = response.json()["countries"][0]
+    assert c["weather"] is None
+    assert c["currency"]["code"] == "EUR"
+    assert c["currency"]["rates"] is None
+    assert c["holidays"] == []
+    assert c["socket_types"] == "C,F"
+
+
 # --- Helper function unit tests ---
 
 
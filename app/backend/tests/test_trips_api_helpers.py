@@ -13,7 +13,7 @@ import httpx
 # --- Currency fetching ---
 
 
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_fetch_frankfurter_success(mock_get: MagicMock) -> None:
     from src.travels.trips import _currency_cache, _fetch_frankfurter
 
@@ -32,7 +32,7 @@ def test_fetch_frankfurter_success(mock_get: MagicMock) -> None:
     assert result["EUR"] == 1.0  # self-rate added
 
 
-@patch("httpx.get", side_effect=httpx.ConnectError("timeout"))
+@patch("src.http_client.get", side_effect=httpx.ConnectError("timeout"))
 def test_fetch_frankfurter_failure(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_frankfurter
 
@@ -40,7 +40,7 @@ def test_fetch_frankfurter_failure(mock_get: MagicMock) -> None:
     assert result is None
 
 
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_fetch_open_er_success(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_open_er
 
@@ -61,7 +61,7 @@ def test_fetch_open_er_success(mock_get: MagicMock) -> None:
     assert "JPY" not in result  # not in target currencies
 
 
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_fetch_open_er_failure(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_open_er
 
@@ -75,7 +75,7 @@ def test_fetch_open_er_failure(mock_get: MagicMock) -> None:
     assert result is None
 
 
-@patch("httpx.get", side_effect=Exception("network"))
+@patch("src.http_client.get", side_effect=Exception("network"))
 def test_fetch_open_er_exception(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_open_er
 
@@ -143,7 +143,7 @@ def test_fetch_currency_rates_cached() -> None:
 # --- Weather fetching ---
 
 
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_fetch_weather_success(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_weather, _weather_cache
 
@@ -169,7 +169,7 @@ def test_fetch_weather_success(mock_get: MagicMock) -> None:
     assert result["rainy_days"] == 1  # only 3.0 > 0.5
 
 
-@patch("httpx.get", side_effect=Exception("error"))
+@patch("src.http_client.get", side_effect=Exception("error"))
 def test_fetch_weather_failure(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_weather, _weather_cache
 
@@ -185,7 +185,7 @@ def test_fetch_weather_cached() -> None:
 
     _weather_cache.clear()
 
-    with patch("httpx.get") as mock_get:
+    with patch("src.http_client.get") as mock_get:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.json.return_value = {
@@ -207,7 +207,7 @@ def test_fetch_weather_cached() -> None:
 # --- Sunrise/sunset ---
 
 
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_fetch_sunrise_sunset_success(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_sunrise_sunset, _sunrise_cache
 
@@ -233,7 +233,7 @@ def test_fetch_sunrise_sunset_success(mock_get: MagicMock) -> None:
     assert result.day_length_hours == 12.0
 
 
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_fetch_sunrise_sunset_not_ok(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_sunrise_sunset, _sunrise_cache
 
@@ -249,7 +249,7 @@ def test_fetch_sunrise_sunset_not_ok(mock_get: MagicMock) -> None:
     assert result is None
 
 
-@patch("httpx.get", side_effect=Exception("error"))
+@patch("src.http_client.get", side_effect=Exception("error"))
 def test_fetch_sunrise_sunset_failure(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_sunrise_sunset, _sunrise_cache
 
@@ -262,7 +262,7 @@ def test_fetch_sunrise_sunset_failure(mock_get: MagicMock) -> None:
 # --- Holiday fetching ---
 
 
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_fetch_holidays_raw_success(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_holidays_raw, _holidays_cache
 
@@ -282,7 +282,7 @@ def test_fetch_holidays_raw_success(mock_get: MagicMock) -> None:
     assert result[0]["name"] == "New Year"
 
 
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_fetch_holidays_raw_204(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_holidays_raw, _holidays_cache
 
@@ -296,7 +296,7 @@ def test_fetch_holidays_raw_204(mock_get: MagicMock) -> None:
     assert result == []
 
 
-@patch("httpx.get", side_effect=Exception("error"))
+@patch("src.http_client.get", side_effect=Exception("error"))
 def test_fetch_holidays_raw_failure(mock_get: MagicMock) -> None:
     from src.travels.trips import _fetch_holidays_raw, _holidays_cache
 
@@ -280,7 +280,7 @@ def test_city_search_with_country_filter(
 # --- Holidays Endpoint ---
 
 
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_holidays_endpoint(mock_get: MagicMock, admin_client: TestClient) -> None:
     """GET /holidays returns parsed holiday data."""
     mock_resp = MagicMock()
@@ -305,7 +305,7 @@ def test_holidays_endpoint(mock_get: MagicMock, admin_client: TestClient) -> Non
     assert holidays[0]["local_name"] == "Nový rok"
 
 
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_holidays_not_found(mock_get: MagicMock, admin_client: TestClient) -> None:
     """GET /holidays returns empty for unknown country."""
     mock_resp = MagicMock()
@@ -321,7 +321,7 @@ def test_holidays_not_found(mock_get: MagicMock, admin_client: TestClient) -> No
     assert res.json()["holidays"] == []
 
 
-@patch("httpx.get", side_effect=Exception("network error"))
+@patch("src.http_client.get", side_effect=Exception("network error"))
 def test_holidays_api_error(mock_get: MagicMock, admin_client: TestClient) -> None:
     """GET /holidays returns empty on API failure."""
     from src.travels.trips import _holidays_cache
@@ -395,7 +395,7 @@ def test_get_health_requirements() -> None:
 
 
 @patch("src.travels.flights.settings")
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_flight_lookup_mocked(
     mock_get: MagicMock, mock_settings: MagicMock, admin_client: TestClient
 ) -> None:
@@ -449,7 +449,7 @@ def test_flight_lookup_mocked(
 
 
 @patch("src.travels.flights.settings")
-@patch("httpx.get")
+@patch("src.http_client.get")
 def test_flight_lookup_204(
     mock_get: MagicMock, mock_settings: MagicMock, admin_client: TestClient
 ) -> None:
@@ -471,7 +471,7 @@ def test_flight_lookup_204(
 
 
 @patch("src.travels.flights.settings")
-@patch("httpx.get", side_effect=httpx.ConnectError("timeout"))
+@patch("src.http_client.get", side_effect=httpx.ConnectError("timeout"))
 def test_flight_lookup_network_error(
     mock_get: MagicMock, mock_settings: MagicMock, admin_client: TestClient
 ) -> None:
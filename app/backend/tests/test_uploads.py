@@ -0,0 +1,115 @@
+"""Tests for the shared upload reader (size limits, type sniffing)."""
+
+import io
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+
+from src.uploads import check_upload, sniff_mime_type
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+def _upload(
+    content: bytes, content_type: str = "application/pdf", *, size: bool = True
+) -> UploadFile:
+    return UploadFile(
+        io.BytesIO(content),
+        size=len(content) if size else None,
+        filename="file.bin",
+        headers=Headers({"content-type": content_type}),
+    )
+
+
+@pytest.mark.parametrize(
+    ("head", "expected"),
+    [
+        (b"%PDF-1.7\n", "application/pdf"),
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image/jpeg"),
+        (PNG, "image/png"),
+        (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+        (b"GIF89a", "image/gif"),
+        (b"\x00\x00\x00\x18ftypheic", "image/heic"),
+        (b"PK\x03\x04", "application/zip"),
+        (b"plain text", None),
+    ],
+)
+def test_sniff_mime_type(head: bytes, expected: str | None) -> None:
+    assert sniff_mime_type(head) == expected
+
+
+def test_measures_and_rewinds() -> None:
+    content = b"%PDF-1.7 " + b"x" * 600_000
+    upload = check_upload(_upload(content))
+
+    assert upload.size == len(content)
+    assert upload.sniffed_type == "application/pdf"
+    assert upload.file.tell() == 0
+    assert upload.read() == content
+
+
+def test_declared_size_rejected_without_reading() -> None:
+    file = _upload(b"x" * 100)
+    file.file = MagicMock(wraps=file.file)
+    with pytest.raises(HTTPException) as exc:
+        check_upload(file, max_size=10)
+    assert "too large" in exc.value.detail
+    file.file.read.assert_not_called()
+
+
+def test_unknown_size_stops_reading_past_limit() -> None:
+    file = _upload(b"x" * 1_000_000, size=False)
+    with patch("src.uploads.UPLOAD_CHUNK_SIZE", 1000):
+        with pytest.raises(HTTPException):
+            check_upload(file, max_size=5000)
+    # Read one chunk past the limit, not the whole file
+    assert file.file.tell() == 6000
+
+
+def test_empty_rejected_unless_allowed() -> None:
+    with pytest.raises(HTTPException) as exc:
+        check_upload(_upload(b""))
+    assert exc.value.detail == "File is empty"
+    assert check_upload(_upload(b""), allow_empty=True).size == 0
+
+
+def test_content_must_match_allowed_types() -> None:
+    with pytest.raises(HTTPException) as exc:
+        check_upload(_upload(b"%PDF-1.4"), allowed_types={"image/png"})
+    assert "application/pdf" in exc.value.detail
+    # Unrecognised content is left to the declared type check
+    assert check_upload(_upload(b"data"), allowed_types={"image/png"}).sniffed_type is None
+
+
+@patch("src.admin.cosplay.get_storage")
+def test_cosplay_photo_streams_to_storage(
+    mock_storage_fn: MagicMock, admin_client: TestClient
+) -> None:
+    from PIL import Image
+
+    stored: list[bytes] = []
+    mock_storage_fn.return_value.save.side_effect = lambda name, content, ct: stored.append(
+        content.read()
+    )
+    buf = io.BytesIO()
+    Image.new("RGB", (30, 20)).save(buf, format="PNG")
+
+    costume = admin_client.post("/api/v1/admin/cosplay", json={"name": "Test"}).json()
+    res = admin_client.post(
+        f"/api/v1/admin/cosplay/{costume['id']}/photos",
+        files={"file": ("p.png", buf.getvalue(), "image/png")},
+    )
+    assert res.status_code == 200
+    assert (res.json()["width"], res.json()["height"]) == (30, 20)
+    assert stored == [buf.getvalue()]
+
+
+def test_mislabelled_upload_rejected(admin_client: TestClient) -> None:
+    res = admin_client.post(
+        "/api/v1/admin/memes/upload",
+        files={"file": ("meme.png", b"%PDF-1.4 not an image", "image/png")},
+    )
+    assert res.status_code == 400
@@ -0,0 +1,107 @@
+"""Tests for set-based first-visit maintenance."""
+
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from datetime import date
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.jobs import enqueue, run_next_job
+from src.models import Job, TCCDestination, Trip, TripDestination, Visit
+from src.query_stats import QueryStats
+from src.travels.visits import recalculate_visits, record_visits
+
+
+def _destinations(db: Session, count: int) -> list[int]:
+    tccs = [
+        TCCDestination(name=f"Dest {i}", tcc_region="EUROPE", tcc_index=i) for i in range(count)
+    ]
+    db.add_all(tccs)
+    db.flush()
+    return [t.id for t in tccs]
+
+
+def _trip(db: Session, start: date, end: date | None, tcc_ids: list[int]) -> Trip:
+    trip = Trip(start_date=start, end_date=end, trip_type="regular")
+    trip.destinations = [TripDestination(tcc_destination_id=i) for i in tcc_ids]
+    db.add(trip)
+    db.flush()
+    return trip
+
+
+def _visit_dates(db: Session) -> dict[int, date | None]:
+    db.expire_all()
+    return {v.tcc_destination_id: v.first_visit_date for v in db.query(Visit).all()}
+
+
+def test_recalculate_batch_in_two_statements(
+    db_session: Session, query_budget: Callable[[int], AbstractContextManager[QueryStats]]
+) -> None:
+    a, b, c, d = _destinations(db_session, 4)
+    _trip(db_session, date(2020, 1, 1), date(2020, 1, 10), [a, b])
+    # Starts later but ends first: the earlier completion wins
+    _trip(db_session, date(2020, 1, 3), date(2020, 1, 5), [b])
+    _trip(db_session, date(2021, 6, 1), None, [c])
+    db_session.add(Visit(tcc_destination_id=a, first_visit_date=date(2022, 1, 1)))
+    db_session.commit()
+
+    with query_budget(2):
+        changed = recalculate_visits(db_session, [a, b, c, d])
+
+    assert changed == 3
+    assert _visit_dates(db_session) == {
+        a: date(2020, 1, 10),
+        b: date(2020, 1, 5),
+        c: date(2021, 6, 1),
+    }
+
+
+def test_recalculate_never_raises_or_clears(db_session: Session) -> None:
+    a, b, c = _destinations(db_session, 3)
+    _trip(db_session, date(2020, 1, 1), date(2020, 1, 10), [a, b])
+    # Earlier check-in, and a destination without trips
+    db_session.add(Visit(tcc_destination_id=a, first_visit_date=date(2019, 5, 1)))
+    db_session.add(Visit(tcc_destination_id=c, first_visit_date=date(2018, 1, 1)))
+    db_session.commit()
+
+    assert recalculate_visits(db_session, []) == 0
+    recalculate_visits(db_session, [b])
+    assert _visit_dates(db_session)[a] == date(2019, 5, 1)
+
+    recalculate_visits(db_session)
+    assert _visit_dates(db_session) == {
+        a: date(2019, 5, 1),
+        b: date(2020, 1, 10),
+        c: date(2018, 1, 1),
+    }
+
+
+def test_record_visits(db_session: Session) -> None:
+    a, b, c = _destinations(db_session, 3)
+    db_session.add(Visit(tcc_destination_id=a, first_visit_date=date(2030, 1, 1)))
+    db_session.add(Visit(tcc_destination_id=b, first_visit_date=date(2020, 1, 1)))
+    db_session.commit()
+
+    assert record_visits(db_session, [a, b, c], date(2025, 3, 1)) == 2
+    assert _visit_dates(db_session) == {
+        a: date(2025, 3, 1),
+        b: date(2020, 1, 1),
+        c: date(2025, 3, 1),
+    }
+    assert record_visits(db_session, [], date(2025, 3, 1)) == 0
+
+
+def test_rebuild_job(db_session: Session) -> None:
+    (a,) = _destinations(db_session, 1)
+    _trip(db_session, date(2020, 1, 1), date(2020, 1, 2), [a])
+    db_session.commit()
+
+    job = enqueue(db_session, "visits.rebuild")
+    assert run_next_job(sessionmaker(bind=db_session.get_bind())) is True
+
+    db_session.expire_all()
+    finished = db_session.get(Job, job.id)
+    assert finished is not None
+    assert finished.status == "succeeded"
+    assert finished.result == {"changed": 1}
+    assert _visit_dates(db_session) == {a: date(2020, 1, 2)}
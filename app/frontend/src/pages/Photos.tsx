@@ -773,7 +773,7 @@ export default function Photos() {
                 }}
               >
                 <img
-                  src={`/api/v1/travels/photos/media/${photo.media_id}`}
+                  src={`/api/v1/travels/photos/media/${photo.media_id}?size=640`}
                   alt={photo.caption || "Trip photo"}
                   loading="lazy"
                 />
@@ -877,7 +877,7 @@ export default function Photos() {
                       }}
                     >
                       <img
-                        src={`/api/v1/travels/photos/media/${photo.media_id}`}
+                        src={`/api/v1/travels/photos/media/${photo.media_id}?size=640`}
                         alt={photo.caption || "Photo"}
                         loading="lazy"
                       />
@@ -977,7 +977,7 @@ export default function Photos() {
                         height="1"
                       >
                         <image
-                          href={`/api/v1/travels/photos/media/${country.thumbnail_media_id}`}
+                          href={`/api/v1/travels/photos/media/${country.thumbnail_media_id}?size=320`}
                           width="1"
                           height="1"
                           preserveAspectRatio="xMidYMid slice"
@@ -1204,7 +1204,7 @@ export default function Photos() {
               >
                 <div className="trip-photo-thumbnail">
                   <img
-                    src={`/api/v1/travels/photos/media/${trip.thumbnail_media_id}`}
+                    src={`/api/v1/travels/photos/media/${trip.thumbnail_media_id}?size=640`}
                     alt={trip.destinations.join(", ")}
                     loading="lazy"
                   />